@@ -0,0 +1,34 @@
+"""Add imap_sync_state table for incremental UID-based inbox ingestion
+
+Stores UIDVALIDITY and the highest processed UID per IMAP account/mailbox
+so the email poller fetches only new messages on each cycle.
+
+Revision ID: 059_add_imap_sync_state
+Revises: 058_migrate_sent_campaigns_to_active
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '059_add_imap_sync_state'
+down_revision = '058_migrate_sent_campaigns_to_active'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'imap_sync_state',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('account', sa.String(255), nullable=False),
+        sa.Column('mailbox', sa.String(255), nullable=False, server_default='INBOX'),
+        sa.Column('uid_validity', sa.BigInteger(), nullable=False),
+        sa.Column('last_seen_uid', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    )
+    op.create_index('idx_imap_sync_state_account_mailbox', 'imap_sync_state', ['account', 'mailbox'], unique=True)
+
+
+def downgrade():
+    op.drop_index('idx_imap_sync_state_account_mailbox', table_name='imap_sync_state')
+    op.drop_table('imap_sync_state')
@@ -0,0 +1,22 @@
+"""Add composite (user_id, category_id) index on documents
+
+Category listing counts a user's documents per category in one grouped
+query; this index lets PostgreSQL answer it from the index alone.
+
+Revision ID: 060_add_document_user_category_index
+Revises: 059_add_imap_sync_state
+"""
+from alembic import op
+
+revision = '060_add_document_user_category_index'
+down_revision = '059_add_imap_sync_state'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('idx_document_user_category', 'documents', ['user_id', 'category_id'])
+
+
+def downgrade():
+    op.drop_index('idx_document_user_category', table_name='documents')
@@ -0,0 +1,35 @@
+"""Add translation_cache table
+
+Stores machine translations keyed by provider, language pair and SHA-256 of
+the source text so repeated category names, keywords and UI strings are not
+sent to LibreTranslate/DeepL again.
+
+Revision ID: 061_add_translation_cache
+Revises: 060_add_document_user_category_index
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '061_add_translation_cache'
+down_revision = '060_add_document_user_category_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'translation_cache',
+        sa.Column('provider', sa.String(30), nullable=False),
+        sa.Column('source_lang', sa.String(10), nullable=False),
+        sa.Column('target_lang', sa.String(10), nullable=False),
+        sa.Column('text_hash', sa.String(64), nullable=False),
+        sa.Column('translated_text', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('provider', 'source_lang', 'target_lang', 'text_hash'),
+    )
+    op.create_index('idx_translation_cache_created', 'translation_cache', ['created_at'])
+
+
+def downgrade():
+    op.drop_index('idx_translation_cache_created', table_name='translation_cache')
+    op.drop_table('translation_cache')
@@ -0,0 +1,44 @@
+"""Add stripe_webhook_events table
+
+Verified Stripe webhook events are stored on receipt (the Stripe event ID is
+the primary key, so redeliveries are ignored) and processed by a background
+worker in per-customer order.
+
+Revision ID: 062_add_stripe_webhook_events
+Revises: 061_add_translation_cache
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '062_add_stripe_webhook_events'
+down_revision = '061_add_translation_cache'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'stripe_webhook_events',
+        sa.Column('id', sa.String(255), primary_key=True),
+        sa.Column('event_type', sa.String(100), nullable=False),
+        sa.Column('customer_key', sa.String(255), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('stripe_created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('received_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        'idx_stripe_webhook_events_customer_status', 'stripe_webhook_events',
+        ['customer_key', 'status', 'stripe_created_at']
+    )
+    op.create_index('idx_stripe_webhook_events_status_received', 'stripe_webhook_events', ['status', 'received_at'])
+
+
+def downgrade():
+    op.drop_index('idx_stripe_webhook_events_status_received', table_name='stripe_webhook_events')
+    op.drop_index('idx_stripe_webhook_events_customer_status', table_name='stripe_webhook_events')
+    op.drop_table('stripe_webhook_events')
@@ -0,0 +1,242 @@
+"""Add incrementally maintained admin statistics
+
+Per-user document totals (user_document_stats) and global counters
+(stats_counters) are kept current by statement-level triggers on documents
+and row-level triggers on users and user_monthly_usage, so the admin
+dashboard and user list no longer aggregate the documents table. Daily
+activity buckets (stats_daily_rollups) are backfilled here and refreshed
+by the stats rollup job.
+
+Revision ID: 063_add_stats_rollups
+Revises: 062_add_stripe_webhook_events
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '063_add_stats_rollups'
+down_revision = '062_add_stripe_webhook_events'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'user_document_stats',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('document_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('total_bytes', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('total_pages', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    )
+    op.create_table(
+        'stats_counters',
+        sa.Column('metric', sa.String(50), nullable=False),
+        sa.Column('slot', sa.SmallInteger(), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('metric', 'slot'),
+    )
+    op.create_table(
+        'stats_daily_rollups',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('metric', sa.String(50), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'metric'),
+    )
+    op.create_index('idx_document_created_at', 'documents', ['created_at'])
+    op.create_index('idx_user_created_at', 'users', ['created_at'])
+
+    # Block writes until triggers and backfill are in place (same transaction)
+    op.execute("LOCK TABLE documents, users, user_monthly_usage IN SHARE ROW EXCLUSIVE MODE")
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION stats_add_counter(p_metric text, p_user uuid, p_delta bigint)
+        RETURNS void AS $$
+        BEGIN
+            IF p_delta = 0 THEN
+                RETURN;
+            END IF;
+            INSERT INTO stats_counters (metric, slot, value)
+            VALUES (p_metric, hashtext(p_user::text) & 15, p_delta)
+            ON CONFLICT (metric, slot) DO UPDATE SET value = stats_counters.value + EXCLUDED.value;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION stats_add_user_totals(p_user uuid, p_docs bigint, p_bytes bigint, p_pages bigint)
+        RETURNS void AS $$
+        BEGIN
+            UPDATE user_document_stats
+            SET document_count = document_count + p_docs,
+                total_bytes = total_bytes + p_bytes,
+                total_pages = total_pages + p_pages,
+                updated_at = now()
+            WHERE user_id = p_user;
+            -- Decrements for a user whose row is gone (user deleted) are dropped
+            IF NOT FOUND AND (p_docs > 0 OR p_pages > 0) THEN
+                INSERT INTO user_document_stats (user_id, document_count, total_bytes, total_pages)
+                VALUES (p_user, p_docs, p_bytes, p_pages)
+                ON CONFLICT (user_id) DO UPDATE SET
+                    document_count = user_document_stats.document_count + EXCLUDED.document_count,
+                    total_bytes = user_document_stats.total_bytes + EXCLUDED.total_bytes,
+                    total_pages = user_document_stats.total_pages + EXCLUDED.total_pages,
+                    updated_at = now();
+            END IF;
+            PERFORM stats_add_counter('documents', p_user, p_docs);
+            PERFORM stats_add_counter('document_bytes', p_user, p_bytes);
+            PERFORM stats_add_counter('document_pages', p_user, p_pages);
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # Statement-level: a bulk insert/delete/move touches each user's row once, in user_id order
+    op.execute("""
+        CREATE OR REPLACE FUNCTION stats_documents_changed()
+        RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM stats_add_user_totals(user_id, count(*), sum(file_size), 0)
+                FROM new_rows WHERE NOT is_deleted
+                GROUP BY user_id ORDER BY user_id;
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM stats_add_user_totals(user_id, -count(*), -sum(file_size), 0)
+                FROM old_rows WHERE NOT is_deleted
+                GROUP BY user_id ORDER BY user_id;
+            ELSE
+                PERFORM stats_add_user_totals(user_id, sum(docs), sum(bytes)::bigint, 0)
+                FROM (
+                    SELECT user_id, 1 AS docs, file_size::bigint AS bytes FROM new_rows WHERE NOT is_deleted
+                    UNION ALL
+                    SELECT user_id, -1, -file_size::bigint FROM old_rows WHERE NOT is_deleted
+                ) delta
+                GROUP BY user_id
+                HAVING sum(docs) <> 0 OR sum(bytes) <> 0
+                ORDER BY user_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_documents_stats_insert AFTER INSERT ON documents
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION stats_documents_changed()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_documents_stats_update AFTER UPDATE ON documents
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION stats_documents_changed()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_documents_stats_delete AFTER DELETE ON documents
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION stats_documents_changed()
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION stats_monthly_usage_changed()
+        RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM stats_add_user_totals(NEW.user_id, 0, 0, NEW.pages_processed);
+            ELSIF TG_OP = 'DELETE' THEN
+                -- Usage rows go away with their user (ON DELETE CASCADE)
+                PERFORM stats_add_user_totals(OLD.user_id, 0, 0, -OLD.pages_processed);
+            ELSE
+                PERFORM stats_add_user_totals(NEW.user_id, 0, 0, NEW.pages_processed - OLD.pages_processed);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_monthly_usage_stats AFTER INSERT OR DELETE OR UPDATE OF pages_processed ON user_monthly_usage
+        FOR EACH ROW EXECUTE FUNCTION stats_monthly_usage_changed()
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION stats_users_changed()
+        RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM stats_add_counter('users', OLD.id, -1);
+                PERFORM stats_add_counter('users_tier:' || OLD.tier_id, OLD.id, -1);
+                IF OLD.is_active THEN
+                    PERFORM stats_add_counter('users_active', OLD.id, -1);
+                END IF;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM stats_add_counter('users', NEW.id, 1);
+                PERFORM stats_add_counter('users_tier:' || NEW.tier_id, NEW.id, 1);
+                IF NEW.is_active THEN
+                    PERFORM stats_add_counter('users_active', NEW.id, 1);
+                END IF;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_users_stats AFTER INSERT OR DELETE OR UPDATE OF tier_id, is_active ON users
+        FOR EACH ROW EXECUTE FUNCTION stats_users_changed()
+    """)
+
+    # Backfill from existing data
+    op.execute("""
+        INSERT INTO user_document_stats (user_id, document_count, total_bytes, total_pages)
+        SELECT u.id, coalesce(d.docs, 0), coalesce(d.bytes, 0), coalesce(m.pages, 0)
+        FROM users u
+        LEFT JOIN (
+            SELECT user_id, count(*) AS docs, sum(file_size) AS bytes
+            FROM documents WHERE NOT is_deleted GROUP BY user_id
+        ) d ON d.user_id = u.id
+        LEFT JOIN (
+            SELECT user_id, sum(pages_processed) AS pages FROM user_monthly_usage GROUP BY user_id
+        ) m ON m.user_id = u.id
+        WHERE d.user_id IS NOT NULL OR m.user_id IS NOT NULL
+    """)
+    op.execute("""
+        INSERT INTO stats_counters (metric, slot, value)
+        SELECT metric, slot, sum(value) FROM (
+            SELECT 'documents' AS metric, hashtext(user_id::text) & 15 AS slot, document_count AS value FROM user_document_stats
+            UNION ALL
+            SELECT 'document_bytes', hashtext(user_id::text) & 15, total_bytes FROM user_document_stats
+            UNION ALL
+            SELECT 'document_pages', hashtext(user_id::text) & 15, total_pages FROM user_document_stats
+            UNION ALL
+            SELECT 'users', hashtext(id::text) & 15, 1 FROM users
+            UNION ALL
+            SELECT 'users_tier:' || tier_id, hashtext(id::text) & 15, 1 FROM users
+            UNION ALL
+            SELECT 'users_active', hashtext(id::text) & 15, 1 FROM users WHERE is_active
+        ) counts
+        GROUP BY metric, slot
+    """)
+    op.execute("""
+        INSERT INTO stats_daily_rollups (day, metric, value)
+        SELECT (created_at AT TIME ZONE 'UTC')::date, 'documents_created', count(*) FROM documents GROUP BY 1
+        UNION ALL
+        SELECT (created_at AT TIME ZONE 'UTC')::date, 'bytes_uploaded', sum(file_size) FROM documents GROUP BY 1
+        UNION ALL
+        SELECT (created_at AT TIME ZONE 'UTC')::date, 'signups', count(*) FROM users GROUP BY 1
+    """)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS trg_users_stats ON users")
+    op.execute("DROP TRIGGER IF EXISTS trg_monthly_usage_stats ON user_monthly_usage")
+    op.execute("DROP TRIGGER IF EXISTS trg_documents_stats_delete ON documents")
+    op.execute("DROP TRIGGER IF EXISTS trg_documents_stats_update ON documents")
+    op.execute("DROP TRIGGER IF EXISTS trg_documents_stats_insert ON documents")
+    op.execute("DROP FUNCTION IF EXISTS stats_users_changed()")
+    op.execute("DROP FUNCTION IF EXISTS stats_monthly_usage_changed()")
+    op.execute("DROP FUNCTION IF EXISTS stats_documents_changed()")
+    op.execute("DROP FUNCTION IF EXISTS stats_add_user_totals(uuid, bigint, bigint, bigint)")
+    op.execute("DROP FUNCTION IF EXISTS stats_add_counter(text, uuid, bigint)")
+    op.drop_index('idx_user_created_at', table_name='users')
+    op.drop_index('idx_document_created_at', table_name='documents')
+    op.drop_table('stats_daily_rollups')
+    op.drop_table('stats_counters')
+    op.drop_table('user_document_stats')
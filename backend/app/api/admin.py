@@ -13,12 +13,14 @@ from sqlalchemy import select, func, and_, or_, desc, text
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 
-from app.database.models import User, TierPlan, TierProviderSettings, UserStorageQuota, UserMonthlyUsage, Document, AuditLog, EmailTemplate, Currency, ProviderConnection, MarketingCampaign, CampaignSend
+from app.database.models import User, TierPlan, TierProviderSettings, UserStorageQuota, UserMonthlyUsage, UserDocumentStats, AuditLog, EmailTemplate, Currency, ProviderConnection, MarketingCampaign, CampaignSend, StopWord
 from app.database.connection import db_manager, get_db
 from app.middleware.auth_middleware import get_current_admin_user
 from app.services.clamav_health_service import clamav_health_service
 from app.services.email_poller_health_service import email_poller_health_service
 from app.services.tier_service import tier_service
+from app.services.admin_stats_service import admin_stats_service
+from app.services.lexicon_service import lexicon_service
 from app.core.provider_registry import ProviderRegistry
 
 logger = logging.getLogger(__name__)
@@ -95,6 +97,7 @@ class SystemStats(BaseModel):
     active_users: int
     total_documents: int
     total_storage_bytes: int
+    total_pages_processed: int
     users_by_tier: Dict[str, int]
     documents_last_24h: int
     signups_last_7d: int
@@ -125,23 +128,15 @@ async def list_users(
         from datetime import datetime
         current_month = datetime.utcnow().strftime("%Y-%m")
 
-        # Compute actual document count and storage from Document table
-        doc_stats = select(
-            Document.user_id,
-            func.count(Document.id).label('doc_count'),
-            func.coalesce(func.sum(Document.file_size), 0).label('total_size')
-        ).where(
-            Document.is_deleted == False
-        ).group_by(Document.user_id).subquery()
-
+        # Document totals are kept per user by triggers (user_document_stats)
         query = select(
             User, TierPlan, UserMonthlyUsage, ProviderConnection,
-            func.coalesce(doc_stats.c.doc_count, 0).label('doc_count'),
-            func.coalesce(doc_stats.c.total_size, 0).label('total_size')
+            func.coalesce(UserDocumentStats.document_count, 0).label('doc_count'),
+            func.coalesce(UserDocumentStats.total_bytes, 0).label('total_size')
         ).join(
             TierPlan, User.tier_id == TierPlan.id
         ).outerjoin(
-            doc_stats, doc_stats.c.user_id == User.id
+            UserDocumentStats, UserDocumentStats.user_id == User.id
         ).outerjoin(
             UserMonthlyUsage,
             and_(
@@ -155,26 +150,30 @@ async def list_users(
                 ProviderConnection.is_active == True
             )
         )
+        filters = []
 
         # Apply filters
         if tier_id is not None:
-            query = query.where(User.tier_id == tier_id)
+            filters.append(User.tier_id == tier_id)
 
         if is_active is not None:
-            query = query.where(User.is_active == is_active)
+            filters.append(User.is_active == is_active)
 
         if search:
             search_pattern = f"%{search}%"
-            query = query.where(
+            filters.append(
                 or_(
                     User.email.ilike(search_pattern),
                     User.full_name.ilike(search_pattern)
                 )
             )
 
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total = session.execute(count_query).scalar()
+        query = query.where(*filters)
+
+        # Get total count: maintained counters when they cover the filters, else users only
+        total = None if search else admin_stats_service.count_users(session, tier_id, is_active)
+        if total is None:
+            total = session.execute(select(func.count(User.id)).where(*filters)).scalar()
 
         # Apply pagination
         query = query.order_by(desc(User.created_at))
@@ -777,53 +776,28 @@ async def get_system_stats(
     """
     session = db_manager.session_local()
     try:
-        # Total users
-        total_users = session.execute(select(func.count(User.id))).scalar()
-
-        # Active users
-        active_users = session.execute(
-            select(func.count(User.id)).where(User.is_active == True)
-        ).scalar()
-
-        # Total documents
-        total_documents = session.execute(select(func.count(Document.id))).scalar()
-
-        # Total storage
-        total_storage = session.execute(
-            select(func.coalesce(func.sum(Document.file_size), 0))
-        ).scalar()
-
-        # Users by tier
-        tier_counts = session.execute(
-            select(TierPlan.display_name, func.count(User.id))
-            .join(User, User.tier_id == TierPlan.id)
-            .group_by(TierPlan.display_name)
-        ).all()
-        users_by_tier = {tier_name: count for tier_name, count in tier_counts}
-
-        # Documents last 24h
-        yesterday = datetime.utcnow() - timedelta(days=1)
-        docs_24h = session.execute(
-            select(func.count(Document.id)).where(Document.created_at >= yesterday)
-        ).scalar()
-
-        # Signups last 7 days
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        signups_7d = session.execute(
-            select(func.count(User.id)).where(User.created_at >= week_ago)
-        ).scalar()
+        counters = admin_stats_service.get_counters(session)
+        total_storage = counters.get('document_bytes', 0)
+
+        # Users by tier (counters hold tier IDs)
+        tier_names = dict(session.execute(select(TierPlan.id, TierPlan.display_name)).all())
+        users_by_tier = {
+            tier_names.get(tier, str(tier)): count
+            for tier, count in admin_stats_service.users_by_tier(counters).items()
+        }
 
         logger.info(f"Admin {current_user.email} viewed system stats")
 
         return {
-            "total_users": total_users,
-            "active_users": active_users,
-            "total_documents": total_documents,
+            "total_users": counters.get('users', 0),
+            "active_users": counters.get('users_active', 0),
+            "total_documents": counters.get('documents', 0),
             "total_storage_bytes": total_storage,
             "total_storage_mb": round(total_storage / (1024 * 1024), 2),
+            "total_pages_processed": counters.get('document_pages', 0),
             "users_by_tier": users_by_tier,
-            "documents_last_24h": docs_24h,
-            "signups_last_7d": signups_7d,
+            "documents_last_24h": counters.get('documents_last_24h', 0),
+            "signups_last_7d": counters.get('signups_last_7d', 0),
             "timestamp": datetime.utcnow().isoformat()
         }
 
@@ -837,6 +811,30 @@ async def get_system_stats(
         session.close()
 
 
+@router.get("/stats/daily")
+async def get_daily_stats(
+    days: int = Query(30, ge=1, le=366, description="Number of days including today"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Get daily uploads, uploaded bytes and signups
+
+    Admin only endpoint for dashboard charts, read from daily rollups.
+    """
+    session = db_manager.session_local()
+    try:
+        return {"days": admin_stats_service.get_daily_rollups(session, days)}
+
+    except Exception as e:
+        logger.error(f"Error retrieving daily stats: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve daily statistics"
+        )
+    finally:
+        session.close()
+
+
 @router.get("/activity")
 async def get_recent_activity(
     limit: int = Query(50, ge=1, le=200, description="Number of recent activities"),
@@ -1265,6 +1263,268 @@ async def delete_email_template(
     finally:
         session.close()
 
+# ============================================================
+# Stop Word Management (Admin Only)
+# ============================================================
+
+class StopWordCreate(BaseModel):
+    """Add stop words for a language"""
+    language_code: str = Field(..., min_length=2, max_length=10, description="Language code (ISO 639-1)")
+    words: List[str] = Field(..., min_length=1, description="Stop words; existing inactive ones are reactivated")
+
+
+class StopWordUpdate(BaseModel):
+    """Enable or disable a stop word"""
+    is_active: bool = Field(..., description="Whether the stop word is used for filtering")
+
+
+@router.get("/stop-words")
+async def list_stop_words(
+    language_code: str = Query(..., description="Language code (ISO 639-1)"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    List stop words of a language
+
+    Admin only endpoint, includes inactive stop words.
+    """
+    session = db_manager.session_local()
+    try:
+        stop_words = session.execute(
+            select(StopWord)
+            .where(StopWord.language_code == language_code)
+            .order_by(StopWord.word)
+        ).scalars().all()
+
+        return {
+            "language_code": language_code,
+            "stop_words": [
+                {
+                    "id": str(sw.id),
+                    "word": sw.word,
+                    "is_active": sw.is_active
+                }
+                for sw in stop_words
+            ]
+        }
+
+    except Exception as e:
+        logger.error(f"Error listing stop words: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to list stop words"
+        )
+    finally:
+        session.close()
+
+
+@router.post("/stop-words")
+async def add_stop_words(
+    request: StopWordCreate,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Add stop words for a language
+
+    Admin only endpoint. Bumps the lexicon version, so every API and worker
+    process reloads its stop words.
+    """
+    session = db_manager.session_local()
+    try:
+        words = list(dict.fromkeys(w.strip().lower() for w in request.words if w and w.strip()))
+        if not words:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No stop words given"
+            )
+
+        existing = {
+            sw.word.lower(): sw
+            for sw in session.execute(
+                select(StopWord).where(
+                    and_(
+                        StopWord.language_code == request.language_code,
+                        func.lower(StopWord.word).in_(words)
+                    )
+                )
+            ).scalars()
+        }
+
+        added = reactivated = 0
+        for word in words:
+            stop_word = existing.get(word)
+            if stop_word is None:
+                session.add(StopWord(word=word, language_code=request.language_code, is_active=True))
+                added += 1
+            elif not stop_word.is_active:
+                stop_word.is_active = True
+                reactivated += 1
+
+        version = lexicon_service.bump_version(session) if added or reactivated else None
+        session.commit()
+
+        logger.info(
+            f"Admin {current_user.email} added {added} and reactivated {reactivated} "
+            f"stop words ({request.language_code})"
+        )
+
+        return {
+            "message": "Stop words updated successfully",
+            "added": added,
+            "reactivated": reactivated,
+            "lexicon_version": version
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Error adding stop words: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to add stop words"
+        )
+    finally:
+        session.close()
+
+
+@router.patch("/stop-words/{stop_word_id}")
+async def update_stop_word(
+    stop_word_id: str,
+    update_data: StopWordUpdate,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Enable or disable a stop word
+
+    Admin only endpoint. Bumps the lexicon version.
+    """
+    session = db_manager.session_local()
+    try:
+        stop_word = session.execute(
+            select(StopWord).where(StopWord.id == stop_word_id)
+        ).scalar_one_or_none()
+
+        if not stop_word:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Stop word not found"
+            )
+
+        stop_word.is_active = update_data.is_active
+        version = lexicon_service.bump_version(session)
+        session.commit()
+
+        logger.info(
+            f"Admin {current_user.email} set stop word '{stop_word.word}' ({stop_word.language_code}) "
+            f"active={update_data.is_active}"
+        )
+
+        return {
+            "message": "Stop word updated successfully",
+            "stop_word": {
+                "id": str(stop_word.id),
+                "word": stop_word.word,
+                "language_code": stop_word.language_code,
+                "is_active": stop_word.is_active
+            },
+            "lexicon_version": version
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Error updating stop word: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to update stop word"
+        )
+    finally:
+        session.close()
+
+
+@router.delete("/stop-words/{stop_word_id}")
+async def delete_stop_word(
+    stop_word_id: str,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Delete a stop word
+
+    Admin only endpoint. Bumps the lexicon version.
+    """
+    session = db_manager.session_local()
+    try:
+        stop_word = session.execute(
+            select(StopWord).where(StopWord.id == stop_word_id)
+        ).scalar_one_or_none()
+
+        if not stop_word:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Stop word not found"
+            )
+
+        stop_word_info = f"{stop_word.word} ({stop_word.language_code})"
+
+        session.delete(stop_word)
+        version = lexicon_service.bump_version(session)
+        session.commit()
+
+        logger.info(f"Admin {current_user.email} deleted stop word: {stop_word_info}")
+
+        return {
+            "message": "Stop word deleted successfully",
+            "deleted_stop_word": stop_word_info,
+            "lexicon_version": version
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Error deleting stop word: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to delete stop word"
+        )
+    finally:
+        session.close()
+
+
+@router.post("/lexicons/reload")
+async def reload_lexicons(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Make every process reload stop words, field labels and the entity blacklist
+
+    Admin only endpoint, for lexicon changes made directly in the database
+    (migrations, SQL fixes of entity_field_labels or entity_blacklist).
+    """
+    session = db_manager.session_local()
+    try:
+        version = lexicon_service.bump_version(session)
+        session.commit()
+
+        logger.info(f"Admin {current_user.email} requested a lexicon reload (version {version})")
+
+        return {
+            "message": "Lexicons will be reloaded",
+            "lexicon_version": version
+        }
+
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Error bumping lexicon version: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to reload lexicons"
+        )
+    finally:
+        session.close()
+
 # ============================================================
 # Currency Management (Admin Only)
 # ============================================================
@@ -349,7 +349,7 @@ async def restore_default_categories(
             logger.info(f"Creating folders for {len(folder_names)} categories: {folder_names}")
 
             # Initialize folder structure
-            folder_map = provider.initialize_folder_structure(token, folder_names)
+            folder_map = provider.initialize_folder_structure(token, folder_names, account_key=str(current_user.id))
             logger.info(f"✅ Folder structure initialized on {provider_key}: {len(folder_map)} folders created")
 
             # Convert result to dict and add folder initialization info
@@ -436,7 +436,7 @@ async def list_category_keywords(
     Returns list of keywords with weights, match statistics, and system flag.
     """
     try:
-        logger.info(f"[KEYWORD API DEBUG] list_category_keywords called for category={category_id}, language_code={language_code}, user={current_user.email}")
+        logger.debug("[KEYWORD API DEBUG] list_category_keywords called for category=%s, language_code=%s, user=%s", category_id, language_code, current_user.email)
         session = db_manager.session_local()
 
         keywords = keyword_management_service.list_keywords(
@@ -445,10 +445,10 @@ async def list_category_keywords(
             session=session
         )
 
-        logger.info(f"[KEYWORD API DEBUG] Returning {len(keywords)} keywords for category={category_id}")
-        if keywords:
+        logger.debug("[KEYWORD API DEBUG] Returning %s keywords for category=%s", len(keywords), category_id)
+        if keywords and logger.isEnabledFor(logging.DEBUG):
             languages = list(set(kw.get('language_code') for kw in keywords if isinstance(kw, dict)))
-            logger.info(f"[KEYWORD API DEBUG] Languages in response: {languages}")
+            logger.debug("[KEYWORD API DEBUG] Languages in response: %s", languages)
 
         session.close()
 
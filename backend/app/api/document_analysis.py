@@ -4,6 +4,8 @@ Document analysis API endpoints - database-driven, production-ready
 """
 
 import logging
+import hashlib
+import os
 import uuid
 from datetime import datetime, timedelta
 from typing import Optional
@@ -14,7 +16,7 @@ from sqlalchemy.orm import Session
 
 from app.database.connection import get_db
 from app.database.models import User
-from app.services.document_analysis_service import document_analysis_service
+from app.services.analysis_executor import analysis_executor, AnalysisQueueFullError, AnalysisCancelledError
 from app.services.document_upload_service import document_upload_service
 from app.services.auth_service import auth_service
 from app.services.provider_manager import ProviderManager
@@ -24,7 +26,9 @@ from app.services.config_service import config_service
 from app.services.user_service import user_service
 from app.services.tier_service import tier_service, TierLimitExceeded
 from app.services.batch_processor_service import batch_processor_service
-from app.utils.pdf_utils import count_pdf_pages, estimate_pages_from_size
+from app.services.storage.chunked_upload import spool
+from app.utils.pdf_document import PDFDocument
+from app.utils.pdf_utils import estimate_pages_from_size
 
 import io
 from app.services.file_validation_service import file_validation_service
@@ -48,8 +52,19 @@ class ConfirmUploadRequest(BaseModel):
     confirmed_keywords: list[str]
 
 
+def _analysis_busy_error(e: AnalysisQueueFullError) -> HTTPException:
+    """503 with Retry-After when analysis workers are saturated"""
+    logger.warning(f"Analysis rejected: {e}")
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Document analysis is busy, please retry shortly",
+        headers={"Retry-After": "10"}
+    )
+
+
 @router.post("/analyze")
 async def analyze_document(
+    request: Request,
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_active_user),
     session: Session = Depends(get_db)
@@ -58,6 +73,7 @@ async def analyze_document(
     Analyze uploaded document without storing permanently
     Returns extracted text, keywords, and suggested category
     """
+    document = None
     try:
         # Check if any storage provider is connected
         # Uses ProviderManager to ensure consistency with provider_connections table
@@ -92,7 +108,9 @@ async def analyze_document(
 
         # Count/estimate pages for the document (needed for tracking)
         if file.content_type == 'application/pdf':
-            page_count = count_pdf_pages(file_content)
+            # Spooled once; page counting and the analysis worker share this handle
+            document = PDFDocument.spool(file_content)
+            page_count = document.page_count
         else:
             # For images and other formats, estimate 1 page per file
             page_count = estimate_pages_from_size(len(file_content), file.content_type)
@@ -133,16 +151,12 @@ async def analyze_document(
                 )
 
         # Check for duplicates BEFORE expensive analysis (saves time and resources)
-        logger.info(f"[DUPLICATE DEBUG] === Checking for duplicate (single file) ===")
-        logger.info(f"[DUPLICATE DEBUG] Filename: {file.filename}")
-
         import hashlib
         from app.database.models import Document
         from sqlalchemy import and_
 
         file_hash = hashlib.sha256(file_content).hexdigest()
-        logger.info(f"[DUPLICATE DEBUG] File hash (SHA-256): {file_hash}")
-        logger.info(f"[DUPLICATE DEBUG] User ID: {current_user.id}")
+        logger.debug("[DUPLICATE DEBUG] Checking %s (SHA-256 %s) for user %s", file.filename, file_hash, current_user.id)
 
         duplicate = session.query(Document).filter(
             and_(
@@ -153,11 +167,10 @@ async def analyze_document(
         ).first()
 
         if duplicate:
-            logger.warning(f"[DUPLICATE DEBUG] ❌ DUPLICATE FOUND!")
-            logger.warning(f"[DUPLICATE DEBUG] Existing document ID: {duplicate.id}")
-            logger.warning(f"[DUPLICATE DEBUG] Existing document title: {duplicate.title}")
-            logger.warning(f"[DUPLICATE DEBUG] Uploaded at: {duplicate.created_at}")
-            logger.warning(f"[DUPLICATE DEBUG] Returning 409 Conflict")
+            logger.info(
+                "[DUPLICATE] %s is a duplicate of document %s (%s, uploaded %s)",
+                file.filename, duplicate.id, duplicate.title, duplicate.created_at
+            )
 
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
@@ -173,8 +186,6 @@ async def analyze_document(
                 }
             )
 
-        logger.info(f"[DUPLICATE DEBUG] ✅ No duplicate found, proceeding with analysis")
-
         # Get user's categories
         categories_response = await category_service.list_categories(
             user_id=str(current_user.id),
@@ -191,21 +202,29 @@ async def analyze_document(
                 detail="No categories found. Please create categories first."
             )
         
-        # Analyze document with ML
-        analysis_result = await document_analysis_service.analyze_document(
-            file_content=file_content,
-            file_name=file.filename,
-            mime_type=file.content_type,
-            db=session,
-            user_id=str(current_user.id)
-        )
+        # Analyze document with ML (in the analysis process pool)
+        try:
+            analysis_result = await analysis_executor.analyze(
+                file_content=file_content,
+                file_name=file.filename,
+                mime_type=file.content_type,
+                db=session,
+                user_id=str(current_user.id),
+                request=request,
+                document=document
+            )
+        except AnalysisQueueFullError as e:
+            raise _analysis_busy_error(e)
+        except AnalysisCancelledError:
+            logger.info(f"Analysis of {file.filename} dropped, client disconnected")
+            raise HTTPException(status_code=499, detail="Client closed request")
         
         # Generate temporary ID
         temp_id = str(uuid.uuid4())
         
         # Store temporarily (expires in 24 hours)
         temp_storage[temp_id] = {
-            'file_content': file_content,
+            **_spool_temp_file(file_content, file_hash),
             'file_name': file.filename,
             'mime_type': file.content_type,
             'user_id': str(current_user.id),
@@ -233,6 +252,9 @@ async def analyze_document(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Document analysis failed: {str(e)}"
         )
+    finally:
+        if document is not None:
+            document.close()
 
 
 @router.post("/confirm-upload")
@@ -268,14 +290,14 @@ async def confirm_upload(
             async with aiofiles.open(metadata_path, 'r') as f:
                 metadata = json.loads(await f.read())
 
-            # Read file content from disk
+            # The file stays on disk; the upload streams it from there
             file_path = metadata['file_path']
-            async with aiofiles.open(file_path, 'rb') as f:
-                file_content = await f.read()
 
             # Reconstruct temp_data structure
             temp_data = {
-                'file_content': file_content,
+                'file_path': file_path,
+                'file_size': os.path.getsize(file_path),
+                'file_hash': metadata.get('file_hash'),
                 'file_name': metadata['file_name'],
                 'mime_type': metadata['mime_type'],
                 'user_id': metadata['user_id'],
@@ -293,8 +315,7 @@ async def confirm_upload(
 
         # Check expiration
         if datetime.utcnow() > temp_data['expires_at']:
-            if confirm_request.temp_id in temp_storage:
-                del temp_storage[confirm_request.temp_id]
+            _discard_temp_file(confirm_request.temp_id)
             raise HTTPException(
                 status_code=status.HTTP_410_GONE,
                 detail="Analysis result has expired"
@@ -327,7 +348,7 @@ async def confirm_upload(
         )
 
         # Update monthly usage after successful upload
-        file_size = len(temp_data['file_content'])
+        file_size = temp_data['file_size']
         page_count = temp_data.get('page_count', 1)  # Default to 1 if not stored
 
         # Increment pages processed
@@ -365,11 +386,10 @@ async def confirm_upload(
         # Clean up temp storage immediately after successful confirmation
         if confirm_request.temp_id in temp_storage:
             # Single file upload - remove from memory
-            del temp_storage[confirm_request.temp_id]
+            _discard_temp_file(confirm_request.temp_id)
         else:
             # Batch upload - delete temp files from disk
             import glob
-            import os
             from pathlib import Path
 
             # Find and delete metadata file
@@ -407,6 +427,22 @@ async def confirm_upload(
         )
 
 
+def _spool_temp_file(file_content: bytes, file_hash: str) -> dict:
+    """temp_storage fields for an analyzed upload; large files wait for confirmation on disk, not in memory"""
+    return {
+        'file_stream': spool(file_content),
+        'file_size': len(file_content),
+        'file_hash': file_hash
+    }
+
+
+def _discard_temp_file(temp_id: str):
+    """Remove an upload from temp_storage and release its spooled file"""
+    temp_data = temp_storage.pop(temp_id, None)
+    if temp_data and temp_data.get('file_stream') is not None:
+        temp_data['file_stream'].close()
+
+
 def _cleanup_expired_temp_files():
     """Remove expired temporary files"""
     try:
@@ -417,7 +453,7 @@ def _cleanup_expired_temp_files():
         ]
         
         for key in expired_keys:
-            del temp_storage[key]
+            _discard_temp_file(key)
             logger.info(f"Removed expired temp file: {key}")
             
     except Exception as e:
@@ -435,6 +471,7 @@ async def analyze_batch(
     Analyze multiple documents in batch with smart security validation
     Returns analysis results for all files
     """
+    documents: List[Optional[PDFDocument]] = []
     try:
         ip_address = get_client_ip(request)
 
@@ -481,17 +518,20 @@ async def analyze_batch(
         file_contents = []
 
         for file in files:
-            # Read file content
+            # Read file content once; later steps reuse it
             content = await file.read()
             size = len(content)
-            await file.seek(0)  # Reset to beginning
 
-            # Count/estimate pages
+            # Count/estimate pages (PDFs are parsed once and the handle is reused
+            # for validation and analysis)
+            document = None
             if file.content_type == 'application/pdf':
-                pages = count_pdf_pages(content)
+                document = PDFDocument.spool(content)
+                pages = document.page_count
             else:
                 pages = estimate_pages_from_size(size, file.content_type)
 
+            documents.append(document)
             file_contents.append(content)
             file_sizes.append(size)
             file_page_counts.append(pages)
@@ -536,21 +576,18 @@ async def analyze_batch(
         # Validate first file to check trust score and CAPTCHA requirement
         if files:
             first_file = files[0]
-            file_content = await first_file.read()
-            file_stream = io.BytesIO(file_content)
-            
+            file_stream = io.BytesIO(file_contents[0])
+
             validation_result = await file_validation_service.validate_upload(
                 file_content=file_stream,
                 filename=first_file.filename,
                 user_id=str(current_user.id),
                 user_tier=current_user.tier.name if current_user.tier else "free",
                 ip_address=ip_address,
-                session=session
+                session=session,
+                document=documents[0]
             )
             
-            # Reset file for processing
-            await first_file.seek(0)
-            
             if not validation_result.allowed:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -596,7 +633,7 @@ async def analyze_batch(
         
         # Prepare files data
         files_data = []
-        for file in files:
+        for idx, file in enumerate(files):
             # Validate type
             if file.content_type not in allowed_types:
                 raise HTTPException(
@@ -604,9 +641,8 @@ async def analyze_batch(
                     detail=f"File type {file.content_type} not supported: {file.filename}"
                 )
             
-            # Read content
-            content = await file.read()
-            
+            content = file_contents[idx]
+
             # Validate size
             if len(content) > max_size:
                 raise HTTPException(
@@ -617,7 +653,8 @@ async def analyze_batch(
             files_data.append({
                 'content': content,
                 'filename': file.filename,
-                'mime_type': file.content_type
+                'mime_type': file.content_type,
+                'document': documents[idx]
             })
         
         # Verify user has categories before processing
@@ -640,18 +677,17 @@ async def analyze_batch(
         # Process each file
         results = []
         for idx, file_data in enumerate(files_data):
-            logger.info(f"[DUPLICATE DEBUG] === Processing file {idx+1}/{len(files_data)} ===")
             try:
                 # Check for duplicates BEFORE expensive analysis (saves time and resources)
-                logger.info(f"[DUPLICATE DEBUG] Filename: {file_data['filename']}")
-
                 import hashlib
                 from app.database.models import Document
                 from sqlalchemy import and_
 
                 file_hash = hashlib.sha256(file_data['content']).hexdigest()
-                logger.info(f"[DUPLICATE DEBUG] File hash: {file_hash}")
-                logger.info(f"[DUPLICATE DEBUG] User ID: {current_user.id}")
+                logger.debug(
+                    "[DUPLICATE DEBUG] Checking file %s/%s %s (SHA-256 %s) for user %s",
+                    idx + 1, len(files_data), file_data['filename'], file_hash, current_user.id
+                )
 
                 duplicate = session.query(Document).filter(
                     and_(
@@ -662,9 +698,10 @@ async def analyze_batch(
                 ).first()
 
                 if duplicate:
-                    logger.warning(f"[DUPLICATE DEBUG] ❌ DUPLICATE FOUND in batch!")
-                    logger.warning(f"[DUPLICATE DEBUG] Existing document: {duplicate.title} (ID: {duplicate.id})")
-                    logger.warning(f"[DUPLICATE DEBUG] Uploaded at: {duplicate.created_at}")
+                    logger.info(
+                        "[DUPLICATE] %s in batch is a duplicate of document %s (%s, uploaded %s)",
+                        file_data['filename'], duplicate.id, duplicate.title, duplicate.created_at
+                    )
 
                     # Return error for this specific file in the batch
                     results.append({
@@ -681,15 +718,15 @@ async def analyze_batch(
                     })
                     continue  # Skip analysis for this duplicate file
 
-                logger.info(f"[DUPLICATE DEBUG] ✅ No duplicate, proceeding with analysis")
-
-                # Analyze document
-                analysis_result = await document_analysis_service.analyze_document(
+                # Analyze document (in the analysis process pool)
+                analysis_result = await analysis_executor.analyze(
                     file_content=file_data['content'],
                     file_name=file_data['filename'],
                     mime_type=file_data['mime_type'],
                     db=session,
-                    user_id=str(current_user.id)
+                    user_id=str(current_user.id),
+                    request=request,
+                    document=file_data['document']
                 )
                 
                 # Generate temporary ID
@@ -697,7 +734,7 @@ async def analyze_batch(
                 
                 # Store temporarily (expires in 24 hours)
                 temp_storage[temp_id] = {
-                    'file_content': file_data['content'],
+                    **_spool_temp_file(file_data['content'], file_hash),
                     'file_name': file_data['filename'],
                     'mime_type': file_data['mime_type'],
                     'user_id': str(current_user.id),
@@ -715,6 +752,11 @@ async def analyze_batch(
                     'batch_id': batch_id
                 })
                 
+            except AnalysisCancelledError:
+                logger.info(f"Batch {batch_id} dropped after {idx} files, client disconnected")
+                raise HTTPException(status_code=499, detail="Client closed request")
+            except AnalysisQueueFullError as e:
+                raise _analysis_busy_error(e)
             except Exception as e:
                 logger.error(f"Failed to analyze {file_data['filename']}: {e}")
                 results.append({
@@ -757,6 +799,10 @@ async def analyze_batch(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Batch analysis failed: {str(e)}"
         )
+    finally:
+        for document in documents:
+            if document is not None:
+                document.close()
 
 
 @router.post("/analyze-batch-async")
@@ -846,31 +892,33 @@ async def analyze_batch_async(
             safe_filename = f"{idx}_{file.filename}"
             file_path = temp_dir / safe_filename
 
-            # Stream file to disk in chunks (memory-efficient)
+            # Stream file to disk in chunks (memory-efficient), hashing as we go;
+            # the batch worker checks duplicates in one query
             file_size = 0
-            file_chunks = []
+            digest = hashlib.sha256()
             async with aiofiles.open(file_path, 'wb') as f:
                 while chunk := await file.read(1024 * 1024):  # 1MB chunks
                     await f.write(chunk)
-                    file_chunks.append(chunk)
+                    digest.update(chunk)
                     file_size += len(chunk)
                 total_size += file_size
+            file_hash = digest.hexdigest()
 
-            # Count pages from file on disk
-            async with aiofiles.open(file_path, 'rb') as f:
-                file_content = await f.read()
-                if file.content_type == 'application/pdf':
-                    pages = count_pdf_pages(file_content)
-                else:
-                    pages = estimate_pages_from_size(file_size, file.content_type)
-                total_pages += pages
+            # Count pages from the file on disk (memory-mapped, not read into memory)
+            if file.content_type == 'application/pdf':
+                with PDFDocument.open(str(file_path)) as document:
+                    pages = document.page_count
+            else:
+                pages = estimate_pages_from_size(file_size, file.content_type)
+            total_pages += pages
 
             file_paths.append({
                 'path': str(file_path),
                 'original_filename': file.filename,
                 'mime_type': file.content_type,
                 'size': file_size,
-                'page_count': pages
+                'page_count': pages,
+                'file_hash': file_hash
             })
 
         logger.info(f"Batch {batch_id}: {len(files)} files, {total_pages} total pages, {total_size / (1024*1024):.2f} MB")
@@ -915,10 +963,14 @@ async def analyze_batch_async(
                 )
 
         # Queue batch processing with Celery (non-blocking)
-        from app.celery_app import process_batch_task, get_queue_stats
+        from app.celery_app import process_batch_task, get_queue_stats, queue_for_batch, PRIORITY_HIGH
 
-        # Send task to Celery queue
-        task = process_batch_task.delay(batch_id, file_paths, str(current_user.id))
+        # Send task to Celery queue (small batches to the interactive queue, large ones to bulk)
+        task = process_batch_task.apply_async(
+            args=(batch_id, file_paths, str(current_user.id)),
+            queue=queue_for_batch(len(file_paths)),
+            priority=PRIORITY_HIGH
+        )
 
         # Get queue statistics
         queue_stats = get_queue_stats()
@@ -172,6 +172,7 @@ async def list_documents(
     page_size: Optional[int] = None,
     sort_by: Optional[str] = None,
     sort_order: Optional[str] = None,
+    cursor: Optional[str] = None,
     include_own: bool = True,
     include_shared: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
@@ -181,6 +182,7 @@ async def list_documents(
     List user documents with search and filtering
 
     Supports full-text search, category filtering, and pagination
+    (page-based, or keyset via the next_cursor of the previous response)
 
     Multi-source filtering (new):
     - include_own: Include user's own documents (default: true)
@@ -200,7 +202,8 @@ async def list_documents(
                 page=page,
                 page_size=page_size,
                 sort_by=sort_by,
-                sort_order=sort_order
+                sort_order=sort_order,
+                cursor=cursor
             )
 
             documents_result = await document_service.search_documents(
@@ -225,7 +228,8 @@ async def list_documents(
             page=page,
             page_size=page_size,
             sort_by=sort_by,
-            sort_order=sort_order
+            sort_order=sort_order,
+            cursor=cursor
         )
 
         # Parse shared owner IDs
@@ -452,6 +456,66 @@ async def update_document_entities(
         )
 
 
+@router.post(
+    "/bulk",
+    response_model=BatchOperationResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "Invalid operation, category or too many documents"},
+        401: {"model": ErrorResponse, "description": "Authentication required"},
+        403: {"model": ErrorResponse, "description": "Delegates cannot modify or delete documents"},
+        500: {"model": ErrorResponse, "description": "Internal server error"}
+    }
+)
+async def bulk_document_operation(
+    batch_request: BatchOperationRequest,
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    delegate_ctx: DelegateContext = Depends(get_delegate_context)
+) -> BatchOperationResponse:
+    """
+    Move, recategorize or delete many documents at once
+
+    Operations: move (parameters.category_id), recategorize
+    (parameters.category_ids, first is primary) and delete.
+    Returns a result per document; documents that fail don't stop the others
+    Note: Delegates need write access to move and delete access to delete
+    """
+    try:
+        if delegate_ctx.is_acting_as_delegate:
+            allowed = delegate_ctx.can_delete if batch_request.operation == "delete" else delegate_ctx.can_write
+            if not allowed:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Delegates cannot modify or delete these documents"
+                )
+
+        ip_address = get_client_ip(request)
+
+        result = await document_service.batch_operation(
+            str(current_user.id), batch_request, ip_address
+        )
+
+        logger.info(
+            f"Bulk {result.operation}: {result.successful}/{result.total_requested} documents "
+            f"by user {current_user.email}"
+        )
+        return result
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Bulk document operation error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Bulk document operation service error"
+        )
+
+
 @router.delete(
     "/{document_id}",
     responses={
@@ -5,11 +5,14 @@ Only accessible from localhost/internal networks.
 """
 
 from fastapi import APIRouter, Request, HTTPException, status
+from fastapi.responses import PlainTextResponse
 from app.services.performance_service import performance_monitor
 from app.core.config import settings
 
 router = APIRouter(tags=["metrics"])
 
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
 
 def _is_internal_request(request: Request) -> bool:
     """Check if request is from localhost/internal network."""
@@ -29,12 +32,8 @@ def _is_internal_request(request: Request) -> bool:
     return client_host in internal_ips
 
 
-@router.get("/metrics")
-async def get_metrics(request: Request):
-    """
-    Get performance metrics.
-    Only accessible from localhost/internal networks.
-    """
+def _check_access(request: Request):
+    """Raise unless the metrics endpoint is enabled and the caller is internal."""
     if not settings.performance.perf_metrics_endpoint_enabled:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -47,6 +46,28 @@ async def get_metrics(request: Request):
             detail="Metrics endpoint is only accessible internally"
         )
 
+
+def _wants_prometheus(request: Request, format: str) -> bool:
+    """Prometheus scrapers ask for text/plain or OpenMetrics; browsers and scripts get JSON."""
+    if format:
+        return format.lower() == "prometheus"
+    accept = request.headers.get("accept", "")
+    return "openmetrics" in accept or accept.startswith("text/plain")
+
+
+@router.get("/metrics")
+async def get_metrics(request: Request, format: str = ""):
+    """
+    Get performance metrics, aggregated across all workers.
+    Returns Prometheus exposition format for scrapers (Accept: text/plain or
+    ?format=prometheus), JSON otherwise.
+    Only accessible from localhost/internal networks.
+    """
+    _check_access(request)
+
+    if _wants_prometheus(request, format):
+        return PlainTextResponse(performance_monitor.render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
     return {
         "status": "ok",
         "environment": settings.app.app_environment,
@@ -60,17 +81,7 @@ async def get_slow_requests(request: Request, limit: int = 20):
     Get recent slow requests for debugging.
     Only accessible from localhost/internal networks.
     """
-    if not settings.performance.perf_metrics_endpoint_enabled:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Metrics endpoint is disabled"
-        )
-
-    if settings.is_production and not _is_internal_request(request):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Metrics endpoint is only accessible internally"
-        )
+    _check_access(request)
 
     return {
         "environment": settings.app.app_environment,
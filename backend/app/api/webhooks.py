@@ -6,6 +6,9 @@ Handles asynchronous events from Stripe (payments, subscriptions, invoices)
 
 import logging
 import asyncio
+from contextvars import ContextVar
+from typing import List, Optional
+
 import stripe
 from fastapi import APIRouter, Request, HTTPException, status, Depends
 from sqlalchemy.orm import Session
@@ -19,6 +22,7 @@ from app.database.models import (
 )
 from app.services.stripe_service import stripe_service
 from app.services.email_service import email_service
+from app.services.stripe_webhook_service import stripe_webhook_service
 from app.schemas.billing_schemas import WebhookEventResponse
 from app.core.config import settings
 
@@ -26,6 +30,18 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/webhooks", tags=["webhooks"])
 
+# Background tasks (emails) spawned by the event handler currently running
+_spawned_tasks: ContextVar[Optional[List[asyncio.Task]]] = ContextVar('stripe_spawned_tasks', default=None)
+
+
+def _spawn(coro) -> asyncio.Task:
+    """Start a handler's background task and record it for process_stripe_event's caller"""
+    task = asyncio.create_task(coro)
+    spawned = _spawned_tasks.get()
+    if spawned is not None:
+        spawned.append(task)
+    return task
+
 
 @router.post(
     "/stripe",
@@ -69,26 +85,15 @@ async def stripe_webhook(
 
         logger.info(f"Received Stripe webhook: {event.type} - {event.id}")
 
-        if event.type == 'checkout.session.completed':
-            await handle_checkout_session_completed(event, session)
-        elif event.type == 'customer.subscription.created':
-            await handle_subscription_created(event, session)
-        elif event.type == 'customer.subscription.updated':
-            await handle_subscription_updated(event, session)
-        elif event.type == 'customer.subscription.deleted':
-            await handle_subscription_deleted(event, session)
-        elif event.type == 'invoice.payment_succeeded':
-            await handle_invoice_payment_succeeded(event, session)
-        elif event.type == 'invoice.payment_failed':
-            await handle_invoice_payment_failed(event, session)
-        elif event.type == 'invoice.finalized':
-            await handle_invoice_finalized(event, session)
-        elif event.type == 'payment_intent.succeeded':
-            await handle_payment_intent_succeeded(event, session)
-        elif event.type == 'payment_intent.payment_failed':
-            await handle_payment_intent_failed(event, session)
+        if settings.stripe.stripe_webhook_async:
+            # Store and acknowledge; events are processed in order per customer by a worker
+            is_new, customer_key = stripe_webhook_service.store_event(payload, event, session)
+            if is_new:
+                stripe_webhook_service.dispatch(customer_key)
+            else:
+                logger.info(f"Duplicate Stripe webhook ignored: {event.id}")
         else:
-            logger.info(f"Unhandled webhook event type: {event.type}")
+            await process_stripe_event(event, session)
 
         return WebhookEventResponse(
             received=True,
@@ -106,6 +111,31 @@ async def stripe_webhook(
         )
 
 
+async def process_stripe_event(event, session: Session) -> List[asyncio.Task]:
+    """
+    Run the handler for a verified Stripe event
+
+    Args:
+        event: Stripe event
+        session: Database session (handlers commit their own changes)
+
+    Returns:
+        Background tasks the handler started (e.g. emails still using the session)
+    """
+    handler = EVENT_HANDLERS.get(event.type)
+    if handler is None:
+        logger.info(f"Unhandled webhook event type: {event.type}")
+        return []
+
+    spawned: List[asyncio.Task] = []
+    token = _spawned_tasks.set(spawned)
+    try:
+        await handler(event, session)
+    finally:
+        _spawned_tasks.reset(token)
+    return spawned
+
+
 async def handle_checkout_session_completed(event, session: Session):
     """
     Process checkout.session.completed event.
@@ -449,7 +479,7 @@ async def handle_subscription_created(event, session: Session):
             tier_feature_3 = "Email-to-document processing (send docs via email)"
 
         # Send email
-        asyncio.create_task(
+        _spawn(
             email_service.send_subscription_confirmation(
                 session=session,
                 user_email=user.email,
@@ -594,7 +624,7 @@ async def handle_subscription_updated(event, session: Session):
                 amount_paid = subscription.amount_cents / 100 if subscription.amount_cents else 0
 
             logger.info(f"[WEBHOOK] Sending upgrade confirmation email to {user.email}")
-            asyncio.create_task(
+            _spawn(
                 email_service.send_subscription_upgraded_email(
                     user.email,
                     user.full_name or user.email,
@@ -677,7 +707,7 @@ async def handle_subscription_deleted(event, session: Session):
         feedback_url = f"{frontend_url}/feedback?reason=cancellation"
         support_url = f"{frontend_url}/support"
 
-        asyncio.create_task(
+        _spawn(
             email_service.send_cancellation_email(
                 session=session,
                 user_email=user.email,
@@ -864,7 +894,7 @@ async def handle_invoice_payment_succeeded(event, session: Session):
                     # Send upgrade confirmation email
                     try:
                         billing_cycle = 'yearly' if 'year' in str(stripe_sub['items']['data'][0]['price'].get('recurring', {}).get('interval', '')) else 'monthly'
-                        asyncio.create_task(
+                        _spawn(
                             email_service.send_subscription_upgraded_email(
                                 user.email,
                                 user.full_name or user.email,
@@ -942,7 +972,7 @@ async def handle_invoice_payment_succeeded(event, session: Session):
         support_url = f"{frontend_url}/support"
 
         # Send email
-        asyncio.create_task(
+        _spawn(
             email_service.send_invoice_email(
                 session=session,
                 user_email=user.email,
@@ -1083,3 +1113,16 @@ async def handle_payment_intent_failed(event, session: Session):
 
     session.commit()
     logger.warning(f"Payment intent {payment_intent.id} failed for user {user.email}")
+
+
+EVENT_HANDLERS = {
+    'checkout.session.completed': handle_checkout_session_completed,
+    'customer.subscription.created': handle_subscription_created,
+    'customer.subscription.updated': handle_subscription_updated,
+    'customer.subscription.deleted': handle_subscription_deleted,
+    'invoice.payment_succeeded': handle_invoice_payment_succeeded,
+    'invoice.payment_failed': handle_invoice_payment_failed,
+    'invoice.finalized': handle_invoice_finalized,
+    'payment_intent.succeeded': handle_payment_intent_succeeded,
+    'payment_intent.payment_failed': handle_payment_intent_failed,
+}
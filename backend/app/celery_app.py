@@ -3,9 +3,10 @@ Celery application for async task processing
 
 This module configures Celery for handling background tasks like document processing.
 """
+import gc
 import os
 from celery import Celery
-from celery.signals import task_prerun, task_postrun, task_failure
+from celery.signals import task_prerun, task_postrun, task_failure, worker_init, worker_process_init, after_setup_logger
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,6 +14,24 @@ logger = logging.getLogger(__name__)
 # Get Redis URL from environment or use default
 REDIS_URL = os.getenv('REDIS_URL', 'redis://redis:6379/0')
 
+# Queue topology (each queue is consumed by its own worker service, see the
+# celery-worker* services in docker-compose*.yml):
+# - interactive: small batches (a user waiting on a few files)
+# - bulk: large batches, fanned out as many shard subtasks
+# - storage_migration: provider migrations (long, I/O bound)
+INTERACTIVE_QUEUE = 'interactive'
+BULK_QUEUE = 'bulk'
+MIGRATION_QUEUE = 'storage_migration'
+
+# Batches up to this many files go to the interactive queue
+INTERACTIVE_MAX_FILES = int(os.getenv('CELERY_INTERACTIVE_MAX_FILES', '4'))
+
+# The Redis transport emulates priorities with one list per step (priority_steps,
+# named <queue><sep><priority>); 0 is the HIGHEST priority
+PRIORITY_STEPS = list(range(10))
+PRIORITY_HIGH = 0
+PRIORITY_LOW = PRIORITY_STEPS[-1]
+
 # Initialize Celery
 celery_app = Celery(
     'bonifatus',
@@ -40,35 +59,124 @@ celery_app.conf.update(
 
     # Worker settings
     worker_prefetch_multiplier=1,  # Only fetch 1 task at a time
-    worker_max_tasks_per_child=10,  # Restart worker after 10 tasks (prevent memory leaks)
+    # Recycle children by memory instead of task count so warm NLP models survive
+    worker_max_memory_per_child=int(os.getenv('CELERY_WORKER_MAX_MEMORY_KB', '1500000')),
+    worker_max_tasks_per_child=int(os.getenv('CELERY_WORKER_MAX_TASKS_PER_CHILD', '0')) or None,
     worker_disable_rate_limits=False,
 
-    # Task routing
+    # Task routing (batch tasks are routed per call, see queue_for_batch)
     task_routes={
-        'app.celery_app.process_batch_task': {'queue': 'document_processing'},
-        'app.celery_app.migrate_provider_documents_task': {'queue': 'storage_migration'},
+        'app.celery_app.process_batch_task': {'queue': INTERACTIVE_QUEUE},
+        'app.celery_app.process_batch_shard_task': {'queue': INTERACTIVE_QUEUE},
+        'app.celery_app.finalize_batch_task': {'queue': INTERACTIVE_QUEUE},
+        'app.celery_app.fail_batch_task': {'queue': INTERACTIVE_QUEUE},
+        'app.celery_app.learn_from_classification_task': {'queue': INTERACTIVE_QUEUE},
+        'app.celery_app.process_stripe_events_task': {'queue': INTERACTIVE_QUEUE},
+        'app.celery_app.migrate_provider_documents_task': {'queue': MIGRATION_QUEUE},
     },
 
     # Queue settings
-    task_default_queue='document_processing',
-    task_default_exchange='document_processing',
-    task_default_routing_key='document_processing',
+    task_default_queue=INTERACTIVE_QUEUE,
+    task_default_exchange=INTERACTIVE_QUEUE,
+    task_default_routing_key=INTERACTIVE_QUEUE,
+    task_default_priority=5,
+    broker_transport_options={
+        'priority_steps': PRIORITY_STEPS,
+        'sep': ':',
+        'queue_order_strategy': 'priority',
+    },
 
     # Retry settings
     task_acks_late=True,  # Acknowledge task after completion
     task_reject_on_worker_lost=True,  # Requeue if worker crashes
 )
 
+
+def queue_for_batch(file_count: int) -> str:
+    """Interactive queue for small batches, bulk queue for large ones"""
+    return INTERACTIVE_QUEUE if file_count <= INTERACTIVE_MAX_FILES else BULK_QUEUE
+
+
+def shard_priority(shard_index: int) -> int:
+    """
+    Priority of the n-th shard of a batch
+
+    Every batch's first shards get the highest priority and later shards sink,
+    so a new user's batch overtakes the tail of someone's 100-file batch
+    instead of waiting behind it (fair share across users).
+    """
+    return min(PRIORITY_HIGH + shard_index, PRIORITY_LOW)
+
+
+async def _close_loop_clients():
+    """Close the pooled HTTP clients bound to the current event loop"""
+    from app.services.email_delivery_service import email_delivery_service
+    from app.services.translation_service import translation_service
+
+    await email_delivery_service.aclose()
+    await translation_service.aclose()
+
+
+def run_task_coroutine(coro):
+    """
+    Run a task's coroutine on a fresh event loop
+
+    The email delivery and translation clients are pooled per event loop, so
+    they are closed before the task's loop is.
+    """
+    import asyncio
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        try:
+            loop.run_until_complete(_close_loop_clients())
+        finally:
+            loop.close()
+
+
+@worker_init.connect
+def warm_up_worker(**kwargs):
+    """Load NLP models in the parent before the prefork pool forks its children"""
+    if os.getenv('CELERY_WARM_UP_MODELS', 'true').lower() != 'true':
+        return
+    from app.services.analysis_executor import warm_up_models
+    from app.database.connection import db_manager
+
+    warm_up_models()
+    # Children must not inherit the parent's open DB connections
+    db_manager.engine.dispose()
+    # Keep the garbage collector away from the preloaded models and lexicons,
+    # so collections in the children do not copy their pages
+    gc.freeze()
+
+
+@worker_process_init.connect
+def reset_child_connections(**kwargs):
+    """Drop pooled DB connections inherited from the parent process"""
+    from app.database.connection import db_manager
+    db_manager.engine.dispose(close=False)
+
+
+@after_setup_logger.connect
+def configure_task_logging(logger=None, **kwargs):
+    """Apply APP_LOG_LEVELS and DEBUG sampling on top of Celery's logging setup"""
+    from app.core.logging_config import configure_worker_logging
+    configure_worker_logging(logger)
+
+
 # Task logging
 @task_prerun.connect
 def task_prerun_handler(sender=None, task_id=None, task=None, args=None, kwargs=None, **extra):
     """Log when task starts"""
-    logger.info(f"[Celery] Task {task.name}[{task_id}] starting")
+    logger.debug("[Celery] Task %s[%s] starting", task.name, task_id)
 
 @task_postrun.connect
 def task_postrun_handler(sender=None, task_id=None, task=None, args=None, kwargs=None, retval=None, state=None, **extra):
     """Log when task completes"""
-    logger.info(f"[Celery] Task {task.name}[{task_id}] completed with state: {state}")
+    logger.info("[Celery] Task %s[%s] completed with state: %s", task.name, task_id, state)
 
 @task_failure.connect
 def task_failure_handler(sender=None, task_id=None, exception=None, args=None, kwargs=None, traceback=None, einfo=None, **extra):
@@ -81,17 +189,19 @@ def process_batch_task(self, batch_id: str, file_paths: list, user_id: str):
     """
     Celery task for processing document batch
 
+    Resolves duplicates for the whole batch, then fans the remaining files out
+    as shard subtasks (chord); finalize_batch_task runs when all shards finish.
+
     Args:
         batch_id: UUID of the batch
-        file_paths: List of {path, original_filename, mime_type, size, page_count}
+        file_paths: List of {path, original_filename, mime_type, size, page_count[, file_hash]}
         user_id: UUID of the user
 
     Returns:
         dict: Result summary
     """
+    from celery import chord, group
     from app.services.batch_processor_service import BatchProcessorService
-    from app.database.connection import DatabaseManager
-    import asyncio
 
     logger.info(f"[Celery] Processing batch {batch_id} with {len(file_paths)} files")
 
@@ -105,58 +215,143 @@ def process_batch_task(self, batch_id: str, file_paths: list, user_id: str):
         }
     )
 
+    batch_processor = BatchProcessorService()
     try:
-        # Initialize services
-        batch_processor = BatchProcessorService()
-
-        # Run async batch processing in sync context
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-        try:
-            # Process the batch
-            result = loop.run_until_complete(
-                batch_processor._process_batch(batch_id, file_paths, user_id)
-            )
-
-            logger.info(f"[Celery] Batch {batch_id} completed successfully")
+        pending = batch_processor.prepare_batch(batch_id, file_paths, user_id)
+        if pending is None:
+            return {'batch_id': batch_id, 'status': 'missing', 'total_files': len(file_paths)}
 
+        shards = batch_processor.make_shards(pending)
+        if not shards:
+            batch_processor.finalize_batch(batch_id)
             return {
                 'batch_id': batch_id,
                 'status': 'completed',
                 'total_files': len(file_paths),
-                'message': 'Batch processing completed'
+                'message': 'All files were duplicates'
             }
 
-        finally:
-            loop.close()
+        # Shards inherit the coordinator's queue; priority spreads workers across users
+        queue = queue_for_batch(len(file_paths))
+        chord(
+            group(
+                process_batch_shard_task.s(batch_id, shard, user_id).set(queue=queue, priority=shard_priority(idx))
+                for idx, shard in enumerate(shards)
+            )
+        )(
+            finalize_batch_task.s(batch_id).set(queue=queue, priority=PRIORITY_HIGH)
+            .on_error(fail_batch_task.si(batch_id).set(queue=queue, priority=PRIORITY_HIGH))
+        )
+
+        logger.info(f"[Celery] Batch {batch_id}: {len(pending)} files dispatched in {len(shards)} shards")
+
+        return {
+            'batch_id': batch_id,
+            'status': 'dispatched',
+            'total_files': len(file_paths),
+            'shards': len(shards),
+            'message': 'Batch processing dispatched'
+        }
 
     except Exception as e:
         logger.error(f"[Celery] Batch {batch_id} failed: {str(e)}")
 
         # Update batch status to failed in database
-        try:
-            from app.database.connection import SessionLocal
-            from app.database.models import UploadBatch
-            import uuid
-
-            db = SessionLocal()
-            batch = db.query(UploadBatch).filter(
-                UploadBatch.id == uuid.UUID(batch_id)
-            ).first()
-
-            if batch:
-                batch.status = 'failed'
-                batch.error_message = str(e)
-                db.commit()
-            db.close()
-        except Exception as db_error:
-            logger.error(f"[Celery] Failed to update batch status: {str(db_error)}")
+        batch_processor.fail_batch(batch_id, str(e))
 
         # Re-raise to mark Celery task as failed
         raise
 
 
+@celery_app.task(name='app.celery_app.process_batch_shard_task')
+def process_batch_shard_task(batch_id: str, files: list, user_id: str):
+    """
+    Analyze one shard of a batch (a few files, one in memory at a time)
+
+    Args:
+        batch_id: UUID of the batch
+        files: Shard of file_paths entries
+        user_id: UUID of the user
+
+    Returns:
+        dict: {'successful': n, 'failed': n, 'unsaved_results': [...]} (unsaved
+        results are written by finalize_batch_task)
+    """
+    from app.services.batch_processor_service import BatchProcessorService
+
+    return run_task_coroutine(BatchProcessorService().process_shard(batch_id, files, user_id))
+
+
+@celery_app.task(name='app.celery_app.finalize_batch_task')
+def finalize_batch_task(shard_summaries: list, batch_id: str):
+    """Chord callback: mark the batch completed once every shard is done"""
+    from app.services.batch_processor_service import BatchProcessorService
+
+    BatchProcessorService().finalize_batch(batch_id, shard_summaries)
+    successful = sum(s.get('successful', 0) for s in shard_summaries)
+    logger.info(f"[Celery] Batch {batch_id} completed ({successful} analyzed successfully)")
+    return {'batch_id': batch_id, 'status': 'completed', 'shards': len(shard_summaries)}
+
+
+@celery_app.task(name='app.celery_app.fail_batch_task')
+def fail_batch_task(batch_id: str):
+    """Chord error callback: a shard crashed, so the batch cannot complete"""
+    from app.services.batch_processor_service import BatchProcessorService
+
+    BatchProcessorService().fail_batch(batch_id, "One or more batch shards failed")
+
+
+@celery_app.task(name='app.celery_app.learn_from_classification_task')
+def learn_from_classification_task(
+    document_id: str,
+    document_keywords: list,
+    primary_category_id: str,
+    secondary_category_ids: list,
+    language: str,
+    user_id: str,
+    ai_predicted_category: str = None,
+    ai_confidence: float = None
+):
+    """
+    Apply keyword weight learning for a confirmed upload (queued by MLLearningService.schedule_learning)
+
+    Returns:
+        bool: True if weights were learned
+    """
+    import uuid
+    from app.database.connection import SessionLocal
+    from app.services.ml_learning_service import ml_learning_service
+
+    db = SessionLocal()
+    try:
+        return ml_learning_service.learn_from_classification(
+            document_id=uuid.UUID(document_id),
+            document_keywords=document_keywords,
+            primary_category_id=uuid.UUID(primary_category_id),
+            secondary_category_ids=[uuid.UUID(cid) for cid in secondary_category_ids],
+            language=language,
+            user_id=uuid.UUID(user_id),
+            ai_predicted_category=uuid.UUID(ai_predicted_category) if ai_predicted_category else None,
+            ai_confidence=ai_confidence,
+            session=db
+        )
+    finally:
+        db.close()
+
+
+@celery_app.task(name='app.celery_app.process_stripe_events_task')
+def process_stripe_events_task(customer_key: str):
+    """
+    Process stored Stripe webhook events of one customer in order (queued by the webhook endpoint)
+
+    Returns:
+        dict: Counts of processed, failed and skipped events
+    """
+    from app.services.stripe_webhook_service import stripe_webhook_service
+
+    return run_task_coroutine(stripe_webhook_service.process_customer(customer_key))
+
+
 # Helper function to get queue stats
 def get_queue_stats():
     """Get current queue statistics"""
@@ -277,7 +472,7 @@ def migrate_provider_documents_task(self, migration_id: str, user_id: str):
         logger.info(f"[Migration] DEBUG: Category names to create: {folder_names}")
 
         try:
-            folder_map = to_provider.initialize_folder_structure(to_token, folder_names)
+            folder_map = to_provider.initialize_folder_structure(to_token, folder_names, account_key=user_id)
             logger.info(f"[Migration] Folder structure initialized successfully")
             logger.info(f"[Migration] DEBUG: folder_map contents: {folder_map}")
             logger.info(f"[Migration] DEBUG: folder_map keys: {list(folder_map.keys())}")
@@ -381,7 +576,8 @@ def migrate_provider_documents_task(self, migration_id: str, user_id: str):
                     file_stream,
                     doc.file_name,
                     doc.mime_type,
-                    category_folder_id
+                    category_folder_id,
+                    account_key=user_id
                 )
                 logger.info(f"[Migration] DEBUG: Upload completed. Result file_id: {upload_result.file_id}")
                 logger.info(f"[Migration] DEBUG: Upload result type: {type(upload_result)}, attributes: {dir(upload_result)}")
@@ -443,7 +639,7 @@ def migrate_provider_documents_task(self, migration_id: str, user_id: str):
                 # Continue anyway - not critical for migration success
 
             try:
-                deletion_result = from_provider.delete_app_folder(from_token)
+                deletion_result = from_provider.delete_app_folder(from_token, account_key=user_id)
                 migration.folder_deleted = deletion_result['success']
                 if not deletion_result['success']:
                     migration.folder_deletion_error = deletion_result['message']
@@ -535,39 +731,32 @@ def _send_migration_email(user_email: str, user_name: str, migration: 'Migration
 
     email_session = SessionLocal()
     try:
-        import asyncio
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-        try:
-            if migration.status == 'completed':
-                template_name = 'migration_completed'
-            elif migration.status == 'partial':
-                template_name = 'migration_partial'
-            else:
-                template_name = 'migration_failed'
-
-            from app.core.config import settings
-            dashboard_url = f"{settings.app.app_frontend_url}/settings"
-
-            loop.run_until_complete(
-                email_service.send_migration_notification(
-                    session=email_session,
-                    to_email=user_email,
-                    user_name=user_name,
-                    template_name=template_name,
-                    from_provider=migration.from_provider,
-                    to_provider=migration.to_provider,
-                    successful_count=migration.successful_documents,
-                    failed_count=migration.failed_documents,
-                    total_count=migration.total_documents,
-                    dashboard_url=dashboard_url,
-                    error_message=migration.error_message or '',
-                    user_can_receive_marketing=marketing_enabled
-                )
+        if migration.status == 'completed':
+            template_name = 'migration_completed'
+        elif migration.status == 'partial':
+            template_name = 'migration_partial'
+        else:
+            template_name = 'migration_failed'
+
+        from app.core.config import settings
+        dashboard_url = f"{settings.app.app_frontend_url}/settings"
+
+        run_task_coroutine(
+            email_service.send_migration_notification(
+                session=email_session,
+                to_email=user_email,
+                user_name=user_name,
+                template_name=template_name,
+                from_provider=migration.from_provider,
+                to_provider=migration.to_provider,
+                successful_count=migration.successful_documents,
+                failed_count=migration.failed_documents,
+                total_count=migration.total_documents,
+                dashboard_url=dashboard_url,
+                error_message=migration.error_message or '',
+                user_can_receive_marketing=marketing_enabled
             )
-        finally:
-            loop.close()
+        )
     except Exception as e:
         logger.error(f"[Migration] Email sending failed: {e}")
     finally:
@@ -145,6 +145,25 @@ class OneDriveSettings(BaseSettings):
         extra = "ignore"
 
 
+class StorageSettings(BaseSettings):
+    """Cloud storage upload and bulk operation configuration"""
+
+    storage_folder_cache_ttl_seconds: int = Field(default=3600, description="How long resolved cloud folder IDs are reused before they are looked up again")
+    storage_folder_cache_size: int = Field(default=10000, description="Max cached folder IDs per process")
+    storage_folder_resolve_workers: int = Field(default=4, description="Parallel lookups when several category folders are resolved at once")
+    storage_simple_upload_max_mb: int = Field(default=4, description="Files up to this size are uploaded in a single request; larger ones in a resumable session")
+    storage_upload_chunk_mb: int = Field(default=8, description="Chunk size of resumable uploads (rounded down to the provider's granularity)")
+    storage_upload_max_retries: int = Field(default=5, description="Retries per chunk of a resumable upload before it fails")
+    storage_spool_max_memory_mb: int = Field(default=8, description="Uploads larger than this are spooled to a temporary file instead of memory")
+    storage_bulk_max_documents: int = Field(default=2000, description="Max documents in one bulk move/recategorize/delete request")
+    storage_batch_workers: int = Field(default=4, description="Provider batch requests (Drive batch, Graph $batch) sent concurrently per bulk operation")
+    storage_batch_max_retries: int = Field(default=3, description="Retries of throttled or failed items inside a provider batch")
+
+    class Config:
+        case_sensitive = False
+        extra = "ignore"
+
+
 class SecuritySettings(BaseSettings):
     """Security configuration from environment variables"""
 
@@ -190,6 +209,11 @@ class TranslationSettings(BaseSettings):
     translation_deepl_url: str = Field(default="https://api-free.deepl.com/v2/translate", description="DeepL API URL")
     translation_force_provider: Optional[str] = Field(default=None, description="Force specific provider (dev/test only)")
     translation_timeout: int = Field(default=30, description="Translation request timeout in seconds")
+    translation_cache_enabled: bool = Field(default=True, description="Persist translations in the translation_cache table")
+    translation_memory_cache_size: int = Field(default=5000, description="Translations kept in the in-process LRU cache")
+    translation_max_concurrency: int = Field(default=8, description="Max in-flight requests to the translation provider")
+    translation_deepl_batch_size: int = Field(default=50, description="Texts per DeepL request (API maximum is 50)")
+    translation_mock: bool = Field(default=False, description="Route requests to a local mock translator (development/benchmarks only)")
 
     class Config:
         case_sensitive = False
@@ -215,6 +239,65 @@ class PerformanceSettings(BaseSettings):
     perf_log_all_requests: bool = Field(default=False, description="Log all requests (not just slow ones)")
     perf_log_db_queries: bool = Field(default=True, description="Log slow database queries")
     perf_metrics_endpoint_enabled: bool = Field(default=False, description="Enable /metrics endpoint (internal only)")
+    perf_metrics_dir: str = Field(default="/tmp/bonifatus_metrics", description="Shared directory for per-worker metric snapshots (empty = this worker only)")
+    perf_metrics_flush_interval_seconds: int = Field(default=10, description="How often each worker writes its metric snapshot")
+    perf_slow_request_history: int = Field(default=200, description="Number of recent slow requests kept for /metrics/slow-requests")
+    perf_analysis_profile_sample_rate: float = Field(default=0.0, description="Fraction of document analyses run under a profiler (0 = off)")
+    perf_analysis_profile_threshold_ms: int = Field(default=10000, description="Keep profiles only for sampled analyses slower than this (ms)")
+    perf_analysis_profile_dir: str = Field(default="/tmp/bonifatus_profiles", description="Directory for analysis profile dumps")
+    perf_analysis_profiler: str = Field(default="cprofile", description="Profiler for sampled analyses: cprofile or pyinstrument")
+    perf_stats_rollup_interval_seconds: int = Field(default=300, description="How often admin daily rollups and 24h/7d figures are refreshed")
+
+    class Config:
+        case_sensitive = False
+        extra = "ignore"
+
+
+class OCRSettings(BaseSettings):
+    """Tesseract OCR configuration from environment variables"""
+
+    ocr_osd_min_confidence: float = Field(default=0.6, description="Run orientation detection only when page OCR confidence is below this (0-1)")
+    ocr_osd_min_words: int = Field(default=8, description="Run orientation detection only when fewer words than this were recognized")
+    ocr_engine_pool_enabled: bool = Field(default=True, description="Keep initialized in-process Tesseract engines (tesserocr) instead of running the tesseract CLI per page")
+    ocr_engine_pool_size: int = Field(default=3, description="Max Tesseract engines kept per process across all language combinations")
+    ocr_engine_max_per_language: int = Field(default=1, description="Max engines per language combination (concurrent OCR calls for it in one process)")
+    ocr_engine_acquire_timeout_seconds: float = Field(default=30.0, description="Max wait for a busy engine before falling back to the tesseract CLI")
+    ocr_tessdata_path: str = Field(default="", description="Tesseract traineddata directory (empty = library default)")
+    ocr_adaptive_preprocessing: bool = Field(default=True, description="Choose render DPI and preprocessing per page from measured noise/contrast (False = always NL-means at full DPI)")
+    ocr_render_dpi: int = Field(default=300, description="Render resolution for pages that need preprocessing")
+    ocr_clean_render_dpi: int = Field(default=200, description="Render resolution for clean pages")
+    ocr_probe_max_side: int = Field(default=900, description="Longer side (px) of the downsampled copy used to measure page quality")
+    ocr_noise_clean_threshold: float = Field(default=1.5, description="Estimated noise sigma below which a page needs no denoising")
+    ocr_noise_heavy_threshold: float = Field(default=4.0, description="Estimated noise sigma from which NL-means denoising is used")
+    ocr_min_contrast: float = Field(default=0.45, description="Contrast (0-1) below which pages get adaptive thresholding")
+    ocr_native_min_quality: float = Field(default=0.75, description="Min spelling-based quality (0-1) of a page's embedded text; pages below are OCR'd")
+
+    class Config:
+        case_sensitive = False
+        extra = "ignore"
+
+
+class AnalysisSettings(BaseSettings):
+    """Document analysis execution configuration (API process pool and Celery batches)"""
+
+    analysis_executor_enabled: bool = Field(default=True, description="Run document analysis in a process pool instead of the API event loop")
+    analysis_workers: int = Field(default=2, description="Analysis worker processes")
+    analysis_worker_max_tasks: int = Field(default=200, description="Recycle a worker process after this many analyses (bounds memory growth)")
+    analysis_queue_size: int = Field(default=16, description="Analyses allowed to wait for a worker before new ones are rejected")
+    analysis_queue_timeout_seconds: int = Field(default=120, description="Max time an analysis waits for a worker before failing")
+    analysis_max_concurrent_per_user: int = Field(default=1, description="Analyses of one user running at the same time")
+    analysis_preload_models: bool = Field(default=True, description="Load spaCy models when a worker process starts")
+    batch_shard_size: int = Field(default=4, description="Files per Celery subtask when a batch is fanned out")
+    batch_progress_flush_files: int = Field(default=5, description="Write batch progress after this many files per shard")
+    batch_progress_flush_seconds: float = Field(default=2.0, description="Write batch progress at least this often per shard")
+    ml_learning_async: bool = Field(default=True, description="Apply keyword learning from confirmed uploads in a Celery task instead of during the request")
+    language_sample_chars: int = Field(default=3000, description="Characters (head/middle/tail windows) used to detect the language of a text")
+    language_segment_chars: int = Field(default=4000, description="Length of the page-sized segments checked for multilingual documents")
+    language_max_segments: int = Field(default=12, description="Max segments checked per document (evenly spread over long documents)")
+    language_min_segment_chars: int = Field(default=200, description="Shorter pages or segments get no language of their own")
+    language_secondary_min_share: float = Field(default=0.15, description="Share of the text a language needs to be listed as a document language")
+    language_cache_size: int = Field(default=1024, description="Detection results cached per process by text hash")
+    lexicon_version_check_seconds: int = Field(default=30, description="How often each process checks whether admins changed stop words, field labels or the entity blacklist")
 
     class Config:
         case_sensitive = False
@@ -233,6 +316,13 @@ class EmailSettings(BaseSettings):
     email_from_noreply: str = Field(default="no-reply@bonidoc.com", description="No-reply email address")
     email_from_name: str = Field(default="BoniDoc", description="Sender name for emails")
 
+    # Delivery (pooled client shared by all sends)
+    email_delivery_max_concurrency: int = Field(default=8, description="Max in-flight Brevo API requests")
+    email_delivery_rate_per_second: float = Field(default=10.0, description="Max Brevo API requests per second (token bucket)")
+    email_delivery_batch_size: int = Field(default=100, description="Personalized messages per bulk request (Brevo message versions, max 1000)")
+    email_delivery_http2: bool = Field(default=True, description="Use HTTP/2 when the h2 package is installed")
+    email_delivery_mock: bool = Field(default=False, description="Route sends to a local mock provider (development/benchmarks only)")
+
     class Config:
         case_sensitive = False
         extra = "ignore"
@@ -258,6 +348,11 @@ class StripeSettings(BaseSettings):
     stripe_price_id_starter_yearly: Optional[str] = Field(None, description="Stripe price ID for Starter yearly")
     stripe_price_id_pro_monthly: Optional[str] = Field(None, description="Stripe price ID for Pro monthly")
     stripe_price_id_pro_yearly: Optional[str] = Field(None, description="Stripe price ID for Pro yearly")
+    # Webhook pipeline (events are stored on receipt and processed in the background)
+    stripe_webhook_async: bool = Field(default=True, description="Acknowledge webhooks after storing them and process events in a Celery worker")
+    stripe_webhook_batch_size: int = Field(default=20, description="Events of one customer loaded per query")
+    stripe_webhook_max_attempts: int = Field(default=8, description="Give up on an event after this many failed attempts")
+    stripe_webhook_retry_seconds: int = Field(default=60, description="Base delay before a failed event is retried (doubles per attempt)")
 
     class Config:
         case_sensitive = False
@@ -281,6 +376,15 @@ class EmailProcessingSettings(BaseSettings):
     doc_domain: str = Field(default="doc.bonidoc.com", description="Document processing email domain")
     temp_storage_path: str = Field(default="/tmp/email_attachments", description="Temporary file storage path")
     polling_interval_seconds: int = Field(default=60, description="How often to poll for new emails (1 minute)")
+    imap_idle_enabled: bool = Field(default=True, description="Use IMAP IDLE push to trigger polls as soon as mail arrives")
+    imap_idle_timeout_seconds: int = Field(default=1500, description="Re-issue IDLE after this many seconds (RFC 2177 requires < 29 minutes)")
+    imap_fetch_batch_size: int = Field(default=50, description="Max UIDs per batched header/BODYSTRUCTURE fetch")
+
+    # Attachment processing pipeline
+    pipeline_workers: int = Field(default=4, description="Emails completed concurrently (scan, analyze, upload)")
+    pipeline_queue_size: int = Field(default=20, description="Accepted emails spooled ahead of the workers")
+    max_concurrent_attachments: int = Field(default=6, description="Global cap on attachments processed at once")
+    max_concurrent_attachments_per_user: int = Field(default=2, description="Per-user share of attachment slots")
 
     # Processing limits (defaults, overridden by tier settings)
     max_attachment_size_mb: int = Field(default=20, description="Default max attachment size in MB")
@@ -311,6 +415,18 @@ class AppSettings(BaseSettings):
         default=False,
         description="Enable verbose debug logging with detailed data (development only)"
     )
+    app_log_levels: str = Field(
+        default="",
+        description="Per-module log levels, e.g. app.services.classification_service=DEBUG,app.tasks=WARNING"
+    )
+    app_log_async: bool = Field(
+        default=True,
+        description="Write log records from a background thread so logging never blocks request or worker threads"
+    )
+    app_log_queue_size: int = Field(default=10000, description="Max queued log records before new ones are dropped")
+    app_log_debug_burst: int = Field(default=20, description="DEBUG records per message template per interval before sampling starts")
+    app_log_debug_interval_seconds: float = Field(default=10.0, description="Sampling window for DEBUG records")
+    app_log_debug_sample_every: int = Field(default=100, description="Beyond the burst keep one DEBUG record in N (0 = drop)")
     app_cors_allow_headers: str = Field(
         default="Content-Type,Accept,Authorization,X-Acting-As-User-Id",
         description="Comma-separated list of allowed CORS request headers"
@@ -337,6 +453,7 @@ class Settings(BaseSettings):
     google: GoogleSettings = Field(default_factory=GoogleSettings)
     facebook: FacebookSettings = Field(default_factory=FacebookSettings)
     onedrive: OneDriveSettings = Field(default_factory=OneDriveSettings)
+    storage: StorageSettings = Field(default_factory=StorageSettings)
     security: SecuritySettings = Field(default_factory=SecuritySettings)
     translation: TranslationSettings = Field(default_factory=TranslationSettings)
     scanner: ScannerSettings = Field(default_factory=ScannerSettings)
@@ -344,6 +461,8 @@ class Settings(BaseSettings):
     email_processing: EmailProcessingSettings = Field(default_factory=EmailProcessingSettings)
     stripe: StripeSettings = Field(default_factory=StripeSettings)
     performance: PerformanceSettings = Field(default_factory=PerformanceSettings)
+    analysis: AnalysisSettings = Field(default_factory=AnalysisSettings)
+    ocr: OCRSettings = Field(default_factory=OCRSettings)
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
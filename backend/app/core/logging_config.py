@@ -0,0 +1,93 @@
+# backend/app/core/logging_config.py
+"""
+Logging setup for the API and Celery workers
+
+Root level from APP_LOG_LEVEL, per-module overrides from APP_LOG_LEVELS,
+rate-limited DEBUG traces, and (API only) a queue handler so log I/O happens
+on a background thread.
+"""
+
+import atexit
+import logging
+from typing import Optional
+
+from app.core.config import settings
+from app.utils.log_utils import (
+    SamplingFilter, apply_level_overrides, parse_level_overrides, start_queue_logging
+)
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Libraries that are too chatty below WARNING
+QUIET_LOGGERS = ('sqlalchemy.engine', 'sqlalchemy.pool')
+
+_listener = None
+
+
+def _root_level() -> int:
+    level = getattr(logging, settings.app.app_log_level.upper(), logging.INFO)
+    # Production hardening: Force WARNING level in production unless explicitly overridden
+    if settings.is_production and settings.app.app_log_level.upper() == "INFO":
+        level = logging.WARNING
+    return level
+
+
+def _sampling_filter() -> SamplingFilter:
+    return SamplingFilter(
+        burst=settings.app.app_log_debug_burst,
+        interval=settings.app.app_log_debug_interval_seconds,
+        sample_every=settings.app.app_log_debug_sample_every
+    )
+
+
+def _apply_levels():
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+    apply_level_overrides(parse_level_overrides(settings.app.app_log_levels))
+
+
+def configure_logging(use_queue: Optional[bool] = None):
+    """
+    Configure root logging for the current process
+
+    Args:
+        use_queue: Route records through a background listener thread
+            (defaults to APP_LOG_ASYNC; only safe before any fork)
+    """
+    global _listener
+
+    root = logging.getLogger()
+    root.setLevel(_root_level())
+    if not root.handlers:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root.addHandler(stream_handler)
+
+    if use_queue is None:
+        use_queue = settings.app.app_log_async
+    if use_queue and _listener is None:
+        _, _listener = start_queue_logging(list(root.handlers), maxsize=settings.app.app_log_queue_size)
+        atexit.register(shutdown_logging)
+
+    # Sample in the logging thread, before a record is queued or formatted
+    sampling = _sampling_filter()
+    for handler in root.handlers:
+        handler.addFilter(sampling)
+    _apply_levels()
+
+
+def configure_worker_logging(logger: logging.Logger):
+    """Apply per-module levels and DEBUG sampling to Celery's already configured logger"""
+    sampling = _sampling_filter()
+    for handler in logger.handlers:
+        handler.addFilter(sampling)
+    _apply_levels()
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -221,3 +221,19 @@ class EmailRateLimit(Base):
     __table_args__ = (
         Index('idx_rate_limits_user_date', 'user_id', 'date', unique=True),
     )
+
+
+class ImapSyncState(Base):
+    """IMAP checkpoint per mailbox so each poll only fetches UIDs it has not seen yet"""
+    __tablename__ = "imap_sync_state"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    account = Column(String(255), nullable=False)
+    mailbox = Column(String(255), nullable=False, default='INBOX')
+    uid_validity = Column(BigInteger, nullable=False)
+    last_seen_uid = Column(BigInteger, default=0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('idx_imap_sync_state_account_mailbox', 'account', 'mailbox', unique=True),
+    )
@@ -201,6 +201,7 @@ class User(Base, TimestampMixin):
         Index('idx_user_facebook_id', 'facebook_id'),
         Index('idx_user_email', 'email'),
         Index('idx_user_tier_id', 'tier_id'),
+        Index('idx_user_created_at', 'created_at'),
     )
 
     @property
@@ -335,6 +336,8 @@ class Document(Base, TimestampMixin):
         Index('idx_document_date', 'document_date'),
         Index('idx_documents_batch', 'batch_id'),
         Index('idx_documents_duplicate_of', 'duplicate_of_document_id'),
+        Index('idx_document_user_category', 'user_id', 'category_id'),
+        Index('idx_document_created_at', 'created_at'),
     )
 
 class DocumentCategory(Base):
@@ -1136,6 +1139,28 @@ class Invoice(Base, TimestampMixin):
         Index('idx_invoice_due', 'due_date'),
     )
 
+class StripeWebhookEvent(Base):
+    """Verified Stripe webhook event, stored on receipt and processed by a background worker"""
+    __tablename__ = "stripe_webhook_events"
+
+    id = Column(String(255), primary_key=True)  # Stripe event ID (idempotency key)
+    event_type = Column(String(100), nullable=False)
+    customer_key = Column(String(255), nullable=False)  # Stripe customer ID; events of one customer run in order
+    payload = Column(Text, nullable=False)  # Raw event JSON as received
+    stripe_created_at = Column(DateTime(timezone=True), nullable=False)
+    status = Column(String(20), nullable=False, default='pending')  # pending, processing, processed, failed, dead
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)  # Retry time after a failure, lease expiry while processing
+    received_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index('idx_stripe_webhook_events_customer_status', 'customer_key', 'status', 'stripe_created_at'),
+        Index('idx_stripe_webhook_events_status_received', 'status', 'received_at'),
+    )
+
+
 class EmailTemplate(Base, TimestampMixin):
     """Email templates for subscription communications"""
     __tablename__ = "email_templates"
@@ -1763,6 +1788,57 @@ class ProviderConnection(Base, TimestampMixin):
     )
 
 
+class TranslationCache(Base):
+    """Machine translation results, reused across requests and workers"""
+    __tablename__ = "translation_cache"
+
+    provider = Column(String(30), primary_key=True)
+    source_lang = Column(String(10), primary_key=True)
+    target_lang = Column(String(10), primary_key=True)
+    text_hash = Column(String(64), primary_key=True)  # SHA-256 of the source text
+    translated_text = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('idx_translation_cache_created', 'created_at'),
+    )
+
+
+class UserDocumentStats(Base):
+    """Per-user document totals, maintained by triggers on documents and user_monthly_usage"""
+    __tablename__ = "user_document_stats"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    document_count = Column(sa.BigInteger, nullable=False, server_default='0')  # Non-deleted documents
+    total_bytes = Column(sa.BigInteger, nullable=False, server_default='0')
+    total_pages = Column(sa.BigInteger, nullable=False, server_default='0')  # Pages processed, all months
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class StatsCounter(Base):
+    """
+    Global counters, maintained by triggers
+
+    Each metric is spread over 16 slots (chosen by user ID hash) so concurrent
+    uploads don't all queue on one row; the metric value is the sum of its slots.
+    """
+    __tablename__ = "stats_counters"
+
+    metric = Column(String(50), primary_key=True)  # documents, document_bytes, users, users_tier:<id>, ...
+    slot = Column(sa.SmallInteger, primary_key=True)
+    value = Column(sa.BigInteger, nullable=False, server_default='0')
+
+
+class StatsDailyRollup(Base):
+    """Per-day activity totals, refreshed by the stats rollup job"""
+    __tablename__ = "stats_daily_rollups"
+
+    day = Column(Date, primary_key=True)
+    metric = Column(String(50), primary_key=True)  # documents_created, bytes_uploaded, signups
+    value = Column(sa.BigInteger, nullable=False, server_default='0')
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
 # Import auth models to register them with Base.metadata
 # This ensures SQLAlchemy knows about these tables and relationships
 # Email processing models (AllowedSender, EmailProcessingLog, etc.) are defined in auth_models.py
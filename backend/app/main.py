@@ -12,21 +12,9 @@ from fastapi.responses import JSONResponse
 
 from app.core.config import settings
 
-# Configure environment-aware logging
-log_level = getattr(logging, settings.app.app_log_level.upper(), logging.INFO)
-logging.basicConfig(
-    level=log_level,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-
-# Production hardening: Force WARNING level in production unless explicitly overridden
-if settings.is_production and settings.app.app_log_level == "INFO":
-    logging.getLogger().setLevel(logging.WARNING)
-    logger.info("Production mode: Forcing log level to WARNING to prevent sensitive data exposure")
-
-# Reduce SQLAlchemy verbosity - only show warnings and errors
-logging.getLogger('sqlalchemy.engine').setLevel(logging.WARNING)
-logging.getLogger('sqlalchemy.pool').setLevel(logging.WARNING)
+# Configure environment-aware logging (levels, DEBUG sampling, background log writer)
+from app.core.logging_config import configure_logging
+configure_logging()
 
 logger = logging.getLogger(__name__)
 
@@ -145,6 +133,27 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Campaign scheduler initialization failed: {e}")
 
+    # Start Stripe webhook sweeper task
+    try:
+        from app.tasks import start_stripe_webhook_sweeper
+        start_stripe_webhook_sweeper()
+    except Exception as e:
+        logger.warning(f"Stripe webhook sweeper initialization failed: {e}")
+
+    # Start admin stats rollup task
+    try:
+        from app.tasks import start_stats_rollup
+        start_stats_rollup()
+    except Exception as e:
+        logger.warning(f"Stats rollup initialization failed: {e}")
+
+    # Spawn document analysis worker processes (loads NLP models off the request path)
+    try:
+        from app.services.analysis_executor import analysis_executor
+        analysis_executor.start()
+    except Exception as e:
+        logger.warning(f"Analysis executor initialization failed: {e}")
+
     logger.info("Application startup completed successfully")
 
     yield
@@ -167,7 +176,49 @@ async def lifespan(app: FastAPI):
         logger.info("Campaign scheduler task stopped")
     except Exception as e:
         logger.warning(f"Campaign scheduler shutdown error: {e}")
-    
+
+    # Stop Stripe webhook sweeper task
+    try:
+        from app.tasks import stop_stripe_webhook_sweeper
+        stop_stripe_webhook_sweeper()
+    except Exception as e:
+        logger.warning(f"Stripe webhook sweeper shutdown error: {e}")
+
+    # Stop admin stats rollup task
+    try:
+        from app.tasks import stop_stats_rollup
+        stop_stats_rollup()
+    except Exception as e:
+        logger.warning(f"Stats rollup shutdown error: {e}")
+
+    # Stop document analysis worker processes
+    try:
+        from app.services.analysis_executor import analysis_executor
+        analysis_executor.shutdown()
+    except Exception as e:
+        logger.warning(f"Analysis executor shutdown error: {e}")
+
+    # Close pooled email delivery client
+    try:
+        from app.services.email_delivery_service import email_delivery_service
+        await email_delivery_service.aclose()
+    except Exception as e:
+        logger.warning(f"Email delivery shutdown error: {e}")
+
+    # Close pooled translation client
+    try:
+        from app.services.translation_service import translation_service
+        await translation_service.aclose()
+    except Exception as e:
+        logger.warning(f"Translation client shutdown error: {e}")
+
+    # Write queued delegate last-access times
+    try:
+        from app.services.delegate_service import delegate_service
+        delegate_service.flush_access_times()
+    except Exception as e:
+        logger.warning(f"Delegate access flush error: {e}")
+
     try:
         from app.database.connection import close_database
         await close_database()
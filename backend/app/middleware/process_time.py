@@ -13,6 +13,12 @@ from app.database.connection import set_request_context, clear_request_context
 logger = logging.getLogger(__name__)
 
 
+def _route_template(request: Request) -> Optional[str]:
+    """Matched route path template (set by the router during call_next)"""
+    route = request.scope.get("route")
+    return getattr(route, "path", None)
+
+
 class ProcessTimeMiddleware(BaseHTTPMiddleware):
     """Add request ID, track processing time, and record performance metrics"""
 
@@ -54,7 +60,8 @@ class ProcessTimeMiddleware(BaseHTTPMiddleware):
             performance_monitor.end_request(
                 request_id=request_id,
                 status_code=response.status_code,
-                user_id=user_id
+                user_id=user_id,
+                route=_route_template(request)
             )
 
             return response
@@ -70,7 +77,8 @@ class ProcessTimeMiddleware(BaseHTTPMiddleware):
             performance_monitor.end_request(
                 request_id=request_id,
                 status_code=500,
-                user_id=None
+                user_id=None,
+                route=_route_template(request)
             )
 
             return JSONResponse(
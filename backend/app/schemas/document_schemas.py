@@ -94,6 +94,7 @@ class DocumentListResponse(BaseModel):
     page: int = Field(..., description="Current page number")
     page_size: int = Field(..., description="Number of documents per page")
     total_pages: int = Field(..., description="Total number of pages")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page (keyset pagination)")
 
 
 class DocumentSearchRequest(BaseModel):
@@ -108,6 +109,7 @@ class DocumentSearchRequest(BaseModel):
     page_size: Optional[int] = Field(None, ge=1, description="Page size")
     sort_by: Optional[str] = Field(None, description="Sort field")
     sort_order: Optional[str] = Field(None, description="Sort order")
+    cursor: Optional[str] = Field(None, description="next_cursor of the previous page; replaces page-based offset")
 
 
 class DocumentProcessingStatus(BaseModel):
@@ -151,8 +153,19 @@ class DocumentStorageInfo(BaseModel):
 class BatchOperationRequest(BaseModel):
     """Request model for batch operations on documents"""
     document_ids: List[str] = Field(..., min_items=1, description="Document IDs")
-    operation: str = Field(..., description="Batch operation type")
-    parameters: Optional[Dict[str, Any]] = Field(None, description="Operation parameters")
+    operation: str = Field(..., description="Batch operation type: move, recategorize or delete")
+    parameters: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Operation parameters: category_id (move) or category_ids, first is primary (recategorize)"
+    )
+
+
+class BatchOperationItemResult(BaseModel):
+    """Outcome of a batch operation for one document"""
+    document_id: str = Field(..., description="Document UUID")
+    success: bool = Field(..., description="Whether the operation was applied")
+    error: Optional[str] = Field(None, description="Why the operation failed")
+    warning: Optional[str] = Field(None, description="Applied, but the cloud storage file could not be updated")
 
 
 class BatchOperationResponse(BaseModel):
@@ -162,6 +175,7 @@ class BatchOperationResponse(BaseModel):
     successful: int = Field(..., description="Successfully processed documents")
     failed: int = Field(..., description="Failed documents")
     errors: List[Dict[str, str]] = Field(default_factory=list, description="Error details")
+    results: List[BatchOperationItemResult] = Field(default_factory=list, description="Per-document results")
 
 
 class ErrorResponse(BaseModel):
@@ -0,0 +1,166 @@
+# backend/app/services/admin_stats_service.py
+"""
+Admin statistics read from maintained counters and daily rollups
+
+Totals (users, documents, bytes, pages, users per tier) come from
+stats_counters and user_document_stats, which database triggers keep current
+on every write path (API, Celery, email processing). Time-based figures come
+from stats_daily_rollups and two rolling-window snapshots, both refreshed
+by the stats rollup job. No admin read scans the documents table.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.database.models import Document, User, StatsCounter, StatsDailyRollup
+
+logger = logging.getLogger(__name__)
+
+# Snapshot metrics written by the rollup job into stats_counters (slot 0)
+WINDOW_METRICS = {
+    'documents_last_24h': (Document, timedelta(days=1)),
+    'signups_last_7d': (User, timedelta(days=7)),
+}
+
+# Daily rollup metrics: name -> (model, aggregate)
+DAILY_METRICS = {
+    'documents_created': (Document, lambda: func.count(Document.id)),
+    'bytes_uploaded': (Document, lambda: func.coalesce(func.sum(Document.file_size), 0)),
+    'signups': (User, lambda: func.count(User.id)),
+}
+
+TIER_METRIC_PREFIX = 'users_tier:'
+
+
+class AdminStatsService:
+    """Constant-time reads of system statistics for the admin dashboard"""
+
+    def get_counters(self, session: Session) -> Dict[str, int]:
+        """
+        Current value of every counter metric
+
+        Args:
+            session: Database session
+
+        Returns:
+            Metric name -> value (sum over its slots)
+        """
+        rows = session.execute(
+            select(StatsCounter.metric, func.sum(StatsCounter.value)).group_by(StatsCounter.metric)
+        ).all()
+        return {metric: int(value) for metric, value in rows}
+
+    def users_by_tier(self, counters: Dict[str, int]) -> Dict[int, int]:
+        """Tier ID -> user count from the users_tier:<id> counters"""
+        return {
+            int(metric[len(TIER_METRIC_PREFIX):]): value
+            for metric, value in counters.items()
+            if metric.startswith(TIER_METRIC_PREFIX) and value
+        }
+
+    def count_users(
+        self,
+        session: Session,
+        tier_id: Optional[int] = None,
+        is_active: Optional[bool] = None
+    ) -> Optional[int]:
+        """
+        User count for the admin user list filters, when a counter covers them
+
+        Returns:
+            Count, or None if the filter combination has no counter
+        """
+        if tier_id is not None and is_active is not None:
+            return None
+        counters = self.get_counters(session)
+        if tier_id is not None:
+            return counters.get(f"{TIER_METRIC_PREFIX}{tier_id}", 0)
+        if is_active is True:
+            return counters.get('users_active', 0)
+        if is_active is False:
+            return counters.get('users', 0) - counters.get('users_active', 0)
+        return counters.get('users', 0)
+
+    def get_daily_rollups(self, session: Session, days: int = 30) -> List[Dict]:
+        """
+        Daily activity for the last N days (oldest first, missing days as zero)
+
+        Args:
+            session: Database session
+            days: Number of days including today
+
+        Returns:
+            List of {"day": ISO date, metric: value, ...}
+        """
+        today = datetime.now(timezone.utc).date()
+        start = today - timedelta(days=days - 1)
+        rows = session.execute(
+            select(StatsDailyRollup.day, StatsDailyRollup.metric, StatsDailyRollup.value)
+            .where(StatsDailyRollup.day >= start)
+        ).all()
+
+        series = {start + timedelta(days=i): {metric: 0 for metric in DAILY_METRICS} for i in range(days)}
+        for day, metric, value in rows:
+            if day in series and metric in DAILY_METRICS:
+                series[day][metric] = int(value)
+        return [{'day': day.isoformat(), **values} for day, values in series.items()]
+
+    def refresh_rollups(self, session: Session, days: int = 2) -> None:
+        """
+        Recompute the most recent daily buckets and the rolling-window snapshots
+
+        Each query is a created_at index range scan over the last few days, so
+        the cost follows recent activity, not table size.
+
+        Args:
+            session: Database session (committed here)
+            days: Number of daily buckets to recompute, including today
+        """
+        now = datetime.now(timezone.utc)
+        start_day = now.date() - timedelta(days=days - 1)
+        start = datetime.combine(start_day, datetime.min.time(), tzinfo=timezone.utc)
+
+        rows = []
+        for metric, (model, aggregate) in DAILY_METRICS.items():
+            bucket = func.date(func.timezone('UTC', model.created_at))
+            for day, value in session.execute(
+                select(bucket, aggregate()).where(model.created_at >= start).group_by(bucket)
+            ).all():
+                rows.append({'day': day, 'metric': metric, 'value': int(value or 0)})
+
+        # Days without activity still get a zero row so stale values are overwritten
+        present = {(row['day'], row['metric']) for row in rows}
+        for offset in range(days):
+            day = start_day + timedelta(days=offset)
+            for metric in DAILY_METRICS:
+                if (day, metric) not in present:
+                    rows.append({'day': day, 'metric': metric, 'value': 0})
+
+        statement = pg_insert(StatsDailyRollup).values(rows)
+        session.execute(statement.on_conflict_do_update(
+            index_elements=['day', 'metric'],
+            set_={'value': statement.excluded.value, 'refreshed_at': func.now()}
+        ))
+
+        windows = []
+        for metric, (model, window) in WINDOW_METRICS.items():
+            value = session.execute(
+                select(func.count(model.id)).where(model.created_at >= now - window)
+            ).scalar() or 0
+            windows.append({'metric': metric, 'slot': 0, 'value': value})
+
+        statement = pg_insert(StatsCounter).values(windows)
+        session.execute(statement.on_conflict_do_update(
+            index_elements=['metric', 'slot'],
+            set_={'value': statement.excluded.value}
+        ))
+        session.commit()
+
+
+# Global instance
+admin_stats_service = AdminStatsService()
@@ -0,0 +1,377 @@
+# backend/app/services/analysis_executor.py
+"""
+Process pool for CPU-bound document analysis
+
+OCR, PDF rendering, spaCy NER and regex scanning are synchronous; running them
+inside API coroutines blocks the event loop for the whole analysis. The
+executor dispatches analyze_document to worker processes (each with its own
+DB session and warm spaCy models), bounds the number of waiting jobs, limits
+concurrent analyses per user and drops queued work when the client disconnects.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import signal
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+from fastapi import Request
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.document_analysis_service import document_analysis_service
+from app.services.performance_service import performance_monitor
+from app.utils.pdf_document import PDFDocument
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisQueueFullError(Exception):
+    """Raised when no analysis worker becomes available in time"""
+
+
+class AnalysisCancelledError(Exception):
+    """Raised when the client disconnected before its analysis finished"""
+
+
+def warm_up_models():
+    """
+    Load spaCy models for every configured language, Lingua's language models
+    and the stop word / field label / blacklist lexicons
+
+    Used by analysis pool workers and by the Celery parent process before it
+    forks (children then share the loaded models copy-on-write).
+    """
+    from app.database.connection import db_manager
+    from app.services.entity_extraction_service import entity_extraction_service
+    from app.services.language_detection_service import language_detection_service
+    from app.services.lexicon_service import lexicon_service
+
+    session = db_manager.session_local()
+    try:
+        languages = entity_extraction_service.preload_models(session)
+        language_detection_service.lingua.detect_language_of("Warm up the language detection models")
+        lexicon_languages = lexicon_service.preload(session)
+        logger.info(f"Analysis models ready, spaCy models loaded: {languages}, lexicons loaded: {lexicon_languages}")
+    except Exception as e:
+        logger.warning(f"Analysis model preload failed: {e}")
+    finally:
+        session.close()
+
+
+def _init_worker(preload_models: bool):
+    """Worker process initializer: ignore Ctrl+C (parent handles it) and warm NLP models"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if preload_models:
+        warm_up_models()
+
+
+def _ping() -> bool:
+    return True
+
+
+def _run_analysis(
+    file_content: Optional[bytes],
+    file_name: str,
+    mime_type: str,
+    user_id: Optional[str],
+    spool_path: Optional[str] = None
+) -> Dict:
+    """
+    Run one analysis inside a worker process with its own DB session
+
+    Spooled PDFs arrive as a path (the API process keeps the file until the
+    job is done) and are memory-mapped here instead of being pickled over.
+    """
+    from app.database.connection import db_manager
+
+    session = db_manager.session_local()
+    document = PDFDocument.open(spool_path) if spool_path else None
+    try:
+        return asyncio.run(document_analysis_service.analyze_document(
+            file_content=document.buffer if document is not None else file_content,
+            file_name=file_name,
+            mime_type=mime_type,
+            db=session,
+            user_id=user_id,
+            document=document
+        ))
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        if document is not None:
+            document.close()
+        session.close()
+        performance_monitor.maybe_flush()
+
+
+async def _wait_for_disconnect(request: Request, interval: float = 1.0):
+    """Return once the client has gone away"""
+    while not await request.is_disconnected():
+        await asyncio.sleep(interval)
+
+
+class AnalysisExecutor:
+    """
+    Dispatches document analysis to a managed process pool
+
+    Slots are asyncio primitives bound to the API event loop; Celery tasks and
+    the email pipeline should keep calling document_analysis_service directly.
+    """
+
+    def __init__(self):
+        config = settings.analysis
+        self.enabled = config.analysis_executor_enabled
+        self.workers = max(1, config.analysis_workers)
+        self.queue_size = max(0, config.analysis_queue_size)
+        self.queue_timeout = config.analysis_queue_timeout_seconds
+        self.per_user = max(1, config.analysis_max_concurrent_per_user)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._user_slots: Dict[str, asyncio.Semaphore] = {}
+        self._user_refs: Dict[str, int] = {}
+        self._waiting = 0
+        self._running = 0
+
+        registry = performance_monitor.registry
+        registry.describe("analysis_queue_depth", "Analyses waiting for a worker process")
+        registry.describe("analysis_jobs_running", "Analyses running in worker processes")
+        registry.describe("analysis_queue_wait_ms", "Time analyses waited for a worker")
+        registry.describe("analysis_job_duration_ms", "Analysis time inside the worker process")
+        registry.describe("analysis_jobs_total", "Analyses by outcome")
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(settings.analysis.analysis_preload_models,),
+                max_tasks_per_child=settings.analysis.analysis_worker_max_tasks
+            )
+            logger.info(f"Analysis process pool started ({self.workers} workers)")
+        return self._pool
+
+    def start(self):
+        """Create the pool and spawn workers ahead of the first upload"""
+        if not self.enabled:
+            return
+        pool = self._get_pool()
+        for _ in range(self.workers):
+            pool.submit(_ping)
+
+    def shutdown(self):
+        """Stop worker processes, dropping analyses that have not started"""
+        pool = self._pool
+        self._pool = None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+            logger.info("Analysis process pool stopped")
+
+    def _publish_gauges(self):
+        registry = performance_monitor.registry
+        registry.set_gauge("analysis_queue_depth", self._waiting)
+        registry.set_gauge("analysis_jobs_running", self._running)
+
+    async def _acquire_slots(self, user_slot: asyncio.Semaphore):
+        """Take the user's slot first so one user's queue cannot hold global slots"""
+        await user_slot.acquire()
+        try:
+            await self._slots.acquire()
+        except BaseException:
+            user_slot.release()
+            raise
+
+    def _release_user(self, user_key: str):
+        self._user_refs[user_key] -= 1
+        if self._user_refs[user_key] <= 0:
+            del self._user_refs[user_key]
+            del self._user_slots[user_key]
+
+    def _release(self, user_key: str, user_slot: asyncio.Semaphore):
+        self._slots.release()
+        user_slot.release()
+        self._release_user(user_key)
+        self._running -= 1
+        self._publish_gauges()
+
+    async def analyze(
+        self,
+        file_content: bytes,
+        file_name: str,
+        mime_type: str,
+        db: Session,
+        user_id: Optional[str] = None,
+        request: Optional[Request] = None,
+        document: Optional[PDFDocument] = None
+    ) -> Dict:
+        """
+        Analyze a document in a worker process
+
+        Args:
+            file_content: Raw file bytes
+            file_name: Original filename
+            mime_type: MIME type
+            db: Caller's session (only used when the executor is disabled)
+            user_id: User ID for per-user limits and user-specific analysis
+            request: Incoming request; queued or pending work is dropped if it disconnects
+            document: Parsed handle of a PDF upload; spooled handles are passed to
+                the worker by path, in-process analysis reuses it directly
+
+        Returns:
+            Analysis result (same as DocumentAnalysisService.analyze_document)
+
+        Raises:
+            AnalysisQueueFullError: Too many waiting analyses or no worker in time
+            AnalysisCancelledError: Client disconnected
+        """
+        if not self.enabled:
+            return await document_analysis_service.analyze_document(
+                file_content=file_content,
+                file_name=file_name,
+                mime_type=mime_type,
+                db=db,
+                user_id=user_id,
+                document=document
+            )
+
+        registry = performance_monitor.registry
+        if self._waiting >= self.queue_size:
+            registry.increment("analysis_jobs_total", outcome="rejected")
+            raise AnalysisQueueFullError(f"{self._waiting} analyses are already waiting for a worker")
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+
+        watcher = asyncio.create_task(_wait_for_disconnect(request)) if request is not None else None
+        try:
+            user_key = user_id or ""
+            user_slot = await self._wait_for_slot(user_key, watcher)
+            if document is not None and document.path:
+                job_args = (None, file_name, mime_type, user_id, document.path)
+            else:
+                job_args = (file_content, file_name, mime_type, user_id)
+            return await self._execute(user_key, user_slot, watcher, job_args)
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+    async def _wait_for_slot(self, user_key: str, watcher: Optional[asyncio.Task]) -> asyncio.Semaphore:
+        """Wait for a per-user and a global slot; both are held on return"""
+        registry = performance_monitor.registry
+        user_slot = self._user_slots.setdefault(user_key, asyncio.Semaphore(self.per_user))
+        self._user_refs[user_key] = self._user_refs.get(user_key, 0) + 1
+        self._waiting += 1
+        self._publish_gauges()
+        queued_at = time.perf_counter()
+
+        acquire = asyncio.create_task(asyncio.wait_for(self._acquire_slots(user_slot), self.queue_timeout))
+        try:
+            waiters = {acquire} if watcher is None else {acquire, watcher}
+            try:
+                await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+            except asyncio.CancelledError:
+                # The request itself was cancelled (shutdown, client gone in the framework)
+                await self._abandon_acquire(acquire, user_key, user_slot)
+                registry.increment("analysis_jobs_total", outcome="cancelled")
+                raise
+
+            if not acquire.done():
+                await self._abandon_acquire(acquire, user_key, user_slot)
+                registry.increment("analysis_jobs_total", outcome="cancelled")
+                raise AnalysisCancelledError("Client disconnected while waiting for an analysis worker")
+
+            try:
+                acquire.result()
+            except asyncio.TimeoutError:
+                self._release_user(user_key)
+                registry.increment("analysis_jobs_total", outcome="timeout")
+                raise AnalysisQueueFullError(f"No analysis worker available within {self.queue_timeout}s")
+            return user_slot
+        finally:
+            self._waiting -= 1
+            registry.observe("analysis_queue_wait_ms", (time.perf_counter() - queued_at) * 1000)
+            self._publish_gauges()
+
+    async def _abandon_acquire(self, acquire: asyncio.Task, user_key: str, user_slot: asyncio.Semaphore):
+        """Stop waiting for slots, giving back any that were granted in the meantime"""
+        acquire.cancel()
+        try:
+            await acquire
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            pass
+        else:
+            # Slots were granted while we were cancelling
+            self._slots.release()
+            user_slot.release()
+        self._release_user(user_key)
+
+    async def _execute(
+        self,
+        user_key: str,
+        user_slot: asyncio.Semaphore,
+        watcher: Optional[asyncio.Task],
+        job_args: tuple
+    ) -> Dict:
+        """Submit to the pool; slots are released when the worker is actually done"""
+        registry = performance_monitor.registry
+        loop = asyncio.get_running_loop()
+        self._running += 1
+        self._publish_gauges()
+        started = time.perf_counter()
+
+        try:
+            job: Future = self._get_pool().submit(_run_analysis, *job_args)
+        except Exception:
+            self._release(user_key, user_slot)
+            raise
+        job.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release, user_key, user_slot))
+        result = asyncio.wrap_future(job)
+
+        try:
+            waiters = {result} if watcher is None else {result, watcher}
+            try:
+                await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+            except asyncio.CancelledError:
+                job.cancel()
+                registry.increment("analysis_jobs_total", outcome="cancelled")
+                raise
+            if not result.done():
+                # Only drops the job if it has not started; a running analysis finishes in the worker
+                job.cancel()
+                registry.increment("analysis_jobs_total", outcome="cancelled")
+                raise AnalysisCancelledError("Client disconnected during analysis")
+
+            analysis = result.result()
+            registry.increment("analysis_jobs_total", outcome="completed")
+            return analysis
+        except BrokenProcessPool:
+            logger.error("Analysis worker process died, restarting the pool")
+            registry.increment("analysis_jobs_total", outcome="failed")
+            self.shutdown()
+            raise
+        except AnalysisCancelledError:
+            raise
+        except Exception:
+            registry.increment("analysis_jobs_total", outcome="failed")
+            raise
+        finally:
+            registry.observe("analysis_job_duration_ms", (time.perf_counter() - started) * 1000)
+
+    def get_stats(self) -> Dict:
+        """Current queue state (this API worker)"""
+        return {
+            "enabled": self.enabled,
+            "workers": self.workers,
+            "waiting": self._waiting,
+            "running": self._running,
+            "queue_size": self.queue_size,
+        }
+
+
+# Global instance
+analysis_executor = AnalysisExecutor()
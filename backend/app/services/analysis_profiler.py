@@ -0,0 +1,145 @@
+# backend/app/services/analysis_profiler.py
+"""
+Stage-level instrumentation for document analysis
+
+An AnalysisTrace times each stage of a single analysis (duration, DB queries
+issued, bytes processed), attaches the breakdown to the analysis result and
+feeds per-stage histograms to the metrics endpoint. A configurable sample of
+analyses runs under cProfile or pyinstrument; profiles are kept only for
+analyses slower than the configured threshold.
+"""
+
+import cProfile
+import logging
+import os
+import random
+import re
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+from app.core.config import settings
+from app.services.performance_service import StageSpan, current_stage_span, performance_monitor
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisTrace:
+    """Collects stage spans for one document analysis"""
+
+    def __init__(self, document_name: str):
+        self.document_name = document_name
+        self.stages: List[StageSpan] = []
+        self._start = time.perf_counter()
+        self.total_ms: Optional[float] = None
+        self._profiler = None
+        self._profiler_kind: Optional[str] = None
+
+    @contextmanager
+    def stage(self, name: str, bytes_processed: int = 0) -> Iterator[StageSpan]:
+        """
+        Time a stage; DB queries issued inside it are counted on the span
+
+        Args:
+            name: Stage name (used as metric label, keep it static)
+            bytes_processed: Input size handled by the stage
+
+        Yields:
+            The span, so callers can adjust bytes_processed once known
+        """
+        span = StageSpan(name=name, bytes_processed=bytes_processed)
+        token = current_stage_span.set(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.duration_ms = (time.perf_counter() - start) * 1000
+            current_stage_span.reset(token)
+            self.stages.append(span)
+            self._record_metrics(span)
+
+    @staticmethod
+    def _record_metrics(span: StageSpan):
+        registry = performance_monitor.registry
+        registry.observe("analysis_stage_duration_ms", span.duration_ms, stage=span.name)
+        if span.db_queries:
+            registry.increment("analysis_stage_db_queries_total", span.db_queries, stage=span.name)
+        if span.bytes_processed:
+            registry.increment("analysis_stage_bytes_total", span.bytes_processed, stage=span.name)
+
+    def start_profiling(self):
+        """Start a profiler for this analysis if it falls into the configured sample"""
+        config = settings.performance
+        if config.perf_analysis_profile_sample_rate <= 0 or random.random() >= config.perf_analysis_profile_sample_rate:
+            return
+
+        if config.perf_analysis_profiler == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+                self._profiler = Profiler(async_mode="enabled")
+                self._profiler.start()
+                self._profiler_kind = "pyinstrument"
+                return
+            except ImportError:
+                logger.warning("pyinstrument not installed, falling back to cProfile")
+
+        # cProfile is per-thread and also sees other coroutines interleaved on this loop
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+        self._profiler_kind = "cprofile"
+
+    def finish(self) -> Dict:
+        """Stop timing (and profiling) and return the breakdown"""
+        if self.total_ms is None:
+            self.total_ms = (time.perf_counter() - self._start) * 1000
+            performance_monitor.registry.observe("analysis_stage_duration_ms", self.total_ms, stage="total")
+            self._stop_profiling()
+        return self.to_dict()
+
+    def _stop_profiling(self):
+        if self._profiler is None:
+            return
+
+        profiler, kind = self._profiler, self._profiler_kind
+        self._profiler = None
+        if kind == "pyinstrument":
+            profiler.stop()
+        else:
+            profiler.disable()
+
+        if self.total_ms < settings.performance.perf_analysis_profile_threshold_ms:
+            return
+
+        try:
+            directory = settings.performance.perf_analysis_profile_dir
+            os.makedirs(directory, exist_ok=True)
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+            safe_name = re.sub(r"[^A-Za-z0-9._-]", "_", self.document_name)[:60]
+            base = os.path.join(directory, f"{stamp}_{int(self.total_ms)}ms_{safe_name}")
+            if kind == "pyinstrument":
+                path = f"{base}.html"
+                with open(path, "w") as f:
+                    f.write(profiler.output_html())
+            else:
+                path = f"{base}.prof"
+                profiler.dump_stats(path)
+            logger.warning(f"[ANALYSIS PROFILE] {self.document_name} took {self.total_ms:.0f}ms, profile saved to {path}")
+        except Exception as e:
+            logger.error(f"Failed to write analysis profile: {e}")
+
+    def to_dict(self) -> Dict:
+        """Timing breakdown for the analysis result"""
+        return {
+            "total_ms": round(self.total_ms if self.total_ms is not None else (time.perf_counter() - self._start) * 1000, 2),
+            "stages": [
+                {
+                    "name": span.name,
+                    "duration_ms": round(span.duration_ms, 2),
+                    "db_queries": span.db_queries,
+                    "db_time_ms": round(span.db_time_ms, 2),
+                    "bytes_processed": span.bytes_processed,
+                }
+                for span in self.stages
+            ],
+        }
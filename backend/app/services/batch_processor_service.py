@@ -6,13 +6,17 @@ Handles asynchronous batch document processing with real-time progress tracking
 
 import logging
 import asyncio
+import hashlib
+import time
 import uuid
 import gc
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
+from sqlalchemy import update, func, cast, literal
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Session
-from sqlalchemy.orm.attributes import flag_modified
 
+from app.core.config import settings
 from app.database.connection import db_manager
 from app.database.models import UploadBatch
 from app.services.document_analysis_service import document_analysis_service
@@ -20,13 +24,91 @@ from app.services.document_analysis_service import document_analysis_service
 logger = logging.getLogger(__name__)
 
 
+def _hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file on disk without loading it into memory"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BatchProgress:
+    """
+    Buffers per-file results and writes them as atomic increments
+
+    Several shards of one batch run concurrently, so counters and the results
+    array are updated in SQL (x = x + n, results || new) instead of
+    read-modify-write on the ORM object. Writes happen every
+    `batch_progress_flush_files` files or `batch_progress_flush_seconds`.
+    """
+
+    def __init__(self, batch_id: str):
+        self.batch_id = uuid.UUID(batch_id)
+        self._results: List[Dict] = []
+        self._last_flush = time.monotonic()
+        self.flush_every = max(1, settings.analysis.batch_progress_flush_files)
+        self.flush_interval = settings.analysis.batch_progress_flush_seconds
+
+    def add(self, result: Dict):
+        self._results.append(result)
+
+    def flush_if_due(self, session: Session):
+        """Flush when enough results are buffered or the interval elapsed"""
+        if len(self._results) >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush(session)
+
+    def flush(self, session: Session) -> bool:
+        """
+        Write buffered results in one UPDATE
+
+        A failed write keeps the results buffered for the next flush.
+
+        Returns:
+            True if nothing is left buffered
+        """
+        self._last_flush = time.monotonic()
+        if not self._results:
+            return True
+
+        results = self._results
+        successful = sum(1 for r in results if r['success'])
+        try:
+            session.execute(
+                update(UploadBatch)
+                .where(UploadBatch.id == self.batch_id)
+                .values(
+                    processed_files=UploadBatch.processed_files + len(results),
+                    successful_files=UploadBatch.successful_files + successful,
+                    failed_files=UploadBatch.failed_files + (len(results) - successful),
+                    current_file_index=UploadBatch.processed_files + len(results),
+                    current_file_name=results[-1]['original_filename'],
+                    results=func.coalesce(UploadBatch.results, cast('[]', JSONB)).op('||')(literal(results, type_=JSONB))
+                )
+            )
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"[Batch {self.batch_id}] Failed to write {len(results)} results, keeping them buffered: {e}")
+            return False
+
+        self._results = []
+        return True
+
+    def drain(self) -> List[Dict]:
+        """Hand over the buffered results (e.g. to the batch finalizer) and clear the buffer"""
+        results, self._results = self._results, []
+        return results
+
+
 class BatchProcessorService:
     """
     Service for processing document batches asynchronously
 
     Features:
-    - Background task processing
-    - Real-time progress updates
+    - Background task processing, sharded across Celery workers
+    - Up-front duplicate detection in a single query
+    - Throttled, atomic progress updates
     - Individual file error handling
     - Database-backed status tracking
     """
@@ -94,86 +176,155 @@ class BatchProcessorService:
         user_id: str
     ):
         """
-        Background task to process all files in a batch
-        Reads files from disk paths
+        Process a whole batch in this process (one shard after another)
+
+        The Celery path fans the shards out to separate tasks instead
+        (see process_batch_task).
+        """
+        try:
+            pending = self.prepare_batch(batch_id, file_paths, user_id)
+            if pending is None:
+                return
+            summaries = [
+                await self.process_shard(batch_id, shard, user_id)
+                for shard in self.make_shards(pending)
+            ]
+            self.finalize_batch(batch_id, summaries)
+        except Exception as e:
+            logger.error(f"[Batch {batch_id}] Fatal error: {e}")
+            self.fail_batch(batch_id, str(e))
+        finally:
+            self._processing_batches.pop(batch_id, None)
+
+    def prepare_batch(
+        self,
+        batch_id: str,
+        file_paths: List[Dict],
+        user_id: str
+    ) -> Optional[List[Dict]]:
+        """
+        Mark the batch as processing and resolve duplicates for all files at once
+
+        Hashes come from the upload step ('file_hash') or are streamed from
+        disk; one query finds every file the user already stored.
+
+        Args:
+            batch_id: UUID of the batch
+            file_paths: List of {path, original_filename, mime_type, size, page_count[, file_hash]}
+            user_id: User ID for the batch
+
+        Returns:
+            Files that still need analysis (with 'file_hash'), or None if the batch is missing
         """
-        session = db_manager.session_local()
-        import aiofiles
-        import hashlib
-        from pathlib import Path
         from app.database.models import Document
-        from sqlalchemy import and_
 
+        session = db_manager.session_local()
         try:
-            # Update batch status to processing
             batch = session.query(UploadBatch).filter(
                 UploadBatch.id == uuid.UUID(batch_id)
             ).first()
 
             if not batch:
                 logger.error(f"Batch {batch_id} not found")
-                return
+                return None
 
             batch.status = 'processing'
             batch.started_at = datetime.utcnow()
+            batch.results = []
             session.commit()
 
-            results = []
+            files = []
+            for file_info in file_paths:
+                file_info = dict(file_info)
+                if not file_info.get('file_hash'):
+                    file_info['file_hash'] = _hash_file(file_info['path'])
+                files.append(file_info)
+
+            hashes = {f['file_hash'] for f in files}
+            duplicates = {
+                doc.file_hash: doc
+                for doc in session.query(Document).filter(
+                    Document.file_hash.in_(hashes),
+                    Document.user_id == uuid.UUID(user_id),
+                    Document.is_deleted == False
+                ).all()
+            } if hashes else {}
+
+            pending = []
+            progress = BatchProgress(batch_id)
+            for file_info in files:
+                duplicate = duplicates.get(file_info['file_hash'])
+                if duplicate is None:
+                    pending.append(file_info)
+                    continue
+
+                logger.warning(f"[Batch {batch_id}] Duplicate found: {file_info['original_filename']}")
+                progress.add({
+                    'success': False,
+                    'original_filename': file_info['original_filename'],
+                    'error': f"This document has already been uploaded as '{duplicate.title}' on {duplicate.created_at.strftime('%Y-%m-%d')}",
+                    'duplicate_of': {
+                        'id': str(duplicate.id),
+                        'title': duplicate.title,
+                        'filename': duplicate.file_name
+                    }
+                })
+            progress.flush(session)
+
+            logger.info(f"[Batch {batch_id}] {len(pending)}/{len(files)} files need analysis ({len(files) - len(pending)} duplicates)")
+            return pending
 
-            # Process each file from disk ONE AT A TIME (memory-efficient)
-            for idx, file_info in enumerate(file_paths):
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def make_shards(self, files: List[Dict], shard_size: Optional[int] = None) -> List[List[Dict]]:
+        """Split files into shards of `batch_shard_size` files, keeping upload order"""
+        size = max(1, shard_size or settings.analysis.batch_shard_size)
+        return [files[i:i + size] for i in range(0, len(files), size)]
+
+    async def process_shard(
+        self,
+        batch_id: str,
+        files: List[Dict],
+        user_id: str
+    ) -> Dict:
+        """
+        Analyze the files of one shard, one file in memory at a time
+
+        Per-file failures are recorded as failed results; progress is written
+        in throttled, atomic increments so concurrent shards never overwrite
+        each other. Results that could not be written are returned with the
+        summary so that finalize_batch persists them.
+
+        Returns:
+            {'successful': n, 'failed': n, 'unsaved_results': [...]}
+        """
+        import aiofiles
+        import json
+        from pathlib import Path
+
+        session = db_manager.session_local()
+        progress = BatchProgress(batch_id)
+        summary = {'successful': 0, 'failed': 0, 'unsaved_results': []}
+
+        try:
+            for file_info in files:
                 file_path = file_info['path']
                 original_filename = file_info['original_filename']
                 mime_type = file_info['mime_type']
                 page_count = file_info.get('page_count', 1)  # Get page count from file_info
+                file_content = None
 
                 try:
-                    # Update current progress
-                    batch.current_file_index = idx + 1
-                    batch.current_file_name = original_filename
-                    session.commit()
-
-                    logger.info(f"[Batch {batch_id}] Processing file {idx+1}/{len(file_paths)}: {original_filename}")
+                    logger.info(f"[Batch {batch_id}] Processing file: {original_filename}")
 
                     # Read file from disk (unavoidable for OCR processing)
                     async with aiofiles.open(file_path, 'rb') as f:
                         file_content = await f.read()
 
-                    # Check for duplicates
-                    file_hash = hashlib.sha256(file_content).hexdigest()
-                    duplicate = session.query(Document).filter(
-                        and_(
-                            Document.file_hash == file_hash,
-                            Document.user_id == uuid.UUID(user_id),
-                            Document.is_deleted == False
-                        )
-                    ).first()
-
-                    if duplicate:
-                        logger.warning(f"[Batch {batch_id}] Duplicate found: {original_filename}")
-                        results.append({
-                            'success': False,
-                            'original_filename': original_filename,
-                            'error': f"This document has already been uploaded as '{duplicate.title}' on {duplicate.created_at.strftime('%Y-%m-%d')}",
-                            'duplicate_of': {
-                                'id': str(duplicate.id),
-                                'title': duplicate.title,
-                                'filename': duplicate.file_name
-                            }
-                        })
-                        batch.failed_files += 1
-                        batch.processed_files += 1
-
-                        # CRITICAL: Update batch.results immediately so duplicate info is saved
-                        batch.results = results
-                        flag_modified(batch, 'results')  # Mark JSONB field as modified
-
-                        session.commit()
-                        # Explicit cleanup
-                        del file_content
-                        continue
-
-                    # Analyze document
                     analysis_result = await document_analysis_service.analyze_document(
                         file_content=file_content,
                         file_name=original_filename,
@@ -183,17 +334,17 @@ class BatchProcessorService:
                     )
 
                     # Explicit cleanup after analysis (free memory immediately)
-                    del file_content
+                    file_content = None
 
                     # Generate temporary ID and store metadata on disk (NOT in memory)
                     temp_id = str(uuid.uuid4())
                     temp_metadata_path = Path(f"/app/temp/batches/{batch_id}/{temp_id}.json")
 
                     # Save metadata to disk with file path reference
-                    import json
                     metadata = {
                         'temp_id': temp_id,
                         'file_path': file_path,  # Keep reference to file on disk
+                        'file_hash': file_info.get('file_hash'),  # Saves re-hashing on confirm
                         'file_name': original_filename,
                         'mime_type': mime_type,
                         'user_id': user_id,
@@ -209,7 +360,7 @@ class BatchProcessorService:
                     # Store ONLY minimal metadata in results (not full analysis to prevent memory bloat)
                     # Include keywords (small, ~1KB) but exclude extracted_text (large, 100KB-1MB)
                     # Full analysis is already saved to disk above and retrieved later via temp_id
-                    results.append({
+                    progress.add({
                         'success': True,
                         'temp_id': temp_id,
                         'original_filename': original_filename,
@@ -226,37 +377,63 @@ class BatchProcessorService:
                             'matched_keywords': analysis_result.get('matched_keywords', [])
                         }
                     })
+                    summary['successful'] += 1
 
                     # Explicit cleanup of large analysis result (can be 100KB-1MB of extracted text)
-                    del analysis_result
-
-                    batch.successful_files += 1
-                    batch.processed_files += 1
+                    del analysis_result, metadata
 
                     logger.info(f"[Batch {batch_id}] Successfully processed: {original_filename}")
 
                 except Exception as e:
                     logger.error(f"[Batch {batch_id}] Error processing {original_filename}: {e}")
-                    results.append({
+                    session.rollback()
+                    file_content = None
+                    progress.add({
                         'success': False,
                         'original_filename': original_filename,
                         'error': str(e)
                     })
-                    batch.failed_files += 1
-                    batch.processed_files += 1
-                    # Cleanup on error
-                    if 'file_content' in locals():
-                        del file_content
-
-                # Update progress
-                batch.results = results
-                flag_modified(batch, 'results')  # Mark JSONB field as modified for SQLAlchemy
-                session.commit()
+                    summary['failed'] += 1
+
+                progress.flush_if_due(session)
 
                 # Force garbage collection after each file to free memory immediately
                 gc.collect()
 
-            # Mark batch as completed
+            if not progress.flush(session):
+                summary['unsaved_results'] = progress.drain()
+            return summary
+
+        finally:
+            session.close()
+
+    def finalize_batch(self, batch_id: str, shard_summaries: Optional[List[Dict]] = None):
+        """
+        Mark the batch as completed once all shards are done (chord callback)
+
+        Results a shard could not write itself are written here first; if that
+        fails too, the error propagates and the batch is marked as failed.
+
+        Args:
+            batch_id: UUID of the batch
+            shard_summaries: Return values of process_shard
+        """
+        session = db_manager.session_local()
+        try:
+            progress = BatchProgress(batch_id)
+            for summary in shard_summaries or []:
+                for result in summary.get('unsaved_results', []):
+                    progress.add(result)
+            if not progress.flush(session):
+                raise RuntimeError(f"Could not save {len(progress.drain())} batch results")
+
+            batch = session.query(UploadBatch).filter(
+                UploadBatch.id == uuid.UUID(batch_id)
+            ).first()
+            if not batch:
+                logger.error(f"Batch {batch_id} not found")
+                return
+
             batch.status = 'completed'
             batch.completed_at = datetime.utcnow()
             batch.current_file_name = None
@@ -269,25 +446,26 @@ class BatchProcessorService:
             logger.info(f"[Batch {batch_id}] Temp files preserved for confirmation (expire in 1 hour)")
 
             logger.info(f"[Batch {batch_id}] Completed: {batch.successful_files}/{batch.total_files} successful")
+        finally:
+            session.close()
 
-        except Exception as e:
-            logger.error(f"[Batch {batch_id}] Fatal error: {e}")
-
-            # Mark batch as failed
+    def fail_batch(self, batch_id: str, error_message: str):
+        """Mark the batch as failed"""
+        session = db_manager.session_local()
+        try:
             batch = session.query(UploadBatch).filter(
                 UploadBatch.id == uuid.UUID(batch_id)
             ).first()
 
             if batch:
                 batch.status = 'failed'
-                batch.error_message = str(e)
+                batch.error_message = error_message
                 batch.completed_at = datetime.utcnow()
                 session.commit()
-
+        except Exception as e:
+            logger.error(f"[Batch {batch_id}] Failed to update batch status: {e}")
         finally:
             session.close()
-            # Remove from active tasks
-            self._processing_batches.pop(batch_id, None)
 
     async def get_batch_status(
         self,
@@ -12,7 +12,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 
 from app.database.connection import db_manager
-from app.services.document_analysis_service import document_analysis_service
+from app.services.analysis_executor import analysis_executor
 from app.services.config_service import config_service
 
 logger = logging.getLogger(__name__)
@@ -77,7 +77,7 @@ class BatchUploadService:
             async def analyze_with_semaphore(file_data):
                 async with semaphore:
                     return await self._analyze_single_file(
-                        file_data, user_categories, batch_id, session
+                        file_data, user_id, user_categories, batch_id
                     )
             
             # Create tasks
@@ -139,18 +139,24 @@ class BatchUploadService:
     async def _analyze_single_file(
         self,
         file_data: Dict,
+        user_id: str,
         user_categories: List[Dict],
-        batch_id: uuid.UUID,
-        session: Session
+        batch_id: uuid.UUID
     ) -> Dict:
-        """Analyze single file in batch"""
+        """
+        Analyze single file in batch
+
+        Runs concurrently with other files, so it uses its own session and the
+        analysis process pool instead of the caller's session and event loop.
+        """
+        session = db_manager.session_local()
         try:
-            analysis = await document_analysis_service.analyze_document(
+            analysis = await analysis_executor.analyze(
                 file_content=file_data['content'],
                 file_name=file_data['filename'],
                 mime_type=file_data['mime_type'],
-                user_categories=user_categories,
-                db=session
+                db=session,
+                user_id=user_id
             )
             
             # Get category code for filename
@@ -191,6 +197,8 @@ class BatchUploadService:
                 'error': str(e),
                 'batch_id': str(batch_id)
             }
+        finally:
+            session.close()
     
     def _generate_standardized_filename(
         self,
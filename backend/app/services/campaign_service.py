@@ -4,18 +4,19 @@ Marketing campaign service for sending promotional emails to users.
 Supports re-sendable campaigns with per-user send tracking.
 """
 
-import asyncio
 import logging
 from datetime import datetime, timezone
 from typing import List, Tuple, Optional
 from uuid import UUID
 
 from sqlalchemy import and_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.database.models import MarketingCampaign, CampaignSend, User, TierPlan
 from app.services.email_service import EmailService
+from app.services.email_delivery_service import email_delivery_service, OutboundEmail
 
 logger = logging.getLogger(__name__)
 
@@ -220,6 +221,16 @@ class CampaignService:
             'html_body': rendered_body,
         }
 
+    def _record_sends(self, session: Session, rows: List[dict]):
+        """Bulk insert CampaignSend rows and commit, ignoring users already recorded."""
+        if not rows:
+            return
+        statement = pg_insert(CampaignSend).values(rows).on_conflict_do_nothing(
+            constraint='uq_campaign_send_user'
+        )
+        session.execute(statement)
+        session.commit()
+
     async def send_campaign(
         self, session: Session, campaign_id: UUID, admin_user_id: UUID
     ) -> dict:
@@ -227,8 +238,9 @@ class CampaignService:
         Send a campaign to new eligible recipients (skips already-sent users).
 
         Updates campaign status throughout the process.
-        Rate-limited to ~10 emails/second via asyncio.sleep.
-        Campaign becomes 'active' after completion (re-sendable).
+        Recipients are sent in bulk requests through the pooled delivery service
+        (rate-limited and concurrency-bounded there); send records are committed
+        per chunk. Campaign becomes 'active' after completion (re-sendable).
         """
         logger.info(f"[CAMPAIGN SEND] Looking up campaign {campaign_id}")
         campaign = session.query(MarketingCampaign).filter(
@@ -264,56 +276,51 @@ class CampaignService:
         sent = 0
         failed = 0
 
+        # Enough recipients per chunk to keep every delivery slot busy
+        chunk_size = email_delivery_service.batch_size * email_delivery_service.max_concurrency
+
         try:
-            for idx, (user_id, email, full_name, tier_name) in enumerate(new_recipients, 1):
-                error_msg = None
-                send_status = 'sent'
-                try:
-                    logger.info(f"[CAMPAIGN SEND] Sending {idx}/{len(new_recipients)} to {email}")
-                    rendered_subject = self._render_template(
-                        campaign.subject, full_name, email, tier_name
-                    )
+            for offset in range(0, len(new_recipients), chunk_size):
+                chunk = new_recipients[offset:offset + chunk_size]
+                logger.info(f"[CAMPAIGN SEND] Sending {offset + 1}-{offset + len(chunk)}/{len(new_recipients)}")
+
+                messages = []
+                for user_id, email, full_name, tier_name in chunk:
                     rendered_body = self._render_template(
                         campaign.html_body, full_name, email, tier_name
                     )
-                    rendered_body = self._append_footer(rendered_body, full_name, email)
-
-                    success = await self.email_service.send_email(
+                    messages.append(OutboundEmail(
                         to_email=email,
                         to_name=full_name,
-                        subject=rendered_subject,
-                        html_content=rendered_body,
-                        from_email=from_email,
-                        from_name=from_name,
-                        reply_to=settings.email.email_from_info,
-                    )
+                        subject=self._render_template(campaign.subject, full_name, email, tier_name),
+                        html_content=self._append_footer(rendered_body, full_name, email),
+                        reference=user_id
+                    ))
+
+                results = await email_delivery_service.send_bulk(
+                    messages,
+                    from_email=from_email,
+                    from_name=from_name,
+                    reply_to=settings.email.email_from_info
+                )
 
-                    if success:
+                send_rows = []
+                for result in results:
+                    if result.success:
                         sent += 1
                     else:
                         failed += 1
-                        send_status = 'failed'
-                        error_msg = 'Email service returned failure'
-                        logger.warning(f"Campaign {campaign.name}: failed to send to {email}")
-
-                except Exception as e:
-                    failed += 1
-                    send_status = 'failed'
-                    error_msg = str(e)
-                    logger.error(f"Campaign {campaign.name}: error sending to {email}: {e}")
-
-                # Record the send
-                campaign_send = CampaignSend(
-                    campaign_id=campaign_id,
-                    user_id=user_id,
-                    user_email=email,
-                    status=send_status,
-                    error_message=error_msg,
-                )
-                session.add(campaign_send)
-
-                # Rate limiting: ~10 emails/second
-                await asyncio.sleep(0.1)
+                        logger.warning(f"Campaign {campaign.name}: failed to send to {result.to_email}: {result.error}")
+                    send_rows.append({
+                        'campaign_id': campaign_id,
+                        'user_id': result.reference,
+                        'user_email': result.to_email,
+                        'status': 'sent' if result.success else 'failed',
+                        'error_message': result.error,
+                    })
+
+                # Record the sends for this chunk in one statement
+                self._record_sends(session, send_rows)
 
             # Campaign completed - set to active (re-sendable)
             campaign.status = 'active'
@@ -6,10 +6,11 @@ Business logic for category management with Google Drive sync
 
 import logging
 import json
-from typing import Optional, List, Dict, Any
+import time
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, func, and_, or_, literal
 
 from app.database.models import Category, CategoryTranslation, Document, User, AuditLog, SystemSetting
 from app.database.connection import db_manager
@@ -18,6 +19,7 @@ from app.schemas.category_schemas import (
     CategoryDeleteRequest, CategoryDeleteResponse, RestoreDefaultsResponse
 )
 from app.services.drive_service import drive_service
+from app.services.storage.folder_cache import folder_cache
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +27,31 @@ logger = logging.getLogger(__name__)
 class CategoryService:
     """Category management service"""
 
+    def __init__(self):
+        # Per-user category list cache: user_id -> (language, include_system, include_counts) -> (timestamp, response)
+        # Invalidated on category/document changes made in this process; the TTL bounds
+        # staleness from documents written elsewhere (Celery batches, email ingestion)
+        self._list_cache: Dict[str, Dict[Tuple[str, bool, bool], Tuple[float, CategoryListResponse]]] = {}
+        self._list_cache_ttl_seconds = 30
+        self._list_cache_next_sweep = 0.0
+
+    def invalidate_user_cache(self, user_id: str):
+        """Drop cached category lists of a user after their categories or documents changed"""
+        self._list_cache.pop(str(user_id), None)
+
+    def _cache_list(self, user_id: str, variant: Tuple[str, bool, bool], response: CategoryListResponse):
+        """Cache a category list, evicting expired entries of all users at most once per TTL"""
+        now = time.monotonic()
+        if now >= self._list_cache_next_sweep:
+            self._list_cache_next_sweep = now + self._list_cache_ttl_seconds
+            for cached_user_id, entries in list(self._list_cache.items()):
+                for key, (cached_at, _) in list(entries.items()):
+                    if now - cached_at >= self._list_cache_ttl_seconds:
+                        entries.pop(key, None)
+                if not entries:
+                    self._list_cache.pop(cached_user_id, None)
+        self._list_cache.setdefault(user_id, {})[variant] = (now, response)
+
     async def list_categories(
         self,
         user_id: str,
@@ -39,15 +66,32 @@ class CategoryService:
         - Template categories (user_id=NULL) are never shown to users
         - Users only see their personal workspace categories (user_id=user_id)
         - This includes both system copies (is_system=True) and custom (is_system=False)
+        - Categories, translations and document counts come from one query
+          (counts are a grouped subquery); results are cached per user
         """
+        cache_variant = (user_language, include_system, include_documents_count)
+        cached = self._list_cache.get(str(user_id), {}).get(cache_variant)
+        if cached and time.monotonic() - cached[0] < self._list_cache_ttl_seconds:
+            return cached[1].model_copy(deep=True)
+
         session = db_manager.session_local()
         try:
-            logger.info(f"[CATEGORY DEBUG] === Listing Categories for user_id={user_id}, language={user_language} ===")
-
             # Build query - only show user's personal categories
-            stmt = select(Category).options(
-                joinedload(Category.translations)
-            )
+            if include_documents_count:
+                counts = (
+                    select(Document.category_id, func.count(Document.id).label('documents_count'))
+                    .where(Document.user_id == user_id)
+                    .group_by(Document.category_id)
+                    .subquery()
+                )
+                stmt = (
+                    select(Category, func.coalesce(counts.c.documents_count, 0))
+                    .outerjoin(counts, counts.c.category_id == Category.id)
+                )
+            else:
+                stmt = select(Category, literal(0))
+
+            stmt = stmt.options(joinedload(Category.translations))
 
             # Filter by user's workspace only
             stmt = stmt.where(Category.user_id == user_id)
@@ -59,25 +103,19 @@ class CategoryService:
             stmt = stmt.where(Category.is_active == True)
             stmt = stmt.order_by(Category.sort_order, Category.created_at)
 
-            categories = session.execute(stmt).unique().scalars().all()
-            logger.info(f"[CATEGORY DEBUG] Found {len(categories)} Category records in database")
+            rows = session.execute(stmt).unique().all()
 
             # Check for duplicate reference_keys
             ref_key_counts = {}
-            for cat in categories:
-                if cat.reference_key not in ref_key_counts:
-                    ref_key_counts[cat.reference_key] = []
-                ref_key_counts[cat.reference_key].append(str(cat.id))
+            for category, _ in rows:
+                ref_key_counts.setdefault(category.reference_key, []).append(str(category.id))
 
             for ref_key, ids in ref_key_counts.items():
                 if len(ids) > 1:
-                    logger.warning(f"[CATEGORY DEBUG] ⚠️ DUPLICATE Category records for reference_key='{ref_key}': {ids}")
-                else:
-                    logger.info(f"[CATEGORY DEBUG] ✅ Single Category record for reference_key='{ref_key}': {ids[0]}")
+                    logger.warning(f"Duplicate Category records for reference_key='{ref_key}': {ids}")
 
             category_responses = []
-            for category in categories:
-                logger.info(f"[CATEGORY DEBUG] Processing category ID={category.id}, ref_key={category.reference_key}, translations={len(category.translations)}")
+            for category, doc_count in rows:
                 # Get translation for user's language
                 translation = next(
                     (t for t in category.translations if t.language_code == user_language),
@@ -95,15 +133,6 @@ class CategoryService:
                     logger.warning(f"No translation found for category {category.id}")
                     continue
                 
-                # Get document count if requested
-                doc_count = 0
-                if include_documents_count:
-                    doc_count = session.execute(
-                        select(func.count(Document.id))
-                        .where(Document.category_id == category.id)
-                        .where(Document.user_id == user_id)
-                    ).scalar() or 0
-                
                 category_responses.append(CategoryResponse(
                     id=str(category.id),
                     reference_key=category.reference_key,
@@ -116,15 +145,18 @@ class CategoryService:
                     user_id=str(category.user_id) if category.user_id else None,
                     sort_order=category.sort_order,
                     is_active=category.is_active,
-                    documents_count=doc_count,
+                    documents_count=doc_count or 0,
                     created_at=category.created_at,
                     updated_at=category.updated_at
                 ))
             
-            return CategoryListResponse(
+            response = CategoryListResponse(
                 categories=category_responses,
                 total_count=len(category_responses)
             )
+            self._cache_list(str(user_id), cache_variant, response)
+            logger.debug(f"Listed {len(category_responses)} categories for user {user_id} (language: {user_language})")
+            return response.model_copy(deep=True)
             
         except Exception as e:
             logger.error(f"Failed to list categories: {e}")
@@ -214,22 +246,18 @@ class CategoryService:
                     # User provided this translation
                     final_translations[lang_code] = category_data.translations[lang_code]
                 else:
-                    # Auto-translate using translation service
-                    translated_name = await translation_service.translate(
-                        text=source_translation.name,
+                    # Auto-translate name and description in one batch
+                    texts = [source_translation.name]
+                    if source_translation.description:
+                        texts.append(source_translation.description)
+                    translated = await translation_service.translate_batch(
+                        texts=texts,
                         source_lang=source_lang,
                         target_lang=lang_code,
                         user_tier=user.tier.name if (user and user.tier) else None
                     )
-
-                    translated_desc = None
-                    if source_translation.description:
-                        translated_desc = await translation_service.translate(
-                            text=source_translation.description,
-                            source_lang=source_lang,
-                            target_lang=lang_code,
-                            user_tier=user.tier.name if (user and user.tier) else None
-                        )
+                    translated_name = translated.get(source_translation.name)
+                    translated_desc = translated.get(source_translation.description) if source_translation.description else None
 
                     # Create translation data object
                     from app.schemas.category_schemas import CategoryTranslationInput
@@ -251,6 +279,7 @@ class CategoryService:
                 session.add(translation)
             
             session.commit()
+            self.invalidate_user_cache(user_id)
             session.refresh(new_category)
             
             # Get user's language translation for response
@@ -375,6 +404,10 @@ class CategoryService:
 
             category.updated_at = datetime.now(timezone.utc)
             session.commit()
+            self.invalidate_user_cache(user_id)
+            if category_data.translations:
+                # Renamed: cloud folders are resolved by category name
+                folder_cache.invalidate(str(user_id))
             session.refresh(category)
 
             # Get user's language translation for response
@@ -510,6 +543,8 @@ class CategoryService:
             category_name = translation.name if translation else category.reference_key
             session.delete(category)
             session.commit()
+            self.invalidate_user_cache(user_id)
+            folder_cache.invalidate(str(user_id))
 
             await self._delete_google_drive_folder(user_email, category_name)
 
@@ -695,6 +730,8 @@ class CategoryService:
                     documents_moved_to_other += 1
 
             session.commit()
+            self.invalidate_user_cache(user_id)
+            folder_cache.invalidate(str(user_id))
 
             await self._log_audit(
                 session=session,
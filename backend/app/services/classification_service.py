@@ -104,7 +104,7 @@ class ClassificationService:
             keyword_weights = {kw.keyword.lower(): kw.weight for kw in keywords}
 
             mode = "all languages" if is_multi_lingual else f"lang: {language}"
-            logger.info(f"[CLASSIFICATION DEBUG] Loaded {len(keyword_weights)} keywords for category {category_id} ({mode}), is_multi_lingual={is_multi_lingual}")
+            logger.debug("[CLASSIFICATION DEBUG] Loaded %s keywords for category %s (%s), is_multi_lingual=%s", len(keyword_weights), category_id, mode, is_multi_lingual)
 
             return keyword_weights
 
@@ -133,7 +133,7 @@ class ClassificationService:
             Tuple of (score, matched_keywords)
         """
         if not document_keywords or not category_keywords:
-            logger.debug(f"[SCORE DEBUG] Empty input: doc_kw={len(document_keywords)}, cat_kw={len(category_keywords)}")
+            logger.debug("[SCORE DEBUG] Empty input: doc_kw=%s, cat_kw=%s", len(document_keywords), len(category_keywords))
             return 0.0, []
 
         document_keywords_lower = [kw.lower() for kw in document_keywords]
@@ -148,7 +148,7 @@ class ClassificationService:
                 matched_keywords.append(doc_keyword)
 
         if not matched_keywords:
-            logger.debug(f"[SCORE DEBUG] No keyword matches found")
+            logger.debug("[SCORE DEBUG] No keyword matches found")
             return 0.0, []
 
         # Smart scoring: Use total weighted score directly
@@ -156,7 +156,7 @@ class ClassificationService:
         # No capping - let scores differentiate naturally
         score = total_weight
 
-        logger.debug(f"[SCORE DEBUG] Score={score:.3f}, Matched={len(matched_keywords)}/{len(document_keywords_lower)}, TotalWeight={total_weight:.2f}, MatchedKeywords={matched_keywords[:5]}{'...' if len(matched_keywords) > 5 else ''}")
+        logger.debug("[SCORE DEBUG] Score=%.3f, Matched=%s/%s, TotalWeight=%.2f, MatchedKeywords=%s%s", score, len(matched_keywords), len(document_keywords_lower), total_weight, matched_keywords[:5], '...' if len(matched_keywords) > 5 else '')
 
         return score, matched_keywords
 
@@ -183,9 +183,9 @@ class ClassificationService:
         try:
             from app.database.models import Category, CategoryTranslation
 
-            logger.info(f"[CLASSIFICATION DEBUG] === Starting classification ===")
-            logger.info(f"[CLASSIFICATION DEBUG] Document keywords ({len(document_keywords)}): {document_keywords[:10]}{'...' if len(document_keywords) > 10 else ''}")
-            logger.info(f"[CLASSIFICATION DEBUG] Language: {language}, User ID: {user_id}")
+            logger.debug("[CLASSIFICATION DEBUG] === Starting classification ===")
+            logger.debug("[CLASSIFICATION DEBUG] Document keywords (%s): %s%s", len(document_keywords), document_keywords[:10], '...' if len(document_keywords) > 10 else '')
+            logger.debug("[CLASSIFICATION DEBUG] Language: %s, User ID: %s", language, user_id)
 
             # PRIORITY KEYWORD FILTERING:
             # Get ALL category keywords across all user's categories and languages
@@ -202,13 +202,13 @@ class ClassificationService:
                     AND c.is_active = true
                 """), {'user_id': str(user_id)})
                 all_category_keywords_set = {row[0] for row in result}
-                logger.info(f"[CLASSIFICATION DEBUG] Loaded {len(all_category_keywords_set)} unique category keywords across all categories")
+                logger.debug("[CLASSIFICATION DEBUG] Loaded %s unique category keywords across all categories", len(all_category_keywords_set))
 
             # Filter to priority keywords only (those that could match any category)
             document_keywords_lower = [kw.lower() for kw in document_keywords]
             priority_keywords = [kw for kw in document_keywords if kw.lower() in all_category_keywords_set]
 
-            logger.info(f"[CLASSIFICATION DEBUG] Filtered to {len(priority_keywords)} priority keywords from {len(document_keywords)} total: {priority_keywords[:10]}{'...' if len(priority_keywords) > 10 else ''}")
+            logger.debug("[CLASSIFICATION DEBUG] Filtered to %s priority keywords from %s total: %s%s", len(priority_keywords), len(document_keywords), priority_keywords[:10], '...' if len(priority_keywords) > 10 else '')
 
             # Use priority keywords for classification scoring
             # All keywords (including general ones) are still stored for search functionality
@@ -225,13 +225,13 @@ class ClassificationService:
                 query = query.filter(Category.user_id.is_(None))
 
             categories = query.all()
-            logger.info(f"[CLASSIFICATION DEBUG] Found {len(categories)} active categories to check")
+            logger.debug("[CLASSIFICATION DEBUG] Found %s active categories to check", len(categories))
 
             results = []
 
             for category in categories:
                 # For multi-lingual categories, load ALL keywords regardless of language
-                logger.info(f"[CLASSIFICATION DEBUG] Processing category {category.reference_key}, is_multi_lingual={category.is_multi_lingual}, requested_language={language}")
+                logger.debug("[CLASSIFICATION DEBUG] Processing category %s, is_multi_lingual=%s, requested_language=%s", category.reference_key, category.is_multi_lingual, language)
                 category_keywords = self.get_category_keywords(
                     db,
                     category.id,
@@ -240,10 +240,11 @@ class ClassificationService:
                 )
 
                 if not category_keywords:
-                    logger.info(f"[CLASSIFICATION DEBUG] No keywords found for category {category.reference_key}")
+                    logger.debug("[CLASSIFICATION DEBUG] No keywords found for category %s", category.reference_key)
                     continue
 
-                logger.info(f"[CLASSIFICATION DEBUG] Category {category.reference_key} keywords ({len(category_keywords)}): {list(category_keywords.keys())[:10]}{'...' if len(category_keywords) > 10 else ''}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("[CLASSIFICATION DEBUG] Category %s keywords (%s): %s%s", category.reference_key, len(category_keywords), list(category_keywords.keys())[:10], '...' if len(category_keywords) > 10 else '')
 
                 # Score using priority keywords only
                 score, matched_keywords = self.calculate_score(classification_keywords, category_keywords)
@@ -255,16 +256,16 @@ class ClassificationService:
 
                 category_name = translation.name if translation else category.reference_key
 
-                logger.info(f"[CLASSIFICATION DEBUG] Category {category.reference_key}: score={score:.3f}, matched={len(matched_keywords)}/{len(classification_keywords)}, matched_kw={matched_keywords[:5]}{'...' if len(matched_keywords) > 5 else ''}")
+                logger.debug("[CLASSIFICATION DEBUG] Category %s: score=%.3f, matched=%s/%s, matched_kw=%s%s", category.reference_key, score, len(matched_keywords), len(classification_keywords), matched_keywords[:5], '...' if len(matched_keywords) > 5 else '')
 
                 results.append((category.id, category_name, score, matched_keywords))
 
             results.sort(key=lambda x: x[2], reverse=True)
 
-            logger.info(f"[CLASSIFICATION DEBUG] === Classification complete ===")
-            logger.info(f"[CLASSIFICATION DEBUG] Top 3 results:")
+            logger.debug("[CLASSIFICATION DEBUG] === Classification complete ===")
+            logger.debug("[CLASSIFICATION DEBUG] Top 3 results:")
             for i, (cat_id, cat_name, score, matched) in enumerate(results[:3], 1):
-                logger.info(f"[CLASSIFICATION DEBUG]   {i}. {cat_name}: {score:.3f} ({len(matched)} matches)")
+                logger.debug("[CLASSIFICATION DEBUG]   %s. %s: %.3f (%s matches)", i, cat_name, score, len(matched))
 
             return results
 
@@ -293,27 +294,27 @@ class ClassificationService:
             List of tuples (category_id, category_name, score, matched_keywords)
             Empty list if no categories meet minimum confidence
         """
-        logger.info(f"[CLASSIFICATION DEBUG] === Selecting categories (multi-category mode) ===")
+        logger.debug("[CLASSIFICATION DEBUG] === Selecting categories (multi-category mode) ===")
 
         if not classification_results:
-            logger.info(f"[CLASSIFICATION DEBUG] No classification results to evaluate")
+            logger.debug("[CLASSIFICATION DEBUG] No classification results to evaluate")
             return []
 
         config = self.get_classification_config(db)
         min_confidence = config['min_confidence']
         gap_threshold = config['gap_threshold']
 
-        logger.info(f"[CLASSIFICATION DEBUG] Thresholds: min_confidence={min_confidence}, gap_threshold={gap_threshold}, max_categories={max_categories}")
+        logger.debug("[CLASSIFICATION DEBUG] Thresholds: min_confidence=%s, gap_threshold=%s, max_categories=%s", min_confidence, gap_threshold, max_categories)
 
         # Get top category
         top_category = classification_results[0]
         top_score = top_category[2]
         top_name = top_category[1]
 
-        logger.info(f"[CLASSIFICATION DEBUG] Top candidate: {top_name} with score {top_score:.3f}")
+        logger.debug("[CLASSIFICATION DEBUG] Top candidate: %s with score %.3f", top_name, top_score)
 
         if top_score < min_confidence:
-            logger.info(f"[CLASSIFICATION DEBUG] REJECTED: Top score {top_score:.3f} below minimum confidence {min_confidence}")
+            logger.debug("[CLASSIFICATION DEBUG] REJECTED: Top score %.3f below minimum confidence %s", top_score, min_confidence)
             return []
 
         # Collect all categories within gap_threshold of top score
@@ -325,18 +326,18 @@ class ClassificationService:
             name = category[1]
             gap = top_score - score
 
-            logger.info(f"[CLASSIFICATION DEBUG] Candidate #{i+1}: {name} with score {score:.3f}, gap={gap:.3f}")
+            logger.debug("[CLASSIFICATION DEBUG] Candidate #%s: %s with score %.3f, gap=%.3f", i+1, name, score, gap)
 
             if gap < gap_threshold:
                 # Within threshold - include this category
                 suggested.append(category)
-                logger.info(f"[CLASSIFICATION DEBUG] ✅ INCLUDED: {name} (gap {gap:.3f} < threshold {gap_threshold})")
+                logger.debug("[CLASSIFICATION DEBUG] ✅ INCLUDED: %s (gap %.3f < threshold %s)", name, gap, gap_threshold)
             else:
                 # Gap too large - stop looking
-                logger.info(f"[CLASSIFICATION DEBUG] ❌ EXCLUDED: {name} (gap {gap:.3f} >= threshold {gap_threshold})")
+                logger.debug("[CLASSIFICATION DEBUG] ❌ EXCLUDED: %s (gap %.3f >= threshold %s)", name, gap, gap_threshold)
                 break
 
-        logger.info(f"[CLASSIFICATION DEBUG] Selected {len(suggested)} categories: {[c[1] for c in suggested]}")
+        logger.debug("[CLASSIFICATION DEBUG] Selected %s categories: %s", len(suggested), [c[1] for c in suggested])
         return suggested
 
     def get_primary_category(
@@ -357,36 +358,36 @@ class ClassificationService:
         Returns:
             Tuple of (category_id, category_name, score, matched_keywords) or None
         """
-        logger.info(f"[CLASSIFICATION DEBUG] === Selecting primary category ===")
+        logger.debug("[CLASSIFICATION DEBUG] === Selecting primary category ===")
 
         if not classification_results:
-            logger.info(f"[CLASSIFICATION DEBUG] No classification results to evaluate")
+            logger.debug("[CLASSIFICATION DEBUG] No classification results to evaluate")
             return None
 
         config = self.get_classification_config(db)
         min_confidence = config['min_confidence']
         gap_threshold = config['gap_threshold']
 
-        logger.info(f"[CLASSIFICATION DEBUG] Thresholds: min_confidence={min_confidence}, gap_threshold={gap_threshold}")
+        logger.debug("[CLASSIFICATION DEBUG] Thresholds: min_confidence=%s, gap_threshold=%s", min_confidence, gap_threshold)
 
         top_category = classification_results[0]
         top_score = top_category[2]
         top_name = top_category[1]
 
-        logger.info(f"[CLASSIFICATION DEBUG] Top candidate: {top_name} with score {top_score:.3f}")
+        logger.debug("[CLASSIFICATION DEBUG] Top candidate: %s with score %.3f", top_name, top_score)
 
         if top_score < min_confidence:
-            logger.info(f"[CLASSIFICATION DEBUG] REJECTED: Top score {top_score:.3f} below minimum confidence {min_confidence}")
+            logger.debug("[CLASSIFICATION DEBUG] REJECTED: Top score %.3f below minimum confidence %s", top_score, min_confidence)
             return None
 
         # NEW: Check for multiple close matches (multi-category scenario)
         close_matches = self.get_suggested_categories(classification_results, db)
 
         if len(close_matches) > 1:
-            logger.info(f"[CLASSIFICATION DEBUG] ⚠️  MULTI-CATEGORY MATCH: {len(close_matches)} categories within threshold")
-            logger.info(f"[CLASSIFICATION DEBUG] Returning primary: {top_name}, but document should be assigned to all {len(close_matches)} categories")
+            logger.debug("[CLASSIFICATION DEBUG] ⚠️  MULTI-CATEGORY MATCH: %s categories within threshold", len(close_matches))
+            logger.debug("[CLASSIFICATION DEBUG] Returning primary: %s, but document should be assigned to all %s categories", top_name, len(close_matches))
 
-        logger.info(f"[CLASSIFICATION DEBUG] ACCEPTED: {top_name} as primary category")
+        logger.debug("[CLASSIFICATION DEBUG] ACCEPTED: %s as primary category", top_name)
         return top_category
 
     def get_other_category(
@@ -415,7 +416,7 @@ class ClassificationService:
 
             if user_id:
                 query = query.filter(Category.user_id == user_id)
-                logger.info(f"[FALLBACK DEBUG] Looking for OTHER category for user_id={user_id}")
+                logger.debug("[FALLBACK DEBUG] Looking for OTHER category for user_id=%s", user_id)
             else:
                 logger.warning(f"[FALLBACK DEBUG] No user_id provided, searching for ANY OTHER category")
 
@@ -432,7 +433,7 @@ class ClassificationService:
 
             category_name = translation.name if translation else "Other"
 
-            logger.info(f"[FALLBACK DEBUG] ✅ Found OTHER category: {category_name} (ID: {other_category.id}, lang: {language})")
+            logger.debug("[FALLBACK DEBUG] ✅ Found OTHER category: %s (ID: %s, lang: %s)", category_name, other_category.id, language)
             return (other_category.id, category_name, 0.0, [])
 
         except Exception as e:
@@ -463,8 +464,8 @@ class ClassificationService:
             Returns OTHER category if no confident match and fallback_to_other=True
             Returns None only if fallback_to_other=False or OTHER category doesn't exist
         """
-        logger.info(f"[SUGGEST CATEGORY DEBUG] === Starting category suggestion ===")
-        logger.info(f"[SUGGEST CATEGORY DEBUG] Language: {language}, Fallback to OTHER: {fallback_to_other}")
+        logger.debug("[SUGGEST CATEGORY DEBUG] === Starting category suggestion ===")
+        logger.debug("[SUGGEST CATEGORY DEBUG] Language: %s, Fallback to OTHER: %s", language, fallback_to_other)
 
         classification_results = self.classify_document(
             document_keywords,
@@ -476,22 +477,22 @@ class ClassificationService:
         primary_category = self.get_primary_category(classification_results, db)
 
         if primary_category:
-            logger.info(f"[SUGGEST CATEGORY DEBUG] ✅ Suggested category: {primary_category[1]} ({primary_category[2]:.1%} confidence)")
+            logger.debug("[SUGGEST CATEGORY DEBUG] ✅ Suggested category: %s (%.1f%% confidence)", primary_category[1], primary_category[2] * 100)
             return primary_category
 
         # No confident match found
-        logger.info(f"[SUGGEST CATEGORY DEBUG] ⚠️  No confident category match found")
+        logger.debug("[SUGGEST CATEGORY DEBUG] ⚠️  No confident category match found")
 
         if fallback_to_other:
-            logger.info(f"[SUGGEST CATEGORY DEBUG] Attempting fallback to OTHER category...")
+            logger.debug("[SUGGEST CATEGORY DEBUG] Attempting fallback to OTHER category...")
             other = self.get_other_category(db, language, user_id)
             if other:
-                logger.info(f"[SUGGEST CATEGORY DEBUG] ✅ Fallback successful: {other[1]}")
+                logger.debug("[SUGGEST CATEGORY DEBUG] ✅ Fallback successful: %s", other[1])
             else:
                 logger.error(f"[SUGGEST CATEGORY DEBUG] ❌ Fallback failed: OTHER category not found!")
             return other
 
-        logger.info(f"[SUGGEST CATEGORY DEBUG] No fallback requested, returning None")
+        logger.debug("[SUGGEST CATEGORY DEBUG] No fallback requested, returning None")
         return None
 
 
@@ -6,11 +6,14 @@ Business logic for multi-user delegate access management
 
 import logging
 import secrets
-from typing import Optional, List, Tuple
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, List, Tuple, Dict, Iterable
 from datetime import datetime, timedelta, timezone
 from uuid import UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, update, and_, or_
 
 from app.database.models import User, UserDelegate, DelegateAccessLog, TierPlan
 from app.database.connection import db_manager
@@ -29,9 +32,19 @@ class DelegateService:
 
     INVITATION_EXPIRY_DAYS = 7  # Invitations expire after 7 days
     PRO_TIER_ID = 2  # Only Pro tier users can invite delegates
+    GRANT_CACHE_TTL_SECONDS = 30  # Bounds how long a revocation in another worker goes unnoticed
+    GRANT_CACHE_MAX_SIZE = 10000  # Least recently used delegate/owner pairs are evicted beyond this
+    ACCESS_TIME_FLUSH_SECONDS = 60  # last_accessed_at is written behind at most this often
 
     def __init__(self):
-        pass
+        # (delegate_user_id, owner_user_id) -> (cached_at, grant) where grant is
+        # (user_delegates.id, role, access_expires_at) or None for "no access"
+        # (LRU order, bounded by GRANT_CACHE_MAX_SIZE)
+        self._grant_cache: 'OrderedDict[Tuple[UUID, UUID], Tuple[float, Optional[Tuple[UUID, str, Optional[datetime]]]]]' = OrderedDict()
+        self._grant_cache_lock = threading.Lock()
+        # user_delegates.id -> last access time not yet written to the database
+        self._pending_access_times: Dict[UUID, datetime] = {}
+        self._last_access_flush = time.monotonic()
 
     def _generate_invitation_token(self) -> str:
         """Generate secure random invitation token"""
@@ -209,6 +222,7 @@ class DelegateService:
             delegate.invitation_accepted_at = datetime.now(timezone.utc)
 
             session.commit()
+            self.invalidate_grant(delegate_user_id, delegate.owner_user_id)
 
             logger.info(f"[DELEGATE] Invitation accepted: delegate={delegate_user_id}, owner={owner.id}")
 
@@ -306,6 +320,8 @@ class DelegateService:
             delegate.revoked_by = revoked_by_user_id
 
             session.commit()
+            if delegate.delegate_user_id:
+                self.invalidate_grant(delegate.delegate_user_id, owner_user_id)
 
             logger.info(f"[DELEGATE] Access revoked: delegate_id={delegate_id}, owner={owner_user_id}")
             return True, None
@@ -317,6 +333,65 @@ class DelegateService:
         finally:
             session.close()
 
+    def invalidate_grant(self, delegate_user_id: UUID, owner_user_id: UUID):
+        """Forget the cached grant of a delegate/owner pair after it changed"""
+        with self._grant_cache_lock:
+            self._grant_cache.pop((UUID(str(delegate_user_id)), UUID(str(owner_user_id))), None)
+
+    def _cached_grant(self, key: Tuple[UUID, UUID], now: datetime):
+        """
+        Return the cached grant for key, or False on a miss
+
+        Entries older than the TTL, and grants whose access_expires_at has passed
+        (so the database path can auto-revoke them), count as misses.
+        """
+        with self._grant_cache_lock:
+            entry = self._grant_cache.get(key)
+            if not entry:
+                return False
+            if time.monotonic() - entry[0] >= self.GRANT_CACHE_TTL_SECONDS:
+                del self._grant_cache[key]
+                return False
+            self._grant_cache.move_to_end(key)
+        grant = entry[1]
+        if grant and grant[2] and grant[2] < now:
+            return False
+        return grant
+
+    def _cache_grant(self, key: Tuple[UUID, UUID], cached_at: float, grant: Optional[Tuple[UUID, str, Optional[datetime]]]):
+        """Cache a grant (None for "no access"), evicting the least recently used pairs beyond the size bound"""
+        with self._grant_cache_lock:
+            self._grant_cache[key] = (cached_at, grant)
+            self._grant_cache.move_to_end(key)
+            while len(self._grant_cache) > self.GRANT_CACHE_MAX_SIZE:
+                self._grant_cache.popitem(last=False)
+
+    def _record_access(self, delegate_row_id: UUID, now: datetime):
+        """Queue a last_accessed_at update and flush the queue when it is due"""
+        self._pending_access_times[delegate_row_id] = now
+        if time.monotonic() - self._last_access_flush >= self.ACCESS_TIME_FLUSH_SECONDS:
+            self.flush_access_times()
+
+    def flush_access_times(self):
+        """Write queued last_accessed_at values with one bulk UPDATE"""
+        self._last_access_flush = time.monotonic()
+        if not self._pending_access_times:
+            return
+
+        pending, self._pending_access_times = self._pending_access_times, {}
+        session = db_manager.session_local()
+        try:
+            session.execute(
+                update(UserDelegate),
+                [{'id': row_id, 'last_accessed_at': accessed_at} for row_id, accessed_at in pending.items()]
+            )
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"[DELEGATE] Error writing last access times: {e}")
+        finally:
+            session.close()
+
     async def check_access(
         self,
         delegate_user_id: UUID,
@@ -325,37 +400,89 @@ class DelegateService:
         """
         Check if delegate has active access to owner's documents
 
+        Grants are cached briefly and last_accessed_at is written behind.
+
         Returns:
             Tuple[has_access, role]
         """
+        roles = await self.get_access_roles(delegate_user_id, [owner_user_id])
+        role = roles.get(UUID(str(owner_user_id)))
+        return (True, role) if role else (False, None)
+
+    async def get_access_roles(
+        self,
+        delegate_user_id: UUID,
+        owner_user_ids: Iterable[UUID]
+    ) -> Dict[UUID, str]:
+        """
+        Resolve the delegate's active access to several owners at once
+
+        Cache misses are loaded with one query; expired grants are auto-revoked.
+
+        Args:
+            delegate_user_id: User acting as delegate
+            owner_user_ids: Owners whose documents are requested
+
+        Returns:
+            {owner_user_id: role} for owners the delegate may access
+        """
+        delegate_user_id = UUID(str(delegate_user_id))
+        now = datetime.now(timezone.utc)
+        roles: Dict[UUID, str] = {}
+        missing: List[UUID] = []
+
+        for owner_id in {UUID(str(owner_id)) for owner_id in owner_user_ids}:
+            grant = self._cached_grant((delegate_user_id, owner_id), now)
+            if grant is False:
+                missing.append(owner_id)
+            elif grant:
+                roles[owner_id] = grant[1]
+                self._record_access(grant[0], now)
+
+        if not missing:
+            return roles
+
         session = db_manager.session_local()
         try:
-            delegate = session.query(UserDelegate).filter(
+            delegates = session.query(UserDelegate).filter(
                 UserDelegate.delegate_user_id == delegate_user_id,
-                UserDelegate.owner_user_id == owner_user_id,
+                UserDelegate.owner_user_id.in_(missing),
                 UserDelegate.status == 'active'
-            ).first()
-
-            if not delegate:
-                return False, None
-
-            # Check if access has expired
-            if delegate.access_expires_at and delegate.access_expires_at < datetime.now(timezone.utc):
-                # Auto-revoke expired access
-                delegate.status = 'revoked'
-                delegate.revoked_at = datetime.now(timezone.utc)
+            ).all()
+            found = {d.owner_user_id: d for d in delegates}
+
+            expired = False
+            cached_at = time.monotonic()
+            for owner_id in missing:
+                delegate = found.get(owner_id)
+
+                # Check if access has expired
+                if delegate and delegate.access_expires_at and delegate.access_expires_at < now:
+                    # Auto-revoke expired access
+                    delegate.status = 'revoked'
+                    delegate.revoked_at = now
+                    expired = True
+                    delegate = None
+
+                if not delegate:
+                    self._cache_grant((delegate_user_id, owner_id), cached_at, None)
+                    continue
+
+                self._cache_grant(
+                    (delegate_user_id, owner_id), cached_at, (delegate.id, delegate.role, delegate.access_expires_at)
+                )
+                roles[owner_id] = delegate.role
+                self._record_access(delegate.id, now)
+
+            if expired:
                 session.commit()
-                return False, None
-
-            # Update last accessed timestamp
-            delegate.last_accessed_at = datetime.now(timezone.utc)
-            session.commit()
 
-            return True, delegate.role
+            return roles
 
         except Exception as e:
+            session.rollback()
             logger.error(f"[DELEGATE] Error checking access: {e}")
-            return False, None
+            return roles
         finally:
             session.close()
 
@@ -18,6 +18,8 @@ from app.services.keyword_extraction_service import keyword_extraction_service
 from app.services.classification_service import classification_service
 from app.services.date_extraction_service import date_extraction_service
 from app.services.language_detection_service import language_detection_service
+from app.services.analysis_profiler import AnalysisTrace
+from app.utils.pdf_document import PDFDocument
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +33,8 @@ class DocumentAnalysisService:
         file_name: str,
         mime_type: str,
         db: Session,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        document: Optional[PDFDocument] = None
     ) -> Dict:
         """
         Analyze document and extract metadata with ML
@@ -42,200 +45,215 @@ class DocumentAnalysisService:
             mime_type: MIME type
             db: Database session
             user_id: User ID for custom categories (optional)
+            document: Parsed handle of a PDF upload (optional, avoids re-parsing)
 
         Returns:
-            Analysis result with keywords, language, suggested category, date
+            Analysis result with keywords, language, suggested category, date,
+            and a per-stage timing breakdown under 'timings'
         """
+        trace = AnalysisTrace(file_name)
+        trace.start_profiling()
         try:
             # Get user's preferred document languages BEFORE OCR to use as language hint
             # Use Tesseract multilingual mode: all user languages simultaneously (e.g., 'eng+deu+rus+fra')
             # This allows Tesseract to automatically pick the best matching language
 
             # Get language mapping from database (no hardcoded values)
-            lang_mapping = ocr_service.get_supported_languages(db)
-
-            # Build multilingual language hint from user preferences
-            tesseract_langs = []
-            if user_id:
-                from app.database.models import User
-                user = db.get(User, UUID(user_id))
-                if user and user.preferred_doc_languages:
-                    # Only include languages that exist in database mapping
-                    tesseract_langs = [lang_mapping[lang] for lang in user.preferred_doc_languages if lang in lang_mapping]
-
-            # Build language hint string
-            if tesseract_langs:
-                language_hint = '+'.join(tesseract_langs)
-                logger.info(f"[OCR LANG HINT] Using multilingual OCR with languages: {language_hint}")
-            else:
-                # Use first language from database as ultimate fallback
-                language_hint = list(lang_mapping.values())[0] if lang_mapping else 'eng'
-                logger.info(f"[OCR LANG HINT] No user preferences, using database default: {language_hint}")
-
-            extracted_text, ocr_confidence = ocr_service.extract_text(
-                file_content,
-                mime_type,
-                db,
-                language=language_hint  # Pass language hint for scanned PDFs
-            )
+            with trace.stage('language_hint'):
+                lang_mapping = ocr_service.get_supported_languages(db)
+
+                # Build multilingual language hint from user preferences
+                tesseract_langs = []
+                if user_id:
+                    from app.database.models import User
+                    user = db.get(User, UUID(user_id))
+                    if user and user.preferred_doc_languages:
+                        # Only include languages that exist in database mapping
+                        tesseract_langs = [lang_mapping[lang] for lang in user.preferred_doc_languages if lang in lang_mapping]
+
+                # Build language hint string
+                if tesseract_langs:
+                    language_hint = '+'.join(tesseract_langs)
+                    logger.debug("[OCR LANG HINT] Using multilingual OCR with languages: %s", language_hint)
+                else:
+                    # Use first language from database as ultimate fallback
+                    language_hint = list(lang_mapping.values())[0] if lang_mapping else 'eng'
+                    logger.debug("[OCR LANG HINT] No user preferences, using database default: %s", language_hint)
+
+            with trace.stage('ocr', bytes_processed=len(file_content)):
+                extracted_text, ocr_confidence = ocr_service.extract_text(
+                    file_content,
+                    mime_type,
+                    db,
+                    language=language_hint,  # Pass language hint for scanned PDFs
+                    document=document
+                )
 
             if not extracted_text or len(extracted_text.strip()) < 10:
                 raise ValueError("Unable to extract meaningful text from document")
 
-            detected_language = await language_detection_service.detect_language(extracted_text, db)
-            logger.info(f"[LANG DEBUG] Detected language: {detected_language} for document: {file_name}")
-
-            # Check if detected language is in user's preferred languages
-            language_warning = None
-            if user_id:
-                from app.database.models import User
-                user = db.get(User, UUID(user_id))
-                if user and user.preferred_doc_languages:
-                    if detected_language not in user.preferred_doc_languages:
-                        # Get language names from system settings
-                        from app.database.models import SystemSetting
-                        from sqlalchemy import select
-                        import json
-
-                        lang_metadata_result = db.execute(
-                            select(SystemSetting.setting_value).where(
-                                SystemSetting.setting_key == 'language_metadata'
+            with trace.stage('language_detection', bytes_processed=len(extracted_text)):
+                # Bounded cost: sampled windows and at most language_max_segments page-sized segments
+                language_profile = language_detection_service.detect_document_languages(extracted_text)
+                detected_language = language_profile.primary
+                logger.debug("[LANG DEBUG] Detected language: %s for document: %s (languages: %s)", detected_language, file_name, language_profile.languages)
+
+                # Check if detected language is in user's preferred languages
+                language_warning = None
+                if user_id:
+                    from app.database.models import User
+                    user = db.get(User, UUID(user_id))
+                    if user and user.preferred_doc_languages:
+                        if detected_language not in user.preferred_doc_languages:
+                            # Get language names from system settings
+                            from app.database.models import SystemSetting
+                            from sqlalchemy import select
+                            import json
+
+                            lang_metadata_result = db.execute(
+                                select(SystemSetting.setting_value).where(
+                                    SystemSetting.setting_key == 'language_metadata'
+                                )
+                            ).scalar_one_or_none()
+
+                            lang_name = detected_language.upper()
+                            if lang_metadata_result:
+                                try:
+                                    metadata = json.loads(lang_metadata_result)
+                                    if detected_language in metadata:
+                                        lang_name = metadata[detected_language]['native_name']
+                                except:
+                                    pass
+
+                            language_warning = (
+                                f"Document detected in {lang_name} ({detected_language}), which is not in your "
+                                f"preferred document languages. You can add it in Settings."
                             )
-                        ).scalar_one_or_none()
-
-                        lang_name = detected_language.upper()
-                        if lang_metadata_result:
-                            try:
-                                metadata = json.loads(lang_metadata_result)
-                                if detected_language in metadata:
-                                    lang_name = metadata[detected_language]['native_name']
-                            except:
-                                pass
-
-                        language_warning = (
-                            f"Document detected in {lang_name} ({detected_language}), which is not in your "
-                            f"preferred document languages. You can add it in Settings."
-                        )
 
             # STOPWORD FILTERING:
             # Use detected document language for stop word filtering, not user's preferred languages
             # User preferences are for UI/OCR hints, not for filtering keywords in an already-detected document
-            logger.info(f"[STOPWORD DEBUG] Loading stopwords for detected document language: {detected_language}")
+            logger.debug("[STOPWORD DEBUG] Loading stopwords for detected document language: %s", detected_language)
 
             # Load stopwords for the detected document language
-            combined_stopwords = keyword_extraction_service.get_stop_words(db, detected_language)
-            logger.info(f"[STOPWORD DEBUG] Loaded {len(combined_stopwords)} stopwords for language '{detected_language}'")
-
-            # Extract named entities FIRST (people, organizations, addresses)
-            # Request both accepted and rejected entities for keyword conversion
-            from app.services.entity_extraction_service import entity_extraction_service
-            entity_result = entity_extraction_service.extract_entities(
-                text=extracted_text,
-                language=detected_language,
-                extract_addresses=True,
-                db=db,  # Pass database session for filtering
-                return_rejected=True  # Get rejected ORG entities for keyword conversion
-            )
-
-            # Extract accepted and rejected entities from result
-            extracted_entities = entity_result['accepted']
-            rejected_entities = entity_result['rejected']
-
-            # Deduplicate accepted entities
-            extracted_entities = entity_extraction_service.deduplicate_entities(extracted_entities)
-            logger.info(f"[ENTITY DEBUG] Extracted {len(extracted_entities)} unique entities, {len(rejected_entities)} rejected for keyword conversion")
-            for ent in extracted_entities[:5]:  # Log first 5 entities
-                logger.info(f"[ENTITY DEBUG]   - {ent.entity_type}: {ent.entity_value} (confidence: {ent.confidence})")
-
-            # Build exclusion set from accepted entities to prevent duplication in keywords
-            # Normalize entity values to match keyword tokenization (lowercase, split multi-word entities)
-            entity_exclusion_set = set()
-            for entity in extracted_entities:
-                # Add full entity value (for single-word entities like emails)
-                entity_exclusion_set.add(entity.entity_value.lower())
-
-                # Also add individual words from multi-word entities (e.g., "Acme Corp" → "acme", "corp")
-                entity_words = re.findall(r'\b[a-zа-яäöüß]{3,}\b', entity.entity_value.lower(), re.IGNORECASE)
-                entity_exclusion_set.update(entity_words)
-
-            logger.info(f"[ENTITY EXCLUSION] Built exclusion set with {len(entity_exclusion_set)} entity-based tokens to prevent keyword duplication")
-
-            # Extract keywords AFTER entity extraction, excluding entity values
-            keywords = keyword_extraction_service.extract_keywords(
-                text=extracted_text,
-                db=db,
-                language=detected_language,
-                stopwords=combined_stopwords,
-                excluded_entities=entity_exclusion_set,  # NEW: Exclude entity values from keywords
-                max_keywords=50,  # Reasonable limit to prevent OCR garbage overload
-                min_frequency=2,  # Filter out rare OCR errors that appear only once
-                user_id=user_id,
-                rejected_entities=rejected_entities  # Pass rejected ORG entities for conversion
-            )
-
-            keyword_strings = [kw[0] for kw in keywords]
-            logger.info(f"[KEYWORD DEBUG] Extracted {len(keyword_strings)} keywords using combined stopwords, top 10: {keyword_strings[:10]}")
-
-            # Post-filter: Remove keywords that match entity values exactly (case-insensitive)
-            # This catches edge cases where tokenization differences allow entities through
-            entity_values_lower = {ent.entity_value.lower() for ent in extracted_entities}
-            filtered_keywords = []
-            removed_entity_keywords = []
-            for kw in keywords:
-                kw_value = kw[0]
-                if kw_value.lower() not in entity_values_lower:
-                    filtered_keywords.append(kw)
-                else:
-                    removed_entity_keywords.append(kw_value)
-
-            if removed_entity_keywords:
-                logger.info(f"[KEYWORD CLEANUP] Removed {len(removed_entity_keywords)} keywords matching entities: {removed_entity_keywords[:10]}")
-
-            keywords = filtered_keywords
-            keyword_strings = [kw[0] for kw in keywords]
-            logger.info(f"[KEYWORD DEBUG] After entity cleanup: {len(keyword_strings)} keywords remain")
-
-            primary_date_result = date_extraction_service.extract_primary_date(
-                text=extracted_text,
-                db=db,
-                language=detected_language
-            )
+            with trace.stage('stopwords'):
+                combined_stopwords = keyword_extraction_service.get_stop_words(db, detected_language)
+                logger.debug("[STOPWORD DEBUG] Loaded %s stopwords for language '%s'", len(combined_stopwords), detected_language)
+
+            with trace.stage('entity_extraction', bytes_processed=len(extracted_text)):
+                # Extract named entities FIRST (people, organizations, addresses)
+                # Request both accepted and rejected entities for keyword conversion
+                from app.services.entity_extraction_service import entity_extraction_service
+                entity_result = entity_extraction_service.extract_entities(
+                    text=extracted_text,
+                    language=detected_language,
+                    extract_addresses=True,
+                    db=db,  # Pass database session for filtering
+                    return_rejected=True  # Get rejected ORG entities for keyword conversion
+                )
 
-            # Convert user_id string to UUID for classification service
-            user_uuid = UUID(user_id) if user_id else None
+                # Extract accepted and rejected entities from result
+                extracted_entities = entity_result['accepted']
+                rejected_entities = entity_result['rejected']
+
+                # Deduplicate accepted entities
+                extracted_entities = entity_extraction_service.deduplicate_entities(extracted_entities)
+                logger.debug("[ENTITY DEBUG] Extracted %s unique entities, %s rejected for keyword conversion", len(extracted_entities), len(rejected_entities))
+                for ent in (extracted_entities[:5] if logger.isEnabledFor(logging.DEBUG) else []):  # Log first 5 entities
+                    logger.debug("[ENTITY DEBUG]   - %s: %s (confidence: %s)", ent.entity_type, ent.entity_value, ent.confidence)
+
+                # Build exclusion set from accepted entities to prevent duplication in keywords
+                # Normalize entity values to match keyword tokenization (lowercase, split multi-word entities)
+                entity_exclusion_set = set()
+                for entity in extracted_entities:
+                    # Add full entity value (for single-word entities like emails)
+                    entity_exclusion_set.add(entity.entity_value.lower())
+
+                    # Also add individual words from multi-word entities (e.g., "Acme Corp" → "acme", "corp")
+                    entity_words = re.findall(r'\b[a-zа-яäöüß]{3,}\b', entity.entity_value.lower(), re.IGNORECASE)
+                    entity_exclusion_set.update(entity_words)
+
+                logger.debug("[ENTITY EXCLUSION] Built exclusion set with %s entity-based tokens to prevent keyword duplication", len(entity_exclusion_set))
+
+            with trace.stage('keyword_extraction', bytes_processed=len(extracted_text)):
+                # Extract keywords AFTER entity extraction, excluding entity values
+                keywords = keyword_extraction_service.extract_keywords(
+                    text=extracted_text,
+                    db=db,
+                    language=detected_language,
+                    stopwords=combined_stopwords,
+                    excluded_entities=entity_exclusion_set,  # NEW: Exclude entity values from keywords
+                    max_keywords=50,  # Reasonable limit to prevent OCR garbage overload
+                    min_frequency=2,  # Filter out rare OCR errors that appear only once
+                    user_id=user_id,
+                    rejected_entities=rejected_entities  # Pass rejected ORG entities for conversion
+                )
 
-            # Classify using multi-language keywords - get ALL close matches
-            classification_results = classification_service.classify_document(
-                document_keywords=keyword_strings,
-                db=db,
-                language=detected_language,
-                user_id=user_uuid
-            )
+                keyword_strings = [kw[0] for kw in keywords]
+                logger.debug("[KEYWORD DEBUG] Extracted %s keywords using combined stopwords, top 10: %s", len(keyword_strings), keyword_strings[:10])
+
+                # Post-filter: Remove keywords that match entity values exactly (case-insensitive)
+                # This catches edge cases where tokenization differences allow entities through
+                entity_values_lower = {ent.entity_value.lower() for ent in extracted_entities}
+                filtered_keywords = []
+                removed_entity_keywords = []
+                for kw in keywords:
+                    kw_value = kw[0]
+                    if kw_value.lower() not in entity_values_lower:
+                        filtered_keywords.append(kw)
+                    else:
+                        removed_entity_keywords.append(kw_value)
+
+                if removed_entity_keywords:
+                    logger.debug("[KEYWORD CLEANUP] Removed %s keywords matching entities: %s", len(removed_entity_keywords), removed_entity_keywords[:10])
+
+                keywords = filtered_keywords
+                keyword_strings = [kw[0] for kw in keywords]
+                logger.debug("[KEYWORD DEBUG] After entity cleanup: %s keywords remain", len(keyword_strings))
+
+            with trace.stage('date_extraction', bytes_processed=len(extracted_text)):
+                primary_date_result = date_extraction_service.extract_primary_date(
+                    text=extracted_text,
+                    db=db,
+                    language=detected_language
+                )
 
-            # Get multiple suggested categories if they match closely
-            suggested_categories_list = classification_service.get_suggested_categories(
-                classification_results=classification_results,
-                db=db,
-                max_categories=3
-            )
+            with trace.stage('classification'):
+                # Convert user_id string to UUID for classification service
+                user_uuid = UUID(user_id) if user_id else None
 
-            # Get primary category (fallback to OTHER if needed)
-            suggested_category = None
-            if suggested_categories_list:
-                # Use the top category from multi-category matches
-                suggested_category = suggested_categories_list[0]
-                logger.info(f"[ANALYSIS DEBUG] Selected {len(suggested_categories_list)} categories for assignment")
-            else:
-                # No confident match - fallback to OTHER
-                logger.info(f"[ANALYSIS DEBUG] No confident matches, using fallback to OTHER")
-                suggested_category = classification_service.suggest_category(
+                # Classify using multi-language keywords - get ALL close matches
+                classification_results = classification_service.classify_document(
                     document_keywords=keyword_strings,
                     db=db,
                     language=detected_language,
-                    user_id=user_uuid,
-                    fallback_to_other=True
+                    user_id=user_uuid
+                )
+
+                # Get multiple suggested categories if they match closely
+                suggested_categories_list = classification_service.get_suggested_categories(
+                    classification_results=classification_results,
+                    db=db,
+                    max_categories=3
                 )
-                suggested_categories_list = [suggested_category] if suggested_category else []
+
+                # Get primary category (fallback to OTHER if needed)
+                suggested_category = None
+                if suggested_categories_list:
+                    # Use the top category from multi-category matches
+                    suggested_category = suggested_categories_list[0]
+                    logger.debug("[ANALYSIS DEBUG] Selected %s categories for assignment", len(suggested_categories_list))
+                else:
+                    # No confident match - fallback to OTHER
+                    logger.debug("[ANALYSIS DEBUG] No confident matches, using fallback to OTHER")
+                    suggested_category = classification_service.suggest_category(
+                        document_keywords=keyword_strings,
+                        db=db,
+                        language=detected_language,
+                        user_id=user_uuid,
+                        fallback_to_other=True
+                    )
+                    suggested_categories_list = [suggested_category] if suggested_category else []
 
             # Filter and validate all keywords before creating response (no arbitrary limit)
             validated_keywords = []
@@ -272,6 +290,7 @@ class DocumentAnalysisService:
                 'ocr_confidence': round(ocr_confidence * 100, 1) if ocr_confidence < 1.0 else None,
                 'keywords': validated_keywords,
                 'detected_language': detected_language,
+                'detected_languages': [code for code, _ in language_profile.languages],
                 'language_warning': language_warning,
                 'document_date': None,
                 'document_date_type': None,
@@ -324,18 +343,23 @@ class DocumentAnalysisService:
                 ]
 
                 if len(suggested_categories_list) > 1:
-                    logger.info(f"[ANALYSIS DEBUG] ✅ Suggested {len(suggested_categories_list)} categories (multi-match): {', '.join([c[1] for c in suggested_categories_list])}")
-                    logger.info(f"[ANALYSIS DEBUG] Primary: {cat_name} (confidence: {confidence:.1%}, matched: {len(matched)})")
+                    logger.debug("[ANALYSIS DEBUG] ✅ Suggested %s categories (multi-match): %s", len(suggested_categories_list), ', '.join([c[1] for c in suggested_categories_list]))
+                    logger.debug("[ANALYSIS DEBUG] Primary: %s (confidence: %.1f%%, matched: %s)", cat_name, confidence * 100, len(matched))
                 else:
-                    logger.info(f"[ANALYSIS DEBUG] ✅ Suggested category: {cat_name} (confidence: {confidence:.1%}, matched: {len(matched)})")
+                    logger.debug("[ANALYSIS DEBUG] ✅ Suggested category: %s (confidence: %.1f%%, matched: %s)", cat_name, confidence * 100, len(matched))
             else:
                 logger.warning(f"[ANALYSIS DEBUG] ⚠️  No category suggested for document (this should never happen if fallback_to_other=True)")
 
-            logger.info(f"Document analyzed: {file_name}, language={detected_language}, keywords={len(keywords)}")
+            analysis_result['timings'] = trace.finish()
+            logger.info(
+                f"Document analyzed: {file_name}, language={detected_language}, keywords={len(keywords)}, "
+                f"total={analysis_result['timings']['total_ms']}ms"
+            )
             return analysis_result
 
         except Exception as e:
-            logger.error(f"Document analysis failed: {e}")
+            timings = trace.finish()
+            logger.error(f"Document analysis failed after {timings['total_ms']}ms: {e}")
             raise
 
 
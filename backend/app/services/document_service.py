@@ -4,31 +4,71 @@ Bonifatus DMS - Document Management Service
 Business logic for document operations with database-driven configuration
 """
 
+import asyncio
+import base64
 import logging
 import json
 import mimetypes
 import uuid
 from uuid import UUID
-from typing import Optional, Dict, Any, List, BinaryIO
+from typing import Optional, Dict, Any, List, BinaryIO, Tuple
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func, text, and_, or_
+from sqlalchemy import select, func, text, and_, or_, tuple_, delete, insert, update
 
-from app.database.models import Document, Category, DocumentCategory, CategoryTranslation, User, AuditLog, SystemSetting, UserSetting
+from app.database.models import (
+    Document, Category, DocumentCategory, CategoryTranslation, User, AuditLog, SystemSetting, UserSetting,
+    DocumentLanguage, DocumentDate
+)
 from app.database.connection import db_manager
 from app.services.drive_service import drive_service
 from app.services.document_storage_service import document_storage_service
 from app.services.provider_manager import ProviderManager
 from app.services.tier_service import tier_service
+from app.services.category_service import category_service
 from app.core.config import settings
 from app.schemas.document_schemas import (
     DocumentUploadResponse, DocumentResponse, DocumentUpdateRequest,
     DocumentListResponse, DocumentSearchRequest, DocumentStorageInfo,
-    BatchOperationRequest, BatchOperationResponse, DocumentProcessingStatus
+    BatchOperationRequest, BatchOperationResponse, BatchOperationItemResult, DocumentProcessingStatus
 )
 
 logger = logging.getLogger(__name__)
 
+# Sort fields backed by non-null document columns support keyset (cursor) pagination
+KEYSET_SORT_FIELDS = {"created_at", "updated_at", "title", "file_name", "file_size", "mime_type"}
+
+BATCH_OPERATIONS = {"move", "recategorize", "delete"}
+
+
+def _encode_cursor(value: Any, document_id: UUID, sort_by: str, sort_order: str) -> str:
+    """Encode the sort and the sort value and id of the last row of a page as an opaque cursor"""
+    if isinstance(value, datetime):
+        payload = {"t": "datetime", "v": value.isoformat()}
+    else:
+        payload = {"t": "value", "v": value}
+    payload.update({"id": str(document_id), "s": sort_by, "o": sort_order})
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def _decode_cursor(cursor: str, sort_by: str, sort_order: str) -> Optional[Tuple[Any, UUID]]:
+    """
+    Decode a cursor from _encode_cursor
+
+    Invalid cursors, and cursors issued for a different sort than the current
+    request, fall back to OFFSET paging.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if payload.get("s") != sort_by or payload.get("o") != sort_order:
+            logger.warning("Ignoring document list cursor issued for a different sort")
+            return None
+        value = datetime.fromisoformat(payload["v"]) if payload["t"] == "datetime" else payload["v"]
+        return value, UUID(payload["id"])
+    except Exception:
+        logger.warning("Ignoring invalid document list cursor")
+        return None
+
 
 class DocumentService:
     """Document management business logic service"""
@@ -341,6 +381,7 @@ class DocumentService:
             session.add(document)
             session.commit()
             session.refresh(document)
+            category_service.invalidate_user_cache(user_id)
 
             from app.database.models import DocumentCategory
             for idx, category_id in enumerate(category_ids):
@@ -450,7 +491,7 @@ class DocumentService:
                     logger.warning(f"[GET_DOCUMENT DEBUG] User {user_id} has no access to document {document_id} owned by {document_temp.user_id}")
                     return None
 
-                logger.info(f"[GET_DOCUMENT DEBUG] User {user_id} accessing shared document {document_id} as delegate (role: {role})")
+                logger.debug("[GET_DOCUMENT DEBUG] User %s accessing shared document %s as delegate (role: %s)", user_id, document_id, role)
 
             document, category, category_translation = result
 
@@ -494,29 +535,21 @@ class DocumentService:
                 for entity in entities_query
             ] if entities_query else None
 
-            logger.info(f"[GET_DOCUMENT DEBUG] Document {document_id}:")
-            logger.info(f"  - title: {document.title}")
-            logger.info(f"  - category_id (from junction table): {category.id if category else None}")
-            logger.info(f"  - category_name: {category_name}")
-            logger.info(f"  - all_categories: {len(all_categories)} categories")
-            logger.info(f"  - user_language: {user_language}")
-            logger.info(f"  - keywords (raw): {document.keywords[:200] if document.keywords else 'None'}")
-            logger.info(f"  - keywords (parsed count): {len(parsed_keywords) if parsed_keywords else 0}")
-            logger.info(f"  - processing_status: {document.processing_status}")
-            logger.info(f"  - primary_language: {document.primary_language}")
-
-            # DEBUG: Log entities being returned
-            if parsed_entities:
-                logger.info(f"  - entities (count): {len(parsed_entities)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "[GET_DOCUMENT DEBUG] Document %s: title=%s, category_id=%s, category_name=%s, "
+                    "all_categories=%s, user_language=%s, keywords=%s (%s parsed), "
+                    "processing_status=%s, primary_language=%s",
+                    document_id, document.title, category.id if category else None, category_name,
+                    len(all_categories), user_language,
+                    document.keywords[:200] if document.keywords else None,
+                    len(parsed_keywords) if parsed_keywords else 0,
+                    document.processing_status, document.primary_language
+                )
                 entity_by_type = {}
-                for e in parsed_entities:
-                    if e.type not in entity_by_type:
-                        entity_by_type[e.type] = []
-                    entity_by_type[e.type].append(f"{e.value} ({e.confidence:.2f})")
-                for entity_type, values in entity_by_type.items():
-                    logger.info(f"    {entity_type}: {values}")
-            else:
-                logger.info(f"  - entities: None")
+                for e in parsed_entities or []:
+                    entity_by_type.setdefault(e.type, []).append(f"{e.value} ({e.confidence:.2f})")
+                logger.debug("[GET_DOCUMENT DEBUG] Entities: %s", entity_by_type or None)
 
             return DocumentResponse(
                 id=str(document.id),
@@ -606,9 +639,9 @@ class DocumentService:
                 ).first()
                 old_primary_id = str(old_primary_category.category_id) if old_primary_category else None
 
-                logger.info(f"[UPDATE DEBUG] Updating categories for document {document_id}")
-                logger.info(f"[UPDATE DEBUG] Old primary category: {old_primary_id}")
-                logger.info(f"[UPDATE DEBUG] New categories: {category_ids_to_set}")
+                logger.debug("[UPDATE DEBUG] Updating categories for document %s", document_id)
+                logger.debug("[UPDATE DEBUG] Old primary category: %s", old_primary_id)
+                logger.debug("[UPDATE DEBUG] New categories: %s", category_ids_to_set)
 
                 # Remove old category assignments
                 session.query(DocumentCategory).filter(
@@ -635,7 +668,7 @@ class DocumentService:
                             new_primary_id = cat_id
 
                     new_values['category_ids'] = category_ids_to_set
-                    logger.info(f"[UPDATE DEBUG] ✅ Categories updated: {len(category_ids_to_set)} assigned")
+                    logger.debug("[UPDATE DEBUG] ✅ Categories updated: %s assigned", len(category_ids_to_set))
 
                     # Move file in Google Drive if primary category changed
                     if old_primary_id and old_primary_id != new_primary_id:
@@ -686,6 +719,7 @@ class DocumentService:
             document.updated_at = datetime.utcnow()
             session.commit()
             session.refresh(document)
+            category_service.invalidate_user_cache(user_id)
 
             await self._log_document_action(
                 user_id, "document_update", "document", document_id,
@@ -703,32 +737,32 @@ class DocumentService:
 
     async def delete_document(self, document_id: str, user_id: str, ip_address: str = None) -> bool:
         """Delete document and remove from Google Drive"""
-        logger.info(f"[DELETE DEBUG] === Document Deletion Started ===")
-        logger.info(f"[DELETE DEBUG] Document ID (raw): {document_id}")
-        logger.info(f"[DELETE DEBUG] Document ID type: {type(document_id)}")
-        logger.info(f"[DELETE DEBUG] User ID: {user_id}")
+        logger.debug("[DELETE DEBUG] === Document Deletion Started ===")
+        logger.debug("[DELETE DEBUG] Document ID (raw): %s", document_id)
+        logger.debug("[DELETE DEBUG] Document ID type: %s", type(document_id))
+        logger.debug("[DELETE DEBUG] User ID: %s", user_id)
 
         session = db_manager.session_local()
         try:
             # Convert string UUID to UUID object for session.get()
             try:
                 doc_uuid = uuid.UUID(document_id)
-                logger.info(f"[DELETE DEBUG] Converted to UUID object: {doc_uuid}")
-                logger.info(f"[DELETE DEBUG] UUID type: {type(doc_uuid)}")
+                logger.debug("[DELETE DEBUG] Converted to UUID object: %s", doc_uuid)
+                logger.debug("[DELETE DEBUG] UUID type: %s", type(doc_uuid))
             except ValueError as e:
                 logger.error(f"[DELETE DEBUG] ❌ Invalid document ID format: {document_id}, error: {e}")
                 return False
 
-            logger.info(f"[DELETE DEBUG] Querying document with UUID: {doc_uuid}")
+            logger.debug("[DELETE DEBUG] Querying document with UUID: %s", doc_uuid)
             document = session.get(Document, doc_uuid)
 
             if not document:
                 logger.error(f"[DELETE DEBUG] ❌ Document not found in database: {doc_uuid}")
                 return False
 
-            logger.info(f"[DELETE DEBUG] ✅ Document found: {document.title}")
-            logger.info(f"[DELETE DEBUG] Document user_id: {document.user_id}, Request user_id: {user_id}")
-            logger.info(f"[DELETE DEBUG] Document user_id type: {type(document.user_id)}, Request user_id type: {type(user_id)}")
+            logger.debug("[DELETE DEBUG] ✅ Document found: %s", document.title)
+            logger.debug("[DELETE DEBUG] Document user_id: %s, Request user_id: %s", document.user_id, user_id)
+            logger.debug("[DELETE DEBUG] Document user_id type: %s, Request user_id type: %s", type(document.user_id), type(user_id))
 
             # Convert user_id string to UUID for comparison
             try:
@@ -741,14 +775,14 @@ class DocumentService:
                 logger.error(f"[DELETE DEBUG] ❌ User ID mismatch - document belongs to {document.user_id}, not {user_uuid}")
                 return False
 
-            logger.info(f"[DELETE DEBUG] ✅ User ID matches, proceeding with deletion")
+            logger.debug("[DELETE DEBUG] ✅ User ID matches, proceeding with deletion")
 
             # Get user object for provider-agnostic deletion
-            logger.info(f"[DELETE DEBUG] Fetching user object...")
+            logger.debug("[DELETE DEBUG] Fetching user object...")
             user = session.get(User, user_uuid)
 
             if user and user.active_storage_provider:
-                logger.info(f"[DELETE DEBUG] User has active storage provider ({user.active_storage_provider}), deleting from storage...")
+                logger.debug("[DELETE DEBUG] User has active storage provider (%s), deleting from storage...", user.active_storage_provider)
                 try:
                     storage_success = document_storage_service.delete_document(
                         user=user,
@@ -759,7 +793,7 @@ class DocumentService:
                     if not storage_success:
                         logger.warning(f"[DELETE DEBUG] ⚠️  Failed to delete from {document.storage_provider_type}: {document.storage_file_id}")
                     else:
-                        logger.info(f"[DELETE DEBUG] ✅ Deleted from {document.storage_provider_type}: {document.storage_file_id}")
+                        logger.debug("[DELETE DEBUG] ✅ Deleted from %s: %s", document.storage_provider_type, document.storage_file_id)
                 except Exception as e:
                     logger.warning(f"[DELETE DEBUG] ⚠️  Error deleting from storage: {e}")
             else:
@@ -773,10 +807,11 @@ class DocumentService:
             # Store file size before deletion for quota update
             file_size = document.file_size
 
-            logger.info(f"[DELETE DEBUG] Deleting document from database...")
+            logger.debug("[DELETE DEBUG] Deleting document from database...")
             session.delete(document)
             session.commit()
-            logger.info(f"[DELETE DEBUG] ✅ Document deleted from database")
+            category_service.invalidate_user_cache(user_id)
+            logger.debug("[DELETE DEBUG] ✅ Document deleted from database")
 
             # NOTE: Monthly usage is NOT decremented on deletion
             # Monthly usage tracks consumption for the month, not current storage
@@ -791,7 +826,7 @@ class DocumentService:
                     session=session,
                     increment=False
                 )
-                logger.info(f"[DELETE DEBUG] Storage quota decremented by {file_size} bytes")
+                logger.debug("[DELETE DEBUG] Storage quota decremented by %s bytes", file_size)
             except Exception as quota_err:
                 logger.warning(f"[DELETE DEBUG] Failed to update storage quota: {quota_err}")
 
@@ -800,7 +835,7 @@ class DocumentService:
                 old_values, {}, ip_address, session
             )
 
-            logger.info(f"[DELETE DEBUG] ✅✅✅ Document deletion completed successfully: {document_id}")
+            logger.debug("[DELETE DEBUG] ✅✅✅ Document deletion completed successfully: %s", document_id)
             return True
 
         except Exception as e:
@@ -810,128 +845,509 @@ class DocumentService:
         finally:
             session.close()
 
-    async def search_documents(
+    async def batch_operation(
         self,
         user_id: str,
-        search_request: DocumentSearchRequest
-    ) -> Optional[DocumentListResponse]:
-        """Search documents with filters and pagination"""
+        batch_request: BatchOperationRequest,
+        ip_address: str = None
+    ) -> BatchOperationResponse:
+        """
+        Move, recategorize or delete many documents at once
+
+        Database changes are applied with set-based statements in one
+        transaction and audit entries are written with one bulk insert.
+        Cloud files are moved or deleted through the providers' batch APIs,
+        grouped by provider. Every requested document gets its own result.
+
+        Operations:
+            move: parameters.category_id becomes the primary category,
+                secondary assignments are kept
+            recategorize: parameters.category_ids replace all assignments
+                (first is primary)
+            delete: documents are removed once their cloud file is deleted
+                (or already gone); if a file can't be deleted the document
+                is kept and reported as failed
+
+        Raises:
+            ValueError: Unknown operation, missing or unusable categories,
+                or more documents than storage_bulk_max_documents
+        """
+        operation = batch_request.operation
+        if operation not in BATCH_OPERATIONS:
+            raise ValueError(f"Unknown batch operation: {operation}")
+
+        max_documents = settings.storage.storage_bulk_max_documents
+        if len(batch_request.document_ids) > max_documents:
+            raise ValueError(f"At most {max_documents} documents can be processed at once")
+
+        parameters = batch_request.parameters or {}
+        category_ids = []
+        if operation == "move":
+            if not parameters.get("category_id"):
+                raise ValueError("Operation 'move' requires category_id")
+            category_ids = [str(parameters["category_id"])]
+        elif operation == "recategorize":
+            category_ids = [str(cat_id) for cat_id in dict.fromkeys(parameters.get("category_ids") or [])]
+            if not category_ids:
+                raise ValueError("Operation 'recategorize' requires category_ids")
+
+        user_uuid = uuid.UUID(user_id)
+        results: Dict[str, BatchOperationItemResult] = {}
+        requested: Dict[UUID, str] = {}
+        for raw_id in dict.fromkeys(batch_request.document_ids):
+            try:
+                requested[uuid.UUID(raw_id)] = raw_id
+            except ValueError:
+                results[raw_id] = BatchOperationItemResult(document_id=raw_id, success=False, error="Invalid document ID")
+
         session = db_manager.session_local()
         try:
-            # Get user's preferred language
-            user_language = self._get_user_language(user_id, session)
+            rows = session.execute(
+                select(
+                    Document.id, Document.title, Document.category_id, Document.file_size,
+                    Document.storage_file_id, Document.storage_provider_type
+                ).where(Document.id.in_(list(requested)), Document.user_id == user_uuid)
+            ).all() if requested else []
+
+            found = {row.id for row in rows}
+            for doc_uuid, raw_id in requested.items():
+                if doc_uuid not in found:
+                    results[raw_id] = BatchOperationItemResult(document_id=raw_id, success=False, error="Document not found")
+
+            if rows:
+                user = session.get(User, user_uuid)
+                if operation == "delete":
+                    item_results = await self._batch_delete(session, user, rows, ip_address)
+                else:
+                    item_results = await self._batch_recategorize(
+                        session, user, rows, category_ids, operation == "move", ip_address
+                    )
+                for doc_uuid, item_result in item_results.items():
+                    # Report IDs exactly as requested
+                    item_result.document_id = requested[doc_uuid]
+                    results[requested[doc_uuid]] = item_result
 
-            page = search_request.page or await self._get_system_setting("default_documents_page_size", 20)
-            page_size = search_request.page_size or await self._get_system_setting("default_documents_page_size", 20)
-            sort_by = search_request.sort_by or await self._get_system_setting("default_documents_sort_field", "created_at")
-            sort_order = search_request.sort_order or await self._get_system_setting("default_documents_sort_order", "desc")
+        except ValueError:
+            session.rollback()
+            raise
+        except Exception as e:
+            logger.error(f"Batch {operation} error: {e}")
+            session.rollback()
+            raise
+        finally:
+            session.close()
 
-            # Join through document_categories to get the primary category
-            # This supports the many-to-many relationship
-            base_query = (
-                select(Document, Category, CategoryTranslation)
-                .outerjoin(DocumentCategory, and_(
-                    DocumentCategory.document_id == Document.id,
-                    DocumentCategory.is_primary == True
-                ))
-                .outerjoin(Category, Category.id == DocumentCategory.category_id)
-                .outerjoin(CategoryTranslation, and_(
-                    CategoryTranslation.category_id == Category.id,
-                    CategoryTranslation.language_code == 'en'  # TODO: Use user's language preference
-                ))
-                .where(Document.user_id == user_id)
-                .where(Document.is_deleted == False)
+        ordered = [results[raw_id] for raw_id in dict.fromkeys(batch_request.document_ids)]
+        successful = sum(1 for item in ordered if item.success)
+        logger.info(f"Batch {operation} by user {user_id}: {successful}/{len(ordered)} documents")
+        return BatchOperationResponse(
+            operation=operation,
+            total_requested=len(ordered),
+            successful=successful,
+            failed=len(ordered) - successful,
+            errors=[{"document_id": item.document_id, "error": item.error} for item in ordered if not item.success],
+            results=ordered
+        )
+
+    async def _batch_recategorize(
+        self,
+        session: Session,
+        user: User,
+        rows: List[Any],
+        category_ids: List[str],
+        keep_secondary: bool,
+        ip_address: Optional[str]
+    ) -> Dict[UUID, BatchOperationItemResult]:
+        """Reassign categories of many documents, then move their cloud files in batches"""
+        try:
+            category_uuids = [uuid.UUID(cat_id) for cat_id in category_ids]
+        except ValueError:
+            raise ValueError("Invalid category ID")
+
+        usable = set(session.execute(
+            select(Category.id).where(
+                Category.id.in_(category_uuids),
+                or_(Category.user_id == user.id, Category.is_system == True)
             )
+        ).scalars())
+        if len(usable) != len(category_uuids):
+            raise ValueError("Category not found")
+
+        primary_uuid = category_uuids[0]
+        doc_ids = [row.id for row in rows]
+        now = datetime.utcnow()
+
+        stale_assignments = DocumentCategory.document_id.in_(doc_ids)
+        if keep_secondary:
+            stale_assignments = and_(
+                stale_assignments,
+                or_(DocumentCategory.is_primary == True, DocumentCategory.category_id.in_(category_uuids))
+            )
+        session.execute(
+            delete(DocumentCategory).where(stale_assignments).execution_options(synchronize_session=False)
+        )
+        session.execute(insert(DocumentCategory), [
+            {"document_id": doc_id, "category_id": cat_uuid, "is_primary": index == 0, "assigned_at": now}
+            for doc_id in doc_ids
+            for index, cat_uuid in enumerate(category_uuids)
+        ])
+        session.execute(
+            update(Document).where(Document.id.in_(doc_ids))
+            .values(category_id=primary_uuid, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        self._add_audit_logs(session, str(user.id), "document_update", [
+            (row.id, {"category_id": str(row.category_id) if row.category_id else None}, {"category_ids": category_ids})
+            for row in rows
+        ], ip_address)
+        session.commit()
+        category_service.invalidate_user_cache(str(user.id))
+
+        results = {row.id: BatchOperationItemResult(document_id=str(row.id), success=True) for row in rows}
+
+        # Only files whose primary category changed change folders
+        relocated = [row for row in rows if row.category_id != primary_uuid]
+        if relocated and user.active_storage_provider:
+            folder_name = self._category_folder_name(
+                session, primary_uuid, self._get_user_language(str(user.id), session)
+            )
+            warnings = await asyncio.to_thread(self._move_files, session, user, relocated, folder_name)
+            for doc_id, warning in warnings.items():
+                results[doc_id].warning = warning
 
-            if search_request.query:
-                search_term = f"%{search_request.query}%"
-                base_query = base_query.where(
-                    or_(
-                        Document.title.ilike(search_term),
-                        Document.description.ilike(search_term),
-                        Document.extracted_text.ilike(search_term),
-                        Document.keywords.ilike(search_term)
-                    )
+        return results
+
+    async def _batch_delete(
+        self,
+        session: Session,
+        user: User,
+        rows: List[Any],
+        ip_address: Optional[str]
+    ) -> Dict[UUID, BatchOperationItemResult]:
+        """Delete cloud files in batches, then remove the documents whose files are gone"""
+        user_id = str(user.id)
+        if user.active_storage_provider:
+            errors, warnings = await asyncio.to_thread(self._delete_files, session, user, rows)
+        else:
+            # Same as single deletion: nothing to clean up without a connected provider
+            errors = {}
+            warnings = {row.id: "No active storage provider, cloud file was not deleted" for row in rows}
+
+        results = {
+            row.id: BatchOperationItemResult(document_id=str(row.id), success=False, error=errors[row.id])
+            for row in rows if row.id in errors
+        }
+        deletable = [row for row in rows if row.id not in errors]
+        if not deletable:
+            return results
+
+        doc_ids = [row.id for row in deletable]
+        # Dependent rows the ORM would cascade on session.delete()
+        for model in (DocumentCategory, DocumentLanguage, DocumentDate):
+            session.execute(
+                delete(model).where(model.document_id.in_(doc_ids)).execution_options(synchronize_session=False)
+            )
+        session.execute(
+            delete(Document).where(Document.id.in_(doc_ids), Document.user_id == user.id)
+            .execution_options(synchronize_session=False)
+        )
+        self._add_audit_logs(session, user_id, "document_delete", [
+            (row.id, {"title": row.title, "storage_file_id": row.storage_file_id}, {})
+            for row in deletable
+        ], ip_address)
+        session.commit()
+        category_service.invalidate_user_cache(user_id)
+
+        # Storage quota tracks current storage (monthly usage is not decremented)
+        try:
+            await tier_service.update_storage_usage(
+                user_id=user_id,
+                file_size_bytes=sum(row.file_size or 0 for row in deletable),
+                session=session,
+                increment=False
+            )
+        except Exception as quota_err:
+            logger.warning(f"Failed to update storage quota after batch delete: {quota_err}")
+
+        for row in deletable:
+            results[row.id] = BatchOperationItemResult(
+                document_id=str(row.id), success=True, warning=warnings.get(row.id)
+            )
+        return results
+
+    def _move_files(self, session: Session, user: User, rows: List[Any], folder_name: str) -> Dict[UUID, str]:
+        """
+        Move cloud files of documents into a category folder, one batched call per provider
+
+        Returns:
+            Warnings for documents whose file could not be moved
+        """
+        warnings = {}
+        by_provider: Dict[str, List[Any]] = {}
+        for row in rows:
+            by_provider.setdefault(row.storage_provider_type, []).append(row)
+
+        for provider_type, provider_rows in by_provider.items():
+            try:
+                folder_map = document_storage_service.initialize_folder_structure(
+                    user=user, folder_names=[folder_name], db=session, provider_type=provider_type
                 )
+                errors = document_storage_service.move_documents(
+                    user=user,
+                    moves={row.storage_file_id: folder_map[folder_name] for row in provider_rows},
+                    db=session,
+                    provider_type=provider_type
+                )
+            except Exception as e:
+                logger.warning(f"[BATCH MOVE] Could not move files in {provider_type}: {e}")
+                errors = {row.storage_file_id: str(e) for row in provider_rows}
 
-            if search_request.category_id:
-                # Filter by documents that have this category using EXISTS subquery
-                # This avoids joining document_categories twice
-                from sqlalchemy.sql import exists
-                try:
-                    category_uuid = uuid.UUID(search_request.category_id)
-                    logger.info(f"[CATEGORY FILTER] Applying category filter for category_id: {category_uuid}")
-                    category_filter = exists(
-                        select(1).select_from(DocumentCategory).where(
-                            and_(
-                                DocumentCategory.document_id == Document.id,
-                                DocumentCategory.category_id == category_uuid
-                            )
+            for row in provider_rows:
+                if errors.get(row.storage_file_id):
+                    warnings[row.id] = f"File could not be moved in cloud storage: {errors[row.storage_file_id]}"
+        return warnings
+
+    def _delete_files(self, session: Session, user: User, rows: List[Any]) -> Tuple[Dict[UUID, str], Dict[UUID, str]]:
+        """
+        Delete cloud files of documents, one batched call per provider
+
+        Returns:
+            (errors, warnings): documents whose file deletion failed and must be
+            kept, and documents that can go although their file was not touched
+            (provider not connected - as with single deletion)
+        """
+        errors, warnings = {}, {}
+        by_provider: Dict[str, List[Any]] = {}
+        for row in rows:
+            by_provider.setdefault(row.storage_provider_type, []).append(row)
+
+        for provider_type, provider_rows in by_provider.items():
+            try:
+                file_errors = document_storage_service.delete_documents(
+                    user=user,
+                    file_ids=[row.storage_file_id for row in provider_rows],
+                    db=session,
+                    provider_type=provider_type
+                )
+            except ValueError as e:
+                logger.warning(f"[BATCH DELETE] Skipping {provider_type} file deletion: {e}")
+                for row in provider_rows:
+                    warnings[row.id] = "Cloud storage not connected, cloud file was not deleted"
+                continue
+            except Exception as e:
+                logger.error(f"[BATCH DELETE] Failed to delete files in {provider_type}: {e}")
+                file_errors = {row.storage_file_id: str(e) for row in provider_rows}
+
+            for row in provider_rows:
+                if file_errors.get(row.storage_file_id):
+                    errors[row.id] = f"Could not delete file from cloud storage: {file_errors[row.storage_file_id]}"
+        return errors, warnings
+
+    def _category_folder_name(self, session: Session, category_id: UUID, language_code: str) -> str:
+        """Cloud folder name of a category (its name in the user's language, as used on upload)"""
+        translation = session.execute(
+            select(CategoryTranslation.name).where(
+                CategoryTranslation.category_id == category_id,
+                CategoryTranslation.language_code == language_code
+            )
+        ).scalar_one_or_none()
+        if translation:
+            return translation
+        return session.execute(select(Category.reference_key).where(Category.id == category_id)).scalar_one()
+
+    def _add_audit_logs(
+        self,
+        session: Session,
+        user_id: str,
+        action: str,
+        changes: List[Tuple[UUID, Dict, Dict]],
+        ip_address: Optional[str]
+    ):
+        """Add one audit entry per (document_id, old_values, new_values) with a single bulk insert"""
+        session.execute(insert(AuditLog), [
+            {
+                "user_id": user_id,
+                "action": action,
+                "resource_type": "document",
+                "resource_id": document_id,
+                "ip_address": ip_address,
+                "old_values": json.dumps(old_values) if old_values else None,
+                "new_values": json.dumps(new_values) if new_values else None,
+                "status": "success",
+                "endpoint": "/api/v1/documents/bulk"
+            }
+            for document_id, old_values, new_values in changes
+        ])
+
+    def _document_response(
+        self,
+        document: Document,
+        category: Optional[Category],
+        category_translation: Optional[CategoryTranslation],
+        user_language: str,
+        session: Session
+    ) -> DocumentResponse:
+        """Build the list/search representation of a document row"""
+        # Use translated category name if available, otherwise fallback to category reference_key
+        category_name = None
+        if category_translation and category_translation.name:
+            category_name = category_translation.name
+        elif category:
+            category_name = category.reference_key  # Fallback to reference key
+
+        # Get all categories for this document
+        all_categories = self._get_document_categories(document.id, user_language, session)
+
+        return DocumentResponse(
+            id=str(document.id),
+            title=document.title,
+            description=document.description,
+            file_name=document.file_name,
+            file_size=document.file_size,
+            mime_type=document.mime_type,
+            google_drive_file_id=document.storage_file_id,
+            processing_status=document.processing_status,
+            extracted_text=document.extracted_text,
+            keywords=self._parse_keywords_to_list(document.keywords),
+            confidence_score=document.confidence_score,
+            primary_language=document.primary_language,
+            category_id=str(category.id) if category else None,
+            category_name=category_name,
+            categories=all_categories,
+            web_view_link=None,
+            created_at=document.created_at,
+            updated_at=document.updated_at
+        )
+
+    async def _execute_search(
+        self,
+        owner_ids: List[str],
+        search_request: DocumentSearchRequest,
+        session: Session
+    ) -> Tuple[list, int, int, int, Optional[str]]:
+        """
+        Run one filtered, sorted and paginated query across the given owners
+
+        Rows are ordered by the sort field with the document id as tiebreaker, so
+        pages are stable. Requests carrying a cursor (from a previous page's
+        next_cursor) page by keyset instead of OFFSET when the sort field allows it.
+
+        Returns:
+            (rows of (Document, Category, CategoryTranslation), total_count, page, page_size, next_cursor)
+        """
+        page = search_request.page or 1
+        page_size = search_request.page_size or await self._get_system_setting("default_documents_page_size", 20)
+        sort_by = search_request.sort_by or await self._get_system_setting("default_documents_sort_field", "created_at")
+        sort_order = search_request.sort_order or await self._get_system_setting("default_documents_sort_order", "desc")
+
+        # Join through document_categories to get the primary category
+        # This supports the many-to-many relationship
+        base_query = (
+            select(Document, Category, CategoryTranslation)
+            .outerjoin(DocumentCategory, and_(
+                DocumentCategory.document_id == Document.id,
+                DocumentCategory.is_primary == True
+            ))
+            .outerjoin(Category, Category.id == DocumentCategory.category_id)
+            .outerjoin(CategoryTranslation, and_(
+                CategoryTranslation.category_id == Category.id,
+                CategoryTranslation.language_code == 'en'  # TODO: Use user's language preference
+            ))
+            .where(Document.user_id.in_(owner_ids))
+            .where(Document.is_deleted == False)
+        )
+
+        if search_request.query:
+            search_term = f"%{search_request.query}%"
+            base_query = base_query.where(
+                or_(
+                    Document.title.ilike(search_term),
+                    Document.description.ilike(search_term),
+                    Document.extracted_text.ilike(search_term),
+                    Document.keywords.ilike(search_term)
+                )
+            )
+
+        if search_request.category_id:
+            # Filter by documents that have this category using EXISTS subquery
+            # This avoids joining document_categories twice
+            from sqlalchemy.sql import exists
+            try:
+                category_uuid = uuid.UUID(search_request.category_id)
+                category_filter = exists(
+                    select(1).select_from(DocumentCategory).where(
+                        and_(
+                            DocumentCategory.document_id == Document.id,
+                            DocumentCategory.category_id == category_uuid
                         )
-                    ).correlate(Document)
-                    base_query = base_query.where(category_filter)
-                    logger.info(f"[CATEGORY FILTER] Category filter applied successfully")
-                except ValueError:
-                    logger.warning(f"[CATEGORY FILTER] Invalid category_id format: {search_request.category_id}")
+                    )
+                ).correlate(Document)
+                base_query = base_query.where(category_filter)
+            except ValueError:
+                logger.warning(f"[CATEGORY FILTER] Invalid category_id format: {search_request.category_id}")
 
-            if search_request.language:
-                base_query = base_query.where(Document.primary_language == search_request.language)
+        if search_request.language:
+            base_query = base_query.where(Document.primary_language == search_request.language)
 
-            if search_request.processing_status:
-                base_query = base_query.where(Document.processing_status == search_request.processing_status)
+        if search_request.processing_status:
+            base_query = base_query.where(Document.processing_status == search_request.processing_status)
 
-            if search_request.date_from:
-                base_query = base_query.where(Document.created_at >= search_request.date_from)
+        if search_request.date_from:
+            base_query = base_query.where(Document.created_at >= search_request.date_from)
 
-            if search_request.date_to:
-                base_query = base_query.where(Document.created_at <= search_request.date_to)
+        if search_request.date_to:
+            base_query = base_query.where(Document.created_at <= search_request.date_to)
 
-            count_stmt = select(func.count()).select_from(base_query.subquery())
-            total_count = session.execute(count_stmt).scalar()
+        count_stmt = select(func.count()).select_from(base_query.subquery())
+        total_count = session.execute(count_stmt).scalar()
 
-            if search_request.category_id:
-                logger.info(f"[CATEGORY FILTER] Found {total_count} documents matching category filter")
+        if sort_by == "category_name":
+            sort_field = CategoryTranslation.name
+        elif sort_by in Document.__table__.columns:
+            sort_field = getattr(Document, sort_by)
+        else:
+            sort_by, sort_field = "created_at", Document.created_at
+        descending = sort_order == "desc"
+        sort_order = "desc" if descending else "asc"
+        order = [sort_field.desc(), Document.id.desc()] if descending else [sort_field.asc(), Document.id.asc()]
 
-            sort_column = getattr(Document, sort_by, Document.created_at)
-            if sort_order == "desc":
-                sort_column = sort_column.desc()
+        keyset = sort_by in KEYSET_SORT_FIELDS
+        position = _decode_cursor(search_request.cursor, sort_by, sort_order) if keyset and search_request.cursor else None
 
-            offset = (page - 1) * page_size
-            documents_stmt = base_query.order_by(sort_column).offset(offset).limit(page_size)
-            results = session.execute(documents_stmt).all()
+        documents_stmt = base_query.order_by(*order).limit(page_size)
+        if position:
+            after = tuple_(sort_field, Document.id)
+            documents_stmt = documents_stmt.where(after < position if descending else after > position)
+        else:
+            documents_stmt = documents_stmt.offset((page - 1) * page_size)
+        results = session.execute(documents_stmt).all()
 
-            documents = []
-            for document, category, category_translation in results:
-                # Use translated category name if available, otherwise fallback to category reference_key
-                category_name = None
-                if category_translation and category_translation.name:
-                    category_name = category_translation.name
-                elif category:
-                    category_name = category.reference_key  # Fallback to reference key
-
-                # Get all categories for this document
-                all_categories = self._get_document_categories(document.id, user_language, session)
-
-                documents.append(DocumentResponse(
-                    id=str(document.id),
-                    title=document.title,
-                    description=document.description,
-                    file_name=document.file_name,
-                    file_size=document.file_size,
-                    mime_type=document.mime_type,
-                    google_drive_file_id=document.storage_file_id,
-                    processing_status=document.processing_status,
-                    extracted_text=document.extracted_text,
-                    keywords=self._parse_keywords_to_list(document.keywords),
-                    confidence_score=document.confidence_score,
-                    primary_language=document.primary_language,
-                    category_id=str(category.id) if category else None,
-                    category_name=category_name,
-                    categories=all_categories,
-                    web_view_link=None,
-                    created_at=document.created_at,
-                    updated_at=document.updated_at
-                ))
+        next_cursor = None
+        if keyset and len(results) == page_size:
+            last_document = results[-1][0]
+            next_cursor = _encode_cursor(getattr(last_document, sort_by), last_document.id, sort_by, sort_order)
+
+        return results, total_count, page, page_size, next_cursor
+
+    async def search_documents(
+        self,
+        user_id: str,
+        search_request: DocumentSearchRequest
+    ) -> Optional[DocumentListResponse]:
+        """Search documents with filters and pagination"""
+        session = db_manager.session_local()
+        try:
+            # Get user's preferred language
+            user_language = self._get_user_language(user_id, session)
+
+            results, total_count, page, page_size, next_cursor = await self._execute_search(
+                [user_id], search_request, session
+            )
+
+            documents = [
+                self._document_response(document, category, category_translation, user_language, session)
+                for document, category, category_translation in results
+            ]
 
             total_pages = (total_count + page_size - 1) // page_size
 
@@ -940,7 +1356,8 @@ class DocumentService:
                 total_count=total_count,
                 page=page,
                 page_size=page_size,
-                total_pages=total_pages
+                total_pages=total_pages,
+                next_cursor=next_cursor
             )
 
         except Exception as e:
@@ -959,6 +1376,9 @@ class DocumentService:
         """
         Search documents from multiple sources (own + shared from delegates)
 
+        Access to all requested owners is resolved in one batch, then a single
+        query covers every authorized owner so sorting and pagination are global.
+
         Args:
             current_user: The current authenticated user
             search_request: Search filters and pagination
@@ -970,132 +1390,81 @@ class DocumentService:
         """
         from app.services.delegate_service import delegate_service
 
-        all_documents = []
-        total_from_sources = 0
-
         try:
-            # Fetch own documents if requested
-            if include_own:
-                logger.info(f"[MULTI-SOURCE] Fetching own documents for user {current_user.id}")
-                own_docs = await self.search_documents(str(current_user.id), search_request)
-
-                if own_docs and own_docs.documents:
-                    for doc in own_docs.documents:
-                        # Add owner metadata for own documents
-                        doc.owner_type = "own"
-                        doc.owner_user_id = str(current_user.id)
-                        doc.owner_name = current_user.full_name
-                        doc.can_edit = True
-                        doc.can_delete = True
-
-                    all_documents.extend(own_docs.documents)
-                    total_from_sources += own_docs.total_count
-                    logger.info(f"[MULTI-SOURCE] Found {len(own_docs.documents)} own documents")
-
-            # Fetch shared documents from each owner
+            requested_owners = []
             for owner_id in shared_owner_ids:
                 try:
-                    owner_uuid = UUID(owner_id)
+                    requested_owners.append(UUID(owner_id))
+                except ValueError:
+                    logger.error(f"[MULTI-SOURCE] Invalid owner ID format: {owner_id}")
 
-                    # Validate delegate has active access to this owner
-                    has_access, role = await delegate_service.check_access(
-                        delegate_user_id=current_user.id,
-                        owner_user_id=owner_uuid
-                    )
+            # Validate delegate has active access to these owners
+            roles = await delegate_service.get_access_roles(current_user.id, requested_owners) if requested_owners else {}
+            for owner_uuid in set(requested_owners) - set(roles):
+                logger.warning(f"[MULTI-SOURCE] User {current_user.id} does not have access to owner {owner_uuid}")
 
-                    if not has_access:
-                        logger.warning(f"[MULTI-SOURCE] User {current_user.id} does not have access to owner {owner_id}")
-                        continue
+            owner_ids = [str(owner_uuid) for owner_uuid in roles]
+            if include_own:
+                owner_ids.append(str(current_user.id))
 
-                    logger.info(f"[MULTI-SOURCE] Fetching shared documents from owner {owner_id} (role: {role})")
-                    if settings.is_development and search_request.category_id:
-                        logger.info(f"[MULTI-SOURCE] Category filter active: {search_request.category_id}")
+            page_size = search_request.page_size or 20
+            if not owner_ids:
+                return DocumentListResponse(
+                    documents=[], total_count=0, page=search_request.page or 1, page_size=page_size, total_pages=0
+                )
 
-                    # Fetch owner's documents
-                    shared_docs = await self.search_documents(owner_id, search_request)
+            session = db_manager.session_local()
+            try:
+                user_language = self._get_user_language(str(current_user.id), session)
+                results, total_count, page, page_size, next_cursor = await self._execute_search(
+                    owner_ids, search_request, session
+                )
 
-                    if settings.is_development and search_request.category_id:
-                        doc_count = len(shared_docs.documents) if shared_docs else 0
-                        logger.info(f"[MULTI-SOURCE] Found {doc_count} shared documents from owner {owner_id} matching category filter")
+                owner_names = {}
+                if roles:
+                    owner_names = {
+                        owner_id: full_name
+                        for owner_id, full_name in session.execute(
+                            select(User.id, User.full_name).where(User.id.in_(list(roles)))
+                        )
+                    }
 
-                    if shared_docs and shared_docs.documents:
-                        # Get owner details for metadata
-                        session = db_manager.session_local()
-                        try:
-                            owner_user = session.query(User).filter(User.id == owner_uuid).first()
-                            owner_name = owner_user.full_name if owner_user else "Unknown Owner"
-                        finally:
-                            session.close()
+                documents = []
+                for document, category, category_translation in results:
+                    doc = self._document_response(document, category, category_translation, user_language, session)
 
+                    if include_own and document.user_id == current_user.id:
+                        # Add owner metadata for own documents
+                        doc.owner_type = "own"
+                        doc.owner_user_id = str(current_user.id)
+                        doc.owner_name = current_user.full_name
+                        doc.can_edit = True
+                        doc.can_delete = True
+                    else:
                         # Add owner metadata for shared documents
-                        for doc in shared_docs.documents:
-                            doc.owner_type = "shared"
-                            doc.owner_user_id = owner_id
-                            doc.owner_name = owner_name
-                            # Delegates with 'viewer' role cannot edit or delete
-                            doc.can_edit = False if role == 'viewer' else True
-                            doc.can_delete = False
-
-                        all_documents.extend(shared_docs.documents)
-                        total_from_sources += shared_docs.total_count
-                        logger.info(f"[MULTI-SOURCE] Found {len(shared_docs.documents)} shared documents from owner {owner_id}")
-
-                except ValueError:
-                    logger.error(f"[MULTI-SOURCE] Invalid owner ID format: {owner_id}")
-                    continue
-                except Exception as e:
-                    logger.error(f"[MULTI-SOURCE] Error fetching documents from owner {owner_id}: {e}")
-                    continue
-
-            # Sort combined results
-            # By default, sort by created_at desc
-            sort_by = search_request.sort_by or "created_at"
-            sort_order = search_request.sort_order or "desc"
-
-            if sort_by == "created_at":
-                all_documents.sort(
-                    key=lambda x: x.created_at if x.created_at else datetime.min,
-                    reverse=(sort_order == "desc")
-                )
-            elif sort_by == "title":
-                all_documents.sort(
-                    key=lambda x: x.title.lower() if x.title else "",
-                    reverse=(sort_order == "desc")
-                )
-            elif sort_by == "file_size":
-                all_documents.sort(
-                    key=lambda x: x.file_size if x.file_size else 0,
-                    reverse=(sort_order == "desc")
-                )
-            elif sort_by == "category_name":
-                all_documents.sort(
-                    key=lambda x: x.category_name.lower() if x.category_name else "zzz",
-                    reverse=(sort_order == "desc")
-                )
-            elif sort_by == "mime_type":
-                all_documents.sort(
-                    key=lambda x: x.mime_type.lower() if x.mime_type else "zzz",
-                    reverse=(sort_order == "desc")
-                )
-
-            # Apply pagination to combined results
-            page = search_request.page or 1
-            page_size = search_request.page_size or 20
-
-            total_count = len(all_documents)
-            offset = (page - 1) * page_size
-            paginated_documents = all_documents[offset:offset + page_size]
+                        role = roles.get(document.user_id)
+                        doc.owner_type = "shared"
+                        doc.owner_user_id = str(document.user_id)
+                        doc.owner_name = owner_names.get(document.user_id) or "Unknown Owner"
+                        # Delegates with 'viewer' role cannot edit or delete
+                        doc.can_edit = False if role == 'viewer' else True
+                        doc.can_delete = False
+
+                    documents.append(doc)
+            finally:
+                session.close()
 
             total_pages = (total_count + page_size - 1) // page_size
 
-            logger.info(f"[MULTI-SOURCE] Returning {len(paginated_documents)} documents (page {page}/{total_pages}, total: {total_count})")
+            logger.info(f"[MULTI-SOURCE] Returning {len(documents)} documents from {len(owner_ids)} owners (page {page}/{total_pages}, total: {total_count})")
 
             return DocumentListResponse(
-                documents=paginated_documents,
+                documents=documents,
                 total_count=total_count,
                 page=page,
                 page_size=page_size,
-                total_pages=total_pages
+                total_pages=total_pages,
+                next_cursor=next_cursor
             )
 
         except Exception as e:
@@ -6,7 +6,7 @@ different cloud storage providers (Google Drive, OneDrive, etc.).
 """
 
 import logging
-from typing import Optional, Dict, BinaryIO
+from typing import Optional, Dict, BinaryIO, List
 from sqlalchemy.orm import Session
 
 from app.services.storage.provider_factory import ProviderFactory
@@ -71,7 +71,7 @@ class DocumentStorageService:
 
         Args:
             user: User model instance
-            file_content: Binary file content stream
+            file_content: Seekable binary stream (a file or spooled temp file for large uploads)
             filename: Name for the uploaded file
             mime_type: MIME type of the file
             db: Database session
@@ -100,7 +100,8 @@ class DocumentStorageService:
             file_content=file_content,
             filename=filename,
             mime_type=mime_type,
-            folder_id=folder_id
+            folder_id=folder_id,
+            account_key=str(user.id)
         )
 
         logger.info(f"Document '{filename}' uploaded to {target_provider}: {result.file_id}")
@@ -186,6 +187,68 @@ class DocumentStorageService:
 
         return success
 
+    def move_documents(
+        self,
+        user: User,
+        moves: Dict[str, str],
+        db: Session,
+        provider_type: Optional[str] = None
+    ) -> Dict[str, Optional[str]]:
+        """
+        Move many files into folders in user's cloud storage using batched requests.
+
+        Args:
+            user: User model instance
+            moves: Dictionary mapping file IDs to target folder IDs
+            db: Database session
+            provider_type: Optional override for provider (uses active_storage_provider if None)
+
+        Returns:
+            Dictionary mapping each file ID to None if moved, or an error message
+
+        Raises:
+            ValueError: If user has no active provider or provider not connected
+        """
+        target_provider = provider_type or user.active_storage_provider
+        if not target_provider:
+            raise ValueError("User has no active storage provider configured")
+
+        refresh_token = self._get_refresh_token(user, target_provider, db)
+
+        provider = ProviderFactory.create(target_provider)
+        return provider.move_documents(refresh_token_encrypted=refresh_token, moves=moves)
+
+    def delete_documents(
+        self,
+        user: User,
+        file_ids: List[str],
+        db: Session,
+        provider_type: Optional[str] = None
+    ) -> Dict[str, Optional[str]]:
+        """
+        Delete many files from user's cloud storage using batched requests.
+
+        Args:
+            user: User model instance
+            file_ids: Provider-specific file identifiers
+            db: Database session
+            provider_type: Optional override for provider (uses active_storage_provider if None)
+
+        Returns:
+            Dictionary mapping each file ID to None if deleted (or already gone), or an error message
+
+        Raises:
+            ValueError: If user has no active provider or provider not connected
+        """
+        target_provider = provider_type or user.active_storage_provider
+        if not target_provider:
+            raise ValueError("User has no active storage provider configured")
+
+        refresh_token = self._get_refresh_token(user, target_provider, db)
+
+        provider = ProviderFactory.create(target_provider)
+        return provider.delete_documents(refresh_token_encrypted=refresh_token, file_ids=file_ids)
+
     def initialize_folder_structure(
         self,
         user: User,
@@ -218,7 +281,8 @@ class DocumentStorageService:
         provider = ProviderFactory.create(target_provider)
         folder_map = provider.initialize_folder_structure(
             refresh_token_encrypted=refresh_token,
-            folder_names=folder_names
+            folder_names=folder_names,
+            account_key=str(user.id)
         )
 
         logger.info(f"Initialized {len(folder_map)} folders in {target_provider}")
@@ -7,10 +7,10 @@ Production-ready implementation with comprehensive error handling
 import logging
 import json
 import uuid as uuid_lib
-import hashlib
 import re
 from datetime import datetime, timezone
-from typing import Optional, List, Dict
+from io import BytesIO
+from typing import BinaryIO, Optional, List, Dict, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 
@@ -26,8 +26,10 @@ from app.database.models import (
 from app.services.drive_service import drive_service
 from app.services.document_storage_service import document_storage_service
 from app.services.ml_learning_service import ml_learning_service
+from app.services.category_service import category_service
 from app.services.config_service import config_service
 from app.services.provider_manager import ProviderManager
+from app.services.storage.chunked_upload import hash_stream, stream_size
 
 logger = logging.getLogger(__name__)
 
@@ -76,10 +78,12 @@ class DocumentUploadService:
         if session is None:
             session = db_manager.session_local()
             close_session = True
-        
+
+        file_stream, owns_stream = None, False
         try:
-            # Extract data from temp storage
-            file_content = temp_data['file_content']
+            # Extract data from temp storage; the file is streamed, not loaded
+            file_stream, owns_stream = self._open_upload_stream(temp_data)
+            file_size = temp_data.get('file_size') or stream_size(file_stream)
             original_filename = temp_data['file_name']
             mime_type = temp_data['mime_type']
             analysis_result = temp_data['analysis_result']
@@ -91,8 +95,8 @@ class DocumentUploadService:
             detected_language = analysis_result.get('detected_language', language_code)
             if detected_language:
                 language_code = detected_language  # This is for document metadata only
-                logger.info(f"[UPLOAD DEBUG] Using detected language for document: {language_code}")
-                logger.info(f"[UPLOAD DEBUG] Using user language for folders: {user_language_code}")
+                logger.debug("[UPLOAD DEBUG] Using detected language for document: %s", language_code)
+                logger.debug("[UPLOAD DEBUG] Using user language for folders: %s", user_language_code)
 
             # Determine primary category first to get category code for filename
             if primary_category_id:
@@ -108,11 +112,11 @@ class DocumentUploadService:
             primary_cat_id = category_ids_ordered[0]
             primary_category = session.query(Category).filter(Category.id == primary_cat_id).first()
             category_code = primary_category.category_code if primary_category else 'OTH'
-            logger.info(f"[FILENAME DEBUG] Primary category: {primary_category.reference_key if primary_category else 'None'}, code: {category_code}")
+            logger.debug("[FILENAME DEBUG] Primary category: %s, code: %s", primary_category.reference_key if primary_category else 'None', category_code)
 
             # Get document date for filename (or None to use current timestamp)
             document_date = analysis_result.get('document_date')
-            logger.info(f"[FILENAME DEBUG] Document date: {document_date}")
+            logger.debug("[FILENAME DEBUG] Document date: %s", document_date)
 
             # Get user's timezone setting (default to UTC if not set)
             from app.database.models import UserSetting
@@ -123,11 +127,11 @@ class DocumentUploadService:
                 )
             ).first()
             user_timezone = timezone_setting.setting_value if timezone_setting else 'UTC'
-            logger.info(f"[FILENAME DEBUG] User timezone: {user_timezone}")
+            logger.debug("[FILENAME DEBUG] User timezone: %s", user_timezone)
 
             # Get standardized filename (user may have edited it)
             if custom_filename:
-                logger.info(f"[FILENAME DEBUG] Using custom filename: {custom_filename}")
+                logger.debug("[FILENAME DEBUG] Using custom filename: %s", custom_filename)
                 standardized_filename = custom_filename
             else:
                 standardized_filename = self._generate_standardized_filename(
@@ -136,7 +140,7 @@ class DocumentUploadService:
                     document_date=document_date,
                     user_timezone=user_timezone
                 )
-                logger.info(f"[FILENAME DEBUG] Generated standardized filename: {standardized_filename}")
+                logger.debug("[FILENAME DEBUG] Generated standardized filename: %s", standardized_filename)
             
             # Validate filename length
             max_length = await config_service.get_setting('max_filename_length', 200, session)
@@ -147,8 +151,8 @@ class DocumentUploadService:
             if not self._validate_filename(standardized_filename):
                 raise ValueError("Filename contains invalid characters")
 
-            # Calculate file hash for storage (duplicate check happens earlier in /analyze endpoint)
-            file_hash = hashlib.sha256(file_content).hexdigest()
+            # File hash for storage (duplicate check happens earlier in /analyze endpoint)
+            file_hash = temp_data.get('file_hash') or hash_stream(file_stream)
 
             # Safety net: Check for duplicate document (guards against double-submit)
             existing = session.query(Document).filter(
@@ -245,14 +249,11 @@ class DocumentUploadService:
             # Upload using centralized document storage service (provider-agnostic)
             logger.info(f"Uploading to {storage_provider}: {standardized_filename} -> {category_name} ({category_code_for_folder})")
 
-            # Convert bytes to BytesIO for upload
-            from io import BytesIO
-            file_io = BytesIO(file_content)
-
             # Use document_storage_service for provider-agnostic upload with category folder
+            # (large files are sent in chunks read from the stream)
             upload_result = document_storage_service.upload_document(
                 user=user,
-                file_content=file_io,
+                file_content=file_stream,
                 filename=standardized_filename,
                 mime_type=mime_type,
                 db=session,
@@ -284,7 +285,7 @@ class DocumentUploadService:
             # If title is same as original filename (user didn't customize), use standardized filename
             if title == original_filename:
                 title = standardized_filename
-                logger.info(f"[FILENAME DEBUG] Title matched original filename, using standardized: {title}")
+                logger.debug("[FILENAME DEBUG] Title matched original filename, using standardized: %s", title)
 
             # Create document record using ORM
             document = Document(
@@ -293,13 +294,14 @@ class DocumentUploadService:
                 description=description,
                 file_name=standardized_filename,
                 original_filename=original_filename,
-                file_size=len(file_content),
+                file_size=file_size,
                 mime_type=mime_type,
                 file_hash=file_hash,
                 storage_file_id=upload_result.file_id,
                 storage_provider_type=storage_provider,
                 web_view_link=getattr(upload_result, 'web_view_link', None),
                 primary_language=language_code,
+                detected_languages=json.dumps(analysis_result['detected_languages']) if analysis_result.get('detected_languages') else None,
                 extracted_text=analysis_result.get('extracted_text'),
                 keywords=keywords_json,
                 processing_status='completed',
@@ -332,27 +334,6 @@ class DocumentUploadService:
                 )
                 session.add(doc_category)
             
-            # Smart ML learning with multi-category support
-            suggested_category_id = analysis_result.get('suggested_category_id')
-            primary_category_id = uuid_lib.UUID(category_ids_ordered[0])
-            secondary_category_ids = [uuid_lib.UUID(cid) for cid in category_ids_ordered[1:]]  # Categories 2-5
-            document_keywords = [kw['word'] for kw in analysis_result.get('keywords', [])]
-
-            logger.info(f"ML Learning: primary={primary_category_id}, secondary={len(secondary_category_ids)}, AI suggested={suggested_category_id}")
-
-            # Use enhanced ML learning service with smart weight calculation
-            ml_learning_service.learn_from_classification(
-                document_id=document.id,
-                document_keywords=document_keywords,
-                primary_category_id=primary_category_id,
-                secondary_category_ids=secondary_category_ids,
-                language=language_code,
-                user_id=uuid_lib.UUID(user_id),
-                ai_predicted_category=uuid_lib.UUID(suggested_category_id) if suggested_category_id else None,
-                ai_confidence=analysis_result.get('classification_confidence', 0) / 100.0 if analysis_result.get('classification_confidence') else None,
-                session=session
-            )
-
             # Store extracted entities (people, organizations, addresses)
             entities = analysis_result.get('entities', [])
             if entities:
@@ -382,9 +363,31 @@ class DocumentUploadService:
             
             # Commit all changes
             session.commit()
+            category_service.invalidate_user_cache(user_id)
             
             logger.info(f"Document uploaded successfully: {document.id} - {title}")
 
+            # Smart ML learning with multi-category support (after the document is
+            # committed: learning commits on its own and is queued when async)
+            suggested_category_id = analysis_result.get('suggested_category_id')
+            primary_category_id = uuid_lib.UUID(category_ids_ordered[0])
+            secondary_category_ids = [uuid_lib.UUID(cid) for cid in category_ids_ordered[1:]]  # Categories 2-5
+            document_keywords = [kw['word'] for kw in analysis_result.get('keywords', [])]
+
+            logger.info(f"ML Learning: primary={primary_category_id}, secondary={len(secondary_category_ids)}, AI suggested={suggested_category_id}")
+
+            ml_learning_service.schedule_learning(
+                document_id=document.id,
+                document_keywords=document_keywords,
+                primary_category_id=primary_category_id,
+                secondary_category_ids=secondary_category_ids,
+                language=language_code,
+                user_id=uuid_lib.UUID(user_id),
+                ai_predicted_category=uuid_lib.UUID(suggested_category_id) if suggested_category_id else None,
+                ai_confidence=analysis_result.get('classification_confidence', 0) / 100.0 if analysis_result.get('classification_confidence') else None,
+                session=session
+            )
+
             # Get category names for response using ORM
             category_names = []
             for cat_id in category_ids_ordered:
@@ -416,7 +419,7 @@ class DocumentUploadService:
                 'title': title,
                 'filename': standardized_filename,
                 'original_filename': original_filename,
-                'file_size': len(file_content),
+                'file_size': file_size,
                 'category_ids': category_ids_ordered,
                 'category_names': category_names,
                 'primary_category_id': category_ids_ordered[0],
@@ -436,9 +439,29 @@ class DocumentUploadService:
             logger.error(f"Document upload failed: {e}", exc_info=True)
             raise
         finally:
+            if owns_stream:
+                file_stream.close()
             if close_session:
                 session.close()
-    
+
+    @staticmethod
+    def _open_upload_stream(temp_data: Dict) -> Tuple[BinaryIO, bool]:
+        """
+        Seekable stream over the file to upload
+
+        temp_data carries the file as 'file_stream' (spooled temp file),
+        'file_path' (batch file on disk) or 'file_content' (bytes).
+
+        Returns:
+            Tuple of (stream, whether the caller must close it)
+        """
+        if temp_data.get('file_stream') is not None:
+            temp_data['file_stream'].seek(0)
+            return temp_data['file_stream'], False
+        if temp_data.get('file_path'):
+            return open(temp_data['file_path'], 'rb'), True
+        return BytesIO(temp_data['file_content']), True
+
     def _generate_standardized_filename(
         self,
         original_filename: str,
@@ -0,0 +1,306 @@
+# backend/app/services/email_delivery_service.py
+"""
+Email delivery subsystem for the Brevo transactional API
+
+Keeps one pooled (HTTP/2 when available) client per event loop instead of a
+new TLS handshake per message, limits request rate with a token bucket and
+bounds in-flight requests. Bulk sends use Brevo message versions so many
+personalized messages travel in a single request.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Brevo accepts at most 1000 message versions per request
+BREVO_MAX_MESSAGE_VERSIONS = 1000
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional 'h2' package (httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+async def _close_client(client: httpx.AsyncClient):
+    """Close a pooled client, ignoring connections whose event loop is already gone"""
+    try:
+        await client.aclose()
+    except Exception as e:
+        logger.debug(f"Email delivery client closed with error: {e}")
+
+
+class TokenBucket:
+    """Async token bucket: sustained `rate` acquisitions per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = max(rate, 0.001)
+        self.capacity = capacity if capacity is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1.0):
+        """Wait until `tokens` are available and consume them"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+@dataclass
+class OutboundEmail:
+    """One personalized message for bulk delivery"""
+    to_email: str
+    to_name: Optional[str]
+    subject: str
+    html_content: str
+    reference: Any = None
+
+
+@dataclass
+class DeliveryResult:
+    """Outcome of a single message in a bulk delivery"""
+    reference: Any
+    to_email: str
+    success: bool
+    message_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class _ClientState:
+    client: httpx.AsyncClient
+    loop: asyncio.AbstractEventLoop
+    limiter: TokenBucket
+    semaphore: asyncio.Semaphore
+    stats: Dict[str, int] = field(default_factory=lambda: {'requests': 0, 'messages': 0})
+
+
+class MockBrevoTransport(httpx.AsyncBaseTransport):
+    """
+    Local stand-in for the Brevo API, used for development and benchmarks
+
+    Simulates network latency and returns Brevo-shaped responses without
+    sending anything.
+    """
+
+    def __init__(self, latency_ms: float = 50.0, failure_rate: float = 0.0):
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self.messages = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.latency_ms / 1000)
+        self.requests += 1
+
+        if self.failure_rate and random.random() < self.failure_rate:
+            return httpx.Response(503, json={'code': 'service_unavailable', 'message': 'Mock failure'})
+
+        payload = json.loads(request.content or b'{}')
+        versions = payload.get('messageVersions')
+        if versions:
+            self.messages += len(versions)
+            return httpx.Response(201, json={
+                'messageIds': [f'<mock-{self.requests}-{idx}@smtp-relay.mailin.fr>' for idx in range(len(versions))]
+            })
+
+        self.messages += 1
+        return httpx.Response(201, json={'messageId': f'<mock-{self.requests}@smtp-relay.mailin.fr>'})
+
+
+class EmailDeliveryService:
+    """Pooled, rate-limited delivery to the Brevo transactional email API"""
+
+    BREVO_API_URL = "https://api.brevo.com/v3/smtp/email"
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        config = settings.email
+        self.api_key = config.brevo_api_key
+        self.timeout = 30
+        self.max_concurrency = max(1, config.email_delivery_max_concurrency)
+        self.rate_per_second = config.email_delivery_rate_per_second
+        self.batch_size = max(1, min(config.email_delivery_batch_size, BREVO_MAX_MESSAGE_VERSIONS))
+        self.http2 = config.email_delivery_http2 and _http2_available()
+        self._transport = transport
+        if self._transport is None and config.email_delivery_mock:
+            logger.warning("Email delivery uses the mock Brevo transport - no emails will be sent")
+            self._transport = MockBrevoTransport()
+        self._state: Optional[_ClientState] = None
+        self._closing: Set[asyncio.Task] = set()
+
+    def _get_state(self) -> _ClientState:
+        """
+        Return the client for the running event loop, creating it on first use
+
+        httpx clients are bound to the loop they were first used on; Celery
+        tasks run their own loops, so each loop gets its own pool.
+        """
+        loop = asyncio.get_running_loop()
+        state = self._state
+        if state is not None and state.loop is loop and not state.client.is_closed:
+            return state
+        if state is not None:
+            self._retire_state(state)
+
+        client = httpx.AsyncClient(
+            timeout=self.timeout,
+            http2=self.http2,
+            transport=self._transport,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+                keepalive_expiry=60
+            ),
+            headers={
+                "api-key": self.api_key or "",
+                "Content-Type": "application/json"
+            }
+        )
+        self._state = _ClientState(
+            client=client,
+            loop=loop,
+            limiter=TokenBucket(self.rate_per_second),
+            semaphore=asyncio.Semaphore(self.max_concurrency)
+        )
+        logger.debug(f"Email delivery client created (http2={self.http2}, max_concurrency={self.max_concurrency})")
+        return self._state
+
+    def _retire_state(self, state: _ClientState):
+        """Close the client of a previous event loop (on that loop if it is still running)"""
+        if state.client.is_closed:
+            return
+        if state.loop.is_running():
+            asyncio.run_coroutine_threadsafe(_close_client(state.client), state.loop)
+        else:
+            task = asyncio.get_running_loop().create_task(_close_client(state.client))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    async def post(self, payload: Dict[str, Any]) -> httpx.Response:
+        """
+        POST one payload to Brevo through the shared client, rate limiter and concurrency cap
+
+        Args:
+            payload: Brevo /v3/smtp/email request body
+
+        Returns:
+            httpx response
+        """
+        state = self._get_state()
+        await state.limiter.acquire()
+        async with state.semaphore:
+            response = await state.client.post(self.BREVO_API_URL, json=payload)
+        state.stats['requests'] += 1
+        state.stats['messages'] += len(payload.get('messageVersions') or [None])
+        return response
+
+    async def send_bulk(
+        self,
+        messages: List[OutboundEmail],
+        from_email: str,
+        from_name: str,
+        reply_to: Optional[str] = None
+    ) -> List[DeliveryResult]:
+        """
+        Send many personalized messages using Brevo message versions
+
+        Messages are grouped into requests of `batch_size` versions; requests
+        run concurrently within the rate limit. A failed request marks every
+        message in it as failed.
+
+        Args:
+            messages: Fully rendered messages
+            from_email: Sender address
+            from_name: Sender name
+            reply_to: Optional reply-to address
+
+        Returns:
+            One DeliveryResult per message, in input order
+        """
+        batches = [messages[i:i + self.batch_size] for i in range(0, len(messages), self.batch_size)]
+        results = await asyncio.gather(*[
+            self._send_version_batch(batch, from_email, from_name, reply_to) for batch in batches
+        ])
+        return [result for batch_results in results for result in batch_results]
+
+    async def _send_version_batch(
+        self,
+        batch: List[OutboundEmail],
+        from_email: str,
+        from_name: str,
+        reply_to: Optional[str]
+    ) -> List[DeliveryResult]:
+        """Send one message-versions request and map the response back to messages"""
+        # Global subject/htmlContent are required; each version overrides them
+        payload: Dict[str, Any] = {
+            "sender": {"name": from_name, "email": from_email},
+            "subject": batch[0].subject,
+            "htmlContent": batch[0].html_content,
+            "messageVersions": [
+                {
+                    "to": [{"email": message.to_email, "name": message.to_name or message.to_email}],
+                    "subject": message.subject,
+                    "htmlContent": message.html_content
+                }
+                for message in batch
+            ]
+        }
+        if reply_to:
+            payload["replyTo"] = {"email": reply_to}
+
+        try:
+            response = await self.post(payload)
+        except Exception as e:
+            logger.error(f"Bulk email request failed for {len(batch)} recipients: {e}")
+            return [DeliveryResult(m.reference, m.to_email, False, error=str(e)) for m in batch]
+
+        if response.status_code != 201:
+            error = f"Status {response.status_code}: {response.text[:500]}"
+            logger.error(f"Bulk email request rejected for {len(batch)} recipients: {error}")
+            return [DeliveryResult(m.reference, m.to_email, False, error=error) for m in batch]
+
+        message_ids = response.json().get("messageIds") or []
+        return [
+            DeliveryResult(
+                reference=message.reference,
+                to_email=message.to_email,
+                success=True,
+                message_id=message_ids[idx] if idx < len(message_ids) else None
+            )
+            for idx, message in enumerate(batch)
+        ]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Requests and messages sent through the current client"""
+        return dict(self._state.stats) if self._state else {'requests': 0, 'messages': 0}
+
+    async def aclose(self):
+        """Close the pooled client (application shutdown, end of a Celery task's event loop)"""
+        state = self._state
+        self._state = None
+        if state is not None and not state.client.is_closed:
+            await _close_client(state.client)
+
+
+# Global instance
+email_delivery_service = EmailDeliveryService()
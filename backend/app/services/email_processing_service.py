@@ -5,37 +5,112 @@ Handles incoming emails sent to @doc.bonidoc.com addresses
 
 import logging
 import imaplib
-import email
 from email.header import decode_header
+from email.message import Message
+from email.parser import BytesHeaderParser
 from email.utils import parseaddr
 import os
 import secrets
 import json
 import hashlib
 import asyncio
-from typing import Optional, List, Dict, Any, Tuple
+import copy
+from contextlib import asynccontextmanager
+from typing import Optional, List, Dict, Any, Tuple, Union
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
 from app.core.config import settings
-from app.database.auth_models import AllowedSender, EmailProcessingLog, EmailSettings
+from app.database.connection import db_manager
+from app.database.auth_models import AllowedSender, EmailProcessingLog, EmailSettings, ImapSyncState
 from app.database.models import User, Document, UserMonthlyUsage
 from app.services.email_service import EmailService
 from app.services.document_upload_service import document_upload_service
 from app.services.malware_scanner_service import malware_scanner_service
-from app.services.document_analysis_service import DocumentAnalysisService
+from app.services.analysis_executor import analysis_executor, AnalysisQueueFullError
+from app.utils.imap_utils import (
+    AttachmentPart, parse_fetch_response, find_attachment_parts,
+    decode_part_payload, get_uid_validity
+)
 
 logger = logging.getLogger(__name__)
 
 
+def open_imap_connection() -> Optional[imaplib.IMAP4]:
+    """
+    Open and authenticate a new IMAP connection using configured credentials
+
+    Returns:
+        IMAP connection or None if failed
+    """
+    config = settings.email_processing
+    try:
+        if config.imap_use_ssl:
+            imap = imaplib.IMAP4_SSL(config.imap_host, config.imap_port)
+        else:
+            imap = imaplib.IMAP4(config.imap_host, config.imap_port)
+
+        imap.login(config.imap_user, config.imap_password)
+        logger.info(f"Connected to IMAP server {config.imap_host}")
+        return imap
+
+    except Exception as e:
+        logger.error(f"Failed to connect to IMAP server: {str(e)}")
+        return None
+
+
+class AttachmentConcurrencyLimiter:
+    """
+    Bounds concurrent attachment work: a global cap plus a per-user share,
+    so one user's burst of scanned invoices cannot occupy every slot
+    """
+
+    def __init__(self, max_total: int, max_per_user: int):
+        self._global = asyncio.Semaphore(max(1, max_total))
+        self._max_per_user = max(1, max_per_user)
+        # Per-user semaphores live only while the user has holders or waiters
+        self._per_user: Dict[str, asyncio.Semaphore] = {}
+        self._user_refs: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def slot(self, user_id: str):
+        """Hold one processing slot for the given user"""
+        user_semaphore = self._per_user.setdefault(user_id, asyncio.Semaphore(self._max_per_user))
+        self._user_refs[user_id] = self._user_refs.get(user_id, 0) + 1
+        try:
+            # Acquire the user's share first so waiting users never hold a global slot
+            async with user_semaphore:
+                async with self._global:
+                    yield
+        finally:
+            self._release_user(user_id)
+
+    def _release_user(self, user_id: str):
+        self._user_refs[user_id] -= 1
+        if self._user_refs[user_id] <= 0:
+            del self._user_refs[user_id]
+            del self._per_user[user_id]
+
+
+attachment_limiter = AttachmentConcurrencyLimiter(
+    max_total=settings.email_processing.max_concurrent_attachments,
+    max_per_user=settings.email_processing.max_concurrent_attachments_per_user
+)
+
+
 class EmailProcessingService:
     """Service for processing incoming emails and converting them to documents"""
 
+    # Headers needed to route and filter a message before downloading its body
+    ROUTING_HEADERS = 'FROM TO DELIVERED-TO X-ORIGINAL-TO X-FORWARDED-TO ENVELOPE-TO SUBJECT MESSAGE-ID'
+
+    # Connection kept open between poll cycles (polls never overlap)
+    _persistent_imap: Optional[imaplib.IMAP4] = None
+
     def __init__(self, db: Session):
         self.db = db
         self.email_service = EmailService()
-        self.document_analysis_service = DocumentAnalysisService()
         self.imap_host = settings.email_processing.imap_host
         self.imap_port = settings.email_processing.imap_port
         self.imap_user = settings.email_processing.imap_user
@@ -187,19 +262,40 @@ class EmailProcessingService:
         Returns:
             IMAP connection or None if failed
         """
-        try:
-            if self.imap_use_ssl:
-                imap = imaplib.IMAP4_SSL(self.imap_host, self.imap_port)
-            else:
-                imap = imaplib.IMAP4(self.imap_host, self.imap_port)
+        return open_imap_connection()
 
-            imap.login(self.imap_user, self.imap_password)
-            logger.info(f"Connected to IMAP server {self.imap_host}")
-            return imap
+    def get_imap_connection(self) -> Optional[imaplib.IMAP4]:
+        """
+        Reuse the persistent IMAP connection, reconnecting if it went stale
 
-        except Exception as e:
-            logger.error(f"Failed to connect to IMAP server: {str(e)}")
-            return None
+        Returns:
+            IMAP connection or None if failed
+        """
+        imap = EmailProcessingService._persistent_imap
+        if imap is not None:
+            try:
+                status, _ = imap.noop()
+                if status == 'OK':
+                    return imap
+            except Exception as e:
+                logger.info(f"Persistent IMAP connection lost, reconnecting: {str(e)}")
+            self.close_imap_connection()
+
+        imap = self.connect_to_imap()
+        EmailProcessingService._persistent_imap = imap
+        return imap
+
+    @classmethod
+    def close_imap_connection(cls):
+        """Log out and drop the persistent IMAP connection"""
+        imap = cls._persistent_imap
+        cls._persistent_imap = None
+        if imap is None:
+            return
+        try:
+            imap.logout()
+        except Exception:
+            pass
 
     def is_doc_email(self, recipient: str) -> bool:
         """
@@ -461,21 +557,34 @@ class EmailProcessingService:
 
     def delete_email_from_inbox(self, imap, email_id: bytes):
         """
-        Delete email from inbox
+        Mark email as deleted (expunged once at the end of the poll cycle)
 
         Args:
             imap: IMAP connection
-            email_id: Email ID to delete
+            email_id: Email UID to delete
         """
         try:
-            # Mark for deletion
-            imap.store(email_id, '+FLAGS', '\\Deleted')
-            # Expunge to permanently delete
-            imap.expunge()
-            logger.info(f"Deleted email {email_id} from inbox")
+            imap.uid('STORE', email_id, '+FLAGS', '(\\Deleted)')
+            logger.info(f"Marked email UID {email_id.decode()} as deleted")
         except Exception as e:
             logger.error(f"Failed to delete email {email_id}: {str(e)}")
 
+    def delete_emails_from_inbox(self, imap, uids: List[int]):
+        """
+        Mark several emails as deleted with a single UID STORE
+
+        Args:
+            imap: IMAP connection
+            uids: Email UIDs to delete
+        """
+        if not uids:
+            return
+        try:
+            imap.uid('STORE', ','.join(str(uid) for uid in uids), '+FLAGS', '(\\Deleted)')
+            logger.info(f"Marked {len(uids)} emails as deleted")
+        except Exception as e:
+            logger.error(f"Failed to delete emails {uids}: {str(e)}")
+
     def increment_monthly_usage(self, user_id: str, document_count: int):
         """
         Increment user's monthly email processing usage
@@ -545,6 +654,9 @@ class EmailProcessingService:
         """
         Process email attachments: scan, analyze, and upload
 
+        Attachments are scanned and then analyzed/uploaded concurrently, bounded
+        by the shared attachment limiter (global cap plus per-user share).
+
         Args:
             temp_files: List of temporary file paths
             filenames: List of original filenames
@@ -556,11 +668,69 @@ class EmailProcessingService:
         Returns:
             Tuple of (documents_created, uploaded_document_ids, processing_errors, malware_detected)
         """
+        user_id = str(user.id)
+
         # SECURITY GATE #8: Malware scanning (ClamAV)
-        malware_detected = False
-        malware_details = []
+        scan_results = await asyncio.gather(*[
+            self._scan_temp_file(temp_file, user_id) for temp_file in temp_files
+        ])
+        malware_details = [detail for threats in scan_results for detail in threats]
+        if malware_details:
+            return 0, [], malware_details, True
+
+        # Resolve everything shared by all attachments once
+        user_context = {
+            'user_id': user_id,
+            'user_email': user.email,
+            'preferred_language': user.preferred_doc_languages[0] if user.preferred_doc_languages else None
+        }
+        fallback_category_ids = await asyncio.to_thread(self._fallback_category_ids)
+
+        # Identical attachments within one email are uploaded once
+        processing_errors = []
+        unique_files = []
+        seen_hashes = set()
+        for idx, temp_file in enumerate(temp_files):
+            file_hash = await asyncio.to_thread(self._hash_file, temp_file)
+            if file_hash in seen_hashes:
+                processing_errors.append(f"{filenames[idx]}: Duplicate - already uploaded")
+                continue
+            seen_hashes.add(file_hash)
+            unique_files.append((idx, temp_file, file_hash))
+
+        # Process documents (upload to Drive, AI categorization)
+        results = await asyncio.gather(*[
+            self._process_single_attachment(
+                idx=idx,
+                temp_file=temp_file,
+                filename=filenames[idx],
+                file_hash=file_hash,
+                user_context=user_context,
+                fallback_category_ids=fallback_category_ids,
+                sender_email=sender_email,
+                email_id=email_id,
+                total=len(temp_files)
+            )
+            for idx, temp_file, file_hash in unique_files
+        ])
+
+        uploaded_document_ids = [document_id for document_id, _ in results if document_id]
+        processing_errors.extend(error for _, error in results if error)
+
+        return len(uploaded_document_ids), uploaded_document_ids, processing_errors, False
+
+    async def _scan_temp_file(self, temp_file: str, user_id: str) -> List[str]:
+        """
+        Malware-scan one spooled attachment
+
+        Args:
+            temp_file: Temporary file path
+            user_id: Owner, for per-user concurrency accounting
 
-        for temp_file in temp_files:
+        Returns:
+            List of threat descriptions (empty if the file is safe)
+        """
+        async with attachment_limiter.slot(user_id):
             try:
                 with open(temp_file, 'rb') as f:
                     scan_result = await malware_scanner_service.scan_file(
@@ -569,69 +739,123 @@ class EmailProcessingService:
                         mime_type=None
                     )
 
-                    if not scan_result.is_safe:
-                        malware_detected = True
-                        malware_details.extend(scan_result.threats)
-                        logger.error(f"Malware detected in {temp_file}: {scan_result.threats}")
+                # Log warnings even if file is safe
+                if scan_result.warnings:
+                    logger.warning(f"Scan warnings for {temp_file}: {scan_result.warnings}")
 
-                    # Log warnings even if file is safe
-                    if scan_result.warnings:
-                        logger.warning(f"Scan warnings for {temp_file}: {scan_result.warnings}")
+                if not scan_result.is_safe:
+                    logger.error(f"Malware detected in {temp_file}: {scan_result.threats}")
+                    return list(scan_result.threats) or [f"Threat detected in {os.path.basename(temp_file)}"]
+                return []
 
             except Exception as e:
                 logger.error(f"Error scanning file {temp_file}: {str(e)}")
                 # Fail-safe: reject on scanning error
-                malware_detected = True
-                malware_details.append(f"Scan error: {str(e)}")
+                return [f"Scan error: {str(e)}"]
+
+    def _fallback_category_ids(self) -> List[str]:
+        """ID of the system "other" category, used when analysis suggests none"""
+        from app.database.models import Category
+        uncategorized = self.db.query(Category).filter(
+            Category.is_system == True,
+            Category.reference_key == 'other'
+        ).first()
+        return [str(uncategorized.id)] if uncategorized else []
+
+    @staticmethod
+    def _find_duplicate(session: Session, user_id: str, file_hash: str) -> Optional[str]:
+        """ID of the user's existing document with this content hash, if any"""
+        existing_doc = session.query(Document.id).filter(
+            Document.user_id == user_id,
+            Document.file_hash == file_hash,
+            Document.is_deleted == False
+        ).first()
+        return str(existing_doc.id) if existing_doc else None
+
+    @staticmethod
+    def _read_attachment(filepath: str) -> Tuple[bytes, str]:
+        """Read a spooled attachment and detect its MIME type"""
+        import magic
+        with open(filepath, 'rb') as f:
+            file_content = f.read()
+        return file_content, magic.from_buffer(file_content, mime=True)
+
+    @staticmethod
+    def _hash_file(filepath: str) -> str:
+        """Stream a file through SHA-256 without loading it into memory"""
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    async def _process_single_attachment(
+        self,
+        idx: int,
+        temp_file: str,
+        filename: str,
+        file_hash: str,
+        user_context: Dict[str, Any],
+        fallback_category_ids: List[str],
+        sender_email: str,
+        email_id: bytes,
+        total: int
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Analyze and upload one attachment on its own database session
 
-        if malware_detected:
-            return 0, [], malware_details, True
+        Analysis runs in the analysis process pool and blocking database and
+        file access in worker threads, so the API event loop stays responsive.
+        A saturated analysis pool raises AnalysisQueueFullError, which leaves
+        the email for the next poll instead of rejecting the attachment.
 
-        # Process documents (upload to Drive, AI categorization)
-        documents_created = 0
-        uploaded_document_ids = []
-        processing_errors = []
+        Args:
+            idx: Attachment index within the email
+            temp_file: Spooled file path
+            filename: Original filename
+            file_hash: SHA-256 of the file content
+            user_context: user_id, user_email and preferred_language
+            fallback_category_ids: Category used when analysis suggests none
+            sender_email: Sender email address
+            email_id: Email UID
+            total: Number of attachments in the email
 
-        for idx, temp_file in enumerate(temp_files):
+        Returns:
+            Tuple of (document_id, error_message) - exactly one is set
+        """
+        user_id = user_context['user_id']
+
+        async with attachment_limiter.slot(user_id):
+            session = db_manager.session_local()
             try:
-                # Read file content
-                with open(temp_file, 'rb') as f:
-                    file_content = f.read()
+                existing_doc_id = await asyncio.to_thread(self._find_duplicate, session, user_id, file_hash)
 
-                filename = filenames[idx]
+                if existing_doc_id:
+                    logger.warning(f"[EMAIL] Duplicate detected: {filename} already exists as document {existing_doc_id}")
+                    return None, f"{filename}: Duplicate - already uploaded"
 
-                # Detect MIME type
-                import magic
-                mime_type = magic.from_buffer(file_content, mime=True)
+                # Read file content (only while holding a slot, bounding memory use)
+                file_content, mime_type = await asyncio.to_thread(self._read_attachment, temp_file)
 
-                logger.info(f"Processing attachment {idx + 1}/{len(temp_files)}: {filename} ({mime_type})")
+                logger.info(f"Processing attachment {idx + 1}/{total}: {filename} ({mime_type})")
 
-                # Analyze document with AI
-                analysis_result = await self.document_analysis_service.analyze_document(
+                # Analyze document with AI (in the analysis process pool, off the event loop)
+                analysis_result = await analysis_executor.analyze(
                     file_content=file_content,
                     file_name=filename,
                     mime_type=mime_type,
-                    db=self.db,
-                    user_id=str(user.id)
+                    db=session,
+                    user_id=user_id
                 )
 
                 logger.info(f"Document analyzed: language={analysis_result.get('detected_language')}, category={analysis_result.get('suggested_category_id')}")
 
                 # Get user's language preference
-                user_language = user.preferred_doc_languages[0] if user.preferred_doc_languages else analysis_result.get('detected_language', 'en')
+                user_language = user_context['preferred_language'] or analysis_result.get('detected_language', 'en')
 
                 # Prepare category IDs
                 suggested_category_id = analysis_result.get('suggested_category_id')
-                if suggested_category_id:
-                    category_ids = [suggested_category_id]
-                else:
-                    # Find "Other/Uncategorized" system category
-                    from app.database.models import Category
-                    uncategorized = self.db.query(Category).filter(
-                        Category.is_system == True,
-                        Category.reference_key == 'other'
-                    ).first()
-                    category_ids = [str(uncategorized.id)] if uncategorized else []
+                category_ids = [suggested_category_id] if suggested_category_id else fallback_category_ids
 
                 if not category_ids:
                     raise ValueError("No category available for document")
@@ -643,22 +867,6 @@ class EmailProcessingService:
                 # Remove file extension for cleaner title
                 title = os.path.splitext(filename)[0]
 
-                # Check for duplicates by file hash
-                file_hash = hashlib.sha256(file_content).hexdigest()
-
-                existing_doc = self.db.query(Document).filter(
-                    Document.user_id == user.id,
-                    Document.file_hash == file_hash,
-                    Document.is_deleted == False
-                ).first()
-
-                if existing_doc:
-                    logger.warning(f"[EMAIL DEBUG] Duplicate detected: {filename} already exists as document {existing_doc.id}")
-                    processing_errors.append(f"{filename}: Duplicate - already uploaded")
-                    continue  # Skip this attachment
-
-                logger.debug(f"[EMAIL] No duplicate found for {filename}, proceeding with upload")
-
                 # Prepare temp_data for upload service
                 temp_data = {
                     'file_content': file_content,
@@ -675,25 +883,31 @@ class EmailProcessingService:
                     category_ids=category_ids,
                     confirmed_keywords=keywords,
                     description=f"Received via email from {sender_email}",
-                    user_id=str(user.id),
-                    user_email=user.email,
+                    user_id=user_id,
+                    user_email=user_context['user_email'],
                     language_code=user_language,
-                    session=self.db
+                    session=session
                 )
 
                 if upload_result['success']:
-                    documents_created += 1
-                    uploaded_document_ids.append(upload_result['document_id'])
                     logger.info(f"Document uploaded successfully: {upload_result['document_id']} - {title}")
-                else:
-                    processing_errors.append(f"{filename}: Upload failed")
-                    logger.error(f"Document upload failed for {filename}")
+                    return upload_result['document_id'], None
+
+                logger.error(f"Document upload failed for {filename}")
+                return None, f"{filename}: Upload failed"
+
+            except AnalysisQueueFullError:
+                # Analysis pool saturated - leave the email in the inbox for the next poll
+                session.rollback()
+                raise
 
             except Exception as e:
+                session.rollback()
                 logger.error(f"Error processing attachment {filename}: {str(e)}", exc_info=True)
-                processing_errors.append(f"{filename}: {str(e)}")
+                return None, f"{filename}: {str(e)}"
 
-        return documents_created, uploaded_document_ids, processing_errors, False
+            finally:
+                session.close()
 
     async def send_rejection_notification(
         self,
@@ -753,517 +967,594 @@ class EmailProcessingService:
         except Exception as e:
             logger.error(f"Failed to send completion notification: {str(e)}")
 
+    def get_sync_checkpoint(self, mailbox: str, uid_validity: Optional[int]) -> ImapSyncState:
+        """
+        Load (or create) the UID checkpoint for a mailbox
+
+        A changed UIDVALIDITY means the server renumbered the mailbox, so the
+        stored last UID is meaningless and the checkpoint is reset.
+
+        Args:
+            mailbox: IMAP mailbox name
+            uid_validity: UIDVALIDITY reported by SELECT
+
+        Returns:
+            Sync state row (not yet committed if newly created)
+        """
+        state = self.db.query(ImapSyncState).filter(
+            ImapSyncState.account == self.imap_user,
+            ImapSyncState.mailbox == mailbox
+        ).first()
+
+        if not state:
+            state = ImapSyncState(
+                account=self.imap_user,
+                mailbox=mailbox,
+                uid_validity=uid_validity or 0,
+                last_seen_uid=0
+            )
+            self.db.add(state)
+        elif uid_validity is not None and state.uid_validity != uid_validity:
+            logger.warning(
+                f"[EMAIL POLL] UIDVALIDITY changed for {mailbox} "
+                f"({state.uid_validity} -> {uid_validity}), resetting checkpoint"
+            )
+            state.uid_validity = uid_validity
+            state.last_seen_uid = 0
+
+        return state
+
+    def save_sync_checkpoint(self, state: ImapSyncState, last_seen_uid: int):
+        """
+        Persist the highest UID that no longer needs processing
+
+        Args:
+            state: Sync state row
+            last_seen_uid: New checkpoint value
+        """
+        try:
+            if last_seen_uid > (state.last_seen_uid or 0):
+                state.last_seen_uid = last_seen_uid
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to save IMAP checkpoint: {str(e)}")
+
+    def search_new_uids(self, imap, last_seen_uid: int) -> List[int]:
+        """
+        Find unread messages above the checkpoint
+
+        Args:
+            imap: IMAP connection with INBOX selected
+            last_seen_uid: Highest UID already handled (0 = no checkpoint yet)
+
+        Returns:
+            Sorted list of new UIDs
+        """
+        if last_seen_uid:
+            status, data = imap.uid('SEARCH', None, f'UID {last_seen_uid + 1}:*', 'UNSEEN')
+        else:
+            status, data = imap.uid('SEARCH', None, 'UNSEEN')
+
+        if status != 'OK' or not data or not data[0]:
+            return []
+
+        # "n:*" always matches the highest UID, even when it is below n
+        return sorted(uid for uid in map(int, data[0].split()) if uid > last_seen_uid)
+
+    def fetch_message_summaries(self, imap, uids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Fetch routing headers and BODYSTRUCTURE for many messages in batched round trips
+
+        Message bodies are not downloaded here, so rejected emails cost only a
+        few hundred bytes each.
+
+        Args:
+            imap: IMAP connection with INBOX selected
+            uids: UIDs to fetch
+
+        Returns:
+            Mapping of UID to {'headers': Message, 'attachment_parts': [AttachmentPart]}
+        """
+        summaries = {}
+        batch_size = max(1, settings.email_processing.imap_fetch_batch_size)
+        header_parser = BytesHeaderParser()
+
+        for offset in range(0, len(uids), batch_size):
+            batch = uids[offset:offset + batch_size]
+            status, data = imap.uid(
+                'FETCH',
+                ','.join(str(uid) for uid in batch),
+                f'(UID BODY.PEEK[HEADER.FIELDS ({self.ROUTING_HEADERS})] BODYSTRUCTURE)'
+            )
+            if status != 'OK':
+                logger.error(f"[EMAIL POLL] Batched header fetch failed for UIDs {batch}: {status}")
+                continue
+
+            for uid, items in parse_fetch_response(data).items():
+                raw_headers = next(
+                    (value for key, value in items.items() if key.startswith('BODY[HEADER')),
+                    b''
+                )
+                summaries[uid] = {
+                    'headers': header_parser.parsebytes(raw_headers or b''),
+                    'attachment_parts': find_attachment_parts(items.get('BODYSTRUCTURE'))
+                }
+
+        return summaries
+
+    def spool_attachment_parts(self, imap, uid: int, parts: List[AttachmentPart]) -> List[Dict[str, Any]]:
+        """
+        Download only the attachment body parts of a message and spool them to disk
+
+        Each part is decoded and written to temp storage immediately, so the
+        pipeline passes file paths around instead of holding payloads in memory.
+
+        Args:
+            imap: IMAP connection with INBOX selected
+            uid: Message UID
+            parts: Attachment parts located via BODYSTRUCTURE
+
+        Returns:
+            List of {'filename', 'path', 'size', 'content_type'} dictionaries
+        """
+        if not parts:
+            return []
+
+        sections = ' '.join(f'BODY.PEEK[{part.section}]' for part in parts)
+        status, data = imap.uid('FETCH', str(uid), f'(UID {sections})')
+        if status != 'OK':
+            raise imaplib.IMAP4.error(f"Failed to fetch attachment parts for UID {uid}: {status}")
+
+        items = parse_fetch_response(data).get(uid, {})
+        del data
+        spooled = []
+
+        try:
+            for part in parts:
+                payload = items.pop(f'BODY[{part.section}]', None)
+                if not payload:
+                    continue
+
+                attachment = {
+                    'filename': self.decode_email_header(part.filename),
+                    'data': decode_part_payload(payload, part.encoding),
+                    'content_type': part.content_type
+                }
+                if not attachment['data']:
+                    continue
+
+                filepath = self.save_attachment_to_temp(attachment)
+                if not filepath:
+                    raise OSError(f"Failed to spool attachment {attachment['filename']}")
+
+                spooled.append({
+                    'filename': attachment['filename'],
+                    'path': filepath,
+                    'size': len(attachment['data']),
+                    'content_type': part.content_type
+                })
+        except Exception:
+            self.cleanup_temp_files([item['path'] for item in spooled])
+            raise
+
+        return spooled
+
+    def log_mailbox_diagnostics(self, imap):
+        """
+        Log folder list and unread counts of spam/trash folders
+
+        Only called when debug logging is enabled; uses STATUS so the
+        selected mailbox is left untouched.
+
+        Args:
+            imap: IMAP connection
+        """
+        try:
+            status, folder_list = imap.list()
+            if status == 'OK':
+                for folder in folder_list:
+                    logger.debug(f"[IMAP FOLDERS]   - {folder.decode()}")
+
+            for folder_name in ['Spam', 'Junk', '[Gmail]/Spam', 'Trash']:
+                status, data = imap.status(f'"{folder_name}"', '(MESSAGES UNSEEN)')
+                if status == 'OK' and data and data[0]:
+                    logger.debug(f"[FOLDER CHECK] {data[0].decode(errors='ignore')}")
+        except Exception as e:
+            logger.debug(f"[IMAP FOLDERS] Diagnostics failed: {str(e)}")
+
     async def poll_inbox(self) -> int:
         """
-        Poll IMAP inbox for new emails sent to @doc.bonidoc.com
+        Fetch new emails sent to @doc.bonidoc.com and process them
+
+        Incremental: only UIDs above the stored checkpoint are considered.
+        Routing headers and BODYSTRUCTURE are fetched in batches first, and
+        bodies are downloaded part-by-part only for accepted emails.
+
+        Accepted emails go through a bounded producer/consumer pipeline: this
+        coroutine screens and spools emails (it owns the IMAP connection) while
+        worker tasks scan, analyze and upload attachments concurrently.
 
         Returns:
             Number of emails processed
         """
-        imap = None
-        processed_count = 0
+        config = settings.email_processing
 
         try:
-            # Connect to IMAP
-            logger.info(f"[EMAIL POLL START] ========================================")
-            logger.info(f"[EMAIL POLL START] IMAP CONFIGURATION:")
-            logger.info(f"[EMAIL POLL START]   Host: {self.imap_host}:{self.imap_port}")
-            logger.info(f"[EMAIL POLL START]   User: {self.imap_user}")
-            logger.info(f"[EMAIL POLL START]   SSL: {self.imap_use_ssl}")
-            logger.info(f"[EMAIL POLL START]   Domain: {self.doc_domain}")
-            logger.info(f"[EMAIL POLL START] ========================================")
-
-            imap = self.connect_to_imap()
+            imap = await asyncio.to_thread(self.get_imap_connection)
             if not imap:
-                logger.error("[EMAIL DEBUG] Failed to connect to IMAP")
+                logger.error("[EMAIL POLL] Failed to connect to IMAP")
                 return 0
 
-            logger.info("[EMAIL DEBUG] ✓ IMAP connection successful")
+            if settings.app.app_debug_logging:
+                self.log_mailbox_diagnostics(imap)
 
-            # COMPREHENSIVE DEBUG: List ALL folders
-            logger.info("[IMAP FOLDERS] ========================================")
-            logger.info("[IMAP FOLDERS] Listing ALL available folders:")
-            try:
-                status, folder_list = imap.list()
-                if status == 'OK':
-                    for folder in folder_list:
-                        logger.info(f"[IMAP FOLDERS]   - {folder.decode()}")
-                else:
-                    logger.error(f"[IMAP FOLDERS] Failed to list folders. Status: {status}")
-            except Exception as folder_error:
-                logger.error(f"[IMAP FOLDERS] Error listing folders: {str(folder_error)}")
-            logger.info("[IMAP FOLDERS] ========================================")
-
-            # Select inbox
-            logger.info("[EMAIL DEBUG] Selecting INBOX folder")
-            status, data = imap.select('INBOX')
-            logger.info(f"[EMAIL DEBUG] INBOX selected. Status: {status}, Message count: {data[0].decode() if data and data[0] else 'N/A'}")
-
-            # COMPREHENSIVE DEBUG: Show ALL emails in INBOX (not just UNSEEN)
-            logger.info("[INBOX ALL EMAILS] ========================================")
-            logger.info("[INBOX ALL EMAILS] Searching for ALL emails in INBOX:")
-            try:
-                status, all_messages = imap.search(None, 'ALL')
-                if status == 'OK':
-                    all_email_ids = all_messages[0].split()
-                    logger.info(f"[INBOX ALL EMAILS] Total emails in INBOX: {len(all_email_ids)}")
-                    logger.info(f"[INBOX ALL EMAILS] Email IDs: {all_email_ids}")
-
-                    # Show flags and basic info for each email
-                    for idx, email_id in enumerate(all_email_ids[:10]):  # Show first 10
-                        try:
-                            # Fetch flags
-                            status, flag_data = imap.fetch(email_id, '(FLAGS)')
-                            flags = flag_data[0].decode() if flag_data and flag_data[0] else 'N/A'
-
-                            # Fetch headers - CRITICAL: Use BODY.PEEK to avoid marking emails as \Seen
-                            status, header_data = imap.fetch(email_id, '(BODY.PEEK[HEADER.FIELDS (FROM TO DELIVERED-TO SUBJECT DATE)])')
-                            headers = header_data[0][1].decode('utf-8', errors='ignore') if header_data and len(header_data[0]) > 1 else 'N/A'
-
-                            logger.info(f"[INBOX ALL EMAILS] Email #{idx+1} (ID: {email_id.decode()}):")
-                            logger.info(f"[INBOX ALL EMAILS]   Flags: {flags}")
-                            logger.info(f"[INBOX ALL EMAILS]   Headers:\n{headers}")
-                        except Exception as email_error:
-                            logger.error(f"[INBOX ALL EMAILS] Error fetching details for email {email_id}: {str(email_error)}")
-
-                    if len(all_email_ids) > 10:
-                        logger.info(f"[INBOX ALL EMAILS] ... and {len(all_email_ids) - 10} more emails (showing first 10 only)")
-                else:
-                    logger.error(f"[INBOX ALL EMAILS] Failed to search ALL emails. Status: {status}")
-            except Exception as all_error:
-                logger.error(f"[INBOX ALL EMAILS] Error searching ALL emails: {str(all_error)}")
-            logger.info("[INBOX ALL EMAILS] ========================================")
-
-            # COMPREHENSIVE DEBUG: Check Spam/Junk folders
-            for folder_name in ['Spam', 'Junk', 'SPAM', 'JUNK', '[Gmail]/Spam', 'Trash', 'TRASH']:
-                logger.info(f"[FOLDER CHECK] Checking folder: {folder_name}")
-                try:
-                    status, data = imap.select(folder_name)
-                    if status == 'OK':
-                        logger.info(f"[FOLDER CHECK] ✓ Folder '{folder_name}' exists, messages: {data[0].decode() if data and data[0] else 'N/A'}")
-
-                        # Search for UNSEEN in this folder
-                        status, messages = imap.search(None, 'UNSEEN')
-                        if status == 'OK':
-                            spam_email_ids = messages[0].split()
-                            logger.info(f"[FOLDER CHECK]   UNSEEN emails in {folder_name}: {len(spam_email_ids)}")
-                            if spam_email_ids:
-                                logger.warning(f"[FOLDER CHECK]   ⚠️  UNSEEN emails found in {folder_name}: {spam_email_ids}")
-                    else:
-                        logger.info(f"[FOLDER CHECK] Folder '{folder_name}' not found or not accessible")
-                except Exception as folder_error:
-                    logger.info(f"[FOLDER CHECK] Folder '{folder_name}' does not exist or error: {str(folder_error)}")
-
-            # Re-select INBOX for actual processing
-            logger.info("[EMAIL DEBUG] Re-selecting INBOX for processing")
-            status, data = imap.select('INBOX')
-
-            # Search for unread emails
-            logger.info("[EMAIL DEBUG] Searching for UNSEEN emails in INBOX")
-            status, messages = imap.search(None, 'UNSEEN')
+            status, _ = imap.select('INBOX')
             if status != 'OK':
-                logger.error(f"[EMAIL DEBUG] Failed to search for UNSEEN emails. Status: {status}")
+                logger.error(f"[EMAIL POLL] Failed to select INBOX. Status: {status}")
                 return 0
 
-            email_ids = messages[0].split()
-            logger.info(f"[EMAIL POLL] ========================================")
-            logger.info(f"[EMAIL POLL] Found {len(email_ids)} UNSEEN emails in INBOX")
-            logger.info(f"[EMAIL POLL] Email IDs: {email_ids}")
-            logger.info(f"[EMAIL POLL] ========================================")
+            state = self.get_sync_checkpoint('INBOX', get_uid_validity(imap))
+            uids = await asyncio.to_thread(self.search_new_uids, imap, state.last_seen_uid or 0)
+            if not uids:
+                self.save_sync_checkpoint(state, state.last_seen_uid or 0)
+                logger.debug("[EMAIL POLL] No new emails")
+                return 0
 
-            for email_id in email_ids:
-                try:
-                    logger.info(f"[EMAIL START] ========================================")
-                    logger.info(f"[EMAIL START] Processing email ID: {email_id}")
-                    logger.info(f"[EMAIL START] ========================================")
-
-                    # Fetch email
-                    status, msg_data = imap.fetch(email_id, '(RFC822)')
-                    if status != 'OK' or not msg_data or not msg_data[0]:
-                        logger.error(f"[EMAIL] ❌ Failed to fetch email {email_id}. Status: {status}, Data: {msg_data}")
-                        continue
-
-                    # Parse email
-                    email_body = msg_data[0][1]
-                    email_message = email.message_from_bytes(email_body)
-
-                    # Extract headers - check multiple headers to find original recipient
-                    # When emails are forwarded, the original recipient may be in different headers
-                    recipient_raw = (
-                        email_message.get('Delivered-To') or  # Original recipient (most reliable)
-                        email_message.get('X-Original-To') or  # Forwarding header
-                        email_message.get('X-Forwarded-To') or  # Alternative forwarding header
-                        email_message.get('Envelope-To') or  # SMTP envelope recipient
-                        email_message.get('To', '')  # Standard To header (may be modified)
-                    )
-                    sender_raw = email_message.get('From', '')
-                    subject_raw = email_message.get('Subject', '')
-                    message_id = email_message.get('Message-ID', '')
-
-                    logger.debug(f"[EMAIL] Headers - From: {sender_raw} | To: {email_message.get('To', '')} | Delivered-To: {email_message.get('Delivered-To', 'N/A')} | Subject: {subject_raw}")
-
-                    # Decode
-                    recipient_email = self.extract_email_address(recipient_raw)
-                    sender_email = self.extract_email_address(sender_raw)
-                    subject = self.decode_email_header(subject_raw)
-
-                    # Skip system-generated emails (contact form notifications, etc.)
-                    if sender_email and sender_email.lower() == settings.email.email_from_noreply.lower():
-                        logger.info(f"[EMAIL] Skipping system email from {sender_email}: {subject}")
-                        continue
-
-                    # Extract attachments to get count and size for validation
-                    attachments = self.extract_attachments(email_message)
-                    attachment_count = len(attachments)
-                    total_size = sum(att['size'] for att in attachments)
-
-                    logger.info(f"Processing email: {sender_email} -> {recipient_email}")
-
-                    # SECURITY GATE #1: Find user by unique email processing address (1:1 relationship)
-                    # This is the definitive check - if processing address exists in DB, it's valid
-                    logger.debug(f"[EMAIL] GATE #1: Looking up user by processing address: {recipient_email}")
-                    user = self.find_user_by_email_address(recipient_email)
-                    if not user:
-                        logger.error(f"[EMAIL REJECTION] ❌ GATE #1 FAILED - No user found")
-                        logger.error(f"[EMAIL REJECTION] Recipient address: {recipient_email}")
-                        logger.error(f"[EMAIL REJECTION] Sender: {sender_email}")
-                        logger.error(f"[EMAIL REJECTION] Subject: {subject}")
-                        logger.error(f"[EMAIL REJECTION] This email address is not registered in the system")
-                        logger.error(f"[EMAIL REJECTION] Deleting email {email_id} from inbox")
-                        try:
-                            self.delete_email_from_inbox(imap, email_id)
-                            logger.error(f"[EMAIL REJECTION] ✓ Email {email_id} deleted successfully")
-                        except Exception as del_error:
-                            logger.error(f"[EMAIL REJECTION] ❌ FAILED to delete email {email_id}: {str(del_error)}", exc_info=True)
-                        continue
-                    logger.debug(f"[EMAIL] ✓ GATE #1 PASSED - User found: {user.email} (ID: {user.id})")
-
-                    # SECURITY GATE #2 & #3: Check sender is allowed and active
-                    logger.debug(f"[EMAIL] Checking if sender {sender_email} is allowed for user {user.id}")
-                    is_allowed, allowed_sender = self.is_sender_allowed(str(user.id), sender_email)
-                    logger.debug(f"[EMAIL] is_sender_allowed returned: is_allowed={is_allowed}, allowed_sender={allowed_sender}")
-
-                    if not is_allowed:
-                        rejection_reason = f"Sender {sender_email} not in whitelist"
-                        logger.error(f"[EMAIL REJECTION] ❌ GATE #2 FAILED - Sender not whitelisted")
-                        logger.error(f"[EMAIL REJECTION] User: {user.email} (ID: {user.id})")
-                        logger.error(f"[EMAIL REJECTION] Sender: {sender_email}")
-                        logger.error(f"[EMAIL REJECTION] Recipient: {recipient_email}")
-                        logger.error(f"[EMAIL REJECTION] Subject: {subject}")
-                        logger.error(f"[EMAIL REJECTION] Creating rejection log and sending notification")
-
-                        # Create log
-                        try:
-                            log = self.create_processing_log(
-                                user_id=str(user.id),
-                                sender_email=sender_email,
-                                recipient_email=recipient_email,
-                                subject=subject,
-                                message_id=message_id,
-                                uid=str(email_id),
-                                attachment_count=attachment_count,
-                                total_size_bytes=total_size,
-                                status='rejected',
-                                rejection_reason=rejection_reason
-                            )
-                            logger.error(f"[EMAIL REJECTION] ✓ Rejection log created successfully: {log.id if log else 'FAILED'}")
-                        except Exception as log_error:
-                            logger.error(f"[EMAIL REJECTION] ❌ FAILED to create rejection log: {str(log_error)}", exc_info=True)
-
-                        # Send notification
-                        try:
-                            await self.send_rejection_notification(
-                                user, sender_email, subject, rejection_reason
-                            )
-                            logger.error(f"[EMAIL REJECTION] ✓ Rejection notification sent to {user.email}")
-                        except Exception as notif_error:
-                            logger.error(f"[EMAIL REJECTION] ❌ FAILED to send rejection notification: {str(notif_error)}", exc_info=True)
-
-                        logger.error(f"[EMAIL REJECTION] Deleting email {email_id} from inbox")
-                        try:
-                            self.delete_email_from_inbox(imap, email_id)
-                            logger.error(f"[EMAIL REJECTION] ✓ Email {email_id} deleted successfully")
-                        except Exception as del_error:
-                            logger.error(f"[EMAIL REJECTION] ❌ FAILED to delete email {email_id}: {str(del_error)}", exc_info=True)
-                        continue
-                    logger.debug(f"[EMAIL] ✓ GATE #2 PASSED - Sender is whitelisted: {sender_email}")
-
-                    # SECURITY GATE #4 & #5: Quota check removed (Pro tier has unlimited email processing)
-                    # Future: Add quota check here for Free tier if needed
-
-                    # SECURITY GATE #6: Check attachment count
-                    logger.debug(f"[EMAIL] GATE #6: Checking attachment count: {attachment_count}")
-                    if attachment_count == 0:
-                        logger.error(f"[EMAIL REJECTION] ❌ GATE #6 FAILED - No attachments")
-                        logger.error(f"[EMAIL REJECTION] Sender: {sender_email}")
-                        logger.error(f"[EMAIL REJECTION] Recipient: {recipient_email}")
-                        logger.error(f"[EMAIL REJECTION] Subject: {subject}")
-                        rejection_reason = "No attachments found in email"
-
-                        self.create_processing_log(
-                            user_id=str(user.id),
-                            sender_email=sender_email,
-                            recipient_email=recipient_email,
-                            subject=subject,
-                            message_id=message_id,
-                            uid=str(email_id),
-                            attachment_count=0,
-                            total_size_bytes=0,
-                            status='rejected',
-                            rejection_reason=rejection_reason
-                        )
-
-                        await self.send_rejection_notification(
-                            user.email, sender_email, subject, rejection_reason
-                        )
-
-                        logger.error(f"[EMAIL DEBUG] Deleting email {email_id}")
-                        self.delete_email_from_inbox(imap, email_id)
-                        continue
-                    logger.debug(f"[EMAIL] ✓ Has {attachment_count} attachments")
-
-                    if attachment_count > settings.email_processing.max_attachments_per_email:
-                        rejection_reason = f"Too many attachments ({attachment_count} > {settings.email_processing.max_attachments_per_email})"
-                        logger.warning(f"Too many attachments from {sender_email}")
-
-                        self.create_processing_log(
-                            user_id=str(user.id),
-                            sender_email=sender_email,
-                            recipient_email=recipient_email,
-                            subject=subject,
-                            message_id=message_id,
-                            uid=str(email_id),
-                            attachment_count=attachment_count,
-                            total_size_bytes=total_size,
-                            status='rejected',
-                            rejection_reason=rejection_reason
-                        )
-
-                        await self.send_rejection_notification(
-                            user.email, sender_email, subject, rejection_reason
-                        )
-
-                        self.delete_email_from_inbox(imap, email_id)
-                        continue
-
-                    # SECURITY GATE #7: Check total size
-                    logger.debug(f"[EMAIL] Checking total size: {total_size} bytes ({total_size / 1024 / 1024:.2f}MB)")
-                    max_size_bytes = settings.email_processing.max_attachment_size_mb * 1024 * 1024
-                    if total_size > max_size_bytes:
-                        rejection_reason = f"Attachments too large ({total_size / 1024 / 1024:.1f}MB > {settings.email_processing.max_attachment_size_mb}MB)"
-                        logger.error(f"[EMAIL DEBUG] REJECTED - Attachments too large from {sender_email}")
-
-                        self.create_processing_log(
-                            user_id=str(user.id),
-                            sender_email=sender_email,
-                            recipient_email=recipient_email,
-                            subject=subject,
-                            message_id=message_id,
-                            uid=str(email_id),
-                            attachment_count=attachment_count,
-                            total_size_bytes=total_size,
-                            status='rejected',
-                            rejection_reason=rejection_reason
-                        )
-
-                        await self.send_rejection_notification(
-                            user.email, sender_email, subject, rejection_reason
-                        )
-
-                        logger.error(f"[EMAIL DEBUG] Deleting email {email_id}")
-                        self.delete_email_from_inbox(imap, email_id)
-                        continue
-                    logger.debug(f"[EMAIL] ✓ Size check passed")
-
-                    # PASSED ALL SECURITY GATES - PROCESSING EMAIL
-                    logger.debug(f"[EMAIL] ========================================")
-                    logger.debug(f"[EMAIL] ✓✓✓ EMAIL PASSED ALL CHECKS - PROCESSING ✓✓✓")
-                    logger.debug(f"[EMAIL] ========================================")
-
-                    # Create processing log
-                    logger.debug(f"[EMAIL] Creating processing log")
-                    log = self.create_processing_log(
-                        user_id=str(user.id),
-                        sender_email=sender_email,
-                        recipient_email=recipient_email,
-                        subject=subject,
-                        message_id=message_id,
-                        uid=str(email_id),
-                        attachment_count=attachment_count,
-                        total_size_bytes=total_size,
-                        status='processing'
-                    )
+            logger.info(f"[EMAIL POLL] Found {len(uids)} new UNSEEN emails above UID {state.last_seen_uid}")
 
-                    # Save attachments to temp storage
-                    logger.debug(f"[EMAIL] Saving {len(attachments)} attachments to temp storage")
-                    temp_files = []
-                    filenames = []
-                    for attachment in attachments:
-                        logger.debug(f"[EMAIL] Saving attachment: {attachment['filename']}")
-                        filepath = self.save_attachment_to_temp(attachment)
-                        if filepath:
-                            temp_files.append(filepath)
-                            filenames.append(attachment['filename'])
-                            logger.debug(f"[EMAIL] ✓ Saved to {filepath}")
-                        else:
-                            logger.error(f"[EMAIL DEBUG] Failed to save attachment: {attachment['filename']}")
-
-                    logger.debug(f"[EMAIL] Saved {len(temp_files)} files successfully")
-
-                    # Update log with filenames
-                    log.attachment_filenames = json.dumps(filenames)
-                    log.processing_started_at = datetime.utcnow()
-                    self.db.commit()
-
-                    # Process attachments: scan, analyze, upload
-                    logger.debug(f"[EMAIL] Starting attachment processing (scan, analyze, upload)")
-                    documents_created, uploaded_document_ids, processing_errors, malware_detected = await self.process_attachments(
-                        temp_files=temp_files,
-                        filenames=filenames,
-                        user=user,
-                        sender_email=sender_email,
-                        subject=subject,
-                        email_id=email_id
-                    )
+            summaries = await asyncio.to_thread(self.fetch_message_summaries, imap, uids)
 
-                    logger.debug(f"[EMAIL] Processing complete. Results:")
-                    logger.debug(f"[EMAIL]   - Documents created: {documents_created}")
-                    logger.debug(f"[EMAIL]   - Document IDs: {uploaded_document_ids}")
-                    logger.debug(f"[EMAIL]   - Malware detected: {malware_detected}")
-                    logger.debug(f"[EMAIL]   - Processing errors: {processing_errors}")
-
-                    # Handle malware detection
-                    if malware_detected:
-                        rejection_reason = f"Malware/threats detected: {', '.join(processing_errors)}"
-                        logger.error(f"[EMAIL DEBUG] REJECTED - Malware detected: {rejection_reason}")
-
-                        # Update log
-                        log.status = 'rejected'
-                        log.rejection_reason = rejection_reason
-                        log.error_code = 'MALWARE_DETECTED'
-                        log.processing_completed_at = datetime.utcnow()
-                        self.db.commit()
-
-                        # Cleanup
-                        self.cleanup_temp_files(temp_files)
-                        self.delete_email_from_inbox(imap, email_id)
-
-                        # Notify user
-                        await self.send_rejection_notification(
-                            user.email, sender_email, subject, rejection_reason
-                        )
-                        continue
-
-                    # Handle processing failures
-                    if documents_created == 0:
-                        rejection_reason = f"Failed to process attachments: {'; '.join(processing_errors)}"
-                        logger.error(f"[EMAIL DEBUG] FAILED - No documents created: {rejection_reason}")
-
-                        # Update log
-                        log.status = 'failed'
-                        log.rejection_reason = rejection_reason
-                        log.error_code = 'PROCESSING_FAILED'
-                        log.error_message = json.dumps(processing_errors)
-                        log.processing_completed_at = datetime.utcnow()
-                        self.db.commit()
-
-                        # Cleanup
-                        self.cleanup_temp_files(temp_files)
-                        self.delete_email_from_inbox(imap, email_id)
-
-                        # Notify user
-                        await self.send_rejection_notification(
-                            user.email, sender_email, subject, rejection_reason
-                        )
-                        continue
-
-                    # SUCCESS! Email passed all checks and documents created
-                    logger.debug(f"[EMAIL] ========================================")
-                    logger.debug(f"[EMAIL] ✓✓✓ SUCCESS - {documents_created} DOCUMENTS CREATED ✓✓✓")
-                    logger.debug(f"[EMAIL] ========================================")
-
-                    # Update log with document IDs
-                    log.processing_metadata = json.dumps({
-                        'uploaded_document_ids': uploaded_document_ids,
-                        'processing_errors': processing_errors
-                    })
-
-                    # Update usage
-                    logger.debug(f"[EMAIL] Updating monthly usage for user {user.id}")
-                    self.increment_monthly_usage(str(user.id), documents_created)
-
-                    # Update allowed sender stats
-                    if allowed_sender:
-                        logger.debug(f"[EMAIL] Updating sender stats for {sender_email}")
-                        self.update_allowed_sender_stats(allowed_sender)
-
-                    # Update log
-                    log.status = 'completed'
-                    log.documents_created = documents_created
-                    log.processing_completed_at = datetime.utcnow()
-                    log.processing_time_ms = int((log.processing_completed_at - log.processing_started_at).total_seconds() * 1000)
-                    self.db.commit()
-                    logger.debug(f"[EMAIL] Processing log updated to 'completed'")
-
-                    # Send completion notification
-                    logger.debug(f"[EMAIL] Sending completion notification to {user.email}")
-                    await self.send_completion_notification(
-                        user, sender_email, subject, documents_created
-                    )
+            # uid -> 'processed' | 'handled' | 'skipped' | 'retry'
+            outcomes: Dict[int, str] = {}
+            queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, config.pipeline_queue_size))
+            workers = [
+                asyncio.create_task(self._pipeline_worker(queue, outcomes))
+                for _ in range(max(1, config.pipeline_workers))
+            ]
 
-                    # CRITICAL CLEANUP: Delete email and temp files
-                    logger.info(f"[EMAIL SUCCESS] ========================================")
-                    logger.info(f"[EMAIL SUCCESS] ✓✓✓ EMAIL PROCESSED SUCCESSFULLY ✓✓✓")
-                    logger.info(f"[EMAIL SUCCESS] ========================================")
-                    logger.info(f"[EMAIL SUCCESS] From: {sender_email}")
-                    logger.info(f"[EMAIL SUCCESS] To: {recipient_email}")
-                    logger.info(f"[EMAIL SUCCESS] User: {user.email}")
-                    logger.info(f"[EMAIL SUCCESS] Documents created: {documents_created}")
-                    logger.info(f"[EMAIL SUCCESS] Cleaning up temp files and deleting email {email_id}")
-                    self.cleanup_temp_files(temp_files)
+            try:
+                for uid in uids:
+                    summary = summaries.get(uid)
                     try:
-                        self.delete_email_from_inbox(imap, email_id)
-                        logger.info(f"[EMAIL SUCCESS] ✓ Email {email_id} deleted from inbox")
-                    except Exception as del_error:
-                        logger.error(f"[EMAIL SUCCESS] ❌ FAILED to delete email {email_id}: {str(del_error)}", exc_info=True)
-                    logger.info(f"[EMAIL SUCCESS] ✓ Cleanup complete")
-
-                    processed_count += 1
-                    logger.info(f"[EMAIL SUCCESS] Total emails processed in this batch: {processed_count}")
-                    logger.info(f"[EMAIL SUCCESS] ========================================")
-
-                except Exception as e:
-                    logger.error(f"[EMAIL CRITICAL] Exception during email processing for ID {email_id}")
-                    logger.error(f"[EMAIL CRITICAL] Exception type: {type(e).__name__}")
-                    logger.error(f"[EMAIL CRITICAL] Exception message: {str(e)}", exc_info=True)
-                    logger.error(f"[EMAIL CRITICAL] Email details - From: {sender_email if 'sender_email' in locals() else 'UNKNOWN'} | To: {recipient_email if 'recipient_email' in locals() else 'UNKNOWN'}")
-                    logger.error(f"[EMAIL CRITICAL] Email will NOT be deleted - will retry on next poll")
-                    # Cleanup any temp files
-                    if 'temp_files' in locals():
-                        self.cleanup_temp_files(temp_files)
-                    continue
+                        if summary is None:
+                            raise imaplib.IMAP4.error(f"No FETCH data returned for UID {uid}")
 
-            # Poll summary
-            logger.info(f"[EMAIL POLL COMPLETE] ========================================")
-            logger.info(f"[EMAIL POLL COMPLETE] Polling cycle finished")
-            logger.info(f"[EMAIL POLL COMPLETE] Total UNSEEN emails found: {len(email_ids)}")
-            logger.info(f"[EMAIL POLL COMPLETE] Successfully processed: {processed_count}")
-            logger.info(f"[EMAIL POLL COMPLETE] Rejected/Failed: {len(email_ids) - processed_count}")
-            logger.info(f"[EMAIL POLL COMPLETE] ========================================")
+                        job = await self._prepare_message(imap, uid, summary['headers'], summary['attachment_parts'])
+                        if isinstance(job, str):
+                            outcomes[uid] = job
+                        else:
+                            # Blocks when workers fall behind, bounding spooled disk usage
+                            await queue.put(job)
+
+                    except Exception as e:
+                        logger.error(f"[EMAIL CRITICAL] Exception during email processing for UID {uid}: {type(e).__name__}: {str(e)}", exc_info=True)
+                        logger.error(f"[EMAIL CRITICAL] Email will NOT be deleted - will retry on next poll")
+                        outcomes[uid] = 'retry'
+                        if isinstance(e, (imaplib.IMAP4.abort, OSError)):
+                            break
+
+                await queue.join()
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+            finished = [uid for uid, outcome in outcomes.items() if outcome in ('processed', 'handled')]
+            if finished and EmailProcessingService._persistent_imap is imap:
+                self.delete_emails_from_inbox(imap, finished)
+                imap.expunge()
+
+            # Checkpoint may only advance past UIDs that do not need a retry
+            checkpoint = state.last_seen_uid or 0
+            for uid in uids:
+                if outcomes.get(uid, 'retry') == 'retry':
+                    break
+                checkpoint = uid
+            self.save_sync_checkpoint(state, checkpoint)
 
+            processed_count = sum(1 for outcome in outcomes.values() if outcome == 'processed')
+            logger.info(f"[EMAIL POLL COMPLETE] New emails: {len(uids)}, processed: {processed_count}, rejected/failed: {len(uids) - processed_count}")
             return processed_count
 
         except Exception as e:
             logger.error(f"Error polling inbox: {str(e)}")
+            self.close_imap_connection()
             return 0
 
+    async def _prepare_message(
+        self,
+        imap,
+        uid: int,
+        headers: Message,
+        attachment_parts: List[AttachmentPart]
+    ) -> Union[Dict[str, Any], str]:
+        """
+        Run the security gates on one email and spool its attachments to disk
+
+        Rejected emails are logged and their users notified here. The caller
+        deletes every handled email once the poll cycle has finished.
+
+        Args:
+            imap: IMAP connection with INBOX selected
+            uid: Message UID
+            headers: Parsed routing headers
+            attachment_parts: Attachment parts located via BODYSTRUCTURE
+
+        Returns:
+            Pipeline job for accepted emails, otherwise 'handled' (rejected,
+            to be deleted) or 'skipped' (left in the inbox)
+        """
+        # Extract headers - check multiple headers to find original recipient
+        # When emails are forwarded, the original recipient may be in different headers
+        recipient_raw = (
+            headers.get('Delivered-To') or  # Original recipient (most reliable)
+            headers.get('X-Original-To') or  # Forwarding header
+            headers.get('X-Forwarded-To') or  # Alternative forwarding header
+            headers.get('Envelope-To') or  # SMTP envelope recipient
+            headers.get('To', '')  # Standard To header (may be modified)
+        )
+        sender_raw = headers.get('From', '')
+        subject_raw = headers.get('Subject', '')
+        message_id = headers.get('Message-ID', '')
+
+        # Decode
+        recipient_email = self.extract_email_address(recipient_raw)
+        sender_email = self.extract_email_address(sender_raw)
+        subject = self.decode_email_header(subject_raw)
+
+        # Skip system-generated emails (contact form notifications, etc.) without deleting them
+        if sender_email and sender_email.lower() == settings.email.email_from_noreply.lower():
+            logger.info(f"[EMAIL] Skipping system email from {sender_email}: {subject}")
+            return 'skipped'
+
+        # Attachment count and size come from BODYSTRUCTURE - no body download needed yet
+        attachment_count = len(attachment_parts)
+        total_size = sum(part.estimated_size for part in attachment_parts)
+
+        logger.info(f"Processing email UID {uid}: {sender_email} -> {recipient_email}")
+
+        # SECURITY GATE #1: Find user by unique email processing address (1:1 relationship)
+        # This is the definitive check - if processing address exists in DB, it's valid
+        user = self.find_user_by_email_address(recipient_email)
+        if not user:
+            logger.error(f"[EMAIL REJECTION] GATE #1 FAILED - No user found for {recipient_email} (sender: {sender_email}, subject: {subject})")
+            return 'handled'
+
+        def reject(reason: str, count: int, size: int):
+            try:
+                self.create_processing_log(
+                    user_id=str(user.id),
+                    sender_email=sender_email,
+                    recipient_email=recipient_email,
+                    subject=subject,
+                    message_id=message_id,
+                    uid=str(uid),
+                    attachment_count=count,
+                    total_size_bytes=size,
+                    status='rejected',
+                    rejection_reason=reason
+                )
+            except Exception as log_error:
+                self.db.rollback()
+                logger.error(f"[EMAIL REJECTION] FAILED to create rejection log: {str(log_error)}", exc_info=True)
+
+        # SECURITY GATE #2 & #3: Check sender is allowed and active
+        is_allowed, allowed_sender = self.is_sender_allowed(str(user.id), sender_email)
+
+        if not is_allowed:
+            rejection_reason = f"Sender {sender_email} not in whitelist"
+            logger.error(f"[EMAIL REJECTION] GATE #2 FAILED - Sender {sender_email} not whitelisted for user {user.id}")
+            reject(rejection_reason, attachment_count, total_size)
+            await self.send_rejection_notification(
+                user, sender_email, subject, rejection_reason
+            )
+            return 'handled'
+
+        # SECURITY GATE #4 & #5: Quota check removed (Pro tier has unlimited email processing)
+        # Future: Add quota check here for Free tier if needed
+
+        # SECURITY GATE #6: Check attachment count
+        if attachment_count == 0:
+            logger.error(f"[EMAIL REJECTION] GATE #6 FAILED - No attachments from {sender_email}")
+            rejection_reason = "No attachments found in email"
+            reject(rejection_reason, 0, 0)
+            await self.send_rejection_notification(
+                user.email, sender_email, subject, rejection_reason
+            )
+            return 'handled'
+
+        if attachment_count > settings.email_processing.max_attachments_per_email:
+            rejection_reason = f"Too many attachments ({attachment_count} > {settings.email_processing.max_attachments_per_email})"
+            logger.warning(f"Too many attachments from {sender_email}")
+            reject(rejection_reason, attachment_count, total_size)
+            await self.send_rejection_notification(
+                user.email, sender_email, subject, rejection_reason
+            )
+            return 'handled'
+
+        # SECURITY GATE #7: Check total size (estimated before download, verified after)
+        max_size_bytes = settings.email_processing.max_attachment_size_mb * 1024 * 1024
+        attachments = []
+        if total_size <= max_size_bytes:
+            attachments = await asyncio.to_thread(self.spool_attachment_parts, imap, uid, attachment_parts)
+            total_size = sum(att['size'] for att in attachments)
+
+        if total_size > max_size_bytes:
+            self.cleanup_temp_files([att['path'] for att in attachments])
+            rejection_reason = f"Attachments too large ({total_size / 1024 / 1024:.1f}MB > {settings.email_processing.max_attachment_size_mb}MB)"
+            logger.error(f"[EMAIL REJECTION] GATE #7 FAILED - Attachments too large from {sender_email}")
+            reject(rejection_reason, attachment_count, total_size)
+            await self.send_rejection_notification(
+                user.email, sender_email, subject, rejection_reason
+            )
+            return 'handled'
+
+        # PASSED ALL SECURITY GATES - hand over to the processing workers
+        try:
+            log = self.create_processing_log(
+                user_id=str(user.id),
+                sender_email=sender_email,
+                recipient_email=recipient_email,
+                subject=subject,
+                message_id=message_id,
+                uid=str(uid),
+                attachment_count=attachment_count,
+                total_size_bytes=total_size,
+                status='processing'
+            )
+            log.attachment_filenames = json.dumps([att['filename'] for att in attachments])
+            log.processing_started_at = datetime.utcnow()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            self.cleanup_temp_files([att['path'] for att in attachments])
+            raise
+
+        return {
+            'uid': uid,
+            'email_id': str(uid).encode(),
+            'user_id': user.id,
+            'allowed_sender_id': allowed_sender.id if allowed_sender else None,
+            'log_id': log.id,
+            'sender_email': sender_email,
+            'recipient_email': recipient_email,
+            'subject': subject,
+            'attachments': attachments
+        }
+
+    async def _pipeline_worker(self, queue: asyncio.Queue, outcomes: Dict[int, str]):
+        """
+        Consume accepted emails from the pipeline queue until cancelled
+
+        Args:
+            queue: Jobs produced by _prepare_message
+            outcomes: Shared uid -> outcome mapping filled in for poll_inbox
+        """
+        while True:
+            job = await queue.get()
+            try:
+                outcomes[job['uid']] = await self._complete_email_job(job)
+            except Exception as e:
+                logger.error(f"[EMAIL CRITICAL] Processing failed for UID {job['uid']}: {type(e).__name__}: {str(e)}", exc_info=True)
+                outcomes[job['uid']] = 'retry'
+            finally:
+                self.cleanup_temp_files([att['path'] for att in job['attachments']])
+                queue.task_done()
+
+    async def _complete_email_job(self, job: Dict[str, Any]) -> str:
+        """
+        Scan, analyze and upload the attachments of one accepted email
+
+        Runs on its own database session so several emails can be completed
+        concurrently without sharing transaction state.
+
+        Args:
+            job: Pipeline job produced by _prepare_message
+
+        Returns:
+            'processed' if documents were created, otherwise 'handled'
+        """
+        session = db_manager.session_local()
+        try:
+            worker = self._bind_session(session)
+            return await worker._finalize_email(job)
         finally:
-            if imap:
-                try:
-                    imap.close()
-                    imap.logout()
-                except:
-                    pass
+            session.close()
+
+    def _bind_session(self, session: Session) -> 'EmailProcessingService':
+        """Return a copy of this service that uses another database session"""
+        worker = copy.copy(self)
+        worker.db = session
+        return worker
+
+    async def _finalize_email(self, job: Dict[str, Any]) -> str:
+        """
+        Process a job's attachments and record the result (bound to a worker session)
+
+        Args:
+            job: Pipeline job produced by _prepare_message
+
+        Returns:
+            'processed' if documents were created, otherwise 'handled'
+        """
+        user = self.db.get(User, job['user_id'])
+        log = self.db.get(EmailProcessingLog, job['log_id'])
+        if not user or not log:
+            raise ValueError(f"User or processing log vanished for UID {job['uid']}")
+
+        sender_email = job['sender_email']
+        subject = job['subject']
+
+        documents_created, uploaded_document_ids, processing_errors, malware_detected = await self.process_attachments(
+            temp_files=[att['path'] for att in job['attachments']],
+            filenames=[att['filename'] for att in job['attachments']],
+            user=user,
+            sender_email=sender_email,
+            subject=subject,
+            email_id=job['email_id']
+        )
+
+        logger.debug(f"[EMAIL] Processing complete: created={documents_created}, ids={uploaded_document_ids}, malware={malware_detected}, errors={processing_errors}")
+
+        # Handle malware detection
+        if malware_detected:
+            rejection_reason = f"Malware/threats detected: {', '.join(processing_errors)}"
+            logger.error(f"[EMAIL REJECTION] Malware detected: {rejection_reason}")
+
+            log.status = 'rejected'
+            log.rejection_reason = rejection_reason
+            log.error_code = 'MALWARE_DETECTED'
+            log.processing_completed_at = datetime.utcnow()
+            self.db.commit()
+
+            await self.send_rejection_notification(
+                user.email, sender_email, subject, rejection_reason
+            )
+            return 'handled'
+
+        # Handle processing failures
+        if documents_created == 0:
+            rejection_reason = f"Failed to process attachments: {'; '.join(processing_errors)}"
+            logger.error(f"[EMAIL] FAILED - No documents created: {rejection_reason}")
+
+            log.status = 'failed'
+            log.rejection_reason = rejection_reason
+            log.error_code = 'PROCESSING_FAILED'
+            log.error_message = json.dumps(processing_errors)
+            log.processing_completed_at = datetime.utcnow()
+            self.db.commit()
+
+            await self.send_rejection_notification(
+                user.email, sender_email, subject, rejection_reason
+            )
+            return 'handled'
+
+        # SUCCESS! Email passed all checks and documents created
+        log.processing_metadata = json.dumps({
+            'uploaded_document_ids': uploaded_document_ids,
+            'processing_errors': processing_errors
+        })
+
+        self.increment_monthly_usage(str(user.id), documents_created)
+
+        if job['allowed_sender_id']:
+            allowed_sender = self.db.get(AllowedSender, job['allowed_sender_id'])
+            if allowed_sender:
+                self.update_allowed_sender_stats(allowed_sender)
+
+        log.status = 'completed'
+        log.documents_created = documents_created
+        log.processing_completed_at = datetime.utcnow()
+        log.processing_time_ms = int((log.processing_completed_at - log.processing_started_at.replace(tzinfo=None)).total_seconds() * 1000)
+        self.db.commit()
+
+        await self.send_completion_notification(
+            user, sender_email, subject, documents_created
+        )
+
+        logger.info(f"[EMAIL SUCCESS] UID {job['uid']} from {sender_email} for {user.email}: {documents_created} documents created")
+        return 'processed'
 
 
 # Global instance
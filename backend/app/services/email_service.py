@@ -4,12 +4,12 @@ Email service using Brevo (Sendinblue) API for transactional emails
 """
 
 import logging
-import httpx
 from typing import Optional, Dict, Any
 from datetime import datetime
 from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.services.email_template_service import email_template_service
+from app.services.email_delivery_service import email_delivery_service
 from app.core.provider_registry import ProviderRegistry
 
 logger = logging.getLogger(__name__)
@@ -104,27 +104,19 @@ class EmailService:
             if reply_to:
                 payload["replyTo"] = {"email": reply_to}
 
-            # Send request to Brevo API
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    self.BREVO_API_URL,
-                    headers={
-                        "api-key": self.api_key,
-                        "Content-Type": "application/json"
-                    },
-                    json=payload
+            # Send request to Brevo API over the shared connection pool
+            response = await email_delivery_service.post(payload)
+
+            if response.status_code == 201:
+                message_id = response.json().get("messageId")
+                logger.info(f"Email sent successfully to {to_email} (ID: {message_id})")
+                return True
+            else:
+                logger.error(
+                    f"Failed to send email to {to_email}: "
+                    f"Status {response.status_code}, Response: {response.text}"
                 )
-
-                if response.status_code == 201:
-                    message_id = response.json().get("messageId")
-                    logger.info(f"Email sent successfully to {to_email} (ID: {message_id})")
-                    return True
-                else:
-                    logger.error(
-                        f"Failed to send email to {to_email}: "
-                        f"Status {response.status_code}, Response: {response.text}"
-                    )
-                    return False
+                return False
 
         except Exception as e:
             logger.error(f"Email sending error to {to_email}: {e}")
@@ -5,11 +5,12 @@ Extracts named entities (people, organizations, addresses) from documents using
 
 import logging
 import re
-from typing import List, Dict, Tuple, Optional, Set
+from typing import List, Dict, Optional, Set
 from dataclasses import dataclass
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from app.services.entity_quality_service import get_entity_quality_service
+from app.services.lexicon_service import lexicon_service
 
 logger = logging.getLogger(__name__)
 
@@ -106,6 +107,20 @@ class EntityExtractionService:
             self._model_loading_attempted.add(language)
             return None
 
+    def preload_models(self, db: Session) -> List[str]:
+        """
+        Load every configured spaCy model up front (analysis worker warm-up)
+
+        Args:
+            db: Database session (required)
+
+        Returns:
+            Languages whose model is loaded
+        """
+        for language in self._get_model_mapping(db):
+            self._get_model(language, db)
+        return list(self._models.keys())
+
     def extract_entities(
         self,
         text: str,
@@ -195,7 +210,7 @@ class EntityExtractionService:
 
             # Create quality service if db provided
             quality_service = get_entity_quality_service(db) if db else None
-            logger.info(f"[QUALITY DEBUG] db provided: {db is not None}, quality_service created: {quality_service is not None}")
+            logger.debug("[QUALITY DEBUG] db provided: %s, quality_service created: %s", db is not None, quality_service is not None)
 
             for ent in doc.ents:
                 entity_type = None
@@ -232,7 +247,7 @@ class EntityExtractionService:
                             base_confidence=base_confidence,
                             language=language
                         )
-                        logger.info(f"[QUALITY DEBUG] Entity '{entity_value[:50]}': base={base_confidence:.2f}, calculated={calculated_confidence:.2f}")
+                        logger.debug("[QUALITY DEBUG] Entity '%s': base=%.2f, calculated=%.2f", entity_value[:50], base_confidence, calculated_confidence)
                     else:
                         # No quality service, use base confidence
                         calculated_confidence = base_confidence
@@ -662,10 +677,11 @@ class EntityExtractionService:
                 return {'accepted': [], 'rejected': []}
             return entities
 
-        # Load filtering rules from database
-        field_labels = self._load_field_labels(db, language)
-        stop_words = self._load_stop_words(db, language)
-        blacklist = self._load_blacklist(db, language)
+        # Load filtering rules from database (shared lexicons, loaded once per process)
+        lexicon = lexicon_service.get(db, language)
+        field_labels = lexicon.field_labels
+        stop_words = lexicon.stop_words
+        blacklist = lexicon.blacklist
 
         # Load confidence thresholds from database (entity-type-specific)
         try:
@@ -687,7 +703,7 @@ class EntityExtractionService:
             ORG_CONFIDENCE_THRESHOLD = threshold_map.get('confidence_threshold_organization', 0.85)
             CONFIDENCE_THRESHOLD = 0.75  # Default fallback for other types
 
-            logger.info(f"[THRESHOLD DEBUG] Loaded thresholds: ADDRESS={ADDRESS_THRESHOLD}, EMAIL={EMAIL_THRESHOLD}, URL={URL_THRESHOLD}, ORG={ORG_CONFIDENCE_THRESHOLD}, DEFAULT={CONFIDENCE_THRESHOLD}")
+            logger.debug("[THRESHOLD DEBUG] Loaded thresholds: ADDRESS=%s, EMAIL=%s, URL=%s, ORG=%s, DEFAULT=%s", ADDRESS_THRESHOLD, EMAIL_THRESHOLD, URL_THRESHOLD, ORG_CONFIDENCE_THRESHOLD, CONFIDENCE_THRESHOLD)
         except Exception as e:
             logger.warning(f"Failed to load confidence thresholds from database: {e}")
             ADDRESS_THRESHOLD = 0.70
@@ -695,7 +711,7 @@ class EntityExtractionService:
             URL_THRESHOLD = 0.75
             ORG_CONFIDENCE_THRESHOLD = 0.85
             CONFIDENCE_THRESHOLD = 0.75
-            logger.info(f"[THRESHOLD DEBUG] Using fallback thresholds: ADDRESS={ADDRESS_THRESHOLD}, EMAIL={EMAIL_THRESHOLD}, URL={URL_THRESHOLD}")
+            logger.debug("[THRESHOLD DEBUG] Using fallback thresholds: ADDRESS=%s, EMAIL=%s, URL=%s", ADDRESS_THRESHOLD, EMAIL_THRESHOLD, URL_THRESHOLD)
 
         filtered = []
         rejected_for_keywords = []  # Collect ORG entities suitable for keyword conversion
@@ -725,7 +741,7 @@ class EntityExtractionService:
             entity.normalized_value = normalized.lower()
 
             # Filter 1: Remove field labels (these are labels, not actual entities)
-            if normalized in field_labels:
+            if normalized.lower() in field_labels:
                 removed_count['field_label'] += 1
                 logger.debug(f"[ENTITY FILTER] Removed field label: {normalized}")
                 continue
@@ -850,65 +866,10 @@ class EntityExtractionService:
 
         return normalized
 
-    def _load_field_labels(self, db: Session, language: str) -> Set[str]:
-        """Load field labels from database"""
-        try:
-            from app.database.models import SystemSetting
-            result = db.execute(
-                select(SystemSetting.setting_value).where(
-                    SystemSetting.setting_key == f'entity_field_labels_{language}'
-                )
-            ).scalar_one_or_none()
-
-            if result:
-                import json
-                return set(json.loads(result))
-
-            # Fallback: query entity_field_labels table directly
-            result = db.execute(
-                select(db.text('label_text')).select_from(db.text('entity_field_labels')).where(
-                    db.text(f"language = '{language}'")
-                )
-            ).fetchall()
-            return {row[0] for row in result}
-
-        except Exception as e:
-            logger.warning(f"Failed to load field labels for {language}: {e}")
-            return set()
-
     # NOTE: Removed _load_invalid_patterns, _load_confidence_thresholds, and _matches_invalid_pattern
     # These are now handled by entity_quality_service.calculate_confidence()
     # which provides unified quality scoring without duplication
 
-    def _load_stop_words(self, db: Session, language: str) -> Set[str]:
-        """Load stop words from database for entity boundary cleaning"""
-        try:
-            from app.database.models import StopWord
-            stop_words = db.query(StopWord).filter(
-                StopWord.language_code == language,
-                StopWord.is_active == True
-            ).all()
-            return {sw.word.lower() for sw in stop_words}
-        except Exception as e:
-            logger.warning(f"Failed to load stop words for {language}: {e}")
-            return set()
-
-    def _load_blacklist(self, db: Session, language: str) -> Set[Tuple[str, str]]:
-        """Load blacklisted entities from database"""
-        try:
-            result = db.execute(
-                db.text("""
-                    SELECT entity_type, LOWER(entity_value)
-                    FROM entity_blacklist
-                    WHERE language = :language
-                """),
-                {"language": language}
-            ).fetchall()
-            return {(row[0], row[1]) for row in result}
-        except Exception as e:
-            logger.warning(f"Failed to load entity blacklist for {language}: {e}")
-            return set()
-
     def deduplicate_entities(self, entities: List[ExtractedEntity]) -> List[ExtractedEntity]:
         """Remove duplicate entities, keeping highest confidence"""
         seen = {}
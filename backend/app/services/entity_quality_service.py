@@ -7,9 +7,11 @@ ALL configuration loaded from database - ZERO hardcoded values
 import logging
 import re
 import subprocess
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, FrozenSet, List, Optional, Tuple
 from sqlalchemy.orm import Session
 
+from app.services.lexicon_service import lexicon_service
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,8 +28,6 @@ class EntityQualityService:
         self.db = db
         self._config_cache: Optional[Dict[str, float]] = None
         self._languages_cache: Optional[Dict[str, Dict]] = None
-        self._stop_words_cache: Optional[Dict[str, Set[str]]] = None
-        self._field_labels_cache: Optional[Dict[str, Set[str]]] = None
         self._type_patterns_cache: Optional[Dict[str, List[Dict]]] = None
 
     def _load_config(self) -> Dict[str, float]:
@@ -85,52 +85,13 @@ class EntityQualityService:
             logger.error(f"Failed to load supported_languages: {e}")
             return {}
 
-    def _load_stop_words(self, language: str) -> Set[str]:
-        """Load stop words from stop_words table"""
-        if self._stop_words_cache is None:
-            self._stop_words_cache = {}
-
-        if language in self._stop_words_cache:
-            return self._stop_words_cache[language]
-
-        try:
-            from app.database.models import StopWord
-
-            stop_words = self.db.query(StopWord).filter(
-                StopWord.language_code == language,
-                StopWord.is_active == True
-            ).all()
-
-            self._stop_words_cache[language] = {sw.word.lower() for sw in stop_words}
-
-            return self._stop_words_cache[language]
-
-        except Exception as e:
-            logger.error(f"Failed to load stop_words for {language}: {e}")
-            return set()
+    def _load_stop_words(self, language: str) -> FrozenSet[str]:
+        """Stop words from the shared lexicon (stop_words table)"""
+        return lexicon_service.stop_words(self.db, language)
 
-    def _load_field_labels(self, language: str) -> Set[str]:
-        """Load field labels from entity_field_labels table"""
-        if self._field_labels_cache is None:
-            self._field_labels_cache = {}
-
-        if language in self._field_labels_cache:
-            return self._field_labels_cache[language]
-
-        try:
-            from app.database.models import EntityFieldLabel
-
-            field_labels = self.db.query(EntityFieldLabel).filter(
-                EntityFieldLabel.language == language
-            ).all()
-
-            self._field_labels_cache[language] = {fl.label_text.lower() for fl in field_labels}
-
-            return self._field_labels_cache[language]
-
-        except Exception as e:
-            logger.error(f"Failed to load field_labels for {language}: {e}")
-            return set()
+    def _load_field_labels(self, language: str) -> FrozenSet[str]:
+        """Field labels from the shared lexicon (entity_field_labels)"""
+        return lexicon_service.field_labels(self.db, language)
 
     def _load_entity_type_patterns(self, entity_type: str, language: str) -> List[Dict]:
         """Load entity type patterns from entity_type_patterns table"""
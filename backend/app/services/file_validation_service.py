@@ -19,6 +19,7 @@ from app.database.connection import db_manager
 from app.services.config_service import config_service
 from app.services.trust_scoring_service import trust_scoring_service
 from app.services.malware_scanner_service import malware_scanner_service
+from app.utils.pdf_document import PDFDocument
 
 logger = logging.getLogger(__name__)
 
@@ -117,11 +118,15 @@ class FileValidationService:
         user_id: str,
         user_tier: str,
         ip_address: Optional[str] = None,
-        session: Optional[Session] = None
+        session: Optional[Session] = None,
+        document: Optional[PDFDocument] = None
     ) -> ValidationResult:
         """
         Multi-layer validation with behavioral trust analysis
         Returns validation result with CAPTCHA requirement if needed
+
+        A parsed PDFDocument of the upload, if the caller has one, is reused
+        for structural validation instead of parsing the file again.
         """
         close_session = False
         if session is None:
@@ -151,7 +156,8 @@ class FileValidationService:
             content_result = await self._validate_content(
                 file_content,
                 filename=filename,
-                mime_type=detected_mime
+                mime_type=detected_mime,
+                document=document
             )
             if not content_result.allowed:
                 return content_result
@@ -277,7 +283,13 @@ class FileValidationService:
             warnings=[]
         )
     
-    async def _validate_content(self, file_content: BinaryIO, filename: str = "", mime_type: str = "") -> ValidationResult:
+    async def _validate_content(
+        self,
+        file_content: BinaryIO,
+        filename: str = "",
+        mime_type: str = "",
+        document: Optional[PDFDocument] = None
+    ) -> ValidationResult:
         """
         Professional malware scanning with ClamAV + structural validation
 
@@ -293,7 +305,8 @@ class FileValidationService:
             scan_result = await malware_scanner_service.scan_file(
                 file_content=file_content,
                 filename=filename,
-                mime_type=mime_type
+                mime_type=mime_type,
+                document=document
             )
 
             file_content.seek(0)
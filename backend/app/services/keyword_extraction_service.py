@@ -6,65 +6,33 @@ Language-aware with stop word filtering from database
 
 import re
 import logging
-from typing import List, Tuple, Dict
-from collections import Counter
+from typing import Dict, FrozenSet, List, Tuple
 from sqlalchemy.orm import Session
 
+from app.services.lexicon_service import lexicon_service
+from app.utils.token_pipeline import TOKEN_PATTERN, scan_tokens
+
 logger = logging.getLogger(__name__)
 
+# Words per IN (...) query when loading corpus statistics
+CORPUS_STATS_CHUNK = 500
+
 
 class KeywordExtractionService:
     """Service for extracting semantic keywords from document text"""
 
-    def __init__(self):
-        """Initialize keyword extraction service"""
-        self._stop_words_cache: Dict[str, set] = {}
-
-    def get_stop_words(self, db: Session, language: str) -> set:
+    def get_stop_words(self, db: Session, language: str) -> FrozenSet[str]:
         """
-        Load stop words for a specific language from database
+        Stop words for a specific language (shared lexicon, loaded once per process)
 
         Args:
             db: Database session
             language: Language code (en, de, ru, etc)
 
         Returns:
-            Set of stop words for the language
+            Read-only set of stop words for the language
         """
-        if language in self._stop_words_cache:
-            logger.debug(f"Using cached stop words for language: {language} ({len(self._stop_words_cache[language])} words)")
-            return self._stop_words_cache[language]
-
-        try:
-            from app.database.models import StopWord
-
-            logger.debug(f"Querying database for stop words, language: {language}")
-
-            stop_words = db.query(StopWord).filter(
-                StopWord.language_code == language,
-                StopWord.is_active == True
-            ).all()
-
-            logger.debug(f"Query returned {len(stop_words)} stop word records for language: {language}")
-
-            stop_word_set = {sw.word.lower() for sw in stop_words}
-
-            self._stop_words_cache[language] = stop_word_set
-
-            if len(stop_word_set) == 0:
-                logger.warning(f"No stop words found in database for language: {language}. Keywords will not be filtered!")
-            else:
-                logger.info(f"Loaded {len(stop_word_set)} stop words for language: {language}")
-
-            return stop_word_set
-
-        except Exception as e:
-            logger.error(f"Failed to load stop words from database for language '{language}': {e}", exc_info=True)
-            return set()
-
-    def clear_stop_words_cache(self):
-        """Clear cached stop words (useful after database updates)"""
-        self._stop_words_cache = {}
+        return lexicon_service.stop_words(db, language)
 
     def cleanse_text(self, text: str) -> str:
         """
@@ -121,8 +89,7 @@ class KeywordExtractionService:
         Returns:
             List of tokens
         """
-        tokens = re.findall(r'\b[a-zа-яäöüßàáâãçéèêëíìîïñóòôõúùûüğışţ]{3,}\b', text, re.IGNORECASE)
-        return tokens
+        return TOKEN_PATTERN.findall(text)
 
     def filter_tokens(
         self,
@@ -228,64 +195,30 @@ class KeywordExtractionService:
                     AND ck.language_code = :lang
                 """), {'user_id': user_id, 'lang': language})
                 category_keywords_set = {row[0] for row in result}
-                logger.info(f"[KEYWORD EXTRACTION] Loaded {len(category_keywords_set)} category keywords for user (lang={language})")
-                if category_keywords_set:
-                    logger.info(f"[KEYWORD EXTRACTION] Sample category keywords: {', '.join(list(category_keywords_set)[:10])}")
+                logger.debug("[KEYWORD EXTRACTION] Loaded %s category keywords for user (lang=%s)", len(category_keywords_set), language)
+                if category_keywords_set and logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("[KEYWORD EXTRACTION] Sample category keywords: %s", ', '.join(list(category_keywords_set)[:10]))
 
-            # STEP 2: Load stopwords and tokenize
+            # STEP 2: Load stopwords
             stop_words = stopwords if stopwords is not None else self.get_stop_words(db, language)
-            logger.info(f"[KEYWORD EXTRACTION] Loaded {len(stop_words)} stopwords for language '{language}'")
-            if stop_words:
-                sample_stopwords = list(stop_words)[:10]
-                logger.info(f"[KEYWORD EXTRACTION] Sample stop words: {sample_stopwords}")
-
-            normalized_text = self.normalize_text(text)
-            tokens = self.tokenize(normalized_text)
-            logger.info(f"[KEYWORD EXTRACTION] Tokenized {len(tokens)} total tokens from text")
-
-            # STEP 3: Filter stopwords BUT preserve category keywords
-            # Category keywords MUST be kept even if they appear in stopwords!
-            filtered_tokens = []
-            preserved_category_keywords = set()
-            filtered_out_stopwords = []
-
-            for token in tokens:
-                if token in category_keywords_set:
-                    # Keep category keyword even if it's a stopword!
-                    filtered_tokens.append(token)
-                    preserved_category_keywords.add(token)
-                elif token not in stop_words:
-                    # Keep non-stopword
-                    filtered_tokens.append(token)
-                else:
-                    # This is a stop word - track what we're filtering
-                    filtered_out_stopwords.append(token)
-
-            if filtered_out_stopwords:
-                logger.info(f"[KEYWORD EXTRACTION] Filtered out {len(filtered_out_stopwords)} stop words: {filtered_out_stopwords[:20]}")
-
-            logger.info(f"[KEYWORD EXTRACTION] After stopword filtering: {len(filtered_tokens)} tokens (preserved {len(preserved_category_keywords)} category keywords)")
-            if preserved_category_keywords:
-                logger.info(f"[KEYWORD EXTRACTION] Preserved category keywords found in text: {', '.join(preserved_category_keywords)}")
-
-            # STEP 3.5: Filter entity values to prevent duplication with entities
-            # Entities (emails, addresses, company names) should NOT appear in keywords
-            if excluded_entities:
-                entity_filtered_tokens = []
-                filtered_out_entities = []
-
-                for token in filtered_tokens:
-                    if token in excluded_entities:
-                        # Skip tokens that are already extracted as entities
-                        filtered_out_entities.append(token)
-                    else:
-                        entity_filtered_tokens.append(token)
-
-                if filtered_out_entities:
-                    logger.info(f"[KEYWORD EXTRACTION] Filtered out {len(filtered_out_entities)} entity values: {filtered_out_entities[:20]}")
-
-                filtered_tokens = entity_filtered_tokens
-                logger.info(f"[KEYWORD EXTRACTION] After entity filtering: {len(filtered_tokens)} tokens")
+            logger.debug("[KEYWORD EXTRACTION] Loaded %s stopwords for language '%s'", len(stop_words), language)
+
+            # STEP 3: Tokenize and filter in one pass - stopwords are dropped BUT category
+            # keywords are preserved (even if they are stopwords), entity values are excluded
+            # (entities like emails, addresses, company names should NOT appear in keywords)
+            scan = scan_tokens(
+                text,
+                stop_words=stop_words,
+                preserve=frozenset(category_keywords_set),
+                exclude=frozenset(excluded_entities) if excluded_entities else frozenset()
+            )
+            frequency = scan.unigrams
+            logger.debug(
+                "[KEYWORD EXTRACTION] Tokenized %s tokens: %s stopwords and %s entity values filtered, %s kept (preserved %s category keywords)",
+                scan.tokens_seen, scan.stopword_hits, scan.excluded_hits, frequency.total, len(scan.preserved)
+            )
+            if scan.preserved:
+                logger.debug("[KEYWORD EXTRACTION] Preserved category keywords found in text: %s", ', '.join(scan.preserved))
 
             # STEP 3.5: Spell check filter (preserve category keywords)
             # Remove obvious OCR garbage that aren't real words
@@ -296,7 +229,7 @@ class KeywordExtractionService:
             ).first()
             spell_check_enabled = spell_check_enabled_result.config_value if spell_check_enabled_result else 1.0
 
-            if spell_check_enabled > 0.5:  # Feature flag
+            if spell_check_enabled > 0.5 and frequency:  # Feature flag
                 try:
                     from app.services.ocr_service import ocr_service
 
@@ -306,41 +239,29 @@ class KeywordExtractionService:
                     ).first()
                     spell_check_min_frequency = spell_min_freq_result.config_value if spell_min_freq_result else 1.0
 
-                    # Call new check_spelling API with set of unique tokens
-                    unique_tokens = set(filtered_tokens)
-                    misspelled = ocr_service.check_spelling(unique_tokens, language)
+                    # Spell check each distinct word once
+                    misspelled = ocr_service.check_spelling(set(frequency), language)
 
-                    spell_filtered_tokens = []
                     ocr_garbage_count = 0
-
-                    for token in filtered_tokens:
-                        # Always preserve category keywords (even if "misspelled")
-                        if token in category_keywords_set:
-                            spell_filtered_tokens.append(token)
-                        # Keep words NOT in misspelled set
-                        elif token not in misspelled:
-                            spell_filtered_tokens.append(token)
-                        # Also keep if it appears frequently (likely domain-specific term)
-                        # Use adaptive_min_frequency instead of hardcoded min_frequency * 2
-                        elif filtered_tokens.count(token) >= spell_check_min_frequency:
-                            spell_filtered_tokens.append(token)
-                        else:
-                            ocr_garbage_count += 1
-
-                    filtered_tokens = spell_filtered_tokens
-                    logger.info(f"[KEYWORD EXTRACTION] After spell check: {len(filtered_tokens)} tokens (removed {ocr_garbage_count} OCR garbage words, threshold={spell_check_min_frequency})")
+                    for word in misspelled:
+                        # Always preserve category keywords (even if "misspelled"), and keep words
+                        # that appear frequently (likely domain-specific terms)
+                        if word in category_keywords_set or frequency[word] >= spell_check_min_frequency:
+                            continue
+                        ocr_garbage_count += frequency[word]
+                        frequency.discard(word)
+
+                    logger.debug("[KEYWORD EXTRACTION] After spell check: %s tokens (removed %s OCR garbage words, threshold=%s)", frequency.total, ocr_garbage_count, spell_check_min_frequency)
                 except Exception as e:
                     logger.warning(f"[KEYWORD EXTRACTION] Spell check failed, continuing without it: {e}")
             else:
-                logger.info(f"[KEYWORD EXTRACTION] Spell check disabled (spell_check_enabled={spell_check_enabled})")
+                logger.debug("[KEYWORD EXTRACTION] Spell check disabled (spell_check_enabled=%s)", spell_check_enabled)
 
-            if not filtered_tokens:
+            if not frequency:
                 logger.warning("No keywords after filtering")
                 return []
 
-            frequency = Counter(filtered_tokens)
-            total_tokens = len(filtered_tokens)
-            max_freq = max(frequency.values())
+            total_tokens = frequency.total
 
             # Adaptive min_frequency for short documents
             # Short documents (like invoices) naturally have low word repetition
@@ -357,12 +278,19 @@ class KeywordExtractionService:
 
             # Use min_frequency from DB config, overriding function parameter
             adaptive_min_frequency = min_freq_default
-            logger.info(f"[KEYWORD EXTRACTION] Using min_frequency={adaptive_min_frequency} from database config (total_tokens={total_tokens})")
+            logger.debug("[KEYWORD EXTRACTION] Using min_frequency=%s from database config (total_tokens=%s)", adaptive_min_frequency, total_tokens)
 
             # STEP 4: Extract keywords with priority scoring
             keywords = []
             extracted_words = set()
 
+            # IDF of all candidates (category matches + most frequent words) in one lookup
+            top_words = frequency.most_common(max_keywords)
+            idf_scores = self._calculate_idf_batch(
+                [word for word in frequency if word in category_keywords_set] + [word for word, _ in top_words],
+                language, user_id, db
+            )
+
             # Priority 1: Words that match category keywords (even if freq=1)
             category_matches = 0
             for word in frequency:
@@ -371,7 +299,7 @@ class KeywordExtractionService:
 
                     # Calculate TF-IDF relevance
                     tf = count / total_tokens
-                    idf = self._calculate_idf(word, language, user_id, db)
+                    idf = idf_scores[word]
                     tfidf_score = tf * idf
                     relevance = tfidf_score * 100
 
@@ -382,10 +310,10 @@ class KeywordExtractionService:
                     extracted_words.add(word)
                     category_matches += 1
 
-            logger.info(f"[KEYWORD EXTRACTION] Found {category_matches} category keyword matches in document")
+            logger.debug("[KEYWORD EXTRACTION] Found %s category keyword matches in document", category_matches)
 
             # Priority 2: Top frequent words (up to max_keywords, skip already extracted)
-            for word, count in frequency.most_common(max_keywords):
+            for word, count in top_words:
                 # Skip if already extracted as category keyword
                 if word in extracted_words:
                     continue
@@ -401,7 +329,7 @@ class KeywordExtractionService:
 
                 # Calculate TF-IDF relevance
                 tf = count / total_tokens
-                idf = self._calculate_idf(word, language, user_id, db)
+                idf = idf_scores[word]
                 tfidf_score = tf * idf
                 relevance = tfidf_score * 100
 
@@ -465,9 +393,9 @@ class KeywordExtractionService:
             keywords.sort(key=lambda x: x[2], reverse=True)
 
             # Update corpus statistics for ML learning (after successful extraction)
-            self._update_corpus_stats(filtered_tokens, language, user_id, db)
+            self._update_corpus_stats(list(frequency), language, user_id, db)
 
-            logger.info(f"[KEYWORD EXTRACTION] Extracted {len(keywords)} keywords from {total_tokens} tokens (lang: {language}, category_matches: {category_matches}, entity_conversions: {entity_conversions})")
+            logger.debug("[KEYWORD EXTRACTION] Extracted %s keywords from %s tokens (lang: %s, category_matches: %s, entity_conversions: %s)", len(keywords), total_tokens, language, category_matches, entity_conversions)
 
             return keywords
 
@@ -502,21 +430,8 @@ class KeywordExtractionService:
 
             stop_words = self.get_stop_words(db, language)
 
-            normalized_text = self.normalize_text(text)
-            tokens = self.tokenize(normalized_text)
-            filtered_tokens = self.filter_tokens(tokens, stop_words, max_length=30)
-
-            if len(filtered_tokens) < ngram_size:
-                return []
-
-            ngrams = []
-            for i in range(len(filtered_tokens) - ngram_size + 1):
-                phrase = ' '.join(filtered_tokens[i:i+ngram_size])
-                ngrams.append(phrase)
-
-            phrase_frequency = Counter(ngrams)
-
-            phrases = phrase_frequency.most_common(max_phrases)
+            scan = scan_tokens(text, stop_words=stop_words, ngram_size=ngram_size, ngram_max_length=30)
+            phrases = scan.ngrams.most_common(max_phrases) if scan.ngrams else []
 
             logger.info(f"Extracted {len(phrases)} {ngram_size}-gram phrases (lang: {language})")
 
@@ -536,19 +451,42 @@ class KeywordExtractionService:
         """
         Calculate hybrid IDF score blending global and user corpus statistics
 
+        Args:
+            word: Word to calculate IDF for
+            language: Language code
+            user_id: User ID (None = global only)
+            db: Database session
+
+        Returns:
+            IDF score (higher = rarer word = more important)
+        """
+        return self._calculate_idf_batch([word], language, user_id, db)[word.lower()]
+
+    def _calculate_idf_batch(
+        self,
+        words: List[str],
+        language: str,
+        user_id: str,
+        db: Session
+    ) -> Dict[str, float]:
+        """
+        Calculate hybrid IDF scores of many words blending global and user corpus statistics
+
         IDF formula: log((N + smoothing) / (df + smoothing))
         Hybrid blend: alpha * global_idf + (1-alpha) * user_idf
 
         Alpha decay: Starts at 0.7 (favor global patterns), decays to 0.3 as user uploads more docs
 
+        Config and corpus statistics are loaded with one query each, not per word.
+
         Args:
-            word: Word to calculate IDF for
+            words: Words to calculate IDF for
             language: Language code
             user_id: User ID (None = global only)
             db: Database session
 
         Returns:
-            IDF score (higher = rarer word = more important)
+            Dictionary mapping lowercase words to IDF scores (higher = rarer word = more important)
         """
         import math
         from app.database.models import (
@@ -557,88 +495,84 @@ class KeywordExtractionService:
             UserCorpusStats
         )
 
+        words = list(dict.fromkeys(word.lower() for word in words))
+        if not words:
+            return {}
+
         try:
             # Load config
-            config_query = db.query(KeywordExtractionConfig)
-            tfidf_enabled = config_query.filter(
-                KeywordExtractionConfig.config_key == 'tfidf_enabled'
-            ).first()
+            config = dict(db.query(KeywordExtractionConfig.config_key, KeywordExtractionConfig.config_value).filter(
+                KeywordExtractionConfig.config_key.in_([
+                    'tfidf_enabled', 'tfidf_smoothing',
+                    'ml_blend_alpha_initial', 'ml_blend_alpha_decay', 'ml_blend_alpha_min'
+                ])
+            ).all())
 
             # If TF-IDF disabled, return neutral score
-            if not tfidf_enabled or tfidf_enabled.config_value == 0.0:
-                return 1.0
-
-            smoothing = config_query.filter(
-                KeywordExtractionConfig.config_key == 'tfidf_smoothing'
-            ).first()
-            smoothing = smoothing.config_value if smoothing else 1.0
-
-            # Calculate global IDF
-            global_stat = db.query(GlobalCorpusStats).filter(
-                GlobalCorpusStats.word == word.lower(),
-                GlobalCorpusStats.language == language
-            ).first()
-
-            if global_stat and global_stat.total_documents > 0:
-                global_idf = math.log(
-                    (global_stat.total_documents + smoothing) /
-                    (global_stat.document_count + smoothing)
-                )
-            else:
-                # Unknown word = high IDF (rare, likely domain-specific)
-                global_idf = 5.0
-
-            # If no user context, return global IDF only
-            if not user_id:
-                return global_idf
-
-            # Calculate user IDF
-            user_stat = db.query(UserCorpusStats).filter(
-                UserCorpusStats.user_id == user_id,
-                UserCorpusStats.word == word.lower(),
-                UserCorpusStats.language == language
-            ).first()
-
-            if user_stat and user_stat.total_documents > 0:
-                user_idf = math.log(
-                    (user_stat.total_documents + smoothing) /
-                    (user_stat.document_count + smoothing)
-                )
-            else:
-                # New word for user = high IDF
-                user_idf = 5.0
-
-            # Calculate hybrid blending alpha (decays as user uploads more)
-            user_total_docs = user_stat.total_documents if user_stat else 0
-
-            alpha_initial = config_query.filter(
-                KeywordExtractionConfig.config_key == 'ml_blend_alpha_initial'
-            ).first()
-            alpha_initial = alpha_initial.config_value if alpha_initial else 0.7
-
-            alpha_decay = config_query.filter(
-                KeywordExtractionConfig.config_key == 'ml_blend_alpha_decay'
-            ).first()
-            alpha_decay = alpha_decay.config_value if alpha_decay else 0.01
+            if not config.get('tfidf_enabled'):
+                return {word: 1.0 for word in words}
+
+            smoothing = config.get('tfidf_smoothing', 1.0)
+            alpha_initial = config.get('ml_blend_alpha_initial', 0.7)
+            alpha_decay = config.get('ml_blend_alpha_decay', 0.01)
+            alpha_min = config.get('ml_blend_alpha_min', 0.3)
+
+            global_stats = {
+                stat.word: stat for stat in db.query(GlobalCorpusStats).filter(
+                    GlobalCorpusStats.word.in_(words),
+                    GlobalCorpusStats.language == language
+                ).all()
+            }
+            user_stats = {
+                stat.word: stat for stat in db.query(UserCorpusStats).filter(
+                    UserCorpusStats.user_id == user_id,
+                    UserCorpusStats.word.in_(words),
+                    UserCorpusStats.language == language
+                ).all()
+            } if user_id else {}
+
+            scores = {}
+            for word in words:
+                # Calculate global IDF
+                global_stat = global_stats.get(word)
+                if global_stat and global_stat.total_documents > 0:
+                    global_idf = math.log(
+                        (global_stat.total_documents + smoothing) /
+                        (global_stat.document_count + smoothing)
+                    )
+                else:
+                    # Unknown word = high IDF (rare, likely domain-specific)
+                    global_idf = 5.0
 
-            alpha_min = config_query.filter(
-                KeywordExtractionConfig.config_key == 'ml_blend_alpha_min'
-            ).first()
-            alpha_min = alpha_min.config_value if alpha_min else 0.3
+                # If no user context, use global IDF only
+                if not user_id:
+                    scores[word] = global_idf
+                    continue
 
-            # Alpha decay formula: starts high (favor global), decays to min (favor user patterns)
-            alpha = max(alpha_min, alpha_initial - (alpha_decay * user_total_docs))
+                # Calculate user IDF
+                user_stat = user_stats.get(word)
+                if user_stat and user_stat.total_documents > 0:
+                    user_idf = math.log(
+                        (user_stat.total_documents + smoothing) /
+                        (user_stat.document_count + smoothing)
+                    )
+                else:
+                    # New word for user = high IDF
+                    user_idf = 5.0
 
-            # Blend global and user IDF
-            hybrid_idf = alpha * global_idf + (1 - alpha) * user_idf
+                # Alpha decay formula: starts high (favor global), decays to min (favor user patterns)
+                user_total_docs = user_stat.total_documents if user_stat else 0
+                alpha = max(alpha_min, alpha_initial - (alpha_decay * user_total_docs))
 
-            logger.debug(f"[TF-IDF] '{word}': global_idf={global_idf:.3f}, user_idf={user_idf:.3f}, alpha={alpha:.2f}, hybrid_idf={hybrid_idf:.3f}")
+                # Blend global and user IDF
+                scores[word] = alpha * global_idf + (1 - alpha) * user_idf
 
-            return hybrid_idf
+            logger.debug("[TF-IDF] Calculated IDF for %s words (lang: %s, user: %s)", len(scores), language, user_id or 'global')
+            return scores
 
         except Exception as e:
-            logger.error(f"Failed to calculate IDF for '{word}': {e}")
-            return 1.0  # Fallback to neutral score
+            logger.error(f"Failed to calculate IDF for {len(words)} words: {e}")
+            return {word: 1.0 for word in words}  # Fallback to neutral score
 
     def _update_corpus_stats(
         self,
@@ -683,13 +617,21 @@ class KeywordExtractionService:
             # Get unique words from document
             unique_words = set(word.lower() for word in words if word and len(word) >= 2)
 
+            # Existing stats are loaded in chunks instead of one query per word
+            ordered_words = sorted(unique_words)
+            word_chunks = [ordered_words[i:i + CORPUS_STATS_CHUNK] for i in range(0, len(ordered_words), CORPUS_STATS_CHUNK)]
+
             # Update GLOBAL corpus stats (if privacy threshold met)
             if total_users >= min_users:
-                for word in unique_words:
-                    global_stat = db.query(GlobalCorpusStats).filter(
-                        GlobalCorpusStats.word == word,
+                global_stats = {}
+                for chunk in word_chunks:
+                    global_stats.update((stat.word, stat) for stat in db.query(GlobalCorpusStats).filter(
+                        GlobalCorpusStats.word.in_(chunk),
                         GlobalCorpusStats.language == language
-                    ).first()
+                    ))
+
+                for word in unique_words:
+                    global_stat = global_stats.get(word)
 
                     if global_stat:
                         # Word exists: increment counts
@@ -709,12 +651,16 @@ class KeywordExtractionService:
             if user_id:
                 user_uuid = uuid.UUID(user_id) if isinstance(user_id, str) else user_id
 
-                for word in unique_words:
-                    user_stat = db.query(UserCorpusStats).filter(
+                user_stats = {}
+                for chunk in word_chunks:
+                    user_stats.update((stat.word, stat) for stat in db.query(UserCorpusStats).filter(
                         UserCorpusStats.user_id == user_uuid,
-                        UserCorpusStats.word == word,
+                        UserCorpusStats.word.in_(chunk),
                         UserCorpusStats.language == language
-                    ).first()
+                    ))
+
+                for word in unique_words:
+                    user_stat = user_stats.get(word)
 
                     if user_stat:
                         # Word exists: increment counts
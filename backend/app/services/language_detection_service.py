@@ -4,13 +4,33 @@ Language detection service using FastText and Lingua libraries
 """
 
 import logging
-from typing import Optional
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, List, Sequence, Tuple
 from ftlangdetect import detect as fasttext_detect
 from lingua import Language, LanguageDetectorBuilder
 
+from app.core.config import settings
+from app.utils.language_sampling import (
+    language_shares, pick_evenly, sample_windows, split_segments, text_fingerprint
+)
+
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class LanguageProfile:
+    """Languages of a document"""
+    primary: str
+    languages: List[Tuple[str, float]] = field(default_factory=list)  # (code, share of text), largest first
+    page_languages: List[Optional[str]] = field(default_factory=list)  # per page/segment, None if too short
+
+    @property
+    def is_multilingual(self) -> bool:
+        return len(self.languages) > 1
+
+
 class LanguageDetectionService:
     """Hybrid language detection using FastText for speed and Lingua for accuracy"""
 
@@ -31,8 +51,85 @@ class LanguageDetectionService:
         self.SHORT_TEXT_THRESHOLD = 20  # words
         self.MIN_CONFIDENCE = 0.7
 
+        # Detection results by (kind, text hash); the same text is often detected
+        # again (re-analysis, email attachments, batch retries)
+        self.config = settings.analysis
+        self._cache: "OrderedDict[Tuple[str, str], object]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
         logger.info("Language detection service initialized")
 
+    def _cache_get(self, key: Tuple[str, str]):
+        with self._cache_lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self._cache.move_to_end(key)
+            return value
+
+    def _cache_put(self, key: Tuple[str, str], value):
+        with self._cache_lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.config.language_cache_size:
+                self._cache.popitem(last=False)
+
+    def _lingua_code(self, text: str) -> Optional[str]:
+        result = self.lingua.detect_language_of(text)
+        return result.iso_code_639_1.name.lower() if result else None
+
+    def _detect_sample(self, sample: str) -> str:
+        """Detect the language of a (sampled, single-line) text"""
+        word_count = len(sample.split())
+
+        if word_count < self.SHORT_TEXT_THRESHOLD:
+            # Short text: Use Lingua for better accuracy
+            lang_code = self._lingua_code(sample)
+            logger.debug("Lingua detected: %s (%s words)", lang_code, word_count)
+            return lang_code or 'en'
+
+        # Long text: Use FastText for speed
+        result = fasttext_detect(sample)
+        lang_code = result['lang']
+        confidence = result['score']
+
+        if confidence >= self.MIN_CONFIDENCE:
+            logger.debug("FastText detected: %s (confidence: %.2f)", lang_code, confidence)
+            return lang_code
+
+        # Low confidence: Fall back to Lingua
+        logger.debug("Low FastText confidence (%.2f), using Lingua", confidence)
+        return self._lingua_code(sample) or lang_code
+
+    def detect_language_sync(self, text: str) -> str:
+        """
+        Detect the language of a text from a bounded sample
+
+        Only language_sample_chars characters (head, middle and tail windows)
+        are analyzed, so the cost does not depend on document length.
+        Results are cached by text hash.
+
+        Returns:
+            ISO 639-1 language code (e.g., 'en', 'de', 'ru'); 'en' if undetectable
+        """
+        if not text or not text.strip():
+            return 'en'
+        return self._detect_text(text, text_fingerprint(text))
+
+    def _detect_text(self, text: str, fingerprint: str) -> str:
+        key = ('text', fingerprint)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            lang_code = self._detect_sample(sample_windows(text, self.config.language_sample_chars))
+        except Exception as e:
+            logger.error(f"Language detection failed: {e}")
+            return 'en'
+
+        self._cache_put(key, lang_code)
+        return lang_code
+
     async def detect_language(
         self,
         text: str,
@@ -48,42 +145,90 @@ class LanguageDetectionService:
         Returns:
             ISO 639-1 language code (e.g., 'en', 'de', 'ru')
         """
+        return self.detect_language_sync(text)
+
+    def detect_languages_batch(self, texts: Sequence[str]) -> List[str]:
+        """
+        Detect the language of many texts (e.g. all documents of an upload batch)
+
+        Identical texts are detected once and cached results are reused.
+
+        Returns:
+            Language codes in the order of texts
+        """
+        fingerprints = [text_fingerprint(text) if text and text.strip() else None for text in texts]
+        codes = {}
+        for text, fingerprint in zip(texts, fingerprints):
+            if fingerprint and fingerprint not in codes:
+                codes[fingerprint] = self._detect_text(text, fingerprint)
+        return [codes[fingerprint] if fingerprint else 'en' for fingerprint in fingerprints]
+
+    def detect_page_languages(self, pages: Sequence[str]) -> LanguageProfile:
+        """
+        Per-page languages of a document
+
+        Each page is detected from a bounded sample; pages shorter than
+        language_min_segment_chars get no language. Languages covering at
+        least language_secondary_min_share of the text are reported.
+
+        Args:
+            pages: Text per page (or per page-sized segment)
+
+        Returns:
+            LanguageProfile; primary is the language with the largest share
+        """
+        min_chars = self.config.language_min_segment_chars
+        page_languages = []
+        detections = []
+        for page in pages:
+            chars = len(page.strip()) if page else 0
+            language = self.detect_language_sync(page) if chars >= min_chars else None
+            page_languages.append(language)
+            detections.append((language, chars))
+
+        shares = language_shares(detections)
+        if not shares:
+            # Only short pages: detect the document as a whole
+            primary = self.detect_language_sync(' '.join(page for page in pages if page))
+            return LanguageProfile(primary=primary, languages=[(primary, 1.0)], page_languages=page_languages)
+
+        min_share = self.config.language_secondary_min_share
+        languages = [(code, round(share, 3)) for code, share in shares if share >= min_share or code == shares[0][0]]
+        return LanguageProfile(primary=shares[0][0], languages=languages, page_languages=page_languages)
+
+    def detect_document_languages(self, text: str, pages: Optional[Sequence[str]] = None) -> LanguageProfile:
+        """
+        Primary and secondary languages of a document
+
+        Without page texts the document is split into page-sized segments
+        (language_segment_chars); at most language_max_segments of them,
+        evenly spread, are detected. Results are cached by text hash.
+
+        Args:
+            text: Full document text
+            pages: Text per page, if known
+
+        Returns:
+            LanguageProfile
+        """
         if not text or not text.strip():
-            return 'en'
+            return LanguageProfile(primary='en', languages=[('en', 1.0)])
 
-        try:
-            word_count = len(text.split())
-
-            if word_count < self.SHORT_TEXT_THRESHOLD:
-                # Short text: Use Lingua for better accuracy
-                result = self.lingua.detect_language_of(text)
-                if result:
-                    lang_code = result.iso_code_639_1.name.lower()
-                    logger.debug(f"Lingua detected: {lang_code} ({word_count} words)")
-                    return lang_code
-                return 'en'
-            else:
-                # Long text: Use FastText for speed
-                # FastText requires single-line input (no newlines)
-                text_sanitized = ' '.join(text.split())
-                result = fasttext_detect(text_sanitized)
-                lang_code = result['lang']
-                confidence = result['score']
-
-                if confidence >= self.MIN_CONFIDENCE:
-                    logger.debug(f"FastText detected: {lang_code} (confidence: {confidence:.2f})")
-                    return lang_code
-                else:
-                    # Low confidence: Fall back to Lingua
-                    logger.debug(f"Low FastText confidence ({confidence:.2f}), using Lingua")
-                    lingua_result = self.lingua.detect_language_of(text)
-                    if lingua_result:
-                        return lingua_result.iso_code_639_1.name.lower()
-                    return lang_code
+        key = ('document', text_fingerprint(text))
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
 
-        except Exception as e:
-            logger.error(f"Language detection failed: {e}")
-            return 'en'
+        if pages is None:
+            pages = split_segments(text, self.config.language_segment_chars, self.config.language_max_segments)
+        else:
+            pages = pick_evenly(pages, self.config.language_max_segments)
+
+        profile = self.detect_page_languages(pages)
+        if profile.is_multilingual:
+            logger.debug("Multilingual document: %s", profile.languages)
+        self._cache_put(key, profile)
+        return profile
 
     async def get_supported_languages(self, session: Optional[object] = None) -> list:
         """Get list of supported languages from database"""
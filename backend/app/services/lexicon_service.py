@@ -0,0 +1,315 @@
+# backend/app/services/lexicon_service.py
+"""
+Per-language lexicons shared by the keyword, entity and ML services
+
+Stop words, entity field labels and the entity blacklist used to be loaded
+and cached separately by keyword extraction, entity extraction, entity
+quality scoring and ML learning (the entity filters even reloaded them for
+every document). They are now loaded once per process and language into
+frozensets of interned strings, and every service reads the same objects.
+Warm-up (analysis pool workers, Celery parent before it forks) loads all
+active languages, so prefork children share one read-only copy.
+
+Admin edits bump a version counter in system_settings. Each process compares
+it with the version its lexicons were loaded at, at most once per
+lexicon_version_check_seconds, and drops its lexicons when it changed.
+"""
+
+import json
+import logging
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# system_settings key of the lexicon version counter
+LEXICON_VERSION_KEY = 'lexicon_version'
+
+# (entity_type, lowercase entity_value)
+BlacklistEntry = Tuple[str, str]
+
+
+def freeze_terms(values: Iterable[Optional[str]]) -> FrozenSet[str]:
+    """Lowercased, stripped and interned terms, without empty values"""
+    return frozenset(
+        sys.intern(value.strip().lower())
+        for value in values
+        if value and value.strip()
+    )
+
+
+@dataclass(frozen=True)
+class Lexicon:
+    """Read-only lexicons of one language"""
+    language: str
+    version: int
+    stop_words: FrozenSet[str] = frozenset()
+    field_labels: FrozenSet[str] = frozenset()
+    blacklist: FrozenSet[BlacklistEntry] = frozenset()
+
+
+class LexiconService:
+    """Loads, shares and invalidates per-language lexicons"""
+
+    def __init__(self, check_seconds: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize lexicon service
+
+        Args:
+            check_seconds: Min seconds between two reads of the version counter
+            clock: Monotonic clock (replaceable in tests)
+        """
+        self.check_seconds = check_seconds
+        self._clock = clock
+        self._lexicons: Dict[str, Lexicon] = {}
+        self._lock = threading.Lock()
+        self._version = 0
+        self._checked_at: Optional[float] = None
+
+    def get(self, db: Session, language: str) -> Lexicon:
+        """
+        Lexicons of a language, loaded on first use
+
+        Args:
+            db: Database session
+            language: Language code (en, de, ru, etc)
+
+        Returns:
+            Lexicon shared by all callers in this process (do not modify)
+        """
+        self._check_version(db)
+        lexicon = self._lexicons.get(language)
+        if lexicon is not None:
+            return lexicon
+
+        with self._lock:
+            lexicon = self._lexicons.get(language)
+            if lexicon is None:
+                lexicon, complete = self._load(db, language, self._version)
+                # Failed loads are retried on the next call instead of caching empty sets
+                if complete:
+                    self._lexicons[language] = lexicon
+        return lexicon
+
+    def stop_words(self, db: Session, language: str) -> FrozenSet[str]:
+        """Lowercase stop words of a language"""
+        return self.get(db, language).stop_words
+
+    def field_labels(self, db: Session, language: str) -> FrozenSet[str]:
+        """Lowercase entity field labels of a language (Tel, Fax, Datum, ...)"""
+        return self.get(db, language).field_labels
+
+    def blacklist(self, db: Session, language: str) -> FrozenSet[BlacklistEntry]:
+        """Blacklisted (entity_type, lowercase entity_value) pairs of a language"""
+        return self.get(db, language).blacklist
+
+    def preload(self, db: Session, languages: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Load lexicons up front (worker warm-up, before forking)
+
+        Args:
+            db: Database session
+            languages: Language codes; all active supported languages if omitted
+
+        Returns:
+            Languages whose lexicons are loaded
+        """
+        if languages is None:
+            languages = self._active_languages(db)
+        for language in languages:
+            self.get(db, language)
+        return sorted(self._lexicons)
+
+    def invalidate(self, language: Optional[str] = None):
+        """
+        Drop lexicons of this process; they are reloaded on next use
+
+        Args:
+            language: Language to drop; all languages if omitted
+        """
+        with self._lock:
+            if language is None:
+                self._lexicons = {}
+            else:
+                self._lexicons.pop(language, None)
+
+    def bump_version(self, db: Session) -> int:
+        """
+        Record a lexicon edit so that every process reloads its lexicons
+
+        Stages the new version in the caller's session (the caller commits it
+        together with the edit) and makes this process re-check on next use.
+
+        Args:
+            db: Database session of the edit
+
+        Returns:
+            New lexicon version
+        """
+        from app.database.models import SystemSetting
+
+        setting = db.execute(
+            select(SystemSetting).where(SystemSetting.setting_key == LEXICON_VERSION_KEY)
+        ).scalar_one_or_none()
+
+        if setting is None:
+            version = 1
+            db.add(SystemSetting(
+                setting_key=LEXICON_VERSION_KEY,
+                setting_value=str(version),
+                data_type='integer',
+                description='Incremented when stop words, field labels or the entity blacklist change',
+                category='ml'
+            ))
+        else:
+            version = int(setting.setting_value or 0) + 1
+            setting.setting_value = str(version)
+
+        self.invalidate()
+        self._checked_at = None
+        logger.info(f"Lexicon version bumped to {version}")
+        return version
+
+    def get_stats(self) -> Dict:
+        """Loaded languages and lexicon sizes"""
+        lexicons = self._lexicons
+        return {
+            'version': self._version,
+            'languages': {
+                language: {
+                    'stop_words': len(lexicon.stop_words),
+                    'field_labels': len(lexicon.field_labels),
+                    'blacklist': len(lexicon.blacklist)
+                }
+                for language, lexicon in lexicons.items()
+            }
+        }
+
+    def _check_version(self, db: Session):
+        """Drop all lexicons when the version counter changed since they were loaded"""
+        now = self._clock()
+        if self._checked_at is not None and now - self._checked_at < self.check_seconds:
+            return
+        self._checked_at = now
+
+        version = self._read_version(db)
+        if version is None or version == self._version:
+            return
+        with self._lock:
+            if version != self._version:
+                if self._lexicons:
+                    logger.info(f"Lexicon version changed ({self._version} -> {version}), reloading lexicons")
+                self._lexicons = {}
+                self._version = version
+
+    def _read_version(self, db: Session) -> Optional[int]:
+        """Current version counter (0 before the first edit), None if it cannot be read"""
+        try:
+            from app.database.models import SystemSetting
+
+            value = db.execute(
+                select(SystemSetting.setting_value).where(SystemSetting.setting_key == LEXICON_VERSION_KEY)
+            ).scalar_one_or_none()
+            return int(value) if value else 0
+        except Exception as e:
+            logger.warning(f"Failed to read lexicon version: {e}")
+            return None
+
+    def _active_languages(self, db: Session) -> List[str]:
+        """Codes of all active supported languages"""
+        try:
+            from app.database.models import SupportedLanguage
+
+            return list(db.execute(
+                select(SupportedLanguage.language_code).where(SupportedLanguage.is_active == True)
+            ).scalars())
+        except Exception as e:
+            logger.warning(f"Failed to load supported languages for lexicon preload: {e}")
+            return []
+
+    def _load(self, db: Session, language: str, version: int) -> Tuple[Lexicon, bool]:
+        """
+        Load all lexicons of a language
+
+        Returns:
+            (lexicon, complete); complete is False if any lexicon failed to load
+        """
+        complete = True
+
+        try:
+            stop_words = self._load_stop_words(db, language)
+            if not stop_words:
+                logger.warning(f"No stop words found in database for language: {language}. Keywords will not be filtered!")
+        except Exception as e:
+            logger.error(f"Failed to load stop words for language '{language}': {e}")
+            stop_words, complete = frozenset(), False
+
+        try:
+            field_labels = self._load_field_labels(db, language)
+        except Exception as e:
+            logger.warning(f"Failed to load field labels for {language}: {e}")
+            field_labels, complete = frozenset(), False
+
+        try:
+            blacklist = self._load_blacklist(db, language)
+        except Exception as e:
+            logger.warning(f"Failed to load entity blacklist for {language}: {e}")
+            blacklist, complete = frozenset(), False
+
+        logger.info(
+            f"Loaded lexicons for {language} (version {version}): {len(stop_words)} stop words, "
+            f"{len(field_labels)} field labels, {len(blacklist)} blacklisted entities"
+        )
+        return Lexicon(language, version, stop_words, field_labels, blacklist), complete
+
+    def _load_stop_words(self, db: Session, language: str) -> FrozenSet[str]:
+        """Active stop words from the stop_words table"""
+        from app.database.models import StopWord
+
+        return freeze_terms(db.execute(
+            select(StopWord.word).where(
+                StopWord.language_code == language,
+                StopWord.is_active == True
+            )
+        ).scalars())
+
+    def _load_field_labels(self, db: Session, language: str) -> FrozenSet[str]:
+        """Field labels from system setting entity_field_labels_<language>, else the entity_field_labels table"""
+        from app.database.models import SystemSetting
+
+        value = db.execute(
+            select(SystemSetting.setting_value).where(
+                SystemSetting.setting_key == f'entity_field_labels_{language}'
+            )
+        ).scalar_one_or_none()
+        if value:
+            return freeze_terms(json.loads(value))
+
+        return freeze_terms(db.execute(
+            text("SELECT label_text FROM entity_field_labels WHERE language = :language"),
+            {"language": language}
+        ).scalars())
+
+    def _load_blacklist(self, db: Session, language: str) -> FrozenSet[BlacklistEntry]:
+        """Blacklisted entities from the entity_blacklist table"""
+        result = db.execute(
+            text("""
+                SELECT entity_type, LOWER(entity_value)
+                FROM entity_blacklist
+                WHERE language = :language
+            """),
+            {"language": language}
+        ).fetchall()
+        return frozenset((sys.intern(row[0]), row[1]) for row in result)
+
+
+# Global instance
+lexicon_service = LexiconService(check_seconds=settings.analysis.lexicon_version_check_seconds)
@@ -5,14 +5,12 @@ Provides multi-layered defense against malicious files
 """
 
 import logging
-import io
 import time
 from typing import BinaryIO, Dict, Optional, List
 import clamd
-import PyPDF2
-from PyPDF2 import PdfReader
-from PyPDF2.errors import PdfReadError
+import fitz  # PyMuPDF
 from app.core.config import settings
+from app.utils.pdf_document import PDFDocument, PDFOpenError
 
 logger = logging.getLogger(__name__)
 
@@ -109,7 +107,8 @@ class MalwareScannerService:
         self,
         file_content: BinaryIO,
         filename: str,
-        mime_type: Optional[str] = None
+        mime_type: Optional[str] = None,
+        document: Optional[PDFDocument] = None
     ) -> ScanResult:
         """
         Comprehensive file scanning with multiple detection layers
@@ -118,6 +117,7 @@ class MalwareScannerService:
             file_content: File binary content
             filename: Original filename
             mime_type: MIME type (optional, for targeted scanning)
+            document: Parsed handle of a PDF upload, reused for structural validation
 
         Returns:
             ScanResult with threat analysis
@@ -143,7 +143,7 @@ class MalwareScannerService:
             # Layer 2: Document-specific structural validation
             if mime_type:
                 if mime_type == 'application/pdf':
-                    pdf_result = await self._validate_pdf_structure(file_content)
+                    pdf_result = await self._validate_pdf_structure(file_content, document)
                     if not pdf_result.is_safe:
                         all_threats.extend(pdf_result.threats)
                     if pdf_result.warnings:
@@ -215,15 +215,15 @@ class MalwareScannerService:
             )
 
         try:
-            # Read file content
-            file_content.seek(0)
-            file_data = file_content.read()
+            file_content.seek(0, 2)
+            file_size = file_content.tell()
             file_content.seek(0)
 
-            logger.info(f"Starting ClamAV antivirus scan on file ({len(file_data)} bytes)")
+            logger.info(f"Starting ClamAV antivirus scan on file ({file_size} bytes)")
 
-            # Scan with ClamAV
-            scan_result = clamav.instream(io.BytesIO(file_data))
+            # Scan with ClamAV (streams the file in chunks, no in-memory copy)
+            scan_result = clamav.instream(file_content)
+            file_content.seek(0)
 
             # Parse result
             # Result format: {'stream': ('FOUND', 'Malware.Name')} or {'stream': ('OK', None)}
@@ -267,7 +267,11 @@ class MalwareScannerService:
                 signature_scan_performed=False
             )
 
-    async def _validate_pdf_structure(self, file_content: BinaryIO) -> ScanResult:
+    async def _validate_pdf_structure(
+        self,
+        file_content: BinaryIO,
+        document: Optional[PDFDocument] = None
+    ) -> ScanResult:
         """
         Validate PDF structure and check for exploit features
 
@@ -275,75 +279,32 @@ class MalwareScannerService:
         - Embedded JavaScript (can execute malicious code)
         - Embedded files (can hide executables)
         - Launch actions (can execute system commands)
-        - Form actions (can trigger exploits)
+        - Suspicious URI actions (shell commands in links)
+
+        Args:
+            file_content: File binary content (parsed only if no document is given)
+            document: Already opened handle of the same upload
         """
         threats = []
         warnings = []
 
+        owns_document = document is None
         try:
-            file_content.seek(0)
-            pdf = PdfReader(file_content)
-            file_content.seek(0)
+            if owns_document:
+                file_content.seek(0)
+                document = PDFDocument.from_bytes(file_content.read())
+                file_content.seek(0)
 
-            # Check for JavaScript (high risk)
-            has_javascript = False
-            for page_num in range(len(pdf.pages)):
-                try:
-                    page = pdf.pages[page_num]
-                    page_obj = page.get_object()
-
-                    # Check for JS in page annotations
-                    if '/Annots' in page_obj:
-                        annots = page_obj['/Annots']
-                        if hasattr(annots, 'get_object'):
-                            annots = annots.get_object()
-
-                        for annot in annots if isinstance(annots, list) else []:
-                            try:
-                                annot_obj = annot.get_object() if hasattr(annot, 'get_object') else annot
-                                if '/JS' in annot_obj or '/JavaScript' in annot_obj:
-                                    has_javascript = True
-                                    break
-                            except:
-                                pass
-
-                    # Check for JS in page object
-                    if '/JS' in page_obj or '/JavaScript' in page_obj:
-                        has_javascript = True
-                        break
-
-                except Exception as e:
-                    logger.debug(f"Error checking page {page_num} for JavaScript: {e}")
-
-            if has_javascript:
-                threats.append("PDF contains JavaScript (potential exploit vector)")
+            flags = document.risk_flags()
 
-            # Check for embedded files
-            catalog = pdf.trailer.get('/Root')
-            if catalog:
-                catalog_obj = catalog.get_object() if hasattr(catalog, 'get_object') else catalog
-                if '/Names' in catalog_obj:
-                    names = catalog_obj['/Names']
-                    names_obj = names.get_object() if hasattr(names, 'get_object') else names
-                    if '/EmbeddedFiles' in names_obj:
-                        warnings.append("PDF contains embedded files")
-
-            # Check for launch actions (very high risk)
-            if '/AA' in pdf.trailer or '/OpenAction' in pdf.trailer:
-                trailer_str = str(pdf.trailer)
-                if '/Launch' in trailer_str:
-                    threats.append("PDF contains launch actions (can execute system commands)")
-
-            # Check for suspicious URIs
-            for page_num in range(len(pdf.pages)):
-                try:
-                    page = pdf.pages[page_num]
-                    page_str = str(page.get_object())
-                    if '/URI' in page_str and ('cmd.exe' in page_str or 'powershell' in page_str):
-                        threats.append("PDF contains suspicious URI actions")
-                        break
-                except:
-                    pass
+            if flags['javascript']:
+                threats.append("PDF contains JavaScript (potential exploit vector)")
+            if flags['embedded_files']:
+                warnings.append("PDF contains embedded files")
+            if flags['launch_action']:
+                threats.append("PDF contains launch actions (can execute system commands)")
+            if flags['suspicious_uri']:
+                threats.append("PDF contains suspicious URI actions")
 
             is_safe = len(threats) == 0
 
@@ -353,7 +314,7 @@ class MalwareScannerService:
                 warnings=warnings
             )
 
-        except PdfReadError as e:
+        except PDFOpenError as e:
             logger.error(f"Invalid PDF structure: {e}")
             return ScanResult(
                 is_safe=False,
@@ -365,6 +326,9 @@ class MalwareScannerService:
                 is_safe=True,
                 warnings=[f"PDF structure validation failed: {str(e)}"]
             )
+        finally:
+            if owns_document and document is not None:
+                document.close()
 
     async def _validate_office_document(self, file_content: BinaryIO, mime_type: str) -> ScanResult:
         """
@@ -414,7 +378,7 @@ class MalwareScannerService:
             },
             'pdf_validator': {
                 'available': True,
-                'version': PyPDF2.__version__
+                'version': fitz.VersionBind
             }
         }
 
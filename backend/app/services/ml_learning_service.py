@@ -6,20 +6,31 @@ Implements intelligent weight adjustment with:
 - Differential preservation to maintain clear category boundaries
 - Confidence-based learning rate modifiers
 - Quality filtering for keywords
+- Set-based persistence: one read and one upsert per learning event,
+  optionally queued to Celery so upload confirmation does not wait
 
 See ML_LEARNING_SYSTEM.md for complete design documentation
 """
 
 import logging
 import json
-from typing import Optional, List, Dict, Set, Tuple
+from typing import Optional, List, Dict, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import select, and_
-from uuid import UUID
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from uuid import UUID, uuid4
 from datetime import datetime
 
+from app.core.config import settings
+from app.services.lexicon_service import lexicon_service
+
 logger = logging.getLogger(__name__)
 
+# {keyword: {category_id: weight}} for every category a keyword appears in
+KeywordWeights = Dict[str, Dict[UUID, float]]
+# {(category_id, keyword): {'weight': float, 'matched': bool}} staged for the upsert
+KeywordUpdates = Dict[Tuple[UUID, str], Dict]
+
 
 class MLLearningService:
     """
@@ -31,7 +42,6 @@ class MLLearningService:
 
     def __init__(self):
         self._config_cache = None
-        self._stopwords_cache = {}
 
     def _load_config(self, session: Session) -> Dict[str, any]:
         """Load ML learning configuration from database"""
@@ -90,31 +100,6 @@ class MLLearningService:
                 'ml_learning_rate': 1.0,
             }
 
-    def _load_stopwords(self, session: Session, language: str) -> Set[str]:
-        """Load stopwords from database for given language"""
-        if language in self._stopwords_cache:
-            return self._stopwords_cache[language]
-
-        try:
-            from app.database.models import StopWord
-
-            result = session.execute(
-                select(StopWord).where(
-                    StopWord.language_code == language,
-                    StopWord.is_active == True
-                )
-            )
-
-            stopwords = {sw.word.lower() for sw in result.scalars()}
-            self._stopwords_cache[language] = stopwords
-
-            logger.info(f"Loaded {len(stopwords)} stopwords for language: {language}")
-            return stopwords
-
-        except Exception as e:
-            logger.error(f"Failed to load stopwords for {language}: {e}")
-            return set()
-
     def _filter_quality_keywords(
         self,
         keywords: List[str],
@@ -128,7 +113,7 @@ class MLLearningService:
         - Remove too short keywords
         - Remove numeric-only keywords
         """
-        stopwords = self._load_stopwords(session, language)
+        stopwords = lexicon_service.stop_words(session, language)
         min_length = config.get('ml_min_keyword_length', 3)
 
         filtered = []
@@ -198,13 +183,46 @@ class MLLearningService:
 
         return adjustment
 
+    def _load_keyword_weights(
+        self,
+        keywords: List[str],
+        language: str,
+        session: Session
+    ) -> KeywordWeights:
+        """
+        Load the weights of the given keywords in every category with one query
+
+        Returns: {keyword: {category_id: weight}}
+        """
+        from app.database.models import CategoryKeyword
+
+        if not keywords:
+            return {}
+
+        rows = session.execute(
+            select(CategoryKeyword.category_id, CategoryKeyword.keyword, CategoryKeyword.weight).where(
+                CategoryKeyword.keyword.in_(set(keywords)),
+                CategoryKeyword.language_code == language
+            )
+        )
+
+        weights: KeywordWeights = {}
+        for category_id, keyword, weight in rows:
+            weights.setdefault(keyword, {})[category_id] = weight
+        return weights
+
+    @staticmethod
+    def _max_other_weight(weights: KeywordWeights, keyword: str, category_id: UUID) -> Optional[float]:
+        """Highest weight of keyword outside category_id (None if it exists nowhere else)"""
+        others = [w for cat_id, w in weights.get(keyword, {}).items() if cat_id != category_id]
+        return max(others) if others else None
+
     def _ensure_differential_preservation(
         self,
         primary_category_id: UUID,
         keyword: str,
-        language: str,
         primary_new_weight: float,
-        session: Session,
+        weights: KeywordWeights,
         config: Dict
     ) -> float:
         """
@@ -212,28 +230,13 @@ class MLLearningService:
 
         Returns: Adjusted weight for primary category (may be boosted)
         """
-        from app.database.models import CategoryKeyword
-
         min_differential = config['ml_min_weight_differential']
 
-        # Get weights of this keyword in OTHER categories
-        result = session.execute(
-            select(CategoryKeyword).where(
-                CategoryKeyword.keyword == keyword,
-                CategoryKeyword.language_code == language,
-                CategoryKeyword.category_id != primary_category_id
-            )
-        )
-
-        other_keywords = result.scalars().all()
-
-        if not other_keywords:
+        max_other_weight = self._max_other_weight(weights, keyword, primary_category_id)
+        if max_other_weight is None:
             # No overlap, no need for differential boost
             return primary_new_weight
 
-        # Find highest weight in other categories
-        max_other_weight = max(kw.weight for kw in other_keywords)
-
         # Check differential
         differential = primary_new_weight - max_other_weight
 
@@ -249,62 +252,32 @@ class MLLearningService:
         self,
         category_id: UUID,
         keyword: str,
-        language: str,
         weight_adjustment: float,
-        session: Session,
+        weights: KeywordWeights,
+        updates: KeywordUpdates,
         config: Dict
     ) -> None:
-        """Update or create CategoryKeyword with new weight"""
-        from app.database.models import CategoryKeyword
-
-        # Find existing keyword
-        existing = session.execute(
-            select(CategoryKeyword).where(
-                CategoryKeyword.category_id == category_id,
-                CategoryKeyword.keyword == keyword,
-                CategoryKeyword.language_code == language
-            )
-        ).scalar_one_or_none()
-
-        if existing:
-            # Update existing
-            new_weight = existing.weight + weight_adjustment
+        """Compute the new (clamped) weight of a matched keyword and stage it for the upsert"""
+        existing = weights.get(keyword, {}).get(category_id)
+        new_weight = existing + weight_adjustment if existing is not None else weight_adjustment
 
-            # Clamp to bounds
-            new_weight = max(config['ml_min_weight'], min(config['ml_max_weight'], new_weight))
+        # Clamp to bounds
+        new_weight = max(config['ml_min_weight'], min(config['ml_max_weight'], new_weight))
 
-            existing.weight = new_weight
-            existing.match_count += 1
-            existing.last_matched_at = datetime.utcnow()
-
-            logger.debug(f"Updated keyword '{keyword}' in category {category_id}: {existing.weight - weight_adjustment:.2f} → {new_weight:.2f}")
+        weights.setdefault(keyword, {})[category_id] = new_weight
+        updates[(category_id, keyword)] = {'weight': new_weight, 'matched': True}
 
+        if existing is not None:
+            logger.debug(f"Updated keyword '{keyword}' in category {category_id}: {existing:.2f} → {new_weight:.2f}")
         else:
-            # Create new keyword
-            new_weight = weight_adjustment
-
-            # Clamp to bounds
-            new_weight = max(config['ml_min_weight'], min(config['ml_max_weight'], new_weight))
-
-            new_keyword = CategoryKeyword(
-                category_id=category_id,
-                keyword=keyword,
-                language_code=language,
-                weight=new_weight,
-                match_count=1,
-                last_matched_at=datetime.utcnow(),
-                is_system_default=False  # Learned keywords are not system keywords
-            )
-            session.add(new_keyword)
-
             logger.debug(f"Created keyword '{keyword}' in category {category_id}: weight={new_weight:.2f}")
 
     def _apply_negative_learning(
         self,
         wrong_category_id: UUID,
         keywords: List[str],
-        language: str,
-        session: Session,
+        weights: KeywordWeights,
+        updates: KeywordUpdates,
         config: Dict
     ) -> None:
         """
@@ -312,33 +285,25 @@ class MLLearningService:
 
         This prevents keywords from accumulating in wrong categories
         """
-        from app.database.models import CategoryKeyword
-
         penalty = config.get('ml_wrong_prediction_penalty', 0.3)
 
         for keyword in keywords:
-            existing = session.execute(
-                select(CategoryKeyword).where(
-                    CategoryKeyword.category_id == wrong_category_id,
-                    CategoryKeyword.keyword == keyword,
-                    CategoryKeyword.language_code == language
-                )
-            ).scalar_one_or_none()
+            existing = weights.get(keyword, {}).get(wrong_category_id)
+            if existing is None:
+                continue
 
-            if existing:
-                # Reduce weight
-                new_weight = existing.weight - penalty
-                new_weight = max(config['ml_min_weight'], new_weight)
+            # Reduce weight
+            new_weight = max(config['ml_min_weight'], existing - penalty)
 
-                existing.weight = new_weight
-                logger.debug(f"[NEGATIVE LEARNING] Reduced '{keyword}' in wrong category: -{penalty:.2f} → {new_weight:.2f}")
+            weights[keyword][wrong_category_id] = new_weight
+            updates[(wrong_category_id, keyword)] = {'weight': new_weight, 'matched': False}
+            logger.debug(f"[NEGATIVE LEARNING] Reduced '{keyword}' in wrong category: -{penalty:.2f} → {new_weight:.2f}")
 
     def _filter_distinctive_keywords(
         self,
         keywords: List[str],
         primary_category_id: UUID,
-        language: str,
-        session: Session,
+        weights: KeywordWeights,
         config: Dict
     ) -> List[str]:
         """
@@ -350,47 +315,28 @@ class MLLearningService:
 
         Returns: List of distinctive keywords safe to learn
         """
-        from app.database.models import CategoryKeyword
-        from sqlalchemy import func
-
         distinctive = []
         min_differential = config.get('ml_min_weight_differential', 0.3)
 
         for keyword in keywords:
-            # Get all categories that have this keyword
-            other_categories = session.execute(
-                select(CategoryKeyword).where(
-                    CategoryKeyword.keyword == keyword,
-                    CategoryKeyword.language_code == language,
-                    CategoryKeyword.category_id != primary_category_id
-                )
-            ).scalars().all()
+            keyword_weights = weights.get(keyword, {})
+            other_count = sum(1 for cat_id in keyword_weights if cat_id != primary_category_id)
 
-            if not other_categories:
+            if not other_count:
                 # Keyword doesn't exist in other categories - it's distinctive!
                 distinctive.append(keyword)
                 logger.debug(f"[DISTINCTIVE] '{keyword}': not in other categories ✓")
                 continue
 
             # Check if keyword is too common (exists in many categories)
-            if len(other_categories) >= 3:
+            if other_count >= 3:
                 # Keyword appears in 3+ other categories - too generic
-                logger.debug(f"[NOT DISTINCTIVE] '{keyword}': appears in {len(other_categories)} other categories ✗")
+                logger.debug(f"[NOT DISTINCTIVE] '{keyword}': appears in {other_count} other categories ✗")
                 continue
 
             # Check weight in other categories
-            max_other_weight = max(kw.weight for kw in other_categories)
-
-            # Get current weight in primary category (if exists)
-            primary_kw = session.execute(
-                select(CategoryKeyword).where(
-                    CategoryKeyword.category_id == primary_category_id,
-                    CategoryKeyword.keyword == keyword,
-                    CategoryKeyword.language_code == language
-                )
-            ).scalar_one_or_none()
-
-            current_primary_weight = primary_kw.weight if primary_kw else 1.0  # Default weight for new keywords
+            max_other_weight = self._max_other_weight(weights, keyword, primary_category_id)
+            current_primary_weight = keyword_weights.get(primary_category_id, 1.0)  # Default weight for new keywords
 
             # If keyword already has much higher weight elsewhere, don't learn it
             if max_other_weight > (current_primary_weight + min_differential):
@@ -403,6 +349,69 @@ class MLLearningService:
 
         return distinctive
 
+    def _persist_keyword_updates(
+        self,
+        updates: KeywordUpdates,
+        language: str,
+        session: Session
+    ) -> None:
+        """
+        Write all staged keyword weights with one INSERT ... ON CONFLICT DO UPDATE
+
+        Rows are sorted so concurrent learners lock category_keywords rows in the
+        same order (no deadlocks when many documents are confirmed at once), and
+        match_count is incremented server-side so parallel updates are not lost.
+        """
+        from app.database.models import CategoryKeyword
+
+        if not updates:
+            return
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                'id': uuid4(),
+                'category_id': category_id,
+                'keyword': keyword,
+                'language_code': language,
+                'weight': update['weight'],
+                'match_count': 1 if update['matched'] else 0,
+                'last_matched_at': now if update['matched'] else None,
+                'is_system_default': False,  # Learned keywords are not system keywords
+            }
+            for (category_id, keyword), update in sorted(updates.items(), key=lambda item: (str(item[0][0]), item[0][1]))
+        ]
+
+        statement = pg_insert(CategoryKeyword).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=['category_id', 'keyword', 'language_code'],
+            set_={
+                'weight': statement.excluded.weight,
+                'match_count': CategoryKeyword.match_count + statement.excluded.match_count,
+                'last_matched_at': func.coalesce(statement.excluded.last_matched_at, CategoryKeyword.last_matched_at),
+                'last_updated': func.now(),
+            }
+        )
+        session.execute(statement)
+
+    def _involves_other_category(
+        self,
+        primary_category_id: UUID,
+        secondary_category_ids: List[UUID],
+        session: Session
+    ) -> bool:
+        """True if the primary or any secondary category is the "Other" fallback"""
+        from app.database.models import Category
+
+        category_ids = [primary_category_id, *(secondary_category_ids or [])]
+        other_id = session.execute(
+            select(Category.id).where(
+                Category.id.in_(category_ids),
+                Category.reference_key == 'OTH'
+            ).limit(1)
+        ).scalar_one_or_none()
+        return other_id is not None
+
     def learn_from_classification(
         self,
         document_id: UUID,
@@ -418,6 +427,9 @@ class MLLearningService:
         """
         Main entry point: Learn from document classification decision
 
+        All affected keyword rows are loaded in one query, adjusted in memory and
+        written back with a single upsert before the commit.
+
         Args:
             document_id: Document UUID
             document_keywords: Keywords extracted from document
@@ -442,27 +454,17 @@ class MLLearningService:
 
             # CRITICAL: Never learn keywords for "Other" category
             # "Other" is a fallback category and should not accumulate keywords
-            from app.database.models import Category
-            primary_category = session.get(Category, primary_category_id)
-            if primary_category and primary_category.reference_key == 'OTH':
-                logger.info(f"[ML LEARNING] Skipping learning for 'Other' category (reference_key=OTH)")
+            if self._involves_other_category(primary_category_id, secondary_category_ids, session):
+                logger.info(f"[ML LEARNING] Skipping learning because 'Other' (reference_key=OTH) is among the categories")
                 return False
 
-            # Also skip if any secondary categories are "Other"
-            if secondary_category_ids:
-                for sec_cat_id in secondary_category_ids:
-                    sec_category = session.get(Category, sec_cat_id)
-                    if sec_category and sec_category.reference_key == 'OTH':
-                        logger.warning(f"[ML LEARNING] Skipping learning because 'Other' is in secondary categories")
-                        return False
-
             # Filter quality keywords
-            quality_keywords = self._filter_quality_keywords(
+            quality_keywords = list(dict.fromkeys(self._filter_quality_keywords(
                 document_keywords,
                 language,
                 session,
                 config
-            )
+            )))
 
             min_required = config.get('ml_min_keywords_required', 3)
             if len(quality_keywords) < min_required:
@@ -471,14 +473,17 @@ class MLLearningService:
 
             logger.info(f"Learning from {len(quality_keywords)} keywords for primary category only")
 
+            weights = self._load_keyword_weights(quality_keywords, language, session)
+            updates: KeywordUpdates = {}
+
             # NEGATIVE LEARNING: If AI predicted wrong category, reduce weights there
             if ai_predicted_category and ai_predicted_category != primary_category_id:
                 logger.info(f"[ML LEARNING] AI predicted wrong category - applying negative learning")
                 self._apply_negative_learning(
                     wrong_category_id=ai_predicted_category,
                     keywords=quality_keywords,
-                    language=language,
-                    session=session,
+                    weights=weights,
+                    updates=updates,
                     config=config
                 )
 
@@ -486,8 +491,7 @@ class MLLearningService:
             distinctive_keywords = self._filter_distinctive_keywords(
                 keywords=quality_keywords,
                 primary_category_id=primary_category_id,
-                language=language,
-                session=session,
+                weights=weights,
                 config=config
             )
 
@@ -495,55 +499,51 @@ class MLLearningService:
 
             if not distinctive_keywords:
                 logger.warning(f"[ML LEARNING] No distinctive keywords to learn - skipping")
+                # Penalties already computed would otherwise be discarded
+                self._persist_keyword_updates(updates, language, session)
+                session.commit()
                 return False
 
+            # Same adjustment for every keyword of this document
+            adjustment = self._calculate_weight_adjustment(
+                is_primary=True,
+                ai_predicted_category=ai_predicted_category,
+                category_id=primary_category_id,
+                ai_confidence=ai_confidence,
+                config=config
+            )
+
             # Process primary category ONLY with distinctive keywords
             for keyword in distinctive_keywords:
-                # Calculate weight adjustment
-                adjustment = self._calculate_weight_adjustment(
-                    is_primary=True,
-                    ai_predicted_category=ai_predicted_category,
-                    category_id=primary_category_id,
-                    ai_confidence=ai_confidence,
-                    config=config
-                )
-
-                # Apply update
                 self._apply_weight_update(
                     primary_category_id,
                     keyword,
-                    language,
                     adjustment,
-                    session,
+                    weights,
+                    updates,
                     config
                 )
 
             # After primary updates, apply differential preservation
-            session.flush()  # Ensure weights are updated before checking differentials
-
             for keyword in quality_keywords:
-                # Get current weight after update
-                from app.database.models import CategoryKeyword
-                primary_kw = session.execute(
-                    select(CategoryKeyword).where(
-                        CategoryKeyword.category_id == primary_category_id,
-                        CategoryKeyword.keyword == keyword,
-                        CategoryKeyword.language_code == language
-                    )
-                ).scalar_one_or_none()
-
-                if primary_kw:
-                    adjusted_weight = self._ensure_differential_preservation(
-                        primary_category_id,
-                        keyword,
-                        language,
-                        primary_kw.weight,
-                        session,
-                        config
-                    )
-
-                    if adjusted_weight != primary_kw.weight:
-                        primary_kw.weight = adjusted_weight
+                current_weight = weights.get(keyword, {}).get(primary_category_id)
+                if current_weight is None:
+                    continue
+
+                adjusted_weight = self._ensure_differential_preservation(
+                    primary_category_id,
+                    keyword,
+                    current_weight,
+                    weights,
+                    config
+                )
+
+                if adjusted_weight != current_weight:
+                    weights[keyword][primary_category_id] = adjusted_weight
+                    update = updates.setdefault((primary_category_id, keyword), {'matched': False})
+                    update['weight'] = adjusted_weight
+
+            self._persist_keyword_updates(updates, language, session)
 
             # IMPORTANT: DO NOT learn keywords for secondary categories
             # Secondary categories are metadata tags, not classification targets
@@ -573,6 +573,64 @@ class MLLearningService:
             session.rollback()
             return False
 
+    def schedule_learning(
+        self,
+        document_id: UUID,
+        document_keywords: List[str],
+        primary_category_id: UUID,
+        secondary_category_ids: List[UUID],
+        language: str,
+        user_id: UUID,
+        ai_predicted_category: Optional[UUID] = None,
+        ai_confidence: Optional[float] = None,
+        session: Session = None
+    ) -> bool:
+        """
+        Learn from a confirmed classification without making the caller wait
+
+        Queues learn_from_classification as a low-priority Celery task when
+        analysis.ml_learning_async is enabled; runs it inline (committing the
+        given session) when disabled or when the broker is unreachable. Call
+        it after the document itself has been committed.
+
+        Returns:
+            True if learning was queued or completed successfully
+        """
+        if settings.analysis.ml_learning_async:
+            try:
+                from app.celery_app import learn_from_classification_task, INTERACTIVE_QUEUE, PRIORITY_LOW
+
+                learn_from_classification_task.apply_async(
+                    kwargs={
+                        'document_id': str(document_id),
+                        'document_keywords': list(document_keywords),
+                        'primary_category_id': str(primary_category_id),
+                        'secondary_category_ids': [str(cid) for cid in secondary_category_ids],
+                        'language': language,
+                        'user_id': str(user_id),
+                        'ai_predicted_category': str(ai_predicted_category) if ai_predicted_category else None,
+                        'ai_confidence': ai_confidence,
+                    },
+                    queue=INTERACTIVE_QUEUE,
+                    priority=PRIORITY_LOW
+                )
+                logger.info(f"[ML LEARNING] Queued learning for document {document_id}")
+                return True
+            except Exception as e:
+                logger.warning(f"[ML LEARNING] Could not queue learning for document {document_id}, running inline: {e}")
+
+        return self.learn_from_classification(
+            document_id=document_id,
+            document_keywords=document_keywords,
+            primary_category_id=primary_category_id,
+            secondary_category_ids=secondary_category_ids,
+            language=language,
+            user_id=user_id,
+            ai_predicted_category=ai_predicted_category,
+            ai_confidence=ai_confidence,
+            session=session
+        )
+
     def _log_learning_event(
         self,
         document_id: UUID,
@@ -0,0 +1,174 @@
+# backend/app/services/ocr_engine_pool.py
+"""
+In-process Tesseract engines for Bonifatus DMS
+
+pytesseract starts the tesseract binary for every call, which writes the
+image to a temp file and reloads the traineddata of every requested language
+(hundreds of MB for combinations like "eng+deu+rus+fra"). This pool keeps
+initialized tesserocr API handles per language combination and per process,
+feeds them raw pixel buffers and reuses them across pages and documents.
+
+When tesserocr is not installed or the pool is disabled, callers get None
+and fall back to pytesseract.
+"""
+
+import atexit
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.utils.ocr_utils import TSV_COLUMNS, OCRResult, parse_ocr_data, parse_tsv
+from app.utils.resource_pool import KeyedPool, PoolTimeout
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+logger = logging.getLogger(__name__)
+
+# Pool key of the orientation/script detection engine
+OSD_KEY = 'osd'
+
+
+def _set_image(api, image):
+    """Hand a PIL image's or uint8 array's raw pixels to Tesseract (no PNG/BMP encoding)"""
+    if hasattr(image, 'shape'):
+        # numpy array: (height, width) or (height, width, channels); tobytes() packs the rows
+        height, width = image.shape[:2]
+        bytes_per_pixel = 1 if len(image.shape) == 2 else image.shape[2]
+    else:
+        if image.mode not in ('L', 'RGB'):
+            image = image.convert('RGB')
+        bytes_per_pixel = 1 if image.mode == 'L' else 3
+        width, height = image.size
+    api.SetImageBytes(image.tobytes(), width, height, bytes_per_pixel, width * bytes_per_pixel)
+
+
+class OCREnginePool:
+    """Per-process pool of initialized Tesseract engines keyed by language combination"""
+
+    def __init__(self):
+        self._pool: Optional[KeyedPool] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return tesserocr is not None and settings.ocr.ocr_engine_pool_enabled
+
+    def _create_engine(self, lang: str):
+        """Initialize a Tesseract API handle (loads the traineddata once)"""
+        kwargs = {'lang': 'osd' if lang == OSD_KEY else lang}
+        if settings.ocr.ocr_tessdata_path:
+            kwargs['path'] = settings.ocr.ocr_tessdata_path
+        if lang == OSD_KEY:
+            kwargs['psm'] = tesserocr.PSM.OSD_ONLY
+        else:
+            # Same as the CLI's --oem 3 --psm 3
+            kwargs['oem'] = tesserocr.OEM.DEFAULT
+            kwargs['psm'] = tesserocr.PSM.AUTO
+
+        api = tesserocr.PyTessBaseAPI(**kwargs)
+        logger.info("[OCR ENGINE] Initialized Tesseract engine for lang=%s (pid %s)", lang, os.getpid())
+        return api
+
+    @staticmethod
+    def _close_engine(api):
+        try:
+            api.End()
+        except Exception as e:
+            logger.warning(f"[OCR ENGINE] Failed to release Tesseract engine: {e}")
+
+    def _get_pool(self) -> Optional[KeyedPool]:
+        if not self.available:
+            return None
+        pid = os.getpid()
+        with self._lock:
+            # Engines never cross a fork: each worker process builds its own
+            if self._pool is None or self._pid != pid:
+                self._pool = KeyedPool(
+                    factory=self._create_engine,
+                    max_size=settings.ocr.ocr_engine_pool_size,
+                    max_per_key=settings.ocr.ocr_engine_max_per_language,
+                    close=self._close_engine
+                )
+                if self._pid is None:
+                    atexit.register(self.shutdown)
+                self._pid = pid
+            return self._pool
+
+    def recognize(self, image, tesseract_lang: str) -> Optional[OCRResult]:
+        """
+        Recognize an image with a pooled engine for the language combination
+
+        Args:
+            image: PIL Image or uint8 array (greyscale or RGB)
+            tesseract_lang: Tesseract language string, e.g. "deu" or "eng+deu"
+
+        Returns:
+            OCRResult, or None if no in-process engine is available (use pytesseract)
+        """
+        pool = self._get_pool()
+        if pool is None:
+            return None
+        try:
+            with pool.acquire(tesseract_lang, timeout=settings.ocr.ocr_engine_acquire_timeout_seconds) as api:
+                _set_image(api, image)
+                api.Recognize()
+                tsv = api.GetTSVText(0)
+                api.Clear()
+        except PoolTimeout as e:
+            logger.warning(f"[OCR ENGINE] {e}, falling back to tesseract CLI")
+            return None
+        except RuntimeError as e:
+            # Raised by tesserocr when the traineddata can't be loaded
+            logger.warning(f"[OCR ENGINE] Engine for lang={tesseract_lang} unavailable: {e}")
+            return None
+        return parse_ocr_data(parse_tsv(tsv, header=TSV_COLUMNS))
+
+    def detect_rotation(self, image) -> Optional[Dict[str, float]]:
+        """
+        Run orientation detection with a pooled OSD engine
+
+        Returns:
+            {'rotate': clockwise degrees to correct, 'orientation_conf', 'script'}
+            (same meaning as tesseract's OSD output), or None if unavailable
+        """
+        pool = self._get_pool()
+        if pool is None:
+            return None
+        try:
+            with pool.acquire(OSD_KEY, timeout=settings.ocr.ocr_engine_acquire_timeout_seconds) as api:
+                _set_image(api, image)
+                osd = api.DetectOrientationScript()
+                api.Clear()
+        except (PoolTimeout, RuntimeError) as e:
+            logger.warning(f"[OCR ENGINE] OSD engine unavailable: {e}")
+            return None
+        if not osd:
+            return {'rotate': 0, 'orientation_conf': 0.0, 'script': 'Unknown'}
+        return {
+            # orient_deg is the page's counter-clockwise orientation
+            'rotate': (360 - osd['orient_deg']) % 360,
+            'orientation_conf': osd['orient_conf'],
+            'script': osd.get('script_name', 'Unknown'),
+        }
+
+    def get_stats(self) -> Dict[str, object]:
+        """Engine reuse counters of this process"""
+        if self._pool is None or self._pid != os.getpid():
+            return {'available': self.available, 'alive': 0}
+        return {'available': self.available, **self._pool.get_stats()}
+
+    def shutdown(self):
+        """Release idle engines (their native memory is not freed by GC promptly)"""
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.close_all()
+
+
+# Global instance
+ocr_engine_pool = OCREnginePool()
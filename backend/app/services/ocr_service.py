@@ -9,7 +9,7 @@ import logging
 import re
 import subprocess
 import tempfile
-from typing import Optional, Tuple, Dict, Set
+from typing import Optional, Tuple, Dict, Set, Union
 from PIL import Image
 import pytesseract
 import cv2
@@ -17,6 +17,16 @@ import numpy as np
 import fitz  # PyMuPDF
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.services.ocr_engine_pool import ocr_engine_pool
+from app.utils.image_preprocessing import apply_chain, downsample, measure_quality, pixmap_to_array, to_gray
+from app.utils.ocr_utils import (
+    CHAIN_NLMEANS, CHAIN_NONE, OCRResult, PageKind, PreprocessPlan, choose_preprocessing,
+    classify_page_structure, finish_text_quality, needs_orientation_check, parse_ocr_data,
+    prescreen_text_quality
+)
+from app.utils.pdf_document import PDFDocument
+
 logger = logging.getLogger(__name__)
 
 
@@ -198,87 +208,53 @@ class OCRService:
             Tuple of (quality_score, metrics_dict)
             quality_score: 1.0 = perfect, 0.0 = garbage
         """
-        if not text or len(text.strip()) < 10:
-            return 0.0, {"reason": "text_too_short"}
-
-        metrics = {}
-
-        # Basic character validation (fast check)
-        total_chars = len(text)
-        letters = len(re.findall(r'[a-zA-ZäöüßÄÖÜа-яА-Я]', text))
-        digits = len(re.findall(r'\d', text))
-        spaces = len(re.findall(r'\s', text))
-        punctuation = len(re.findall(r'[.,!?;:()\-"]', text))
-
-        valid_chars = letters + digits + spaces + punctuation
-        valid_ratio = valid_chars / total_chars if total_chars > 0 else 0
-        metrics['valid_char_ratio'] = valid_ratio
+        return self.assess_pages_quality({0: text}, language)[0]
 
-        # If too many invalid characters, fail fast
-        if valid_ratio < 0.7:
-            metrics['quality_score'] = valid_ratio * 0.5
-            logger.debug(f"Text quality (fast fail): {metrics['quality_score']:.2f}")
-            return metrics['quality_score'], metrics
-
-        # Extract words for spell checking (min 3 chars)
-        words = re.findall(r'\b[a-zA-ZäöüßÄÖÜà-яА-ЯáâãçéèêëíìîïñóòôõúùûüğışţÀÁÂÃÇÉÈÊËÍÌÎÏÑÓÒÔÕÚÙÛÜĞİŞŢ]{3,}\b', text.lower())
-
-        if len(words) < 5:
-            metrics['quality_score'] = 0.5
-            metrics['reason'] = 'too_few_words'
-            return 0.5, metrics
+    def assess_pages_quality(self, texts: Dict[int, str], language: str = 'en') -> Dict[int, Tuple[float, Dict[str, float]]]:
+        """
+        Assess the quality of several texts (e.g. PDF pages) with one spell-check run
 
-        # Spell check (sample up to 100 words for performance)
-        sample_size = min(100, len(words))
-        sample_words = set(words[:sample_size])  # Use set to avoid duplicates
+        Args:
+            texts: Key (e.g. page number) -> extracted text
+            language: Language code for spell checking
 
-        try:
-            # Use new check_spelling API that takes a set of words and returns misspelled ones
-            misspelled_words = self.check_spelling(sample_words, language)
-
-            misspelled_count = len(misspelled_words)
-            error_rate = misspelled_count / len(sample_words) if sample_words else 1.0
-            metrics['spelling_error_rate'] = error_rate
-            metrics['total_words_checked'] = len(sample_words)
-            metrics['misspelled_words'] = misspelled_count
-
-            # Quality score based on spelling accuracy
-            # < 15% errors = excellent (0.95-1.0)
-            # 15-30% errors = good (0.7-0.95)
-            # 30-50% errors = poor (0.5-0.7)
-            # > 50% errors = garbage (0.0-0.5)
-
-            if error_rate < 0.15:
-                spelling_score = 1.0 - (error_rate * 0.33)  # 0.95-1.0
-            elif error_rate < 0.30:
-                spelling_score = 0.95 - ((error_rate - 0.15) * 1.67)  # 0.7-0.95
-            elif error_rate < 0.50:
-                spelling_score = 0.7 - ((error_rate - 0.30) * 1.0)  # 0.5-0.7
+        Returns:
+            Key -> (quality_score, metrics_dict), see assess_text_quality
+        """
+        results = {}
+        samples = {}
+        for key, text in texts.items():
+            score, metrics, sample = prescreen_text_quality(text)
+            if score is not None:
+                results[key] = (score, metrics)
             else:
-                spelling_score = max(0.0, 0.5 - (error_rate - 0.5))  # 0.0-0.5
+                samples[key] = (metrics, sample)
 
-            metrics['spelling_score'] = spelling_score
+        if not samples:
+            return results
 
+        # Hunspell checks words independently, so all pages share one process
+        try:
+            misspelled = self.check_spelling(set().union(*(sample for _, sample in samples.values())), language)
         except Exception as e:
             logger.warning(f"Spell check failed: {e}")
-            # Fall back to basic word validation
-            valid_words = [w for w in words if re.search(r'[aeiouäöüАЕИОУЫЭЮЯаеиоуыэюя]', w, re.IGNORECASE)]
-            word_quality = len(valid_words) / len(words) if words else 0
-            spelling_score = word_quality
-            metrics['spelling_score'] = spelling_score
-            metrics['spelling_error_rate'] = 1.0 - word_quality
-
-        # Final quality score: weighted combination
-        quality_score = (
-            valid_ratio * 0.2 +      # Basic char validation
-            spelling_score * 0.8      # Spelling accuracy (most important)
-        )
-
-        metrics['quality_score'] = quality_score
+            misspelled = None
 
-        logger.debug(f"Text quality: {quality_score:.2f} (spelling: {spelling_score:.2f}, error_rate: {error_rate:.2%})")
-
-        return quality_score, metrics
+        for key, (metrics, sample) in samples.items():
+            if misspelled is not None:
+                score = finish_text_quality(metrics, sample, misspelled)
+            else:
+                # Fall back to basic word validation
+                valid_words = [w for w in sample if re.search(r'[aeiouäöüАЕИОУЫЭЮЯаеиоуыэюя]', w, re.IGNORECASE)]
+                word_quality = len(valid_words) / len(sample)
+                metrics['spelling_score'] = word_quality
+                metrics['spelling_error_rate'] = 1.0 - word_quality
+                score = metrics['quality_score'] = metrics['valid_char_ratio'] * 0.2 + word_quality * 0.8
+            results[key] = (score, metrics)
+            logger.debug("Text quality [%s]: %.2f (spelling: %.2f, error_rate: %.2f%%)",
+                         key, score, metrics['spelling_score'], metrics['spelling_error_rate'] * 100)
+
+        return results
 
     def preprocess_image(self, image: Image.Image, enhance: bool = False) -> Image.Image:
         """
@@ -326,404 +302,490 @@ class OCRService:
             logger.warning(f"Image preprocessing failed, using original: {e}")
             return image
 
+    def plan_preprocessing(self, gray: np.ndarray, source_dpi: Optional[float] = None) -> PreprocessPlan:
+        """
+        Measure a page on a downsampled copy and choose render DPI and preprocessing chain
+
+        Args:
+            gray: Greyscale page (any resolution; measured at ocr_probe_max_side)
+            source_dpi: Resolution of an embedded scan, if known
+
+        Returns:
+            PreprocessPlan
+        """
+        config = settings.ocr
+        noise, contrast = measure_quality(downsample(gray, config.ocr_probe_max_side))
+        return choose_preprocessing(
+            noise,
+            contrast,
+            clean_noise=config.ocr_noise_clean_threshold,
+            heavy_noise=config.ocr_noise_heavy_threshold,
+            min_contrast=config.ocr_min_contrast,
+            clean_dpi=config.ocr_clean_render_dpi,
+            dpi=config.ocr_render_dpi,
+            source_dpi=source_dpi
+        )
+
+    def _prepare(self, image: Union[Image.Image, np.ndarray], preprocess: bool, chain: Optional[str]):
+        """Apply the given chain, or (if preprocess) the one the image's measured quality calls for"""
+        if chain is None:
+            if not preprocess:
+                return image
+            if not settings.ocr.ocr_adaptive_preprocessing:
+                return self.preprocess_image(image)
+            gray = to_gray(image)
+            return apply_chain(gray, self.plan_preprocessing(gray).chain)
+        return apply_chain(to_gray(image), chain)
+
+    @staticmethod
+    def _rotate(image: Union[Image.Image, np.ndarray], rotation: int):
+        """Rotate a PIL image or array clockwise by a multiple of 90 degrees"""
+        if isinstance(image, np.ndarray):
+            return np.rot90(image, k=-(rotation // 90))
+        return image.rotate(-rotation, expand=True)  # PIL rotates counter-clockwise
+
+    def _tesseract_lang(self, db: Session, language: str) -> str:
+        """Map an app language code (or a '+'-joined Tesseract combo) to Tesseract languages"""
+        # Handle multilingual OCR (e.g., "eng+deu+rus") - use directly without lookup
+        if '+' in language:
+            return language
+        return self.get_supported_languages(db).get(language, 'eng')
+
+    def _recognize(self, image: Union[Image.Image, np.ndarray], tesseract_lang: str) -> OCRResult:
+        """
+        Run Tesseract once and return text, confidence and word layout together
+
+        Uses a pooled in-process engine when available, the tesseract CLI otherwise.
+
+        Args:
+            image: (Preprocessed) PIL Image or uint8 array
+            tesseract_lang: Tesseract language string, e.g. "deu" or "eng+deu"
+
+        Returns:
+            OCRResult built from the word-level data output
+        """
+        result = ocr_engine_pool.recognize(image, tesseract_lang)
+        if result is not None:
+            return result
+
+        data = pytesseract.image_to_data(
+            image,
+            lang=tesseract_lang,
+            config=r'--oem 3 --psm 3',
+            output_type=pytesseract.Output.DICT
+        )
+        return parse_ocr_data(data)
+
+    def _detect_rotation(self, image: Union[Image.Image, np.ndarray]) -> int:
+        """
+        Detect page rotation with Tesseract OSD (Orientation and Script Detection)
+
+        Returns:
+            Clockwise rotation in degrees to correct, 0 if none or not confident
+        """
+        try:
+            osd = ocr_engine_pool.detect_rotation(image)
+            if osd is None:
+                osd = pytesseract.image_to_osd(image, output_type=pytesseract.Output.DICT)
+        except Exception as e:
+            # OSD can fail on pages with very little text or complex layouts
+            logger.warning("[ROTATION] OSD failed: %s, proceeding without rotation correction", e)
+            return 0
+
+        detected_rotation = osd.get('rotate', 0)
+        orientation_conf = osd.get('orientation_conf', 0)
+        logger.debug(
+            "[ROTATION] OSD detected: %s° rotation (confidence: %.2f), script: %s",
+            detected_rotation, orientation_conf, osd.get('script', 'Unknown')
+        )
+        if detected_rotation != 0 and orientation_conf > 2.0:
+            return detected_rotation
+        return 0
+
     def ocr_image_with_rotation_detection(
         self,
-        image: Image.Image,
+        image: Union[Image.Image, np.ndarray],
         db: Session,
         language: str = 'en',
-        preprocess: bool = True
+        preprocess: bool = True,
+        chain: Optional[str] = None
     ) -> Tuple[str, float]:
         """
-        OCR an image with automatic rotation detection and correction
-        Uses Tesseract OSD (Orientation and Script Detection) to detect rotation
+        OCR an image, correcting its rotation when the result looks wrong
+
+        The page is recognized once as is. Orientation detection (an extra
+        Tesseract pass) only runs when that result has low confidence, very few
+        words or mostly vertical word boxes; a rotated retry is kept if it is
+        more confident.
 
         Args:
-            image: PIL Image to OCR
+            image: PIL Image or greyscale/RGB array to OCR
             db: Database session for language config
             language: Language code for OCR
-            preprocess: Whether to apply preprocessing
+            preprocess: Whether to apply preprocessing (chosen from measured quality)
+            chain: Preprocessing chain already chosen for this image (overrides preprocess)
 
         Returns:
             Tuple of (extracted_text, confidence)
         """
         try:
-            # Step 1: Detect rotation using Tesseract OSD
-            logger.info(f"[ROTATION] Running OSD on image size: {image.size}")
-            osd = pytesseract.image_to_osd(image, output_type=pytesseract.Output.DICT)
-            detected_rotation = osd.get('rotate', 0)
-            orientation_conf = osd.get('orientation_conf', 0)
-            script = osd.get('script', 'Unknown')
-            script_conf = osd.get('script_conf', 0)
-
-            logger.info(f"[ROTATION] OSD detected: {detected_rotation}° rotation (confidence: {orientation_conf:.2f}), script: {script} (conf: {script_conf:.2f})")
-
-            # Step 2: Rotate image if needed (with high confidence)
-            if detected_rotation != 0 and orientation_conf > 2.0:
-                logger.info(f"[ROTATION] ✅ Rotating image by {-detected_rotation}° before OCR")
-                image = image.rotate(-detected_rotation, expand=True)  # PIL rotates counter-clockwise
-            else:
-                logger.info(f"[ROTATION] No rotation needed (rotation={detected_rotation}°, conf={orientation_conf:.2f})")
-        except Exception as e:
-            # OSD can fail on pages with very little text or complex layouts
-            logger.warning(f"[ROTATION] OSD failed: {e}, proceeding without rotation correction")
+            tesseract_lang = self._tesseract_lang(db, language)
+            prepared = self._prepare(image, preprocess, chain)
+            result = self._recognize(prepared, tesseract_lang)
+
+            if needs_orientation_check(
+                result, settings.ocr.ocr_osd_min_confidence, settings.ocr.ocr_osd_min_words
+            ):
+                rotation = self._detect_rotation(image)
+                if rotation:
+                    logger.info("[ROTATION] Retrying OCR with image rotated by %s°", -rotation)
+                    rotated = self._prepare(self._rotate(image, rotation), preprocess, chain)
+                    retry = self._recognize(rotated, tesseract_lang)
+                    if retry.confidence > result.confidence:
+                        retry.rotation = rotation
+                        result = retry
+
+            logger.debug(
+                "Extracted %s characters with %.1f%% confidence (lang: %s, rotation: %s)",
+                len(result.text), result.confidence * 100, tesseract_lang, result.rotation
+            )
+            return result.text, result.confidence
 
-        # Step 3: OCR the (possibly rotated) image
-        return self.extract_text_from_image(image, db, language, preprocess)
+        except Exception as e:
+            logger.error(f"OCR extraction failed: {e}")
+            return "", 0.0
 
     def extract_text_from_image(
         self,
-        image: Image.Image,
+        image: Union[Image.Image, np.ndarray],
         db: Session,
         language: str = 'en',
-        preprocess: bool = True
+        preprocess: bool = True,
+        chain: Optional[str] = None
     ) -> Tuple[str, float]:
         """
         Extract text from an image using Tesseract OCR
 
         Args:
-            image: PIL Image object
+            image: PIL Image object or greyscale/RGB array
             db: Database session for loading language config
             language: Language code (fallback to 'en' if not provided)
-            preprocess: Whether to preprocess the image
+            preprocess: Whether to preprocess the image (chosen from measured quality)
+            chain: Preprocessing chain already chosen for this image (overrides preprocess)
 
         Returns:
             Tuple of (extracted_text, confidence_score)
         """
         try:
-            supported_languages = self.get_supported_languages(db)
+            tesseract_lang = self._tesseract_lang(db, language)
+            image = self._prepare(image, preprocess, chain)
+            result = self._recognize(image, tesseract_lang)
 
-            # Handle multilingual OCR (e.g., "eng+deu+rus") - use directly without lookup
-            if '+' in language:
-                tesseract_lang = language
-                logger.info(f"[OCR LANG] Using multilingual Tesseract: {tesseract_lang}")
-            else:
-                tesseract_lang = supported_languages.get(language, 'eng')
-                logger.info(f"[OCR LANG] Mapped {language} -> {tesseract_lang}")
-
-            # Log image dimensions before preprocessing
-            logger.info(f"[OCR IMAGE] Original image size: {image.size} (width x height)")
-
-            if preprocess:
-                image = self.preprocess_image(image)
-                logger.info(f"[OCR IMAGE] After preprocessing: {image.size} (width x height)")
-
-            custom_config = r'--oem 3 --psm 3'
-
-            logger.info(f"[OCR EXEC] Starting Tesseract with lang={tesseract_lang}, config={custom_config}")
-            text = pytesseract.image_to_string(
-                image,
-                lang=tesseract_lang,
-                config=custom_config
+            logger.debug(
+                "Extracted %s characters with %.1f%% confidence (lang: %s)",
+                len(result.text), result.confidence * 100, language
             )
-            logger.info(f"[OCR EXEC] Tesseract completed, extracted {len(text)} characters")
-
-            data = pytesseract.image_to_data(
-                image,
-                lang=tesseract_lang,
-                output_type=pytesseract.Output.DICT
-            )
-
-            confidences = [int(conf) for conf in data['conf'] if int(conf) > 0]
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0
-
-            text = text.strip()
-
-            logger.info(f"Extracted {len(text)} characters with {avg_confidence:.1f}% confidence (lang: {language})")
-
-            return text, avg_confidence / 100.0
+            return result.text, result.confidence
 
         except Exception as e:
             logger.error(f"OCR extraction failed: {e}")
             return "", 0.0
 
-    def is_scanned_pdf(self, pdf_file: bytes, language: str = 'en') -> Tuple[bool, float]:
+    def is_scanned_pdf(
+        self,
+        pdf_file: bytes,
+        language: str = 'en',
+        document: Optional[PDFDocument] = None
+    ) -> Tuple[bool, float]:
         """
         Detect if a PDF is scanned (image-based) or native text using PDF STRUCTURE analysis
-        This is language-agnostic and more reliable than spell-checking
+        of its first page. This is language-agnostic and more reliable than spell-checking
 
         Args:
-            pdf_file: PDF file as bytes
+            pdf_file: PDF file as bytes (parsed only if no document is given)
             language: Language code (unused, kept for API compatibility)
+            document: Already opened handle of the same PDF
 
         Returns:
             Tuple of (is_scanned, confidence_score)
             is_scanned: True if PDF is scanned/image-only, False if it contains native text
             confidence_score: Confidence in the decision (0.0-1.0)
         """
+        owns_document = document is None
+        if owns_document:
+            document = PDFDocument.from_bytes(pdf_file)
         try:
-            doc = fitz.open(stream=pdf_file, filetype="pdf")
-
-            if len(doc) == 0:
-                doc.close()
+            if document.open_error or len(document.doc) == 0:
                 return True, 0.0
+            kind = self.classify_pdf_page(document, 0)
+            return kind.is_scanned, kind.confidence
+        finally:
+            if owns_document:
+                document.close()
+
+    def classify_pdf_page(self, document: PDFDocument, number: int) -> PageKind:
+        """
+        Classify one PDF page as scanned or native text from its structure
 
-            first_page = doc[0]
+        Uses embedded fonts, non-empty text blocks, the amount of embedded text
+        and images; all of them are cached on the document handle, so native
+        extraction reuses the text.
 
-            # METHOD 1: Check for embedded fonts (native text PDFs always have fonts)
+        Returns:
+            PageKind (is_scanned, confidence, reason)
+        """
+        try:
             try:
-                font_list = doc.get_page_fonts(0)
-                font_count = len(font_list)
-            except:
+                font_count = len(document.page_fonts(number))
+            except Exception:
                 font_count = 0
 
-            # METHOD 2: Get text blocks (native PDFs have structured text blocks)
-            text_blocks = first_page.get_text("blocks")
+            text_blocks = document.page_blocks(number)
             text_block_count = len([b for b in text_blocks if len(b[4].strip()) > 0])
+            text_length = len(document.page_text(number).strip())
+            image_count = len(document.page_images(number))
 
-            # METHOD 3: Extract raw text
-            text = first_page.get_text().strip()
-            text_length = len(text)
-
-            # METHOD 4: Check for images (scanned PDFs are usually 1 full-page image)
-            image_list = first_page.get_images()
-            image_count = len(image_list)
-
-            doc.close()
-
-            # DECISION LOGIC (structure-based, language-agnostic)
-            # =========================================================
-
-            # Case 1: Definitely NATIVE text PDF
-            if font_count > 0 and text_block_count > 3:
-                logger.info(f"PDF is NATIVE TEXT: {font_count} fonts, {text_block_count} text blocks, {text_length} chars")
-                return False, 1.0
-
-            # Case 2: Substantial text present (>200 chars) = likely native
-            if text_length >= 200:
-                logger.info(f"PDF has substantial text ({text_length} chars), treating as native")
-                return False, 0.9
-
-            # Case 3: Definitely SCANNED (no fonts, no text, but has images)
-            if font_count == 0 and text_block_count == 0 and image_count > 0:
-                logger.info(f"PDF is SCANNED: no fonts, no text blocks, {image_count} images")
-                return True, 1.0
+            kind = classify_page_structure(font_count, text_block_count, text_length, image_count)
+        except Exception as e:
+            logger.warning(f"Could not determine if PDF page {number + 1} is scanned: {e}")
+            return PageKind(True, 0.0, "structure unreadable")
+
+        logger.debug("PDF page %s is %s: %s", number + 1, 'SCANNED' if kind.is_scanned else 'NATIVE TEXT', kind.reason)
+        return kind
+
+    def _embedded_image_dpi(self, page, base_image: Dict) -> Tuple[float, float]:
+        """Effective resolution of a page's embedded scan"""
+        # Get page dimensions in inches
+        page_rect = page.rect
+        page_width_inches = page_rect.width / 72
+        page_height_inches = page_rect.height / 72
+
+        # Calculate DPI
+        dpi_x = base_image['width'] / page_width_inches if page_width_inches > 0 else 0
+        dpi_y = base_image['height'] / page_height_inches if page_height_inches > 0 else 0
+
+        # Handle PDFs with incorrect page dimensions (common issue)
+        # If calculated DPI is suspiciously low but image resolution is high, recalculate using standard page sizes
+        if (dpi_x < 150 or dpi_y < 150) and (base_image['width'] >= 2000 or base_image['height'] >= 2000):
+            logger.debug("[OCR DEBUG] ⚠️ PDF has incorrect page dimensions (%.2fx%.2f in), recalculating DPI", page_width_inches, page_height_inches)
+
+            # Detect orientation from image aspect ratio
+            image_aspect = base_image['width'] / base_image['height']
+
+            # Standard page sizes (width x height in inches): Letter, A4
+            standard_sizes = [
+                (8.5, 11.0),   # US Letter portrait
+                (11.0, 8.5),   # US Letter landscape
+                (8.27, 11.69), # A4 portrait
+                (11.69, 8.27)  # A4 landscape
+            ]
+
+            # Find best matching standard size
+            best_match = None
+            best_diff = float('inf')
+            for std_width, std_height in standard_sizes:
+                std_aspect = std_width / std_height
+                aspect_diff = abs(image_aspect - std_aspect)
+                if aspect_diff < best_diff:
+                    best_diff = aspect_diff
+                    best_match = (std_width, std_height)
+
+            # Recalculate DPI using standard page size
+            if best_match:
+                page_width_inches, page_height_inches = best_match
+                dpi_x = base_image['width'] / page_width_inches
+                dpi_y = base_image['height'] / page_height_inches
+                logger.debug("[OCR DEBUG] ✅ Matched to standard page size: %sx%s inches, recalculated DPI: %.0fx%.0f", page_width_inches, page_height_inches, dpi_x, dpi_y)
+
+        logger.debug("[OCR DEBUG] Embedded image found:")
+        logger.debug("[OCR DEBUG]   - Resolution: %sx%s pixels", base_image['width'], base_image['height'])
+        logger.debug("[OCR DEBUG]   - Page size: %.2fx%.2f inches", page_width_inches, page_height_inches)
+        logger.debug("[OCR DEBUG]   - Effective DPI: %.0fx%.0f", dpi_x, dpi_y)
+        logger.debug("[OCR DEBUG]   - Format: %s", base_image['ext'])
+        logger.debug("[OCR DEBUG]   - Size: %.1f KB", len(base_image['image']) / 1024)
+        return dpi_x, dpi_y
+
+    @staticmethod
+    def _legacy_chain(base_image: Dict, dpi_x: float, dpi_y: float) -> Tuple[str, str]:
+        """Format/DPI rule used when adaptive preprocessing is disabled"""
+        # JPEG/compressed formats need preprocessing even at good DPI due to compression artifacts
+        # Clean formats (PNG, TIFF) can skip preprocessing at 200+ DPI
+        image_format = base_image['ext'].lower()
+        is_compressed_format = image_format in ['jpeg', 'jpg']
+
+        if dpi_x >= 300 and dpi_y >= 300:
+            # Very high quality - no preprocessing regardless of format
+            return CHAIN_NONE, f"HIGH QUALITY ({dpi_x:.0f} DPI)"
+        if dpi_x >= 200 and dpi_y >= 200 and not is_compressed_format:
+            # Good quality clean format (PNG, TIFF, etc.) - no preprocessing needed
+            return CHAIN_NONE, f"CLEAN FORMAT ({image_format.upper()}, {dpi_x:.0f} DPI)"
+        # Low quality OR compressed format - apply preprocessing
+        if is_compressed_format:
+            return CHAIN_NLMEANS, f"COMPRESSED FORMAT ({image_format.upper()}, {dpi_x:.0f} DPI)"
+        return CHAIN_NLMEANS, f"LOW QUALITY ({dpi_x:.0f} DPI)"
+
+    def _ocr_pdf_page(
+        self,
+        document: PDFDocument,
+        number: int,
+        db: Session,
+        language: str,
+        is_scanned: bool
+    ) -> Tuple[str, float]:
+        """
+        OCR one PDF page
 
-            # Case 4: Very little text (<50 chars) = likely scanned
-            if text_length < 50:
-                logger.info(f"PDF appears scanned: only {text_length} chars of text")
-                return True, 0.8
+        Scanned pages with an embedded image are recognized from the image at
+        its own resolution; other pages are rendered. With adaptive
+        preprocessing the page is first measured on a small greyscale render
+        (or a downsampled copy of the scan) and only as much resolution and
+        denoising as its noise and contrast call for is used.
 
-            # Case 5: Ambiguous (has some text but no fonts) = check text amount
-            if text_length >= 100:
-                logger.info(f"PDF has moderate text ({text_length} chars), treating as native")
-                return False, 0.7
+        Returns:
+            Tuple of (page_text, confidence)
+        """
+        config = settings.ocr
+        page = document.load_page(number)
+
+        # Check for embedded images (direct extraction preserves quality)
+        # CRITICAL: Only use embedded image extraction for SCANNED PDFs
+        # For NATIVE PDFs with font encoding issues, embedded images are just logos/graphics
+        # We must render the full page to get the actual text content
+        images = document.page_images(number)
+
+        if images and is_scanned:
+            base_image = document.extract_image(images[0][0])
+            dpi_x, dpi_y = self._embedded_image_dpi(page, base_image)
+
+            gray = cv2.imdecode(np.frombuffer(base_image['image'], dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+            if gray is None:
+                # Formats OpenCV can't decode (e.g. JPX variants)
+                gray = to_gray(Image.open(io.BytesIO(base_image['image'])))
+
+            if config.ocr_adaptive_preprocessing:
+                plan = self.plan_preprocessing(gray, source_dpi=min(dpi_x, dpi_y))
+                chain, reason = plan.chain, plan.reason
             else:
-                logger.info(f"PDF has little text ({text_length} chars), will re-OCR")
-                return True, 0.6
+                chain, reason = self._legacy_chain(base_image, dpi_x, dpi_y)
+            logger.debug("[OCR DEBUG] Embedded scan: %s - preprocessing: %s", reason, chain)
+        else:
+            if config.ocr_adaptive_preprocessing:
+                # Measure on a small greyscale render, then render once at the chosen DPI
+                probe_zoom = config.ocr_probe_max_side / max(page.rect.width, page.rect.height, 1)
+                probe = pixmap_to_array(page.get_pixmap(matrix=fitz.Matrix(probe_zoom, probe_zoom), colorspace=fitz.csGRAY))
+                plan = self.plan_preprocessing(probe)
+                dpi, chain, reason = plan.dpi, plan.chain, plan.reason
+            else:
+                dpi, chain, reason = config.ocr_render_dpi, CHAIN_NLMEANS, "fixed"
 
-        except Exception as e:
-            logger.warning(f"Could not determine if PDF is scanned: {e}")
-            return True, 0.0
+            logger.debug("[OCR DEBUG] Rendering page at %s DPI - %s - preprocessing: %s", dpi, reason, chain)
+            zoom = dpi / 72
+            gray = pixmap_to_array(page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY))
+
+        page_text, confidence = self.ocr_image_with_rotation_detection(gray, db, language, chain=chain)
+        logger.debug("[OCR DEBUG] Page %s extraction result: %s chars, %.1f%% confidence", number + 1, len(page_text), confidence * 100)
+        return page_text, confidence
 
     def extract_text_from_pdf(
         self,
         pdf_file: bytes,
         db: Session,
         language: str = 'en',
-        max_pages: Optional[int] = None
+        max_pages: Optional[int] = None,
+        document: Optional[PDFDocument] = None
     ) -> Tuple[str, float]:
         """
-        Extract text from PDF using detection-first approach:
-        1. Detect if PDF is scanned or native using is_scanned_pdf()
-        2. If NATIVE: Extract embedded text with PyMuPDF (handles custom fonts)
-        3. If SCANNED or extraction fails: Use Tesseract OCR
+        Extract text from PDF page by page (hybrid extraction):
+        1. Classify each page as scanned or native using classify_pdf_page()
+        2. NATIVE pages: use the embedded text if its quality passes
+        3. SCANNED pages and native pages with garbled text: Tesseract OCR
+
+        Mixed documents (native cover letter + scanned attachments) only OCR
+        the pages that need it. Quality of all native pages is assessed with
+        one spell-check run.
 
         Args:
-            pdf_file: PDF file as bytes
+            pdf_file: PDF file as bytes (parsed only if no document is given)
             db: Database session for loading language config
             language: Language code for OCR (fallback to 'en' if not provided)
             max_pages: Maximum number of pages to process (None for all)
+            document: Already opened handle of the same PDF; classification,
+                native extraction and OCR all share it
 
         Returns:
-            Tuple of (extracted_text, confidence_score)
+            Tuple of (extracted_text, confidence_score); the confidence is the
+            mean over pages with text (native pages count as 0.95)
         """
-        logger.info(f"[PDF EXTRACTION DEBUG] extract_text_from_pdf called with {len(pdf_file)} bytes, language={language}")
+        logger.debug("[PDF EXTRACTION DEBUG] extract_text_from_pdf called with %s bytes, language=%s", len(pdf_file), language)
+        owns_document = document is None
+        if owns_document:
+            document = PDFDocument.from_bytes(pdf_file)
         try:
-            # STEP 1: Detect PDF type (scanned vs native)
-            logger.info("[PDF EXTRACTION DEBUG] Calling is_scanned_pdf()...")
-            is_scanned, confidence = self.is_scanned_pdf(pdf_file)
-            logger.info(f"[PDF EXTRACTION DEBUG] PDF detection: is_scanned={is_scanned}, confidence={confidence:.2f}")
-
-            # STEP 2: If NATIVE PDF, extract embedded text with PyMuPDF
-            if not is_scanned:
-                logger.info("PDF identified as NATIVE - extracting embedded text with PyMuPDF")
-
-                doc = fitz.open(stream=pdf_file, filetype="pdf")
-                pages_to_process = len(doc) if max_pages is None else min(max_pages, len(doc))
-
-                # Extract text from all pages
-                text_parts = []
-                for i in range(pages_to_process):
-                    page = doc[i]
-                    page_text = page.get_text()
-                    if page_text and len(page_text.strip()) > 0:
-                        text_parts.append(page_text)
-
-                full_text = "\n\n".join(text_parts)
-                doc.close()
-
-                # Validate text quality to detect extraction issues
-                if len(full_text.strip()) > 50:
-                    quality_score, metrics = self.assess_text_quality(full_text)
-                    logger.info(f"PyMuPDF extraction quality: {quality_score:.2f} "
-                              f"(valid_ratio={metrics.get('valid_char_ratio', 0):.2f}, "
-                              f"spelling_score={metrics.get('spelling_score', 0):.2f})")
-
-                    # Require higher quality (0.75) to accept native text extraction
-                    # This prevents font substitution garbage from passing through
-                    if quality_score >= 0.75:
-                        # Good quality embedded text extracted successfully
-                        logger.info(f"Native text extraction successful: {len(full_text)} chars")
-                        return full_text, 0.95
-                    else:
-                        # Quality too low - likely font substitution issue, fallback to OCR
-                        logger.warning(f"Native text quality too low ({quality_score:.2f} < 0.75), falling back to OCR for better accuracy")
+            page_count = len(document.doc)
+            pages_to_process = page_count if max_pages is None else min(max_pages, page_count)
+            min_quality = settings.ocr.ocr_native_min_quality
+
+            # STEP 1: Classify pages and collect the embedded text of native ones
+            scanned_pages = set()
+            native_texts = {}
+            for i in range(pages_to_process):
+                if self.classify_pdf_page(document, i).is_scanned:
+                    scanned_pages.add(i)
                 else:
-                    logger.warning("PyMuPDF extracted insufficient text, falling back to OCR")
+                    native_texts[i] = document.page_text(i)
 
-            # STEP 3: Use OCR for scanned PDFs or when native extraction fails
-            logger.info("Using OCR for text extraction")
-            doc = fitz.open(stream=pdf_file, filetype="pdf")
-            pages_to_process = len(doc) if max_pages is None else min(max_pages, len(doc))
+            # STEP 2: Score native pages; sparse pages (too few words to judge) are kept as they are
+            qualities = self.assess_pages_quality(
+                {i: text for i, text in native_texts.items() if len(text.strip()) > 50}
+            ) if native_texts else {}
 
+            garbled_pages = set()
+            for i, (quality_score, metrics) in qualities.items():
+                if quality_score < min_quality and metrics.get('reason') != 'too_few_words':
+                    # Likely font substitution garbage - OCR the rendered page instead
+                    logger.debug("[PDF EXTRACTION DEBUG] Page %s native text quality too low (%.2f < %.2f)", i + 1, quality_score, min_quality)
+                    garbled_pages.add(i)
+
+            # STEP 3: Native text where it is good, OCR for the rest
             text_parts = []
             confidences = []
-
-            # Render at 300 DPI for better OCR quality
-            zoom = 300 / 72
-            mat = fitz.Matrix(zoom, zoom)
-
             for i in range(pages_to_process):
-                logger.info(f"[OCR DEBUG] Processing page {i+1}/{pages_to_process}")
-
-                page = doc[i]
-
-                # Check for embedded images (direct extraction preserves quality)
-                # CRITICAL: Only use embedded image extraction for SCANNED PDFs
-                # For NATIVE PDFs with font encoding issues, embedded images are just logos/graphics
-                # We must render the full page to get the actual text content
-                images = page.get_images()
-
-                if images and is_scanned:
-                    # PDF has embedded image - analyze quality
-                    xref = images[0][0]
-                    base_image = doc.extract_image(xref)
-
-                    # Get page dimensions in inches
-                    page_rect = page.rect
-                    page_width_inches = page_rect.width / 72
-                    page_height_inches = page_rect.height / 72
-
-                    # Calculate DPI
-                    dpi_x = base_image['width'] / page_width_inches if page_width_inches > 0 else 0
-                    dpi_y = base_image['height'] / page_height_inches if page_height_inches > 0 else 0
-
-                    # Handle PDFs with incorrect page dimensions (common issue)
-                    # If calculated DPI is suspiciously low but image resolution is high, recalculate using standard page sizes
-                    if (dpi_x < 150 or dpi_y < 150) and (base_image['width'] >= 2000 or base_image['height'] >= 2000):
-                        logger.info(f"[OCR DEBUG] ⚠️ PDF has incorrect page dimensions ({page_width_inches:.2f}x{page_height_inches:.2f} in), recalculating DPI")
-
-                        # Detect orientation from image aspect ratio
-                        image_aspect = base_image['width'] / base_image['height']
-
-                        # Standard page sizes (width x height in inches): Letter, A4
-                        standard_sizes = [
-                            (8.5, 11.0),   # US Letter portrait
-                            (11.0, 8.5),   # US Letter landscape
-                            (8.27, 11.69), # A4 portrait
-                            (11.69, 8.27)  # A4 landscape
-                        ]
-
-                        # Find best matching standard size
-                        best_match = None
-                        best_diff = float('inf')
-                        for std_width, std_height in standard_sizes:
-                            std_aspect = std_width / std_height
-                            aspect_diff = abs(image_aspect - std_aspect)
-                            if aspect_diff < best_diff:
-                                best_diff = aspect_diff
-                                best_match = (std_width, std_height)
-
-                        # Recalculate DPI using standard page size
-                        if best_match:
-                            page_width_inches, page_height_inches = best_match
-                            dpi_x = base_image['width'] / page_width_inches
-                            dpi_y = base_image['height'] / page_height_inches
-                            logger.info(f"[OCR DEBUG] ✅ Matched to standard page size: {page_width_inches}x{page_height_inches} inches, recalculated DPI: {dpi_x:.0f}x{dpi_y:.0f}")
-
-                    logger.info(f"[OCR DEBUG] Embedded image found:")
-                    logger.info(f"[OCR DEBUG]   - Resolution: {base_image['width']}x{base_image['height']} pixels")
-                    logger.info(f"[OCR DEBUG]   - Page size: {page_width_inches:.2f}x{page_height_inches:.2f} inches")
-                    logger.info(f"[OCR DEBUG]   - Effective DPI: {dpi_x:.0f}x{dpi_y:.0f}")
-                    logger.info(f"[OCR DEBUG]   - Format: {base_image['ext']}")
-                    logger.info(f"[OCR DEBUG]   - Size: {len(base_image['image']) / 1024:.1f} KB")
-
-                    # Smart quality and format-based extraction decision
-                    # JPEG/compressed formats need preprocessing even at good DPI due to compression artifacts
-                    # Clean formats (PNG, TIFF) can skip preprocessing at 200+ DPI
-                    image_format = base_image['ext'].lower()
-                    is_compressed_format = image_format in ['jpeg', 'jpg']
-
-                    # Determine preprocessing strategy
-                    if dpi_x >= 300 and dpi_y >= 300:
-                        # Very high quality - no preprocessing regardless of format
-                        apply_preprocess = False
-                        quality_reason = f"HIGH QUALITY ({dpi_x:.0f} DPI)"
-                    elif dpi_x >= 200 and dpi_y >= 200 and not is_compressed_format:
-                        # Good quality clean format (PNG, TIFF, etc.) - no preprocessing needed
-                        apply_preprocess = False
-                        quality_reason = f"CLEAN FORMAT ({image_format.upper()}, {dpi_x:.0f} DPI)"
-                    else:
-                        # Low quality OR compressed format - apply preprocessing
-                        apply_preprocess = True
-                        if is_compressed_format:
-                            quality_reason = f"COMPRESSED FORMAT ({image_format.upper()}, {dpi_x:.0f} DPI)"
-                        else:
-                            quality_reason = f"LOW QUALITY ({dpi_x:.0f} DPI)"
-
-                    # Extract image and apply appropriate processing
-                    import io
-                    image = Image.open(io.BytesIO(base_image['image']))
-
-                    if apply_preprocess:
-                        logger.info(f"[OCR DEBUG] ⚠️ {quality_reason} - Applying preprocessing to improve OCR")
-                        page_text, confidence = self.ocr_image_with_rotation_detection(image, db, language, preprocess=True)
-                        logger.info(f"[OCR DEBUG] Preprocessed extraction result: {len(page_text)} chars, {confidence*100:.1f}% confidence")
-                    else:
-                        logger.info(f"[OCR DEBUG] ✅ {quality_reason} - Direct extraction (no preprocessing)")
-                        page_text, confidence = self.ocr_image_with_rotation_detection(image, db, language, preprocess=False)
-                        logger.info(f"[OCR DEBUG] Direct extraction result: {len(page_text)} chars, {confidence*100:.1f}% confidence")
+                if i in native_texts and i not in garbled_pages:
+                    page_text, confidence = native_texts[i], 0.95
                 else:
-                    # No embedded images - render page
-                    logger.info(f"[OCR DEBUG] No embedded images - rendering page at 300 DPI")
-                    pix = page.get_pixmap(matrix=mat)
-                    image = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                    page_text, confidence = self.ocr_image_with_rotation_detection(image, db, language, preprocess=True)
-                    logger.info(f"[OCR DEBUG] Rendered extraction result: {len(page_text)} chars, {confidence*100:.1f}% confidence")
-
-                if page_text:
+                    logger.debug("[OCR DEBUG] Processing page %s/%s", i + 1, pages_to_process)
+                    # Only pages classified as scanned are OCR'd from their embedded image
+                    page_text, confidence = self._ocr_pdf_page(document, i, db, language, i in scanned_pages)
+
+                if page_text and page_text.strip():
                     text_parts.append(page_text)
                     confidences.append(confidence)
 
-            doc.close()
-
             full_text = "\n\n".join(text_parts)
             avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
 
-            logger.info(f"OCR extracted text from scanned PDF ({pages_to_process} pages, {avg_confidence*100:.1f}% confidence)")
+            ocr_pages = len(scanned_pages) + len(garbled_pages)
+            logger.info(
+                f"PDF text extracted from {pages_to_process} pages: {pages_to_process - ocr_pages} native, "
+                f"{len(scanned_pages)} scanned, {len(garbled_pages)} re-OCR'd ({avg_confidence*100:.1f}% confidence)"
+            )
 
             return full_text.strip(), avg_confidence
 
         except Exception as e:
             logger.error(f"PDF text extraction failed: {e}")
             return "", 0.0
+        finally:
+            if owns_document:
+                document.close()
 
     def extract_text(
         self,
         file_content: bytes,
         mime_type: str,
         db: Session,
-        language: str = 'en'
+        language: str = 'en',
+        document: Optional[PDFDocument] = None
     ) -> Tuple[str, float]:
         """
         Extract text from any supported document type
@@ -733,13 +795,14 @@ class OCRService:
             mime_type: MIME type of the file
             db: Database session for loading language config
             language: Language code for OCR (fallback to 'en' if detection fails)
+            document: Parsed handle of a PDF upload (reused instead of parsing again)
 
         Returns:
             Tuple of (extracted_text, confidence_score)
         """
         try:
             if mime_type == 'application/pdf':
-                return self.extract_text_from_pdf(file_content, db, language)
+                return self.extract_text_from_pdf(file_content, db, language, document=document)
 
             elif mime_type.startswith('image/'):
                 image = Image.open(io.BytesIO(file_content))
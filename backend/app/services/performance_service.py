@@ -1,22 +1,32 @@
 # backend/app/services/performance_service.py
 """
 Performance Monitoring Service
-Tracks request times, DB queries, and provides internal metrics.
+Tracks request times, DB queries, and provides internal metrics
+(JSON summary and Prometheus exposition).
 Logs are silent (not exposed externally) and configurable via environment variables.
 """
 
 import logging
 import time
-import threading
 from collections import deque
+from contextvars import ContextVar
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Deque
 from app.core.config import settings
+from app.utils.metrics import (
+    MetricsRegistry,
+    histogram_percentile,
+    merge_histogram_snapshots,
+    render_prometheus,
+)
 
 # Use a dedicated logger for performance metrics
 perf_logger = logging.getLogger("app.performance")
 
+# Stage span (see analysis_profiler) that DB queries on this context are attributed to
+current_stage_span: ContextVar[Optional["StageSpan"]] = ContextVar("current_stage_span", default=None)
+
 
 @dataclass
 class RequestMetric:
@@ -33,6 +43,16 @@ class RequestMetric:
     user_id: Optional[str] = None
 
 
+@dataclass
+class StageSpan:
+    """Timing of one stage of a traced operation"""
+    name: str
+    duration_ms: float = 0.0
+    db_queries: int = 0
+    db_time_ms: float = 0.0
+    bytes_processed: int = 0
+
+
 @dataclass
 class DbQueryMetric:
     """Single database query metric"""
@@ -45,30 +65,41 @@ class DbQueryMetric:
 class PerformanceMonitor:
     """
     Centralized performance monitoring service.
-    Thread-safe, stores recent metrics in memory for analysis.
+
+    Latencies go into fixed-bucket histograms (per route template and per DB
+    statement type), so recording is O(1) and percentiles stay accurate over
+    the whole process lifetime. Each worker periodically writes a snapshot to
+    a shared directory; stats and the Prometheus export merge all workers.
     """
 
-    def __init__(self, max_history: int = 1000):
-        self._lock = threading.Lock()
-        self._request_history: Deque[RequestMetric] = deque(maxlen=max_history)
-        self._db_query_history: Deque[DbQueryMetric] = deque(maxlen=max_history * 5)
+    def __init__(self, max_slow_history: Optional[int] = None):
+        self.registry = MetricsRegistry()
+        self.registry.describe("http_request_duration_ms", "HTTP request latency by method and route template")
+        self.registry.describe("http_requests_total", "HTTP requests by method, route template and status code")
+        self.registry.describe("http_slow_requests_total", "HTTP requests above the slow request threshold")
+        self.registry.describe("db_query_duration_ms", "Database query latency by statement type")
+        self.registry.describe("db_slow_queries_total", "Database queries above the slow query threshold")
+        self.registry.describe("analysis_stage_duration_ms", "Document analysis latency by stage")
+        self.registry.describe("analysis_stage_db_queries_total", "Database queries issued by document analysis stages")
+        self.registry.describe("analysis_stage_bytes_total", "Bytes processed by document analysis stages")
+
+        history = max_slow_history or settings.performance.perf_slow_request_history
+        self._slow_request_history: Deque[RequestMetric] = deque(maxlen=history)
         self._current_requests: Dict[str, Dict] = {}  # Track in-flight requests
-        self._total_requests = 0
-        self._total_db_queries = 0
-        self._slow_requests = 0
-        self._slow_db_queries = 0
+        self._flush_interval = settings.performance.perf_metrics_flush_interval_seconds
+        self._next_flush = time.monotonic() + self._flush_interval
 
     def start_request(self, request_id: str, method: str, path: str, client_ip: str = "") -> float:
         """Start tracking a request. Returns start time."""
         start_time = time.perf_counter()
-        with self._lock:
-            self._current_requests[request_id] = {
-                "method": method,
-                "path": path,
-                "client_ip": client_ip,
-                "start_time": start_time,
-                "db_queries": [],
-            }
+        self._current_requests[request_id] = {
+            "method": method,
+            "path": path,
+            "client_ip": client_ip,
+            "start_time": start_time,
+            "db_query_count": 0,
+            "db_query_time_ms": 0.0,
+        }
         return start_time
 
     def record_db_query(self, request_id: str, query_type: str, duration_ms: float):
@@ -76,154 +107,179 @@ class PerformanceMonitor:
         if not settings.performance.perf_logging_enabled:
             return
 
-        with self._lock:
-            if request_id in self._current_requests:
-                self._current_requests[request_id]["db_queries"].append({
-                    "type": query_type,
-                    "duration_ms": duration_ms
-                })
-
-            self._total_db_queries += 1
-
-            # Log slow queries
-            threshold = settings.performance.perf_slow_db_query_threshold_ms
-            if duration_ms > threshold:
-                self._slow_db_queries += 1
-                if settings.performance.perf_log_db_queries:
-                    perf_logger.warning(
-                        f"[SLOW DB] {query_type} query took {duration_ms:.2f}ms (threshold: {threshold}ms)"
-                    )
-
-            # Store in history
-            metric = DbQueryMetric(
-                request_id=request_id,
-                query_type=query_type,
-                duration_ms=duration_ms
-            )
-            self._db_query_history.append(metric)
+        self.registry.observe("db_query_duration_ms", duration_ms, statement=query_type)
+
+        span = current_stage_span.get()
+        if span is not None:
+            span.db_queries += 1
+            span.db_time_ms += duration_ms
+
+        req_data = self._current_requests.get(request_id) if request_id else None
+        if req_data is not None:
+            req_data["db_query_count"] += 1
+            req_data["db_query_time_ms"] += duration_ms
+
+        # Log slow queries
+        threshold = settings.performance.perf_slow_db_query_threshold_ms
+        if duration_ms > threshold:
+            self.registry.increment("db_slow_queries_total", statement=query_type)
+            if settings.performance.perf_log_db_queries:
+                perf_logger.warning(
+                    f"[SLOW DB] {query_type} query took {duration_ms:.2f}ms (threshold: {threshold}ms)"
+                )
 
     def end_request(
         self,
         request_id: str,
         status_code: int,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        route: Optional[str] = None
     ) -> Optional[RequestMetric]:
-        """End request tracking and record metrics."""
-        if not settings.performance.perf_logging_enabled:
+        """
+        End request tracking and record metrics.
+
+        Args:
+            request_id: ID passed to start_request
+            status_code: Response status
+            user_id: Authenticated user, if any
+            route: Matched route template (e.g. /api/v1/documents/{document_id});
+                   unmatched requests are grouped so scans cannot create new series
+        """
+        req_data = self._current_requests.pop(request_id, None)
+        if req_data is None or not settings.performance.perf_logging_enabled:
             return None
 
-        end_time = time.perf_counter()
-
-        with self._lock:
-            if request_id not in self._current_requests:
-                return None
-
-            req_data = self._current_requests.pop(request_id)
-            duration_ms = (end_time - req_data["start_time"]) * 1000
-
-            # Calculate DB metrics
-            db_queries = req_data.get("db_queries", [])
-            db_query_count = len(db_queries)
-            db_query_time_ms = sum(q["duration_ms"] for q in db_queries)
-
-            metric = RequestMetric(
-                request_id=request_id,
-                method=req_data["method"],
-                path=req_data["path"],
-                status_code=status_code,
-                duration_ms=duration_ms,
-                db_query_count=db_query_count,
-                db_query_time_ms=db_query_time_ms,
-                client_ip=req_data["client_ip"],
-                user_id=user_id
+        duration_ms = (time.perf_counter() - req_data["start_time"]) * 1000
+        route_label = route or "unmatched"
+        method = req_data["method"]
+
+        self.registry.observe("http_request_duration_ms", duration_ms, method=method, route=route_label)
+        self.registry.increment("http_requests_total", method=method, route=route_label, status=str(status_code))
+
+        metric = RequestMetric(
+            request_id=request_id,
+            method=method,
+            path=req_data["path"],
+            status_code=status_code,
+            duration_ms=duration_ms,
+            db_query_count=req_data["db_query_count"],
+            db_query_time_ms=req_data["db_query_time_ms"],
+            client_ip=req_data["client_ip"],
+            user_id=user_id
+        )
+
+        # Log slow requests
+        threshold = settings.performance.perf_slow_request_threshold_ms
+        if duration_ms > threshold:
+            self.registry.increment("http_slow_requests_total", method=method, route=route_label)
+            self._slow_request_history.append(metric)
+            perf_logger.warning(
+                f"[SLOW REQUEST] {metric.method} {metric.path} "
+                f"took {duration_ms:.2f}ms (threshold: {threshold}ms) "
+                f"[status={status_code}, db_queries={metric.db_query_count}, db_time={metric.db_query_time_ms:.2f}ms]"
+            )
+        elif settings.performance.perf_log_all_requests:
+            perf_logger.info(
+                f"[REQUEST] {metric.method} {metric.path} "
+                f"{duration_ms:.2f}ms [status={status_code}]"
             )
 
-            self._request_history.append(metric)
-            self._total_requests += 1
+        self.maybe_flush()
+        return metric
 
-            # Log slow requests
-            threshold = settings.performance.perf_slow_request_threshold_ms
-            is_slow = duration_ms > threshold
+    def maybe_flush(self):
+        """Write this worker's snapshot to the shared directory at most once per interval"""
+        directory = settings.performance.perf_metrics_dir
+        if not directory or time.monotonic() < self._next_flush:
+            return
+        self._next_flush = time.monotonic() + self._flush_interval
+        self.registry.flush(directory)
 
-            if is_slow:
-                self._slow_requests += 1
-                perf_logger.warning(
-                    f"[SLOW REQUEST] {metric.method} {metric.path} "
-                    f"took {duration_ms:.2f}ms (threshold: {threshold}ms) "
-                    f"[status={status_code}, db_queries={db_query_count}, db_time={db_query_time_ms:.2f}ms]"
-                )
-            elif settings.performance.perf_log_all_requests:
-                perf_logger.info(
-                    f"[REQUEST] {metric.method} {metric.path} "
-                    f"{duration_ms:.2f}ms [status={status_code}]"
-                )
+    def collect(self) -> Dict:
+        """Registry snapshot merged across all live workers"""
+        return self.registry.collect(
+            settings.performance.perf_metrics_dir or None,
+            max_age_seconds=max(60, self._flush_interval * 6)
+        )
 
-            return metric
+    def render_prometheus(self) -> str:
+        """All-worker metrics in Prometheus text exposition format"""
+        return render_prometheus(self.collect())
 
     def get_stats(self) -> Dict:
         """Get performance statistics (for internal metrics endpoint)."""
-        with self._lock:
-            if not self._request_history:
-                return {
-                    "total_requests": self._total_requests,
-                    "total_db_queries": self._total_db_queries,
-                    "slow_requests": self._slow_requests,
-                    "slow_db_queries": self._slow_db_queries,
-                    "avg_request_time_ms": 0,
-                    "avg_db_time_ms": 0,
-                    "in_flight_requests": len(self._current_requests),
-                }
-
-            recent_requests = list(self._request_history)
-            avg_request_time = sum(r.duration_ms for r in recent_requests) / len(recent_requests)
-            avg_db_time = (
-                sum(r.db_query_time_ms for r in recent_requests) / len(recent_requests)
-                if recent_requests else 0
-            )
+        snapshot = self.collect()
+        bounds = tuple(snapshot["bounds"])
+
+        def family(name: str) -> List[Dict]:
+            return [h for h in snapshot["histograms"] if h["name"] == name]
 
-            # Calculate percentiles
-            durations = sorted(r.duration_ms for r in recent_requests)
-            p50_idx = len(durations) // 2
-            p95_idx = int(len(durations) * 0.95)
-            p99_idx = int(len(durations) * 0.99)
+        def counter_total(name: str) -> int:
+            return int(sum(c["value"] for c in snapshot["counters"] if c["name"] == name))
 
+        def summarize(histogram: Dict) -> Dict:
+            count = sum(histogram["counts"])
             return {
-                "total_requests": self._total_requests,
-                "total_db_queries": self._total_db_queries,
-                "slow_requests": self._slow_requests,
-                "slow_db_queries": self._slow_db_queries,
-                "in_flight_requests": len(self._current_requests),
-                "recent_request_count": len(recent_requests),
-                "avg_request_time_ms": round(avg_request_time, 2),
-                "avg_db_time_ms": round(avg_db_time, 2),
-                "p50_request_time_ms": round(durations[p50_idx] if durations else 0, 2),
-                "p95_request_time_ms": round(durations[p95_idx] if len(durations) > p95_idx else 0, 2),
-                "p99_request_time_ms": round(durations[p99_idx] if len(durations) > p99_idx else 0, 2),
-                "thresholds": {
-                    "slow_request_ms": settings.performance.perf_slow_request_threshold_ms,
-                    "slow_db_query_ms": settings.performance.perf_slow_db_query_threshold_ms,
-                }
+                "count": count,
+                "avg_ms": round(histogram["sum"] / count, 2) if count else 0,
+                "p50_ms": round(histogram_percentile(histogram, 0.50, bounds), 2),
+                "p95_ms": round(histogram_percentile(histogram, 0.95, bounds), 2),
+                "p99_ms": round(histogram_percentile(histogram, 0.99, bounds), 2),
+            }
+
+        requests = merge_histogram_snapshots(family("http_request_duration_ms"))
+        queries = merge_histogram_snapshots(family("db_query_duration_ms"))
+        request_summary = summarize(requests)
+        total_requests = request_summary["count"]
+
+        return {
+            "total_requests": total_requests,
+            "total_db_queries": sum(queries["counts"]),
+            "slow_requests": counter_total("http_slow_requests_total"),
+            "slow_db_queries": counter_total("db_slow_queries_total"),
+            "in_flight_requests": len(self._current_requests),
+            "avg_request_time_ms": request_summary["avg_ms"],
+            "avg_db_time_ms": round(queries["sum"] / total_requests, 2) if total_requests else 0,
+            "p50_request_time_ms": request_summary["p50_ms"],
+            "p95_request_time_ms": request_summary["p95_ms"],
+            "p99_request_time_ms": request_summary["p99_ms"],
+            "routes": {
+                f"{h['labels'].get('method')} {h['labels'].get('route')}": summarize(h)
+                for h in family("http_request_duration_ms")
+            },
+            "db_statements": {
+                h["labels"].get("statement"): summarize(h)
+                for h in family("db_query_duration_ms")
+            },
+            "analysis_stages": {
+                h["labels"].get("stage"): summarize(h)
+                for h in family("analysis_stage_duration_ms")
+            },
+            "gauges": {
+                g["name"]: g["value"] for g in snapshot.get("gauges", []) if not g["labels"]
+            },
+            "thresholds": {
+                "slow_request_ms": settings.performance.perf_slow_request_threshold_ms,
+                "slow_db_query_ms": settings.performance.perf_slow_db_query_threshold_ms,
             }
+        }
 
     def get_recent_slow_requests(self, limit: int = 20) -> List[Dict]:
-        """Get recent slow requests for debugging."""
-        threshold = settings.performance.perf_slow_request_threshold_ms
-        with self._lock:
-            slow = [
-                {
-                    "request_id": r.request_id,
-                    "method": r.method,
-                    "path": r.path,
-                    "duration_ms": round(r.duration_ms, 2),
-                    "status_code": r.status_code,
-                    "db_query_count": r.db_query_count,
-                    "db_query_time_ms": round(r.db_query_time_ms, 2),
-                    "timestamp": r.timestamp.isoformat(),
-                }
-                for r in self._request_history
-                if r.duration_ms > threshold
-            ]
-            return slow[-limit:]
+        """Get recent slow requests for debugging (this worker only)."""
+        slow = [
+            {
+                "request_id": r.request_id,
+                "method": r.method,
+                "path": r.path,
+                "duration_ms": round(r.duration_ms, 2),
+                "status_code": r.status_code,
+                "db_query_count": r.db_query_count,
+                "db_query_time_ms": round(r.db_query_time_ms, 2),
+                "timestamp": r.timestamp.isoformat(),
+            }
+            for r in list(self._slow_request_history)
+        ]
+        return slow[-limit:]
 
 
 # Global instance
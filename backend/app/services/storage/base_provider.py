@@ -6,10 +6,14 @@ This module defines the abstract base class that all storage providers
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, BinaryIO
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, BinaryIO, Callable, List
 from dataclasses import dataclass
 from datetime import datetime
 
+from app.core.config import settings
+from app.services.storage.folder_cache import folder_cache
+
 
 @dataclass
 class UploadResult:
@@ -46,6 +50,7 @@ class StorageProvider(ABC):
     - redirect_uri passed to methods (not constructor) for flexibility in different contexts
     - folder_id in upload (not folder_name) for efficiency - avoids extra API calls
     - Encrypted tokens passed to methods to maintain security
+    - account_key (the user ID) scopes the folder ID cache; without it folders are looked up every time
     """
 
     def __init__(self, provider_type: str):
@@ -57,6 +62,70 @@ class StorageProvider(ABC):
         """
         self.provider_type = provider_type
 
+    def _cached_folder(
+        self,
+        account_key: Optional[str],
+        folder_name: str,
+        parent_id: Optional[str],
+        resolve: Callable[[], str]
+    ) -> str:
+        """
+        Folder ID from the folder cache, resolved (found or created) on a miss.
+
+        Args:
+            account_key: Cache scope (user ID); None disables caching
+            folder_name: Folder name
+            parent_id: Parent folder ID (None for the drive root)
+            resolve: Finds or creates the folder and returns its ID
+        """
+        folder_id = folder_cache.get(account_key, self.provider_type, folder_name, parent_id)
+        if folder_id:
+            return folder_id
+        folder_id = resolve()
+        folder_cache.put(account_key, self.provider_type, folder_name, folder_id, parent_id)
+        return folder_id
+
+    def _resolve_folders(
+        self,
+        account_key: Optional[str],
+        folder_names: List[str],
+        parent_id: str,
+        resolve: Callable[[str], str]
+    ) -> Dict[str, str]:
+        """
+        Folder IDs of several sibling folders; cache misses are resolved in parallel.
+
+        Args:
+            account_key: Cache scope (user ID); None disables caching
+            folder_names: Folder names under parent_id
+            parent_id: Parent folder ID
+            resolve: Finds or creates one folder by name and returns its ID
+                (called from worker threads when several folders are missing)
+
+        Returns:
+            Dictionary mapping folder names to folder IDs
+        """
+        folder_map = {}
+        missing = []
+        for folder_name in dict.fromkeys(folder_names):
+            folder_id = folder_cache.get(account_key, self.provider_type, folder_name, parent_id)
+            if folder_id:
+                folder_map[folder_name] = folder_id
+            else:
+                missing.append(folder_name)
+
+        workers = min(settings.storage.storage_folder_resolve_workers, len(missing))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{self.provider_type}-folders") as executor:
+                resolved = list(zip(missing, executor.map(resolve, missing)))
+        else:
+            resolved = [(folder_name, resolve(folder_name)) for folder_name in missing]
+
+        for folder_name, folder_id in resolved:
+            folder_cache.put(account_key, self.provider_type, folder_name, folder_id, parent_id)
+            folder_map[folder_name] = folder_id
+        return folder_map
+
     @abstractmethod
     def get_authorization_url(self, state: str, redirect_uri: str) -> str:
         """
@@ -123,17 +192,19 @@ class StorageProvider(ABC):
         file_content: BinaryIO,
         filename: str,
         mime_type: str,
-        folder_id: Optional[str] = None
+        folder_id: Optional[str] = None,
+        account_key: Optional[str] = None
     ) -> UploadResult:
         """
         Upload a document to the cloud storage provider.
 
         Args:
             refresh_token_encrypted: Encrypted refresh token from database
-            file_content: Binary file content stream
+            file_content: Seekable binary stream (read chunk by chunk)
             filename: Name for the uploaded file
             mime_type: MIME type of the file (e.g., 'application/pdf')
             folder_id: Optional folder ID to upload into (provider-specific)
+            account_key: Folder cache scope (user ID)
 
         Returns:
             UploadResult with file metadata
@@ -143,8 +214,10 @@ class StorageProvider(ABC):
 
         Implementation Notes:
             - Must call file_content.seek(0) before reading
-            - Should handle resumable uploads for large files (>5MB)
+            - Must use a resumable, chunked upload for files above
+              storage_simple_upload_max_mb and resume from the provider's offset on failure
             - Must refresh access token if expired
+            - Should drop folder_id from the folder cache if the provider reports it missing
         """
         pass
 
@@ -185,11 +258,54 @@ class StorageProvider(ABC):
         """
         pass
 
+    @abstractmethod
+    def move_documents(self, refresh_token_encrypted: str, moves: Dict[str, str]) -> Dict[str, Optional[str]]:
+        """
+        Move many files into (possibly different) folders using batched requests.
+
+        Args:
+            refresh_token_encrypted: Encrypted refresh token from database
+            moves: Dictionary mapping file IDs to target folder IDs
+
+        Returns:
+            Dictionary mapping each file ID to None if moved, or an error message
+
+        Raises:
+            Exception: If authentication is invalid
+
+        Implementation Notes:
+            - Should use the provider's batch API (see batch_requests) and send
+              up to storage_batch_workers batches concurrently
+            - Should resend throttled items (429/5xx) with backoff instead of failing them
+        """
+        pass
+
+    @abstractmethod
+    def delete_documents(self, refresh_token_encrypted: str, file_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Delete many files using batched requests.
+
+        Args:
+            refresh_token_encrypted: Encrypted refresh token from database
+            file_ids: Provider-specific file identifiers
+
+        Returns:
+            Dictionary mapping each file ID to None if deleted, or an error message
+
+        Raises:
+            Exception: If authentication is invalid
+
+        Note:
+            Files that no longer exist count as deleted (None)
+        """
+        pass
+
     @abstractmethod
     def initialize_folder_structure(
         self,
         refresh_token_encrypted: str,
-        folder_names: list[str]
+        folder_names: list[str],
+        account_key: Optional[str] = None
     ) -> Dict[str, str]:
         """
         Create folder structure for organizing documents by category.
@@ -197,6 +313,7 @@ class StorageProvider(ABC):
         Args:
             refresh_token_encrypted: Encrypted refresh token from database
             folder_names: List of folder names to create (e.g., ['Invoices', 'Contracts'])
+            account_key: Folder cache scope (user ID)
 
         Returns:
             Dictionary mapping folder names to provider-specific folder IDs
@@ -208,11 +325,12 @@ class StorageProvider(ABC):
         Implementation Notes:
             - Should check if folders already exist before creating
             - Should be idempotent (safe to call multiple times)
+            - Should resolve folders through _resolve_folders (cached, parallel)
         """
         pass
 
     @abstractmethod
-    def delete_app_folder(self, refresh_token_encrypted: str) -> Dict[str, Any]:
+    def delete_app_folder(self, refresh_token_encrypted: str, account_key: Optional[str] = None) -> Dict[str, Any]:
         """
         Delete the entire app folder from the cloud storage provider.
 
@@ -221,6 +339,7 @@ class StorageProvider(ABC):
 
         Args:
             refresh_token_encrypted: Encrypted refresh token from database
+            account_key: Folder cache scope (user ID); its cached folders are dropped
 
         Returns:
             Dictionary containing:
@@ -0,0 +1,92 @@
+"""
+Helpers for resumable, chunked uploads to cloud storage providers.
+
+Providers read one chunk at a time from a seekable stream (a spooled
+temporary file or a file on disk), so large scans are never held in memory
+as a whole. When a chunk fails with a transient error, the upload asks the
+provider how much it has received and continues from that offset.
+"""
+
+import hashlib
+import random
+import tempfile
+from typing import BinaryIO, Optional, Sequence
+
+from app.core.config import settings
+
+MB = 1024 * 1024
+
+# Google Drive chunks must be multiples of 256 KiB, OneDrive chunks multiples of 320 KiB
+GOOGLE_CHUNK_GRANULARITY = 256 * 1024
+ONEDRIVE_CHUNK_GRANULARITY = 320 * 1024
+
+# Responses worth retrying (the upload session stays valid)
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def stream_size(stream: BinaryIO) -> int:
+    """Size of a seekable stream; leaves it positioned at the start"""
+    stream.seek(0, 2)
+    size = stream.tell()
+    stream.seek(0)
+    return size
+
+
+def hash_stream(stream: BinaryIO, chunk_size: int = MB) -> str:
+    """SHA-256 of a seekable stream without reading it into memory at once"""
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def spool(content: bytes) -> BinaryIO:
+    """
+    Copy upload bytes into a spooled temporary file
+
+    Small files stay in memory; larger ones roll over to disk, so the caller
+    can drop its bytes and keep only the file.
+    """
+    spooled = tempfile.SpooledTemporaryFile(max_size=settings.storage.storage_spool_max_memory_mb * MB)
+    spooled.write(content)
+    spooled.seek(0)
+    return spooled
+
+
+def align_chunk_size(size: int, granularity: int) -> int:
+    """Round a chunk size down to a multiple of the provider's granularity (at least one unit)"""
+    return max(granularity, size // granularity * granularity)
+
+
+def upload_chunk_size(granularity: int) -> int:
+    """Configured chunk size aligned for a provider"""
+    return align_chunk_size(settings.storage.storage_upload_chunk_mb * MB, granularity)
+
+
+def use_resumable_upload(size: int) -> bool:
+    """Whether a file is large enough for a resumable upload session"""
+    return size > settings.storage.storage_simple_upload_max_mb * MB
+
+
+def content_range(start: int, length: int, total: int) -> str:
+    """Content-Range header value of one chunk"""
+    return f"bytes {start}-{start + length - 1}/{total}"
+
+
+def next_expected_offset(ranges: Optional[Sequence[str]]) -> Optional[int]:
+    """
+    First byte the provider still expects, from ranges like ["26214400-"] or ["0-99", "200-"]
+
+    Returns:
+        Offset to resume from, or None if nothing is missing
+    """
+    if not ranges:
+        return None
+    return min(int(r.split('-', 1)[0]) for r in ranges)
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Exponential backoff with jitter for retry number attempt (0-based)"""
+    return min(cap, base * (2 ** attempt)) + random.uniform(0, base)
@@ -0,0 +1,118 @@
+"""
+Folder ID cache for cloud storage providers.
+
+Every upload used to look up the app folder and the category folder by name
+(a Drive files().list query or a Graph children lookup each) before sending
+a single byte. Folder IDs are stable, so providers remember them per
+account, parent and folder name.
+
+Entries expire after a TTL and are dropped when a category is renamed or
+deleted, when the app folder is deleted, or when the provider reports a
+cached folder as missing. The cache is per process; the TTL bounds how long
+another worker can keep using an ID that was invalidated elsewhere.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from app.core.config import settings
+
+FolderKey = Tuple[str, str, str, str]
+
+
+class FolderCache:
+    """
+    Thread-safe LRU cache of folder IDs with a TTL
+
+    Keys are (account_key, provider_type, parent_id, folder_name); the
+    account key is the user ID. An empty parent_id means the drive root.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: 'OrderedDict[FolderKey, Tuple[str, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(account_key: str, provider_type: str, folder_name: str, parent_id: Optional[str]) -> FolderKey:
+        return (account_key, provider_type, parent_id or '', folder_name)
+
+    def get(self, account_key: Optional[str], provider_type: str, folder_name: str, parent_id: Optional[str] = None) -> Optional[str]:
+        """Cached folder ID, or None if unknown or expired (always None without an account)"""
+        if not account_key:
+            return None
+        key = self._key(account_key, provider_type, folder_name, parent_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, account_key: Optional[str], provider_type: str, folder_name: str, folder_id: str, parent_id: Optional[str] = None):
+        """Remember a resolved folder ID"""
+        if not account_key or not folder_id:
+            return
+        key = self._key(account_key, provider_type, folder_name, parent_id)
+        with self._lock:
+            self._entries[key] = (folder_id, self._clock() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, account_key: str, provider_type: Optional[str] = None) -> int:
+        """
+        Drop all folders of an account (optionally of one provider only)
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if key[0] == account_key and (provider_type is None or key[1] == provider_type)
+            ]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def invalidate_folder_id(self, account_key: str, folder_id: str) -> int:
+        """
+        Drop a folder that no longer exists and every folder cached beneath it
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            stale = [
+                key for key, (cached_id, _) in self._entries.items()
+                if key[0] == account_key and (cached_id == folder_id or key[2] == folder_id)
+            ]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+# Global instance
+folder_cache = FolderCache(
+    max_size=settings.storage.storage_folder_cache_size,
+    ttl_seconds=settings.storage.storage_folder_cache_ttl_seconds
+)
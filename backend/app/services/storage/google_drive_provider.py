@@ -7,7 +7,9 @@ providing OAuth authentication and document management capabilities.
 
 import logging
 import io
-from typing import Optional, Dict, Any, BinaryIO
+import threading
+import time
+from typing import Optional, Dict, Any, BinaryIO, List
 from urllib.parse import urlencode
 
 from google.oauth2.credentials import Credentials
@@ -19,6 +21,12 @@ import requests
 from app.core.config import settings
 from app.core.security import decrypt_token
 from app.services.storage.base_provider import StorageProvider, UploadResult
+from app.services.storage.batch_requests import GOOGLE_BATCH_LIMIT, ItemOutcome, run_batches, send_with_retries
+from app.services.storage.chunked_upload import (
+    GOOGLE_CHUNK_GRANULARITY, RETRYABLE_STATUS_CODES, backoff_delay, stream_size,
+    upload_chunk_size, use_resumable_upload
+)
+from app.services.storage.folder_cache import folder_cache
 
 logger = logging.getLogger(__name__)
 
@@ -171,17 +179,24 @@ class GoogleDriveProvider(StorageProvider):
         file_content: BinaryIO,
         filename: str,
         mime_type: str,
-        folder_id: Optional[str] = None
+        folder_id: Optional[str] = None,
+        account_key: Optional[str] = None
     ) -> UploadResult:
         """
         Upload document to Google Drive.
 
+        Small files go up in one multipart request. Larger files use a
+        resumable session and are sent in chunks read from the stream; a chunk
+        that fails with a transient error is retried, and the client library
+        asks Drive for the received offset before continuing.
+
         Args:
             refresh_token_encrypted: Encrypted refresh token
-            file_content: Binary file content stream
+            file_content: Seekable binary stream
             filename: Name for the file
             mime_type: MIME type of the file
             folder_id: Optional folder ID to upload into
+            account_key: Folder cache scope (user ID)
 
         Returns:
             UploadResult with file metadata
@@ -190,44 +205,38 @@ class GoogleDriveProvider(StorageProvider):
             Exception: If upload fails
         """
         try:
-            logger.info(f"[GoogleDrive] DEBUG: upload_document called for '{filename}'")
-            logger.info(f"[GoogleDrive] DEBUG: folder_id parameter = {folder_id}")
-
             service = self._get_drive_service(refresh_token_encrypted)
 
-            # If no folder specified, find/create main app folder
+            # If no folder specified, use the (cached) main app folder
             if not folder_id:
-                logger.warning(f"[GoogleDrive] DEBUG: No folder_id provided, finding/creating app folder")
-                folder_id = self._find_folder(service, self.app_folder_name)
-                if not folder_id:
-                    logger.info(f"[GoogleDrive] DEBUG: App folder not found, creating: '{self.app_folder_name}'")
-                    folder_id = self._create_folder(service, self.app_folder_name)
-                logger.info(f"[GoogleDrive] DEBUG: Using app folder_id: {folder_id}")
-            else:
-                logger.info(f"[GoogleDrive] DEBUG: Using specified folder_id: {folder_id}")
+                folder_id = self._get_app_folder_id(service, account_key)
+            logger.debug("[GoogleDrive] Uploading '%s' into folder %s", filename, folder_id)
 
             file_metadata = {
                 'name': filename,
                 'parents': [folder_id]
             }
-            logger.info(f"[GoogleDrive] DEBUG: file_metadata: {file_metadata}")
 
-            file_content.seek(0)
+            size = stream_size(file_content)
+            resumable = use_resumable_upload(size)
             media = MediaIoBaseUpload(
                 file_content,
                 mimetype=mime_type,
-                resumable=True
+                chunksize=upload_chunk_size(GOOGLE_CHUNK_GRANULARITY),
+                resumable=resumable
             )
-
-            logger.info(f"[GoogleDrive] DEBUG: Calling Google Drive API files().create()")
-            file_result = service.files().create(
+            request = service.files().create(
                 body=file_metadata,
                 media_body=media,
                 fields='id,name,size,mimeType,webViewLink,parents'
-            ).execute()
+            )
+
+            if resumable:
+                file_result = self._upload_chunks(request, filename, size)
+            else:
+                file_result = request.execute(num_retries=settings.storage.storage_upload_max_retries)
 
-            logger.info(f"[GoogleDrive] DEBUG: Upload response - file_id: {file_result['id']}, parents: {file_result.get('parents', [])}")
-            logger.info(f"Document uploaded successfully: {file_result['id']}")
+            logger.info(f"Document uploaded successfully: {file_result['id']} ({size} bytes, resumable={resumable})")
 
             return UploadResult(
                 file_id=file_result['id'],
@@ -240,12 +249,49 @@ class GoogleDriveProvider(StorageProvider):
             )
 
         except HttpError as e:
+            if e.resp.status == 404 and account_key and folder_id:
+                # Target folder was deleted in Drive - look it up again next time
+                folder_cache.invalidate_folder_id(account_key, folder_id)
             logger.error(f"Failed to upload document '{filename}': {e}")
             raise
         except Exception as e:
             logger.error(f"Document upload error: {e}")
             raise
 
+    def _upload_chunks(self, request, filename: str, size: int) -> Dict[str, Any]:
+        """
+        Drive a resumable upload request chunk by chunk.
+
+        After a failed chunk the request is in an error state; the next
+        next_chunk() call queries the session's received range first and
+        resumes from that offset instead of restarting the file.
+
+        Returns:
+            Created file resource
+        """
+        max_retries = settings.storage.storage_upload_max_retries
+        retries = 0
+        response = None
+        while response is None:
+            try:
+                status, response = request.next_chunk()
+                retries = 0
+                if status:
+                    logger.debug("[GoogleDrive] '%s' upload progress: %s/%s bytes", filename, status.resumable_progress, size)
+            except HttpError as e:
+                if e.resp.status not in RETRYABLE_STATUS_CODES or retries >= max_retries:
+                    raise
+                retries += 1
+                logger.warning(f"[GoogleDrive] Chunk of '{filename}' failed ({e.resp.status}), resuming (retry {retries}/{max_retries})")
+                time.sleep(backoff_delay(retries - 1))
+            except (ConnectionError, TimeoutError, OSError) as e:
+                if retries >= max_retries:
+                    raise
+                retries += 1
+                logger.warning(f"[GoogleDrive] Chunk of '{filename}' failed ({e}), resuming (retry {retries}/{max_retries})")
+                time.sleep(backoff_delay(retries - 1))
+        return response
+
     def download_document(self, refresh_token_encrypted: str, file_id: str) -> bytes:
         """
         Download document from Google Drive.
@@ -322,14 +368,20 @@ class GoogleDriveProvider(StorageProvider):
     def initialize_folder_structure(
         self,
         refresh_token_encrypted: str,
-        folder_names: list[str]
+        folder_names: list[str],
+        account_key: Optional[str] = None
     ) -> Dict[str, str]:
         """
         Create folder structure in Google Drive.
 
+        Cached folder IDs are reused; missing category folders are found or
+        created in parallel (one Drive client per worker thread, since the
+        underlying HTTP client is not thread-safe).
+
         Args:
             refresh_token_encrypted: Encrypted refresh token
             folder_names: List of folder names to create
+            account_key: Folder cache scope (user ID)
 
         Returns:
             Dictionary mapping folder names to folder IDs
@@ -338,36 +390,25 @@ class GoogleDriveProvider(StorageProvider):
             Exception: If folder creation fails
         """
         try:
-            logger.info(f"[GoogleDrive] DEBUG: initialize_folder_structure called")
-            logger.info(f"[GoogleDrive] DEBUG: folder_names to create: {folder_names}")
-
             service = self._get_drive_service(refresh_token_encrypted)
-            folder_map = {}
-
-            # Create or find main app folder
-            logger.info(f"[GoogleDrive] DEBUG: Finding/creating main app folder: '{self.app_folder_name}'")
-            main_folder_id = self._find_folder(service, self.app_folder_name)
-            if not main_folder_id:
-                logger.info(f"[GoogleDrive] DEBUG: Main folder not found, creating: '{self.app_folder_name}'")
-                main_folder_id = self._create_folder(service, self.app_folder_name)
-            logger.info(f"[GoogleDrive] DEBUG: Main folder '{self.app_folder_name}' ID: {main_folder_id}")
-
-            folder_map['main'] = main_folder_id
-            logger.info(f"Main folder '{self.app_folder_name}' ready: {main_folder_id}")
-
-            # Create category folders
-            for folder_name in folder_names:
-                logger.info(f"[GoogleDrive] DEBUG: Finding/creating category folder '{folder_name}' under parent {main_folder_id}")
-                folder_id = self._find_folder(service, folder_name, main_folder_id)
-                if not folder_id:
-                    logger.info(f"[GoogleDrive] DEBUG: Folder '{folder_name}' not found, creating under parent {main_folder_id}")
-                    folder_id = self._create_folder(service, folder_name, main_folder_id)
-                logger.info(f"[GoogleDrive] DEBUG: Folder '{folder_name}' ID: {folder_id}")
-
-                folder_map[folder_name] = folder_id
-                logger.info(f"Folder '{folder_name}' ready: {folder_id}")
-
-            logger.info(f"[GoogleDrive] DEBUG: Final folder_map: {folder_map}")
+            main_folder_id = self._get_app_folder_id(service, account_key)
+            logger.debug("[GoogleDrive] Main folder '%s' ID: %s", self.app_folder_name, main_folder_id)
+
+            caller = threading.get_ident()
+            local = threading.local()
+
+            def resolve(folder_name: str) -> str:
+                if threading.get_ident() == caller:
+                    thread_service = service
+                else:
+                    if not hasattr(local, 'service'):
+                        local.service = self._get_drive_service(refresh_token_encrypted)
+                    thread_service = local.service
+                return self._find_or_create_folder(thread_service, folder_name, main_folder_id)
+
+            folder_map = {'main': main_folder_id}
+            folder_map.update(self._resolve_folders(account_key, folder_names, main_folder_id, resolve))
+
             logger.info(f"Folder structure initialized with {len(folder_map)} folders")
             return folder_map
 
@@ -375,6 +416,22 @@ class GoogleDriveProvider(StorageProvider):
             logger.error(f"Failed to initialize folder structure: {e}")
             raise
 
+    def _get_app_folder_id(self, service, account_key: Optional[str]) -> str:
+        """Main app folder ID (cached per account; found or created on a miss)"""
+        return self._cached_folder(
+            account_key,
+            self.app_folder_name,
+            None,
+            lambda: self._find_or_create_folder(service, self.app_folder_name)
+        )
+
+    def _find_or_create_folder(self, service, folder_name: str, parent_id: Optional[str] = None) -> str:
+        """Folder ID by name, creating the folder if it doesn't exist"""
+        folder_id = self._find_folder(service, folder_name, parent_id)
+        if not folder_id:
+            folder_id = self._create_folder(service, folder_name, parent_id)
+        return folder_id
+
     def _create_folder(self, service, folder_name: str, parent_id: Optional[str] = None) -> str:
         """
         Create a folder in Google Drive.
@@ -448,7 +505,8 @@ class GoogleDriveProvider(StorageProvider):
         refresh_token_encrypted: str,
         category_name: str,
         category_code: str,
-        main_folder_id: str
+        main_folder_id: str,
+        account_key: Optional[str] = None
     ) -> str:
         """
         Get or create a category folder in Drive.
@@ -460,20 +518,21 @@ class GoogleDriveProvider(StorageProvider):
             category_name: Category display name
             category_code: Category code (e.g., BNK, TAX)
             main_folder_id: Main app folder ID
+            account_key: Folder cache scope (user ID)
 
         Returns:
             Category folder ID
         """
         try:
-            service = self._get_drive_service(refresh_token_encrypted)
             folder_name = f"{category_name} ({category_code})"
-
-            folder_id = self._find_folder(service, folder_name, main_folder_id)
-            if folder_id:
-                return folder_id
-
-            folder_id = self._create_folder(service, folder_name, main_folder_id)
-            return folder_id
+            return self._cached_folder(
+                account_key,
+                folder_name,
+                main_folder_id,
+                lambda: self._find_or_create_folder(
+                    self._get_drive_service(refresh_token_encrypted), folder_name, main_folder_id
+                )
+            )
 
         except Exception as e:
             logger.error(f"Failed to get/create category folder '{category_name}': {e}")
@@ -525,7 +584,130 @@ class GoogleDriveProvider(StorageProvider):
             logger.error(f"Document move error: {e}")
             return False
 
-    def delete_app_folder(self, refresh_token_encrypted: str) -> Dict[str, Any]:
+    def move_documents(self, refresh_token_encrypted: str, moves: Dict[str, str]) -> Dict[str, Optional[str]]:
+        """
+        Move many files with Drive batch requests.
+
+        Drive needs a file's current parents to remove them, so each batch of
+        up to 100 files is two batch requests: one reading the parents, one
+        updating them. Files already in their target folder are left alone.
+
+        Args:
+            refresh_token_encrypted: Encrypted refresh token
+            moves: Dictionary mapping file IDs to target folder IDs
+
+        Returns:
+            Dictionary mapping each file ID to None if moved, or an error message
+        """
+        get_service = self._thread_drive_service(refresh_token_encrypted)
+
+        def send_once(file_ids: List[str]) -> Dict[str, ItemOutcome]:
+            service = get_service()
+            outcomes: Dict[str, ItemOutcome] = {}
+            parents: Dict[str, List[str]] = {}
+
+            def on_get(request_id, response, exception):
+                if exception is not None:
+                    outcomes[request_id] = self._batch_outcome(exception)
+                else:
+                    parents[request_id] = response.get('parents', [])
+
+            batch = service.new_batch_http_request(callback=on_get)
+            for file_id in file_ids:
+                batch.add(service.files().get(fileId=file_id, fields='parents'), request_id=file_id)
+            batch.execute()
+
+            def on_update(request_id, response, exception):
+                outcomes[request_id] = self._batch_outcome(exception)
+
+            batch = service.new_batch_http_request(callback=on_update)
+            pending_updates = 0
+            for file_id, current_parents in parents.items():
+                target = moves[file_id]
+                if current_parents == [target]:
+                    outcomes[file_id] = (200, None)
+                    continue
+                update_args = {'fileId': file_id, 'addParents': target, 'fields': 'id'}
+                stale_parents = [parent for parent in current_parents if parent != target]
+                if stale_parents:
+                    update_args['removeParents'] = ",".join(stale_parents)
+                batch.add(service.files().update(**update_args), request_id=file_id)
+                pending_updates += 1
+            if pending_updates:
+                batch.execute()
+            return outcomes
+
+        results = self._run_batched(list(moves), send_once)
+        logger.info(f"Moved {sum(1 for error in results.values() if error is None)}/{len(results)} files in Google Drive")
+        return results
+
+    def delete_documents(self, refresh_token_encrypted: str, file_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Delete many files with Drive batch requests (up to 100 files per request).
+
+        Args:
+            refresh_token_encrypted: Encrypted refresh token
+            file_ids: Google Drive file IDs
+
+        Returns:
+            Dictionary mapping each file ID to None if deleted (or already gone), or an error message
+        """
+        get_service = self._thread_drive_service(refresh_token_encrypted)
+
+        def send_once(batch_ids: List[str]) -> Dict[str, ItemOutcome]:
+            service = get_service()
+            outcomes: Dict[str, ItemOutcome] = {}
+
+            def on_delete(request_id, response, exception):
+                outcome = self._batch_outcome(exception)
+                outcomes[request_id] = (204, None) if outcome[0] == 404 else outcome
+
+            batch = service.new_batch_http_request(callback=on_delete)
+            for file_id in batch_ids:
+                batch.add(service.files().delete(fileId=file_id), request_id=file_id)
+            batch.execute()
+            return outcomes
+
+        results = self._run_batched(file_ids, send_once)
+        logger.info(f"Deleted {sum(1 for error in results.values() if error is None)}/{len(results)} files in Google Drive")
+        return results
+
+    def _thread_drive_service(self, refresh_token_encrypted: str):
+        """Returns a getter for a Drive service per thread (service objects are not thread-safe)"""
+        local = threading.local()
+
+        def get_service():
+            if not hasattr(local, 'service'):
+                local.service = self._get_drive_service(refresh_token_encrypted)
+            return local.service
+
+        return get_service
+
+    @staticmethod
+    def _run_batched(file_ids: List[str], send_once) -> Dict[str, Optional[str]]:
+        """Send file IDs in Drive-sized batches, a few batches at a time, with retries"""
+        max_retries = settings.storage.storage_batch_max_retries
+        return run_batches(
+            file_ids,
+            GOOGLE_BATCH_LIMIT,
+            lambda batch_ids: send_with_retries(batch_ids, send_once, max_retries),
+            settings.storage.storage_batch_workers
+        )
+
+    @staticmethod
+    def _batch_outcome(exception: Optional[Exception]) -> ItemOutcome:
+        """Outcome of one call inside a Drive batch request"""
+        if exception is None:
+            return (200, None)
+        if isinstance(exception, HttpError):
+            status = exception.resp.status
+            # Drive reports per-user rate limits as 403 - retry them like 429
+            if status == 403 and 'ratelimitexceeded' in str(exception).lower():
+                status = 429
+            return (status, str(exception))
+        return (0, str(exception))
+
+    def delete_app_folder(self, refresh_token_encrypted: str, account_key: Optional[str] = None) -> Dict[str, Any]:
         """
         Delete the entire app folder from Google Drive.
 
@@ -534,6 +716,7 @@ class GoogleDriveProvider(StorageProvider):
 
         Args:
             refresh_token_encrypted: Encrypted refresh token from database
+            account_key: Folder cache scope (user ID); its cached folders are dropped
 
         Returns:
             Dictionary with:
@@ -541,6 +724,8 @@ class GoogleDriveProvider(StorageProvider):
                 - message: Human-readable status message
                 - folder_id: Optional ID of the deleted folder (if found)
         """
+        if account_key:
+            folder_cache.invalidate(account_key, self.provider_type)
         try:
             service = self._get_drive_service(refresh_token_encrypted)
 
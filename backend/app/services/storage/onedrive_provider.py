@@ -6,13 +6,22 @@ providing OAuth authentication and document management via Microsoft Graph API.
 """
 
 import logging
-from typing import Optional, Dict, Any, BinaryIO
+import time
+from typing import Optional, Dict, Any, BinaryIO, List
 from urllib.parse import urlencode
 import requests
 
 from app.core.config import settings
 from app.core.security import decrypt_token
 from app.services.storage.base_provider import StorageProvider, UploadResult
+from app.services.storage.batch_requests import (
+    GRAPH_BATCH_LIMIT, ItemOutcome, graph_batch_body, graph_batch_outcomes, run_batches, send_with_retries
+)
+from app.services.storage.chunked_upload import (
+    ONEDRIVE_CHUNK_GRANULARITY, RETRYABLE_STATUS_CODES, backoff_delay, content_range,
+    next_expected_offset, stream_size, upload_chunk_size, use_resumable_upload
+)
+from app.services.storage.folder_cache import folder_cache
 
 logger = logging.getLogger(__name__)
 
@@ -134,17 +143,23 @@ class OneDriveProvider(StorageProvider):
         file_content: BinaryIO,
         filename: str,
         mime_type: str,
-        folder_id: Optional[str] = None
+        folder_id: Optional[str] = None,
+        account_key: Optional[str] = None
     ) -> UploadResult:
         """
         Upload document to OneDrive.
 
+        Small files go up in one PUT. Larger files use an upload session and
+        are sent in chunks read from the stream; after a failed chunk the
+        session's nextExpectedRanges tells where to continue.
+
         Args:
             refresh_token_encrypted: Encrypted refresh token
-            file_content: Binary file content stream
+            file_content: Seekable binary stream
             filename: Name for the file
             mime_type: MIME type of the file
             folder_id: Optional folder ID to upload into
+            account_key: Folder cache scope (user ID)
 
         Returns:
             UploadResult with file metadata
@@ -153,38 +168,27 @@ class OneDriveProvider(StorageProvider):
             Exception: If upload fails
         """
         try:
-            logger.info(f"[OneDrive] DEBUG: upload_document called for '{filename}'")
-            logger.info(f"[OneDrive] DEBUG: folder_id parameter = {folder_id}")
-
             access_token = self.refresh_access_token(refresh_token_encrypted)
-            headers = {
-                'Authorization': f'Bearer {access_token}',
-                'Content-Type': mime_type
-            }
 
-            # Build upload URL
-            if folder_id:
-                upload_url = f"{self.graph_base_url}/me/drive/items/{folder_id}:/{filename}:/content"
-                logger.info(f"[OneDrive] DEBUG: Uploading to specified folder_id: {folder_id}")
-                logger.info(f"[OneDrive] DEBUG: Upload URL: {upload_url}")
+            # Upload to the (cached) app folder if no folder specified
+            if not folder_id:
+                folder_id = self._get_or_create_app_folder(access_token, account_key)
+            logger.debug("[OneDrive] Uploading '%s' into folder %s", filename, folder_id)
+
+            size = stream_size(file_content)
+            item_path = f"{self.graph_base_url}/me/drive/items/{folder_id}:/{filename}:"
+            if use_resumable_upload(size):
+                result = self._upload_session(access_token, item_path, file_content, filename, size)
             else:
-                # Upload to app folder (create if doesn't exist)
-                logger.warning(f"[OneDrive] DEBUG: No folder_id provided, using app folder")
-                app_folder_id = self._get_or_create_app_folder(access_token)
-                upload_url = f"{self.graph_base_url}/me/drive/items/{app_folder_id}:/{filename}:/content"
-                folder_id = app_folder_id
-                logger.info(f"[OneDrive] DEBUG: Using app folder_id: {app_folder_id}")
-                logger.info(f"[OneDrive] DEBUG: Upload URL: {upload_url}")
-
-            # Upload file
-            file_content.seek(0)
-            logger.info(f"[OneDrive] DEBUG: Sending PUT request to OneDrive API")
-            response = requests.put(upload_url, headers=headers, data=file_content)
-            response.raise_for_status()
+                headers = {
+                    'Authorization': f'Bearer {access_token}',
+                    'Content-Type': mime_type
+                }
+                response = requests.put(f"{item_path}/content", headers=headers, data=file_content.read())
+                response.raise_for_status()
+                result = response.json()
 
-            result = response.json()
-            logger.info(f"[OneDrive] DEBUG: Upload response - file_id: {result['id']}, parentReference: {result.get('parentReference', {})}")
-            logger.info(f"Document uploaded successfully to OneDrive: {result['id']}")
+            logger.info(f"Document uploaded successfully to OneDrive: {result['id']} ({size} bytes)")
 
             return UploadResult(
                 file_id=result['id'],
@@ -197,12 +201,95 @@ class OneDriveProvider(StorageProvider):
             )
 
         except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404 and account_key and folder_id:
+                # Target folder was deleted in OneDrive - look it up again next time
+                folder_cache.invalidate_folder_id(account_key, folder_id)
             logger.error(f"Failed to upload document '{filename}' to OneDrive: {e}")
             raise
         except Exception as e:
             logger.error(f"OneDrive document upload error: {e}")
             raise
 
+    def _upload_session(
+        self,
+        access_token: str,
+        item_path: str,
+        file_content: BinaryIO,
+        filename: str,
+        size: int
+    ) -> Dict[str, Any]:
+        """
+        Upload a file in chunks through a Graph upload session.
+
+        Returns:
+            Created driveItem
+
+        Raises:
+            requests.HTTPError: Session creation or a chunk failed for good
+        """
+        response = requests.post(
+            f"{item_path}/createUploadSession",
+            headers={'Authorization': f'Bearer {access_token}', 'Content-Type': 'application/json'},
+            json={'item': {'@microsoft.graph.conflictBehavior': 'replace'}}
+        )
+        response.raise_for_status()
+        upload_url = response.json()['uploadUrl']
+
+        chunk_size = upload_chunk_size(ONEDRIVE_CHUNK_GRANULARITY)
+        max_retries = settings.storage.storage_upload_max_retries
+        offset = 0
+        retries = 0
+        try:
+            while True:
+                file_content.seek(offset)
+                chunk = file_content.read(chunk_size)
+                try:
+                    # The upload URL is pre-authenticated; Graph rejects an Authorization header here
+                    response = requests.put(upload_url, data=chunk, headers={
+                        'Content-Length': str(len(chunk)),
+                        'Content-Range': content_range(offset, len(chunk), size)
+                    })
+                    if response.status_code in RETRYABLE_STATUS_CODES:
+                        raise requests.HTTPError(f"{response.status_code} for chunk at {offset}", response=response)
+                    response.raise_for_status()
+                except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                    status = getattr(getattr(e, 'response', None), 'status_code', None)
+                    if (status is not None and status not in RETRYABLE_STATUS_CODES) or retries >= max_retries:
+                        raise
+                    retries += 1
+                    time.sleep(backoff_delay(retries - 1))
+                    offset = self._session_offset(upload_url, offset)
+                    logger.warning(f"[OneDrive] Chunk of '{filename}' failed ({e}), resuming at byte {offset} (retry {retries}/{max_retries})")
+                    continue
+
+                retries = 0
+                if response.status_code in (200, 201):
+                    return response.json()
+
+                # 202 Accepted: more bytes expected
+                next_offset = next_expected_offset(response.json().get('nextExpectedRanges'))
+                offset = next_offset if next_offset is not None else offset + len(chunk)
+                logger.debug("[OneDrive] '%s' upload progress: %s/%s bytes", filename, offset, size)
+        except Exception:
+            # Release the partial upload on OneDrive's side
+            try:
+                requests.delete(upload_url)
+            except requests.RequestException:
+                pass
+            raise
+
+    @staticmethod
+    def _session_offset(upload_url: str, fallback: int) -> int:
+        """Byte offset an upload session expects next (fallback if the status can't be read)"""
+        try:
+            response = requests.get(upload_url)
+            response.raise_for_status()
+            offset = next_expected_offset(response.json().get('nextExpectedRanges'))
+            return offset if offset is not None else fallback
+        except requests.RequestException as e:
+            logger.warning(f"[OneDrive] Could not read upload session status: {e}")
+            return fallback
+
     def download_document(self, refresh_token_encrypted: str, file_id: str) -> bytes:
         """
         Download document from OneDrive.
@@ -277,17 +364,112 @@ class OneDriveProvider(StorageProvider):
             logger.error(f"OneDrive document deletion error: {e}")
             raise
 
+    def move_documents(self, refresh_token_encrypted: str, moves: Dict[str, str]) -> Dict[str, Optional[str]]:
+        """
+        Move many files with Graph $batch requests (up to 20 moves per request).
+
+        Args:
+            refresh_token_encrypted: Encrypted refresh token
+            moves: Dictionary mapping file IDs to target folder IDs
+
+        Returns:
+            Dictionary mapping each file ID to None if moved, or an error message
+        """
+        access_token = self.refresh_access_token(refresh_token_encrypted)
+
+        def build(file_id: str) -> Dict[str, Any]:
+            return {
+                'method': 'PATCH',
+                'url': f"/me/drive/items/{file_id}",
+                'body': {'parentReference': {'id': moves[file_id]}}
+            }
+
+        results = self._run_graph_batches(access_token, list(moves), build)
+        logger.info(f"Moved {sum(1 for error in results.values() if error is None)}/{len(results)} files in OneDrive")
+        return results
+
+    def delete_documents(self, refresh_token_encrypted: str, file_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Delete many files with Graph $batch requests (up to 20 deletions per request).
+
+        Args:
+            refresh_token_encrypted: Encrypted refresh token
+            file_ids: OneDrive file IDs
+
+        Returns:
+            Dictionary mapping each file ID to None if deleted (or already gone), or an error message
+        """
+        access_token = self.refresh_access_token(refresh_token_encrypted)
+
+        def build(file_id: str) -> Dict[str, Any]:
+            return {'method': 'DELETE', 'url': f"/me/drive/items/{file_id}"}
+
+        results = self._run_graph_batches(access_token, file_ids, build, missing_ok=True)
+        logger.info(f"Deleted {sum(1 for error in results.values() if error is None)}/{len(results)} files in OneDrive")
+        return results
+
+    def _run_graph_batches(
+        self,
+        access_token: str,
+        file_ids: List[str],
+        build,
+        missing_ok: bool = False
+    ) -> Dict[str, Optional[str]]:
+        """
+        Send one Graph request per file through $batch, a few batches at a time.
+
+        Args:
+            access_token: Valid access token
+            file_ids: Files to act on
+            build: Returns the batch request (method, url, body) for a file ID
+            missing_ok: Count 404 responses as success
+
+        Returns:
+            Dictionary mapping each file ID to None on success, or an error message
+        """
+        headers = {'Authorization': f'Bearer {access_token}', 'Content-Type': 'application/json'}
+
+        def send_once(batch_ids: List[str]) -> Dict[str, ItemOutcome]:
+            response = requests.post(
+                f"{self.graph_base_url}/$batch",
+                headers=headers,
+                json=graph_batch_body([build(file_id) for file_id in batch_ids])
+            )
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                return {file_id: (response.status_code, None) for file_id in batch_ids}
+            response.raise_for_status()
+            outcomes = graph_batch_outcomes(response.json(), batch_ids)
+            if missing_ok:
+                outcomes = {
+                    file_id: (204, None) if status == 404 else (status, error)
+                    for file_id, (status, error) in outcomes.items()
+                }
+            return outcomes
+
+        max_retries = settings.storage.storage_batch_max_retries
+        return run_batches(
+            file_ids,
+            GRAPH_BATCH_LIMIT,
+            lambda batch_ids: send_with_retries(batch_ids, send_once, max_retries),
+            settings.storage.storage_batch_workers
+        )
+
     def initialize_folder_structure(
         self,
         refresh_token_encrypted: str,
-        folder_names: list[str]
+        folder_names: list[str],
+        account_key: Optional[str] = None
     ) -> Dict[str, str]:
         """
         Create folder structure in OneDrive.
 
+        Cached folder IDs are reused; missing category folders are created
+        (or looked up on conflict) in parallel.
+
         Args:
             refresh_token_encrypted: Encrypted refresh token
             folder_names: List of folder names to create
+            account_key: Folder cache scope (user ID)
 
         Returns:
             Dictionary mapping folder names to folder IDs
@@ -296,28 +478,19 @@ class OneDriveProvider(StorageProvider):
             Exception: If folder creation fails
         """
         try:
-            logger.info(f"[OneDrive] DEBUG: initialize_folder_structure called")
-            logger.info(f"[OneDrive] DEBUG: folder_names to create: {folder_names}")
-
             access_token = self.refresh_access_token(refresh_token_encrypted)
-            folder_map = {}
-
-            # Create or get main app folder
-            logger.info(f"[OneDrive] DEBUG: Getting/creating main app folder: '{self.app_folder_name}'")
-            main_folder_id = self._get_or_create_app_folder(access_token)
-            folder_map['main'] = main_folder_id
-            logger.info(f"[OneDrive] DEBUG: Main folder '{self.app_folder_name}' ID: {main_folder_id}")
-            logger.info(f"Main folder '{self.app_folder_name}' ready: {main_folder_id}")
-
-            # Create category folders
-            for folder_name in folder_names:
-                logger.info(f"[OneDrive] DEBUG: Creating category folder '{folder_name}' under parent {main_folder_id}")
-                folder_id = self._create_folder(access_token, folder_name, main_folder_id)
-                folder_map[folder_name] = folder_id
-                logger.info(f"[OneDrive] DEBUG: Folder '{folder_name}' created with ID: {folder_id}")
-                logger.info(f"Folder '{folder_name}' ready: {folder_id}")
-
-            logger.info(f"[OneDrive] DEBUG: Final folder_map: {folder_map}")
+
+            main_folder_id = self._get_or_create_app_folder(access_token, account_key)
+            logger.debug("[OneDrive] Main folder '%s' ID: %s", self.app_folder_name, main_folder_id)
+
+            folder_map = {'main': main_folder_id}
+            folder_map.update(self._resolve_folders(
+                account_key,
+                folder_names,
+                main_folder_id,
+                lambda folder_name: self._create_folder(access_token, folder_name, main_folder_id)
+            ))
+
             logger.info(f"Folder structure initialized in OneDrive with {len(folder_map)} folders")
             return folder_map
 
@@ -325,16 +498,26 @@ class OneDriveProvider(StorageProvider):
             logger.error(f"Failed to initialize folder structure in OneDrive: {e}")
             raise
 
-    def _get_or_create_app_folder(self, access_token: str) -> str:
+    def _get_or_create_app_folder(self, access_token: str, account_key: Optional[str] = None) -> str:
         """
         Get or create the main application folder in OneDrive.
 
         Args:
             access_token: Valid access token
+            account_key: Folder cache scope (user ID)
 
         Returns:
             Folder ID of the main app folder
         """
+        return self._cached_folder(
+            account_key,
+            self.app_folder_name,
+            None,
+            lambda: self._find_or_create_app_folder(access_token)
+        )
+
+    def _find_or_create_app_folder(self, access_token: str) -> str:
+        """Look up the main application folder in OneDrive, creating it if missing"""
         try:
             headers = {'Authorization': f'Bearer {access_token}'}
 
@@ -409,7 +592,7 @@ class OneDriveProvider(StorageProvider):
             logger.error(f"Failed to create folder '{folder_name}' in OneDrive: {e}")
             raise
 
-    def delete_app_folder(self, refresh_token_encrypted: str) -> Dict[str, Any]:
+    def delete_app_folder(self, refresh_token_encrypted: str, account_key: Optional[str] = None) -> Dict[str, Any]:
         """
         Delete the entire app folder from OneDrive.
 
@@ -418,6 +601,7 @@ class OneDriveProvider(StorageProvider):
 
         Args:
             refresh_token_encrypted: Encrypted refresh token from database
+            account_key: Folder cache scope (user ID); its cached folders are dropped
 
         Returns:
             Dictionary with:
@@ -425,6 +609,8 @@ class OneDriveProvider(StorageProvider):
                 - message: Human-readable status message
                 - folder_id: Optional ID of the deleted folder (if found)
         """
+        if account_key:
+            folder_cache.invalidate(account_key, self.provider_type)
         try:
             access_token = self.refresh_access_token(refresh_token_encrypted)
             headers = {'Authorization': f'Bearer {access_token}'}
@@ -0,0 +1,389 @@
+# backend/app/services/stripe_webhook_service.py
+"""
+Stripe webhook ingestion and background processing
+
+The webhook endpoint only verifies the signature, stores the event (its Stripe
+event ID is the primary key, so redeliveries are no-ops) and acknowledges.
+A Celery task then processes the stored events of one customer at a time, in
+Stripe creation order, under a PostgreSQL advisory lock so two workers never
+interleave a customer's events.
+
+Each event is claimed ('processing', with a lease) before its handler runs,
+and its final status is committed right after the handler, so a handler that
+succeeded is never run again by this worker or the sweeper. Failed events are
+retried with exponential backoff by the sweeper job; events left
+'processing' by a crashed worker are retried once their lease has expired.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Sequence, Tuple
+
+import stripe
+from sqlalchemy import select, update, func, or_, and_, case
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database.connection import db_manager
+from app.database.models import StripeWebhookEvent
+
+logger = logging.getLogger(__name__)
+
+# Pending events older than this are assumed to have missed their Celery dispatch
+STALE_PENDING_SECONDS = 30
+
+# Events still 'processing' this long after their claim belong to a crashed worker
+PROCESSING_LEASE_SECONDS = 600
+
+
+class EventStatusWriteError(Exception):
+    """Raised when an event's claim or final status could not be committed"""
+
+
+def due_events(rows: Sequence, now: datetime) -> List:
+    """
+    Leading events of a customer that may run now
+
+    Args:
+        rows: Pending, failed and processing events of one customer in Stripe order
+        now: Current time
+
+    Returns:
+        Events up to (excluding) the first one that is still being processed
+        (or was left by a crashed worker) or is waiting for its retry time
+    """
+    due = []
+    for row in rows:
+        if row.status == 'processing':
+            break
+        if row.status == 'failed' and row.next_attempt_at and row.next_attempt_at > now:
+            break
+        due.append(row)
+    return due
+
+
+def customer_key_for(event_data: Dict) -> str:
+    """
+    Ordering key of an event: the Stripe customer it concerns
+
+    Events without a customer (rare) get their own key, i.e. no ordering constraint.
+    """
+    obj = (event_data.get('data') or {}).get('object') or {}
+    customer = obj.get('id') if obj.get('object') == 'customer' else obj.get('customer')
+    if isinstance(customer, dict):
+        customer = customer.get('id')
+    return customer or f"event:{event_data.get('id')}"
+
+
+class StripeWebhookService:
+    """Durable, idempotent, per-customer ordered Stripe event processing"""
+
+    def __init__(self):
+        config = settings.stripe
+        self.async_enabled = config.stripe_webhook_async
+        self.batch_size = max(1, config.stripe_webhook_batch_size)
+        self.max_attempts = max(1, config.stripe_webhook_max_attempts)
+        self.retry_seconds = max(1, config.stripe_webhook_retry_seconds)
+
+    def store_event(self, payload: bytes, event, session: Session) -> Tuple[bool, str]:
+        """
+        Persist a verified event unless it was already received
+
+        Args:
+            payload: Raw request body (the signed event JSON)
+            event: Event returned by stripe_service.construct_webhook_event
+            session: Database session (committed here)
+
+        Returns:
+            (newly_stored, customer_key)
+        """
+        event_data = json.loads(payload)
+        customer_key = customer_key_for(event_data)
+        created = event_data.get('created')
+
+        statement = pg_insert(StripeWebhookEvent).values(
+            id=event.id,
+            event_type=event.type,
+            customer_key=customer_key,
+            payload=payload.decode('utf-8'),
+            stripe_created_at=datetime.fromtimestamp(created, tz=timezone.utc) if created else datetime.now(timezone.utc),
+            status='pending',
+            attempts=0
+        ).on_conflict_do_nothing(index_elements=['id'])
+
+        result = session.execute(statement)
+        session.commit()
+        return result.rowcount == 1, customer_key
+
+    def dispatch(self, customer_key: str):
+        """Queue processing of a customer's events; the sweeper retries if the broker is down"""
+        try:
+            from app.celery_app import process_stripe_events_task, INTERACTIVE_QUEUE, PRIORITY_HIGH
+
+            process_stripe_events_task.apply_async(
+                args=[customer_key],
+                queue=INTERACTIVE_QUEUE,
+                priority=PRIORITY_HIGH
+            )
+        except Exception as e:
+            logger.warning(f"[STRIPE WEBHOOK] Could not queue events for {customer_key}, sweeper will retry: {e}")
+
+    def retry_delay(self, attempts: int) -> timedelta:
+        """Backoff before the next attempt of an event that failed attempts times"""
+        return timedelta(seconds=self.retry_seconds * 2 ** (attempts - 1))
+
+    async def process_customer(self, customer_key: str) -> Dict[str, int]:
+        """
+        Process all due events of one customer in order
+
+        Holds a session-level advisory lock on a dedicated connection; if another
+        worker holds it, that worker will also see the new events and this call
+        returns immediately.
+
+        Returns:
+            Counts of processed, failed and skipped events
+        """
+        lock_id = func.hashtextextended(customer_key, 0)
+
+        with db_manager.engine.connect() as conn:
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+            if not conn.execute(select(func.pg_try_advisory_lock(lock_id))).scalar():
+                return {'processed': 0, 'failed': 0, 'skipped': 1}
+
+            try:
+                summary = await self._drain(customer_key)
+            finally:
+                conn.execute(select(func.pg_advisory_unlock(lock_id)))
+
+        if summary['processed'] or summary['failed']:
+            logger.info(f"[STRIPE WEBHOOK] Customer {customer_key}: {summary['processed']} processed, {summary['failed']} failed")
+        return summary
+
+    async def _drain(self, customer_key: str) -> Dict[str, int]:
+        """Process due events batch by batch until none are left or one fails (caller holds the lock)"""
+        summary = {'processed': 0, 'failed': 0, 'skipped': 0}
+        while True:
+            events = self._load_due_events(customer_key)
+            if not events:
+                break
+            processed, failed, finished = await self._process_batch(events)
+            summary['processed'] += processed
+            summary['failed'] += failed
+            if failed or not finished:
+                # Later events of this customer wait for the failed (or unclaimed) one
+                break
+        return summary
+
+    def _load_due_events(self, customer_key: str) -> List[StripeWebhookEvent]:
+        """Next events of the customer in Stripe order, up to the first one that may not run yet"""
+        session = db_manager.session_local()
+        try:
+            rows = session.execute(
+                select(StripeWebhookEvent).where(
+                    StripeWebhookEvent.customer_key == customer_key,
+                    StripeWebhookEvent.status.in_(['pending', 'failed', 'processing'])
+                ).order_by(
+                    StripeWebhookEvent.stripe_created_at,
+                    StripeWebhookEvent.received_at
+                ).limit(self.batch_size)
+            ).scalars().all()
+
+            due = due_events(rows, datetime.now(timezone.utc))
+            session.expunge_all()
+            return due
+        finally:
+            session.close()
+
+    async def _process_batch(self, events: List[StripeWebhookEvent]) -> Tuple[int, int, bool]:
+        """
+        Claim, run and record events one at a time, stopping at the first failure
+
+        Returns:
+            (processed, failed, finished); finished is False if an event could
+            not be claimed because its status changed since it was loaded
+
+        Raises:
+            EventStatusWriteError: A claim or status could not be committed
+        """
+        handler = self._get_handler()
+        processed = failed = 0
+
+        for row in events:
+            if not self._claim(row):
+                return processed, failed, False
+
+            attempts = row.attempts + 1
+            session = db_manager.session_local()
+            try:
+                try:
+                    event = self._build_event(row)
+                    await self._run_handler(handler, event, session)
+                except Exception as e:
+                    session.rollback()
+                    dead = attempts >= self.max_attempts
+                    logger.error(
+                        f"[STRIPE WEBHOOK] {row.event_type} {row.id} failed (attempt {attempts}"
+                        f"{', giving up' if dead else ''}): {e}"
+                    )
+                    self._record(session, row.id, {
+                        'status': 'dead' if dead else 'failed',
+                        'last_error': str(e)[:2000],
+                        'processed_at': None,
+                        'next_attempt_at': None if dead else datetime.now(timezone.utc) + self.retry_delay(attempts)
+                    })
+                    if not dead:
+                        return processed, failed + 1, True
+                    continue
+
+                self._record(session, row.id, {
+                    'status': 'processed',
+                    'last_error': None,
+                    'processed_at': datetime.now(timezone.utc),
+                    'next_attempt_at': None
+                })
+                processed += 1
+            finally:
+                session.close()
+
+        return processed, failed, True
+
+    @staticmethod
+    def _get_handler():
+        from app.api.webhooks import process_stripe_event
+        return process_stripe_event
+
+    @staticmethod
+    def _build_event(row: StripeWebhookEvent):
+        return stripe.Event.construct_from(json.loads(row.payload), stripe.api_key)
+
+    @staticmethod
+    async def _run_handler(handler, event, session: Session):
+        """Run one handler and wait for the background tasks it spawned (e.g. emails using its session)"""
+        spawned = await handler(event, session)
+        if spawned:
+            await asyncio.gather(*spawned, return_exceptions=True)
+
+    def _claim(self, row: StripeWebhookEvent) -> bool:
+        """
+        Mark an event as 'processing' and count the attempt before its handler runs
+
+        Returns:
+            False if the event's status changed since it was loaded
+
+        Raises:
+            EventStatusWriteError: The claim could not be committed
+        """
+        session = db_manager.session_local()
+        try:
+            result = session.execute(
+                update(StripeWebhookEvent).where(
+                    StripeWebhookEvent.id == row.id,
+                    StripeWebhookEvent.status == row.status,
+                    StripeWebhookEvent.attempts == row.attempts
+                ).values(
+                    status='processing',
+                    attempts=row.attempts + 1,
+                    next_attempt_at=datetime.now(timezone.utc) + timedelta(seconds=PROCESSING_LEASE_SECONDS)
+                )
+            )
+            session.commit()
+            return result.rowcount == 1
+        except Exception as e:
+            session.rollback()
+            logger.error(f"[STRIPE WEBHOOK] Failed to claim event {row.id}: {e}")
+            raise EventStatusWriteError(f"Could not claim event {row.id}") from e
+        finally:
+            session.close()
+
+    @staticmethod
+    def _record(session: Session, event_id: str, values: Dict):
+        """
+        Commit the final status of a claimed event
+
+        Raises:
+            EventStatusWriteError: The status could not be committed; the event
+                stays 'processing' until its lease expires
+        """
+        try:
+            session.execute(
+                update(StripeWebhookEvent).where(StripeWebhookEvent.id == event_id).values(**values)
+            )
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"[STRIPE WEBHOOK] Failed to record status of event {event_id}: {e}")
+            raise EventStatusWriteError(f"Could not record status of event {event_id}") from e
+
+    def _recover_expired_claims(self, session: Session, now: datetime) -> List[str]:
+        """Turn events left 'processing' by a crashed worker into failed (or dead) events due now"""
+        rows = session.execute(
+            update(StripeWebhookEvent).where(
+                StripeWebhookEvent.status == 'processing',
+                StripeWebhookEvent.next_attempt_at <= now
+            ).values(
+                status=case(
+                    (StripeWebhookEvent.attempts >= self.max_attempts, 'dead'),
+                    else_='failed'
+                ),
+                last_error='Worker stopped while processing the event',
+                next_attempt_at=now
+            ).returning(StripeWebhookEvent.customer_key, StripeWebhookEvent.id)
+        ).all()
+        session.commit()
+        for customer_key, event_id in rows:
+            logger.warning(f"[STRIPE WEBHOOK] Claim of event {event_id} ({customer_key}) expired, retrying")
+        return [customer_key for customer_key, _ in rows]
+
+    def sweep(self) -> int:
+        """
+        Dispatch customers with stale pending events, failed events due for
+        retry or events whose processing claim expired
+
+        Returns:
+            Number of customers dispatched
+        """
+        now = datetime.now(timezone.utc)
+        session = db_manager.session_local()
+        try:
+            recovered = self._recover_expired_claims(session, now)
+            customer_keys = session.execute(
+                select(StripeWebhookEvent.customer_key).where(
+                    or_(
+                        and_(
+                            StripeWebhookEvent.status == 'pending',
+                            StripeWebhookEvent.received_at < now - timedelta(seconds=STALE_PENDING_SECONDS)
+                        ),
+                        and_(
+                            StripeWebhookEvent.status == 'failed',
+                            StripeWebhookEvent.next_attempt_at <= now
+                        )
+                    )
+                ).distinct().limit(500)
+            ).scalars().all()
+            customer_keys = list(dict.fromkeys([*recovered, *customer_keys]))
+        finally:
+            session.close()
+
+        for customer_key in customer_keys:
+            self.dispatch(customer_key)
+        if customer_keys:
+            logger.info(f"[STRIPE WEBHOOK] Sweeper dispatched {len(customer_keys)} customers")
+        return len(customer_keys)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Event counts by status"""
+        session = db_manager.session_local()
+        try:
+            rows = session.execute(
+                select(StripeWebhookEvent.status, func.count()).group_by(StripeWebhookEvent.status)
+            ).all()
+            return {status: count for status, count in rows}
+        finally:
+            session.close()
+
+
+# Global instance
+stripe_webhook_service = StripeWebhookService()
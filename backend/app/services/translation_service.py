@@ -1,23 +1,146 @@
 # backend/app/services/translation_service.py
 """
 Translation service supporting LibreTranslate and DeepL providers
+
+Results are cached in-process (LRU) and in the translation_cache table, keyed
+by provider, language pair and text hash. Misses are sent in provider-native
+batches (multi-text DeepL requests, concurrent LibreTranslate calls) over one
+pooled client per event loop, and identical texts already in flight are
+awaited instead of being requested twice.
 """
 
+import asyncio
+import hashlib
+import json
 import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Set, Tuple
+from urllib.parse import parse_qs
+
 import httpx
-from typing import Optional, Dict, List
+
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# (provider, source_lang, target_lang, sha256 of text)
+CacheKey = Tuple[str, str, str, str]
+
+# DeepL accepts at most 50 texts per request
+DEEPL_MAX_TEXTS = 50
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+async def _close_client(client: httpx.AsyncClient):
+    """Close a pooled client, ignoring connections whose event loop is already gone"""
+    try:
+        await client.aclose()
+    except Exception as e:
+        logger.debug(f"Translation client closed with error: {e}")
+
+
+@dataclass
+class _ClientState:
+    client: httpx.AsyncClient
+    loop: asyncio.AbstractEventLoop
+    semaphore: asyncio.Semaphore
+    inflight: Dict[CacheKey, asyncio.Future] = field(default_factory=dict)
+    stats: Dict[str, int] = field(default_factory=lambda: {'requests': 0, 'texts': 0})
+
+
+class MockTranslationTransport(httpx.AsyncBaseTransport):
+    """
+    Local stand-in for LibreTranslate and DeepL, used for development and benchmarks
+
+    Simulates latency and "translates" by tagging the text with the target language.
+    """
+
+    def __init__(self, latency_ms: float = 50.0):
+        self.latency_ms = latency_ms
+        self.requests = 0
+        self.texts = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.latency_ms / 1000)
+        self.requests += 1
+
+        if request.headers.get("content-type", "").startswith("application/json"):
+            payload = json.loads(request.content or b'{}')
+            self.texts += 1
+            return httpx.Response(200, json={'translatedText': f"[{payload.get('target')}] {payload.get('q')}"})
+
+        form = parse_qs(request.content.decode())
+        target = form.get('target_lang', [''])[0]
+        texts = form.get('text', [])
+        self.texts += len(texts)
+        return httpx.Response(200, json={
+            'translations': [{'detected_source_language': form.get('source_lang', [''])[0], 'text': f"[{target.lower()}] {t}"} for t in texts]
+        })
+
 
 class TranslationService:
     """Multi-provider translation service with LibreTranslate and DeepL support"""
 
-    def __init__(self):
-        self.timeout = settings.translation.translation_timeout
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None, persistent_cache: Optional[bool] = None):
+        config = settings.translation
+        self.timeout = config.translation_timeout
+        self.max_concurrency = max(1, config.translation_max_concurrency)
+        self.deepl_batch_size = max(1, min(config.translation_deepl_batch_size, DEEPL_MAX_TEXTS))
+        self.memory_cache_size = max(0, config.translation_memory_cache_size)
+        self.persistent_cache = config.translation_cache_enabled if persistent_cache is None else persistent_cache
+        self._memory_cache: "OrderedDict[CacheKey, str]" = OrderedDict()
+        self._transport = transport
+        if self._transport is None and config.translation_mock:
+            logger.warning("Translation uses the mock transport - texts are not really translated")
+            self._transport = MockTranslationTransport()
+        self._state: Optional[_ClientState] = None
+        self._closing: Set[asyncio.Task] = set()
         logger.info("Translation service initialized")
 
+    def _get_state(self) -> _ClientState:
+        """Return the pooled client for the running event loop, creating it on first use"""
+        loop = asyncio.get_running_loop()
+        state = self._state
+        if state is not None and state.loop is loop and not state.client.is_closed:
+            return state
+        if state is not None:
+            self._retire_state(state)
+
+        client = httpx.AsyncClient(
+            timeout=self.timeout,
+            transport=self._transport,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+                keepalive_expiry=60
+            )
+        )
+        self._state = _ClientState(client=client, loop=loop, semaphore=asyncio.Semaphore(self.max_concurrency))
+        return self._state
+
+    def _retire_state(self, state: _ClientState):
+        """Close the client of a previous event loop (on that loop if it is still running)"""
+        if state.client.is_closed:
+            return
+        if state.loop.is_running():
+            asyncio.run_coroutine_threadsafe(_close_client(state.client), state.loop)
+        else:
+            task = asyncio.get_running_loop().create_task(_close_client(state.client))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    async def _post(self, url: str, **kwargs) -> httpx.Response:
+        """POST through the shared client and concurrency cap"""
+        state = self._get_state()
+        async with state.semaphore:
+            response = await state.client.post(url, **kwargs)
+        state.stats['requests'] += 1
+        return response
+
     async def translate(
         self,
         text: str,
@@ -43,23 +166,8 @@ class TranslationService:
         if source_lang == target_lang:
             return text
 
-        try:
-            # Determine provider
-            provider = self._get_provider(user_tier)
-
-            logger.debug(
-                f"Translating with {provider}: {source_lang} -> {target_lang} "
-                f"({len(text)} chars)"
-            )
-
-            if provider == "deepl":
-                return await self._translate_deepl(text, source_lang, target_lang)
-            else:
-                return await self._translate_libretranslate(text, source_lang, target_lang)
-
-        except Exception as e:
-            logger.error(f"Translation failed ({source_lang} -> {target_lang}): {e}")
-            return None
+        results = await self.translate_batch([text], source_lang, target_lang, user_tier)
+        return results.get(text)
 
     async def translate_batch(
         self,
@@ -71,6 +179,9 @@ class TranslationService:
         """
         Translate multiple texts
 
+        Cached texts are answered without a request; the rest are deduplicated,
+        coalesced with identical in-flight requests and sent in provider batches.
+
         Args:
             texts: List of texts to translate
             source_lang: Source language code
@@ -80,33 +191,127 @@ class TranslationService:
         Returns:
             Dictionary mapping original text to translated text
         """
-        results = {}
-        for text in texts:
-            translated = await self.translate(text, source_lang, target_lang, user_tier)
-            results[text] = translated
-        return results
+        results: Dict[str, Optional[str]] = {text: None for text in texts}
+        pending = [text for text in dict.fromkeys(texts) if text and text.strip()]
+        if not pending:
+            return results
+
+        if source_lang == target_lang:
+            results.update({text: text for text in pending})
+            return results
+
+        try:
+            provider = self._get_provider(user_tier)
+            keys = {text: (provider, source_lang, target_lang, _text_hash(text)) for text in pending}
+
+            # 1. In-process cache, then the shared table
+            for text in pending:
+                cached = self._memory_get(keys[text])
+                if cached is not None:
+                    results[text] = cached
+            pending = [text for text in pending if results[text] is None]
+
+            if pending and self.persistent_cache:
+                stored = await asyncio.to_thread(self._load_cached, [keys[text] for text in pending])
+                for text in pending:
+                    cached = stored.get(keys[text])
+                    if cached is not None:
+                        results[text] = cached
+                        self._memory_put(keys[text], cached)
+                pending = [text for text in pending if results[text] is None]
+
+            if not pending:
+                return results
+
+            # 2. Coalesce with identical texts another caller is already translating
+            state = self._get_state()
+            waiting: Dict[str, asyncio.Future] = {}
+            owned: Dict[str, asyncio.Future] = {}
+            for text in pending:
+                future = state.inflight.get(keys[text])
+                if future is not None:
+                    waiting[text] = future
+                else:
+                    owned[text] = state.inflight[keys[text]] = state.loop.create_future()
+
+            # 3. Request what nobody else is translating
+            if owned:
+                logger.debug(
+                    f"Translating {len(owned)} texts with {provider}: {source_lang} -> {target_lang} "
+                    f"({len(results) - len(pending)} cached, {len(waiting)} in flight)"
+                )
+                translated: Dict[str, Optional[str]] = {}
+                try:
+                    translated = await self._translate_uncached(list(owned), source_lang, target_lang, provider)
+                finally:
+                    for text, future in owned.items():
+                        state.inflight.pop(keys[text], None)
+                        if not future.done():
+                            future.set_result(translated.get(text))
+                results.update(translated)
+
+            for text, future in waiting.items():
+                results[text] = await asyncio.shield(future)
+
+            return results
+
+        except Exception as e:
+            logger.error(f"Translation failed ({source_lang} -> {target_lang}): {e}")
+            return results
+
+    async def _translate_uncached(
+        self,
+        texts: List[str],
+        source_lang: str,
+        target_lang: str,
+        provider: str
+    ) -> Dict[str, Optional[str]]:
+        """Translate with the provider and store successful results in both caches"""
+        if provider == "deepl":
+            by_provider = await self._translate_deepl(texts, source_lang, target_lang)
+        else:
+            by_provider = {"libretranslate": await self._translate_libretranslate(texts, source_lang, target_lang)}
+
+        translated: Dict[str, Optional[str]] = {}
+        new_entries: Dict[CacheKey, str] = {}
+        for used_provider, provider_results in by_provider.items():
+            for text, value in provider_results.items():
+                translated[text] = value
+                if value is not None:
+                    # Fallback results are cached under the provider that produced them
+                    key = (used_provider, source_lang, target_lang, _text_hash(text))
+                    new_entries[key] = value
+                    self._memory_put(key, value)
+
+        if new_entries and self.persistent_cache:
+            await asyncio.to_thread(self._store_cached, new_entries)
+        self._get_state().stats['texts'] += len(texts)
+        return translated
 
     async def _translate_libretranslate(
         self,
-        text: str,
+        texts: List[str],
         source_lang: str,
         target_lang: str
-    ) -> Optional[str]:
+    ) -> Dict[str, Optional[str]]:
         """
         Translate using LibreTranslate (self-hosted, free)
 
+        One request per text, issued concurrently over the pooled client.
+
         Args:
-            text: Text to translate
+            texts: Texts to translate
             source_lang: Source language code
             target_lang: Target language code
 
         Returns:
-            Translated text or None
+            Dictionary mapping text to translated text (None on failure)
         """
-        try:
-            url = settings.translation.translation_libretranslate_url
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
+        url = settings.translation.translation_libretranslate_url
+
+        async def translate_one(text: str) -> Optional[str]:
+            try:
+                response = await self._post(
                     f"{url}/translate",
                     json={
                         "q": text,
@@ -115,71 +320,141 @@ class TranslationService:
                     }
                 )
                 response.raise_for_status()
-                data = response.json()
-                return data.get("translatedText")
+                return response.json().get("translatedText")
 
-        except httpx.HTTPStatusError as e:
-            logger.error(f"LibreTranslate HTTP error: {e.response.status_code} - {e.response.text}")
-            return None
-        except Exception as e:
-            logger.error(f"LibreTranslate translation error: {e}")
-            return None
+            except httpx.HTTPStatusError as e:
+                logger.error(f"LibreTranslate HTTP error: {e.response.status_code} - {e.response.text}")
+                return None
+            except Exception as e:
+                logger.error(f"LibreTranslate translation error: {e}")
+                return None
+
+        translated = await asyncio.gather(*(translate_one(text) for text in texts))
+        return dict(zip(texts, translated))
 
     async def _translate_deepl(
         self,
-        text: str,
+        texts: List[str],
         source_lang: str,
         target_lang: str
-    ) -> Optional[str]:
+    ) -> Dict[str, Dict[str, Optional[str]]]:
         """
         Translate using DeepL API (premium quality, paid)
 
+        Texts are sent up to deepl_batch_size per request; chunks that fail
+        fall back to LibreTranslate.
+
         Args:
-            text: Text to translate
+            texts: Texts to translate
             source_lang: Source language code
             target_lang: Target language code
 
         Returns:
-            Translated text or None
+            {provider_used: {text: translated text or None}}
         """
-        try:
-            api_key = settings.translation.translation_deepl_api_key
-            if not api_key:
-                logger.warning("DeepL API key not configured, falling back to LibreTranslate")
-                return await self._translate_libretranslate(text, source_lang, target_lang)
-
-            url = settings.translation.translation_deepl_url
+        api_key = settings.translation.translation_deepl_api_key
+        if not api_key:
+            logger.warning("DeepL API key not configured, falling back to LibreTranslate")
+            return {"libretranslate": await self._translate_libretranslate(texts, source_lang, target_lang)}
 
-            # DeepL expects uppercase language codes for some targets
-            target_lang_upper = target_lang.upper()
-            source_lang_upper = source_lang.upper()
+        url = settings.translation.translation_deepl_url
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
+        async def translate_chunk(chunk: List[str]) -> Tuple[str, Dict[str, Optional[str]]]:
+            try:
+                # DeepL expects uppercase language codes for some targets
+                response = await self._post(
                     url,
                     data={
                         "auth_key": api_key,
-                        "text": text,
-                        "source_lang": source_lang_upper,
-                        "target_lang": target_lang_upper
+                        "text": chunk,
+                        "source_lang": source_lang.upper(),
+                        "target_lang": target_lang.upper()
                     }
                 )
                 response.raise_for_status()
-                data = response.json()
+                translations = response.json().get("translations", [])
+                if len(translations) != len(chunk):
+                    raise ValueError(f"DeepL returned {len(translations)} translations for {len(chunk)} texts")
+                return "deepl", {text: item.get("text") for text, item in zip(chunk, translations)}
 
-                translations = data.get("translations", [])
-                if translations:
-                    return translations[0].get("text")
-                return None
+            except httpx.HTTPStatusError as e:
+                logger.error(f"DeepL HTTP error: {e.response.status_code} - {e.response.text}")
+            except Exception as e:
+                logger.error(f"DeepL translation error: {e}")
 
-        except httpx.HTTPStatusError as e:
-            logger.error(f"DeepL HTTP error: {e.response.status_code} - {e.response.text}")
             # Fall back to LibreTranslate on error
             logger.info("Falling back to LibreTranslate")
-            return await self._translate_libretranslate(text, source_lang, target_lang)
+            return "libretranslate", await self._translate_libretranslate(chunk, source_lang, target_lang)
+
+        chunks = [texts[i:i + self.deepl_batch_size] for i in range(0, len(texts), self.deepl_batch_size)]
+        by_provider: Dict[str, Dict[str, Optional[str]]] = {}
+        for used_provider, chunk_results in await asyncio.gather(*(translate_chunk(chunk) for chunk in chunks)):
+            by_provider.setdefault(used_provider, {}).update(chunk_results)
+        return by_provider
+
+    def _memory_get(self, key: CacheKey) -> Optional[str]:
+        value = self._memory_cache.get(key)
+        if value is not None:
+            self._memory_cache.move_to_end(key)
+        return value
+
+    def _memory_put(self, key: CacheKey, value: str):
+        if not self.memory_cache_size:
+            return
+        self._memory_cache[key] = value
+        self._memory_cache.move_to_end(key)
+        while len(self._memory_cache) > self.memory_cache_size:
+            self._memory_cache.popitem(last=False)
+
+    def _load_cached(self, keys: List[CacheKey]) -> Dict[CacheKey, str]:
+        """Look up many cached translations (same provider and language pair) in one query"""
+        from app.database.connection import db_manager
+        from app.database.models import TranslationCache
+        from sqlalchemy import select
+
+        provider, source_lang, target_lang, _ = keys[0]
+        session = db_manager.session_local()
+        try:
+            rows = session.execute(
+                select(TranslationCache.text_hash, TranslationCache.translated_text).where(
+                    TranslationCache.provider == provider,
+                    TranslationCache.source_lang == source_lang,
+                    TranslationCache.target_lang == target_lang,
+                    TranslationCache.text_hash.in_([key[3] for key in keys])
+                )
+            )
+            return {(provider, source_lang, target_lang, text_hash): value for text_hash, value in rows}
         except Exception as e:
-            logger.error(f"DeepL translation error: {e}")
-            return await self._translate_libretranslate(text, source_lang, target_lang)
+            logger.warning(f"Translation cache lookup failed: {e}")
+            return {}
+        finally:
+            session.close()
+
+    def _store_cached(self, entries: Dict[CacheKey, str]):
+        """Insert new translations, keeping whichever row another worker stored first"""
+        from app.database.connection import db_manager
+        from app.database.models import TranslationCache
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        session = db_manager.session_local()
+        try:
+            rows = [
+                {
+                    'provider': provider,
+                    'source_lang': source_lang,
+                    'target_lang': target_lang,
+                    'text_hash': text_hash,
+                    'translated_text': value,
+                }
+                for (provider, source_lang, target_lang, text_hash), value in entries.items()
+            ]
+            session.execute(pg_insert(TranslationCache).values(rows).on_conflict_do_nothing())
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"Translation cache write failed: {e}")
+        finally:
+            session.close()
 
     async def get_supported_languages(self) -> List[str]:
         """
@@ -233,6 +508,19 @@ class TranslationService:
 
         return provider
 
+    def get_stats(self) -> Dict[str, int]:
+        """Provider requests and texts sent through the current client, plus cache size"""
+        stats = dict(self._state.stats) if self._state else {'requests': 0, 'texts': 0}
+        stats['memory_cache_entries'] = len(self._memory_cache)
+        return stats
+
+    async def aclose(self):
+        """Close the pooled client (application shutdown, end of a Celery task's event loop)"""
+        state = self._state
+        self._state = None
+        if state is not None and not state.client.is_closed:
+            await _close_client(state.client)
+
 
 # Global instance
 translation_service = TranslationService()
@@ -4,8 +4,12 @@ Background tasks package
 
 from app.tasks.email_poller import start_email_poller, stop_email_poller, run_poll_now
 from app.tasks.campaign_scheduler import start_campaign_scheduler, stop_campaign_scheduler
+from app.tasks.stripe_webhook_sweeper import start_stripe_webhook_sweeper, stop_stripe_webhook_sweeper
+from app.tasks.stats_rollup import start_stats_rollup, stop_stats_rollup
 
 __all__ = [
     'start_email_poller', 'stop_email_poller', 'run_poll_now',
     'start_campaign_scheduler', 'stop_campaign_scheduler',
+    'start_stripe_webhook_sweeper', 'stop_stripe_webhook_sweeper',
+    'start_stats_rollup', 'stop_stats_rollup',
 ]
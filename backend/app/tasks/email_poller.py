@@ -1,30 +1,61 @@
 """
 Email Polling Background Task
-Periodically polls IMAP inbox for new emails and processes them
+Processes new IMAP emails as soon as IDLE reports them, with interval polling as fallback
 """
 
 import logging
 import asyncio
+import socket
 from datetime import datetime
+from typing import Optional, Set
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
 from app.core.config import settings
 from app.database.connection import db_manager
-from app.services.email_processing_service import EmailProcessingService
+from app.services.email_processing_service import EmailProcessingService, open_imap_connection
+from app.utils.imap_utils import supports_idle, wait_for_new_mail
 
 logger = logging.getLogger(__name__)
 
 # Global scheduler instance
 scheduler = AsyncIOScheduler()
 
+# Serializes poll cycles triggered by the scheduler and by IDLE notifications
+_poll_lock = asyncio.Lock()
+_poll_requested = False
+
+# IDLE watcher state (separate connection - an idling connection cannot run commands)
+_idle_task: Optional[asyncio.Task] = None
+_idle_imap = None
+
+# Polls triggered by the IDLE watcher (the loop only keeps weak references to tasks)
+_poll_tasks: Set[asyncio.Task] = set()
+
 
 async def poll_emails_task():
     """
     Background task to poll for new emails
-    Runs periodically based on POLLING_INTERVAL_SECONDS
+    Runs periodically based on POLLING_INTERVAL_SECONDS and whenever IDLE reports new mail.
+    A request arriving while a cycle is running schedules one more cycle instead of overlapping.
     """
-    logger.info("Starting email polling task...")
+    global _poll_requested
+
+    if _poll_lock.locked():
+        _poll_requested = True
+        return
+
+    async with _poll_lock:
+        while True:
+            _poll_requested = False
+            await _run_poll_cycle()
+            if not _poll_requested:
+                break
+
+
+async def _run_poll_cycle():
+    """Run a single poll cycle and record the outcome in the health service"""
+    logger.debug("Starting email polling task...")
 
     try:
         # Get database session
@@ -37,7 +68,8 @@ async def poll_emails_task():
             # Poll inbox
             processed_count = await email_service.poll_inbox()
 
-            logger.info(f"Email polling completed. Processed {processed_count} emails.")
+            if processed_count:
+                logger.info(f"Email polling completed. Processed {processed_count} emails.")
 
             # Record success in health service
             from app.services.email_poller_health_service import email_poller_health_service
@@ -99,11 +131,83 @@ async def _send_admin_alert(subject: str, message: str):
         logger.error(f"Error sending admin alert: {e}")
 
 
+async def idle_watch_task():
+    """
+    Keep an IMAP IDLE session open and trigger a poll as soon as the server reports new mail
+
+    Falls back silently to interval polling if the server lacks IDLE support,
+    and reconnects with exponential backoff on connection errors.
+    """
+    global _idle_imap
+
+    timeout = settings.email_processing.imap_idle_timeout_seconds
+    backoff = 5
+
+    while True:
+        try:
+            _idle_imap = await asyncio.to_thread(open_imap_connection)
+            if not _idle_imap:
+                raise ConnectionError("Could not open IMAP connection for IDLE")
+
+            if not supports_idle(_idle_imap):
+                logger.info("IMAP server does not support IDLE - using interval polling only")
+                _close_idle_connection()
+                return
+
+            await asyncio.to_thread(_idle_imap.select, 'INBOX', True)
+            logger.info("IMAP IDLE watcher connected")
+            backoff = 5
+
+            # Catch anything that arrived while (re)connecting
+            _trigger_poll()
+
+            while True:
+                has_new_mail = await asyncio.to_thread(wait_for_new_mail, _idle_imap, timeout)
+                if has_new_mail:
+                    logger.debug("IMAP IDLE reported new mail - triggering poll")
+                    _trigger_poll()
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"IMAP IDLE watcher error, reconnecting in {backoff}s: {str(e)}")
+            _close_idle_connection()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, settings.email_processing.polling_interval_seconds)
+
+
+def _trigger_poll():
+    """Start a poll cycle in the background, keeping a reference until it finishes"""
+    task = asyncio.create_task(poll_emails_task())
+    _poll_tasks.add(task)
+    task.add_done_callback(_poll_tasks.discard)
+
+
+def _close_idle_connection():
+    """Shut down the IDLE socket so a worker thread blocked in IDLE returns immediately"""
+    global _idle_imap
+
+    imap = _idle_imap
+    _idle_imap = None
+    if imap is None:
+        return
+    try:
+        imap.sock.shutdown(socket.SHUT_RDWR)
+    except Exception:
+        pass
+    try:
+        imap.shutdown()
+    except Exception:
+        pass
+
+
 def start_email_poller():
     """
-    Start the email polling scheduler
+    Start the email polling scheduler and IDLE watcher
     Called during application startup
     """
+    global _idle_task
+
     try:
         # Get polling interval from settings
         interval_seconds = settings.email_processing.polling_interval_seconds
@@ -127,16 +231,28 @@ def start_email_poller():
         else:
             logger.warning("Email poller already running")
 
+        if settings.email_processing.imap_idle_enabled and _idle_task is None:
+            _idle_task = asyncio.get_running_loop().create_task(idle_watch_task())
+            logger.info("IMAP IDLE watcher started")
+
     except Exception as e:
         logger.error(f"Failed to start email poller: {str(e)}", exc_info=True)
 
 
 def stop_email_poller():
     """
-    Stop the email polling scheduler
+    Stop the email polling scheduler, IDLE watcher and persistent IMAP connection
     Called during application shutdown
     """
+    global _idle_task
+
     try:
+        if _idle_task is not None:
+            _idle_task.cancel()
+            _idle_task = None
+        _close_idle_connection()
+        EmailProcessingService.close_imap_connection()
+
         if scheduler.running:
             scheduler.shutdown()
             logger.info("Email poller stopped")
@@ -0,0 +1,75 @@
+"""
+Stats Rollup Background Task
+Refreshes the recent daily activity buckets and rolling 24h/7d figures
+shown on the admin dashboard.
+Uses the shared scheduler from email_poller to avoid multiple AsyncIOScheduler conflicts.
+"""
+
+import asyncio
+import logging
+from apscheduler.triggers.interval import IntervalTrigger
+
+from app.core.config import settings
+from app.database.connection import db_manager
+
+logger = logging.getLogger(__name__)
+
+# Job ID for the stats rollup
+STATS_ROLLUP_JOB_ID = 'stats_rollup'
+
+
+def _refresh():
+    from app.services.admin_stats_service import admin_stats_service
+
+    session = db_manager.session_local()
+    try:
+        admin_stats_service.refresh_rollups(session)
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+async def refresh_stats_rollups():
+    """Recompute today's and yesterday's rollups off the event loop."""
+    try:
+        await asyncio.to_thread(_refresh)
+    except Exception as e:
+        logger.error(f"Stats rollup error: {e}")
+
+
+def start_stats_rollup():
+    """Start the stats rollup by adding job to the shared scheduler."""
+    try:
+        from app.tasks.email_poller import scheduler as shared_scheduler
+
+        interval = settings.performance.perf_stats_rollup_interval_seconds
+        logger.info(f"Starting stats rollup with {interval}s interval")
+
+        shared_scheduler.add_job(
+            refresh_stats_rollups,
+            trigger=IntervalTrigger(seconds=interval),
+            id=STATS_ROLLUP_JOB_ID,
+            name='Refresh admin statistics rollups',
+            replace_existing=True,
+            max_instances=1,
+            misfire_grace_time=interval,
+        )
+
+        logger.info("Stats rollup job registered on shared scheduler")
+
+    except Exception as e:
+        logger.error(f"Error starting stats rollup: {e}")
+
+
+def stop_stats_rollup():
+    """Remove stats rollup job from shared scheduler."""
+    try:
+        from app.tasks.email_poller import scheduler as shared_scheduler
+
+        if shared_scheduler.running and shared_scheduler.get_job(STATS_ROLLUP_JOB_ID):
+            shared_scheduler.remove_job(STATS_ROLLUP_JOB_ID)
+            logger.info("Stats rollup job removed")
+    except Exception as e:
+        logger.error(f"Error stopping stats rollup: {e}")
@@ -0,0 +1,67 @@
+"""
+Stripe Webhook Sweeper Background Task
+Re-dispatches stored Stripe events whose Celery task was lost (broker outage,
+worker crash) and failed events whose retry backoff has elapsed.
+Uses the shared scheduler from email_poller to avoid multiple AsyncIOScheduler conflicts.
+"""
+
+import asyncio
+import logging
+from apscheduler.triggers.interval import IntervalTrigger
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Job ID for the Stripe webhook sweeper
+STRIPE_WEBHOOK_SWEEPER_JOB_ID = 'stripe_webhook_sweeper'
+
+
+async def sweep_stripe_webhook_events():
+    """Dispatch customers with stale pending or retry-due Stripe events."""
+    try:
+        from app.services.stripe_webhook_service import stripe_webhook_service
+
+        await asyncio.to_thread(stripe_webhook_service.sweep)
+    except Exception as e:
+        logger.error(f"Stripe webhook sweeper error: {e}")
+
+
+def start_stripe_webhook_sweeper():
+    """Start the Stripe webhook sweeper by adding job to the shared scheduler."""
+    if not settings.stripe.stripe_webhook_async:
+        logger.info("Stripe webhooks are processed inline, sweeper not started")
+        return
+
+    try:
+        from app.tasks.email_poller import scheduler as shared_scheduler
+
+        interval = settings.stripe.stripe_webhook_retry_seconds
+        logger.info(f"Starting Stripe webhook sweeper with {interval}s interval")
+
+        shared_scheduler.add_job(
+            sweep_stripe_webhook_events,
+            trigger=IntervalTrigger(seconds=interval),
+            id=STRIPE_WEBHOOK_SWEEPER_JOB_ID,
+            name='Retry pending and failed Stripe webhook events',
+            replace_existing=True,
+            max_instances=1,
+            misfire_grace_time=interval,
+        )
+
+        logger.info("Stripe webhook sweeper job registered on shared scheduler")
+
+    except Exception as e:
+        logger.error(f"Error starting Stripe webhook sweeper: {e}")
+
+
+def stop_stripe_webhook_sweeper():
+    """Remove Stripe webhook sweeper job from shared scheduler."""
+    try:
+        from app.tasks.email_poller import scheduler as shared_scheduler
+
+        if shared_scheduler.running and shared_scheduler.get_job(STRIPE_WEBHOOK_SWEEPER_JOB_ID):
+            shared_scheduler.remove_job(STRIPE_WEBHOOK_SWEEPER_JOB_ID)
+            logger.info("Stripe webhook sweeper job removed")
+    except Exception as e:
+        logger.error(f"Error stopping Stripe webhook sweeper: {e}")
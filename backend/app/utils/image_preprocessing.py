@@ -0,0 +1,102 @@
+# backend/app/utils/image_preprocessing.py
+"""
+Cheap page quality measurement and OCR preprocessing chains on numpy buffers
+
+Pages are measured on a downsampled greyscale copy (a few hundred thousand
+pixels) so the decision costs a few milliseconds; the chosen chain then runs
+once on the full-resolution buffer. Rendered PDF pages come straight from
+PyMuPDF pixmaps as greyscale arrays, without PIL conversions.
+"""
+
+import math
+from typing import Tuple
+
+import cv2
+import numpy as np
+
+from app.utils.ocr_utils import CHAIN_BILATERAL, CHAIN_NLMEANS, CHAIN_NONE
+
+# Immerkaer's noise estimation kernel (difference of two Laplacians)
+_NOISE_KERNEL = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+
+
+def to_gray(image) -> np.ndarray:
+    """Greyscale uint8 array from a PIL image or an RGB/RGBA/grey array"""
+    if not isinstance(image, np.ndarray):
+        if image.mode != 'L':
+            image = image.convert('L')
+        return np.asarray(image)
+    if image.ndim == 2:
+        return image
+    if image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_RGBA2GRAY)
+    return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+
+
+def pixmap_to_array(pix) -> np.ndarray:
+    """View a PyMuPDF pixmap's samples as an array (greyscale pixmaps give 2-D arrays)"""
+    array = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+    return array[:, :, 0] if pix.n == 1 else array
+
+
+def downsample(gray: np.ndarray, max_side: int) -> np.ndarray:
+    """Area-averaged copy whose longer side is at most max_side"""
+    height, width = gray.shape[:2]
+    scale = max_side / max(height, width)
+    if scale >= 1:
+        return gray
+    size = (max(1, int(width * scale)), max(1, int(height * scale)))
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+
+
+def measure_quality(gray: np.ndarray) -> Tuple[float, float]:
+    """
+    Estimate noise and contrast of a (downsampled) greyscale page
+
+    Noise is Immerkaer's sigma estimate computed over flat regions only
+    (pixels on text edges are excluded, they would read as noise).
+    Contrast is the spread between the 2nd and 98th brightness percentile.
+
+    Returns:
+        (noise sigma in grey levels, contrast 0-1)
+    """
+    if gray.shape[0] < 3 or gray.shape[1] < 3:
+        return 0.0, 1.0
+
+    low, high = np.percentile(gray, (2, 98))
+    contrast = float(high - low) / 255.0
+
+    image = gray.astype(np.float32)
+    response = np.abs(cv2.filter2D(image, -1, _NOISE_KERNEL))[1:-1, 1:-1]
+    gradient = cv2.magnitude(
+        cv2.Sobel(image, cv2.CV_32F, 1, 0, ksize=3),
+        cv2.Sobel(image, cv2.CV_32F, 0, 1, ksize=3)
+    )[1:-1, 1:-1]
+    flat = gradient <= np.percentile(gradient, 80)
+    if not flat.any():
+        return 0.0, contrast
+
+    noise = math.sqrt(math.pi / 2) * float(response[flat].mean()) / 6.0
+    return noise, contrast
+
+
+def apply_chain(gray: np.ndarray, chain: str) -> np.ndarray:
+    """Run a preprocessing chain (see app.utils.ocr_utils.CHAINS) on a greyscale array"""
+    if chain == CHAIN_NONE:
+        return gray
+    if chain == CHAIN_NLMEANS:
+        smoothed = cv2.fastNlMeansDenoising(gray, None, h=10, templateWindowSize=7, searchWindowSize=21)
+    elif chain == CHAIN_BILATERAL:
+        smoothed = cv2.bilateralFilter(gray, 5, 50, 50)
+    else:
+        raise ValueError(f"Unknown preprocessing chain: {chain}")
+
+    # Adaptive thresholding (better for varying lighting)
+    return cv2.adaptiveThreshold(
+        smoothed,
+        255,
+        cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+        cv2.THRESH_BINARY,
+        blockSize=11,
+        C=2
+    )
@@ -0,0 +1,310 @@
+# backend/app/utils/imap_utils.py
+"""
+IMAP protocol helpers for incremental inbox ingestion
+
+imaplib only returns raw response lines, so these helpers parse FETCH
+responses (including BODYSTRUCTURE) into Python structures and implement
+the IDLE command, which is not available in the Python 3.11 stdlib.
+"""
+
+import binascii
+import imaplib
+import logging
+import quopri
+import re
+import select
+from dataclasses import dataclass
+from email.utils import decode_rfc2231
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+logger = logging.getLogger(__name__)
+
+_LITERAL_RE = re.compile(rb'\{(\d+)\}$')
+_ATOM_SPECIALS = b' ()"\r\n'
+
+
+@dataclass
+class AttachmentPart:
+    """A single attachment part located via BODYSTRUCTURE"""
+    section: str
+    filename: str
+    content_type: str
+    encoding: str
+    encoded_size: int
+
+    @property
+    def estimated_size(self) -> int:
+        """Approximate decoded size (base64 inflates payloads by 4/3)"""
+        if self.encoding == 'base64':
+            return self.encoded_size * 3 // 4
+        return self.encoded_size
+
+
+def _tokenize(segment: bytes, tokens: List[Any]):
+    """Tokenize one raw IMAP response segment (literal markers are dropped)"""
+    segment = _LITERAL_RE.sub(b'', segment.rstrip(b'\r\n'))
+    i = 0
+    length = len(segment)
+
+    while i < length:
+        char = segment[i:i + 1]
+
+        if char in (b' ', b'\r', b'\n'):
+            i += 1
+        elif char in (b'(', b')'):
+            tokens.append(char)
+            i += 1
+        elif char == b'"':
+            i += 1
+            value = bytearray()
+            while i < length and segment[i:i + 1] != b'"':
+                if segment[i:i + 1] == b'\\':
+                    i += 1
+                value += segment[i:i + 1]
+                i += 1
+            tokens.append(('str', bytes(value)))
+            i += 1
+        else:
+            start = i
+            depth = 0
+            while i < length:
+                char = segment[i:i + 1]
+                if char == b'[':
+                    depth += 1
+                elif char == b']':
+                    depth -= 1
+                elif depth == 0 and char in _ATOM_SPECIALS:
+                    break
+                i += 1
+            atom = segment[start:i]
+            tokens.append(None if atom.upper() == b'NIL' else atom)
+
+
+def _build(tokens: List[Any], pos: int = 0) -> Tuple[List[Any], int]:
+    """Build nested lists from a token stream starting after an opening paren"""
+    result = []
+    while pos < len(tokens):
+        token = tokens[pos]
+        pos += 1
+        if token == b'(':
+            child, pos = _build(tokens, pos)
+            result.append(child)
+        elif token == b')':
+            return result, pos
+        elif isinstance(token, tuple):
+            result.append(token[1])
+        else:
+            result.append(token)
+    return result, pos
+
+
+def parse_fetch_response(data: List[Any]) -> Dict[int, Dict[str, Any]]:
+    """
+    Parse the data returned by imaplib ``uid('FETCH', ...)``
+
+    Args:
+        data: Raw response list (bytes lines and (header, literal) tuples)
+
+    Returns:
+        Mapping of UID to {ITEM_NAME: value}, e.g. {'BODYSTRUCTURE': [...]}
+    """
+    tokens: List[Any] = []
+    for item in data:
+        if item is None:
+            continue
+        if isinstance(item, tuple):
+            _tokenize(item[0], tokens)
+            tokens.append(('str', item[1]))
+            if len(item) > 2:
+                _tokenize(item[2], tokens)
+        else:
+            _tokenize(item, tokens)
+
+    parsed, _ = _build(tokens)
+    messages: Dict[int, Dict[str, Any]] = {}
+
+    # Top level is a flat sequence of: <seq> (<key> <value> ...)
+    for element in parsed:
+        if not isinstance(element, list):
+            continue
+        items: Dict[str, Any] = {}
+        for idx in range(0, len(element) - 1, 2):
+            key = element[idx]
+            if isinstance(key, bytes):
+                items[key.decode('ascii', errors='ignore').upper().replace('.PEEK', '')] = element[idx + 1]
+        uid = items.get('UID')
+        if uid is not None:
+            try:
+                messages[int(uid)] = items
+            except (TypeError, ValueError):
+                continue
+
+    return messages
+
+
+def _params_to_dict(params: Any) -> Dict[str, str]:
+    """Convert a BODYSTRUCTURE parameter list into a dict with lower-case keys"""
+    result: Dict[str, str] = {}
+    if not isinstance(params, list):
+        return result
+    for idx in range(0, len(params) - 1, 2):
+        key, value = params[idx], params[idx + 1]
+        if isinstance(key, bytes) and isinstance(value, bytes):
+            result[key.decode('ascii', errors='ignore').lower()] = value.decode('utf-8', errors='ignore')
+    return result
+
+
+def _filename_from_params(params: Dict[str, str]) -> Optional[str]:
+    """Resolve filename, honouring RFC 2231 extended parameters"""
+    for key in ('filename', 'name'):
+        if params.get(key):
+            return params[key]
+        extended = params.get(f'{key}*')
+        if extended:
+            charset, _, value = decode_rfc2231(extended)
+            return unquote(value, encoding=charset or 'utf-8', errors='ignore')
+    return None
+
+
+def _collect_parts(structure: List[Any], prefix: str, parts: List[AttachmentPart]):
+    """Walk a BODYSTRUCTURE tree collecting parts with a filename and disposition"""
+    if structure and isinstance(structure[0], list):
+        # Child parts come first, followed by the multipart subtype and extension data
+        children = []
+        for child in structure:
+            if not isinstance(child, list):
+                break
+            children.append(child)
+        for number, child in enumerate(children, start=1):
+            section = f"{prefix}.{number}" if prefix else str(number)
+            _collect_parts(child, section, parts)
+        return
+
+    if len(structure) < 7:
+        return
+
+    main_type = (structure[0] or b'').decode('ascii', errors='ignore').lower()
+    sub_type = (structure[1] or b'').decode('ascii', errors='ignore').lower()
+    encoding = (structure[5] or b'7bit').decode('ascii', errors='ignore').lower()
+    try:
+        size = int(structure[6] or 0)
+    except (TypeError, ValueError):
+        size = 0
+
+    # Extension data position depends on the body type (RFC 3501 section 7.4.2)
+    if main_type == 'text':
+        disposition_index = 9
+    elif main_type == 'message' and sub_type == 'rfc822':
+        disposition_index = 11
+    else:
+        disposition_index = 8
+
+    disposition = structure[disposition_index] if len(structure) > disposition_index else None
+    if not isinstance(disposition, list) or not disposition:
+        return
+
+    filename = _filename_from_params(_params_to_dict(disposition[1] if len(disposition) > 1 else None))
+    if not filename:
+        filename = _filename_from_params(_params_to_dict(structure[2]))
+    if not filename:
+        return
+
+    parts.append(AttachmentPart(
+        section=prefix or '1',
+        filename=filename,
+        content_type=f"{main_type}/{sub_type}",
+        encoding=encoding,
+        encoded_size=size
+    ))
+
+
+def find_attachment_parts(bodystructure: Any) -> List[AttachmentPart]:
+    """
+    Locate attachment parts in a parsed BODYSTRUCTURE
+
+    Mirrors the rules of the full-message parser: a part counts as an
+    attachment when it has a Content-Disposition and a filename.
+
+    Args:
+        bodystructure: Parsed BODYSTRUCTURE list from parse_fetch_response
+
+    Returns:
+        List of attachment parts with their IMAP section numbers
+    """
+    parts: List[AttachmentPart] = []
+    if isinstance(bodystructure, list):
+        _collect_parts(bodystructure, '', parts)
+    return parts
+
+
+def decode_part_payload(payload: bytes, encoding: str) -> bytes:
+    """
+    Decode a raw body part fetched with BODY[<section>]
+
+    Args:
+        payload: Raw transfer-encoded part bytes
+        encoding: Content-Transfer-Encoding from BODYSTRUCTURE
+
+    Returns:
+        Decoded bytes
+    """
+    if encoding == 'base64':
+        return binascii.a2b_base64(payload)
+    if encoding == 'quoted-printable':
+        return quopri.decodestring(payload)
+    return payload
+
+
+def get_uid_validity(imap) -> Optional[int]:
+    """Read UIDVALIDITY from the untagged responses of the last SELECT"""
+    _, data = imap.response('UIDVALIDITY')
+    if data and data[0]:
+        try:
+            return int(data[0])
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+def supports_idle(imap) -> bool:
+    """Check whether the server advertises the IDLE capability (RFC 2177)"""
+    return 'IDLE' in getattr(imap, 'capabilities', ())
+
+
+def wait_for_new_mail(imap, timeout: float) -> bool:
+    """
+    Issue IDLE and block until the server reports new mail or timeout expires
+
+    Blocking call - run it in a worker thread from async code.
+
+    Args:
+        imap: Connected IMAP client with a mailbox selected
+        timeout: Seconds to idle before returning (keep below 29 minutes)
+
+    Returns:
+        True if the server pushed an EXISTS/RECENT notification
+    """
+    tag = imap._new_tag()
+    imap.send(tag + b' IDLE\r\n')
+
+    continuation = imap.readline()
+    if not continuation.startswith(b'+'):
+        raise imaplib.IMAP4.error(f"IDLE rejected: {continuation!r}")
+
+    received: List[bytes] = []
+    sock = imap.sock
+    pending = getattr(sock, 'pending', lambda: 0)
+    if pending() or select.select([sock], [], [], timeout)[0]:
+        received.append(imap.readline())
+
+    imap.send(b'DONE\r\n')
+    while True:
+        line = imap.readline()
+        if not line:
+            raise imaplib.IMAP4.abort("Connection closed while leaving IDLE")
+        if line.startswith(tag):
+            break
+        received.append(line)
+
+    return any(b'EXISTS' in line or b'RECENT' in line for line in received)
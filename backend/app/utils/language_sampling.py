@@ -0,0 +1,118 @@
+# backend/app/utils/language_sampling.py
+"""
+Text sampling helpers for language detection.
+
+Detecting the language of a 200-page OCR result does not need all of its
+text. Detection looks at a few evenly spaced windows (head, middle, tail)
+with a fixed character budget. To find multilingual documents it checks a
+bounded number of page-sized segments. Detection cost therefore no longer
+grows with document length.
+"""
+
+import hashlib
+from typing import List, Optional, Sequence, Tuple
+
+
+def text_fingerprint(text: str) -> str:
+    """Short, stable hash of a text (cache key for detection results)"""
+    return hashlib.blake2b(text.encode('utf-8', 'replace'), digest_size=16).hexdigest()
+
+
+def _trim_to_words(window: str, cut_start: bool, cut_end: bool) -> str:
+    """Drop the partial words at the edges of a window cut out of a longer text"""
+    if cut_start:
+        space = window.find(' ')
+        if 0 <= space < len(window) // 2:
+            window = window[space + 1:]
+    if cut_end:
+        space = window.rfind(' ')
+        if space > len(window) // 2:
+            window = window[:space]
+    return window
+
+
+def sample_windows(text: str, budget: int, windows: int = 3) -> str:
+    """
+    Representative sample of a text for language detection
+
+    Whitespace is normalized first. Texts within the budget are returned
+    whole; longer texts are reduced to evenly spaced windows (head, middle,
+    tail for three windows) of budget // windows characters each, cut at
+    word boundaries.
+
+    Args:
+        text: Text to sample
+        budget: Max characters of the sample
+        windows: Number of windows
+
+    Returns:
+        Single-line sample of at most budget characters (plus separators)
+    """
+    text = ' '.join(text.split())
+    if len(text) <= budget:
+        return text
+
+    windows = max(1, windows)
+    size = budget // windows
+    span = len(text) - size
+    parts = []
+    for index in range(windows):
+        start = span * index // (windows - 1) if windows > 1 else 0
+        parts.append(_trim_to_words(text[start:start + size], start > 0, start + size < len(text)))
+    return ' '.join(parts)
+
+
+def pick_evenly(items: Sequence, limit: int) -> list:
+    """At most limit items, evenly spread and always including the first and last"""
+    items = list(items)
+    if len(items) <= limit:
+        return items
+    if limit <= 1:
+        return items[:limit]
+    return [items[index * (len(items) - 1) // (limit - 1)] for index in range(limit)]
+
+
+def split_segments(text: str, segment_chars: int, max_segments: int) -> List[str]:
+    """
+    Page-sized segments of a text; evenly picked when there are more than max_segments
+
+    Args:
+        text: Text to split
+        segment_chars: Segment length in characters (roughly one page)
+        max_segments: Max segments returned
+
+    Returns:
+        Segments in document order, whitespace-normalized
+    """
+    text = ' '.join(text.split())
+    if not text:
+        return []
+
+    count = -(-len(text) // segment_chars)
+    segments = []
+    for index in pick_evenly(range(count), max_segments):
+        start = index * segment_chars
+        end = start + segment_chars
+        segments.append(_trim_to_words(text[start:end], start > 0, end < len(text)))
+    return segments
+
+
+def language_shares(detections: Sequence[Tuple[Optional[str], int]]) -> List[Tuple[str, float]]:
+    """
+    Share of text per language
+
+    Args:
+        detections: (language, characters) per page or segment; pages
+            without a result (None) are ignored
+
+    Returns:
+        (language, share) pairs, largest share first
+    """
+    totals = {}
+    for language, chars in detections:
+        if language:
+            totals[language] = totals.get(language, 0) + chars
+    total = sum(totals.values())
+    if not total:
+        return []
+    return sorted(((language, chars / total) for language, chars in totals.items()), key=lambda item: -item[1])
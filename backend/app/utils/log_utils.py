@@ -0,0 +1,152 @@
+# backend/app/utils/log_utils.py
+"""
+Logging primitives: per-module level overrides, rate-limited sampling of
+debug traces and a queue handler that leaves formatting and I/O to a
+background listener thread.
+
+Hot paths should log with %-style arguments (``logger.debug("x=%s", x)``),
+never f-strings: the message is only built if a handler accepts the record,
+and the sampling filter groups records by their unformatted template.
+"""
+
+import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterable, Optional, Tuple
+
+
+def parse_level_overrides(spec: str) -> Dict[str, int]:
+    """
+    Parse per-module log levels
+
+    Args:
+        spec: Comma-separated ``logger=LEVEL`` pairs,
+            e.g. "app.services.classification_service=DEBUG,app.tasks=WARNING"
+
+    Returns:
+        Logger name -> numeric level (invalid entries are skipped)
+    """
+    overrides = {}
+    for item in (spec or '').split(','):
+        name, _, level = item.partition('=')
+        name, level = name.strip(), level.strip().upper()
+        if not name or not level:
+            continue
+        value = logging.getLevelName(level)
+        if isinstance(value, int):
+            overrides[name] = value
+    return overrides
+
+
+def apply_level_overrides(overrides: Dict[str, int]):
+    """Set the level of each named logger"""
+    for name, level in overrides.items():
+        logging.getLogger(name).setLevel(level)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Rate-limit low-level records per message template
+
+    For records at or below ``max_level`` each (logger, template) pair may
+    emit ``burst`` records per ``interval`` seconds; beyond that only every
+    ``sample_every``-th record passes (0 drops them all). The first record
+    passed in a new interval is annotated with how many were suppressed.
+    Higher levels always pass.
+    """
+
+    def __init__(
+        self,
+        burst: int = 20,
+        interval: float = 10.0,
+        sample_every: int = 100,
+        max_level: int = logging.DEBUG,
+        clock=time.monotonic
+    ):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.sample_every = sample_every
+        self.max_level = max_level
+        self._clock = clock
+        self._windows: Dict[Tuple[str, object], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+
+        key = (record.name, record.msg)
+        now = self._clock()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                # [window start, records seen, records suppressed]
+                window = self._windows[key] = [now, 0, 0]
+                if suppressed:
+                    record.msg = f"{record.msg} [{suppressed} similar suppressed]"
+            window[1] += 1
+            seen = window[1]
+            if seen <= self.burst:
+                return True
+            if self.sample_every and (seen - self.burst) % self.sample_every == 0:
+                return True
+            window[2] += 1
+            return False
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler that never blocks the logging thread
+
+    Only the message arguments are merged in the caller (so later mutation of
+    the arguments can't change the message); timestamps, the line format and
+    tracebacks are rendered by the listener thread's handlers. When the queue
+    is full, records are dropped and counted instead of waiting.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def start_queue_logging(
+    handlers: Iterable[logging.Handler],
+    maxsize: int = 10000,
+    logger: Optional[logging.Logger] = None
+) -> Tuple[DeferredQueueHandler, QueueListener]:
+    """
+    Route a logger's records through a queue to the given handlers
+
+    The handlers are removed from the logger (root by default) and driven by a
+    QueueListener thread instead; the logger gets a single DeferredQueueHandler.
+
+    Returns:
+        (queue handler, started listener); call listener.stop() on shutdown to flush
+    """
+    target = logger or logging.getLogger()
+    handlers = list(handlers)
+    for handler in handlers:
+        target.removeHandler(handler)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=maxsize)
+    queue_handler = DeferredQueueHandler(log_queue)
+    target.addHandler(queue_handler)
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return queue_handler, listener
@@ -0,0 +1,373 @@
+# backend/app/utils/metrics.py
+"""
+Lightweight metrics primitives: fixed-bucket latency histograms, counters,
+gauges, a registry with cross-process snapshot merging and Prometheus text exposition.
+
+Recording is O(1) and lock-free on the hot path: every thread writes to its
+own shard, shards are summed only when a snapshot is taken.
+"""
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bucket upper bounds in milliseconds (roughly 1.5x apart, 1ms - 2min)
+DEFAULT_LATENCY_BUCKETS_MS: Tuple[float, ...] = (
+    1, 2, 3, 5, 7.5, 10, 15, 20, 30, 50, 75, 100, 150, 200, 300, 500, 750,
+    1000, 1500, 2000, 3000, 5000, 7500, 10000, 15000, 30000, 60000, 120000,
+)
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class _Shard:
+    __slots__ = ('counts', 'total')
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.total = 0.0
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram; the last bucket collects values above the highest bound"""
+
+    def __init__(self, bounds: Iterable[float] = DEFAULT_LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = _Shard(len(self.bounds) + 1)
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def record(self, value: float):
+        """Record one observation"""
+        shard = self._shard()
+        shard.counts[bisect.bisect_left(self.bounds, value)] += 1
+        shard.total += value
+
+    def snapshot(self) -> Dict:
+        """Return {'counts': [...], 'sum': float} summed over all thread shards"""
+        counts = [0] * (len(self.bounds) + 1)
+        total = 0.0
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for idx, value in enumerate(shard.counts):
+                counts[idx] += value
+            total += shard.total
+        return {'counts': counts, 'sum': total}
+
+
+class _Counter:
+    """Monotonic counter; like the histogram, each thread adds to its own shard"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[List[float]] = []
+        self._shards_lock = threading.Lock()
+
+    def add(self, amount: float):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = [0.0]
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        shard[0] += amount
+
+    def value(self) -> float:
+        with self._shards_lock:
+            shards = list(self._shards)
+        return sum(shard[0] for shard in shards)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge_histogram_snapshots(snapshots: Iterable[Dict]) -> Dict:
+    """Add up histogram snapshots that share the same bucket layout"""
+    merged: Optional[Dict] = None
+    for snapshot in snapshots:
+        if merged is None:
+            merged = {'counts': list(snapshot['counts']), 'sum': snapshot['sum']}
+            continue
+        for idx, value in enumerate(snapshot['counts']):
+            merged['counts'][idx] += value
+        merged['sum'] += snapshot['sum']
+    return merged or {'counts': [], 'sum': 0.0}
+
+
+def histogram_percentile(snapshot: Dict, quantile: float, bounds: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS_MS) -> float:
+    """
+    Estimate a percentile from bucket counts (linear interpolation inside the bucket)
+
+    Args:
+        snapshot: Histogram snapshot
+        quantile: 0.0 - 1.0
+        bounds: Bucket upper bounds used by the histogram
+
+    Returns:
+        Estimated value (0 if empty)
+    """
+    counts = snapshot.get('counts') or []
+    total = sum(counts)
+    if not total:
+        return 0.0
+
+    rank = quantile * total
+    cumulative = 0
+    for idx, count in enumerate(counts):
+        if not count:
+            continue
+        if cumulative + count >= rank:
+            lower = bounds[idx - 1] if idx > 0 else 0.0
+            upper = bounds[idx] if idx < len(bounds) else bounds[-1]
+            fraction = (rank - cumulative) / count
+            return lower + (upper - lower) * fraction
+        cumulative += count
+    return float(bounds[-1])
+
+
+class MetricsRegistry:
+    """
+    Named histograms, counters and gauges keyed by label sets
+
+    Each process keeps its own registry. `flush()` writes a snapshot file
+    so any worker can serve metrics aggregated over all workers.
+    """
+
+    def __init__(self, bounds: Iterable[float] = DEFAULT_LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self._histograms: Dict[Tuple[str, LabelSet], LatencyHistogram] = {}
+        self._counters: Dict[Tuple[str, LabelSet], _Counter] = {}
+        self._gauges: Dict[Tuple[str, LabelSet], float] = {}
+        self._help: Dict[str, str] = {}
+        self._create_lock = threading.Lock()
+
+    def describe(self, name: str, help_text: str):
+        """Attach a HELP description to a metric family"""
+        self._help[name] = help_text
+
+    def observe(self, name: str, value: float, **labels: str):
+        """Record a histogram observation"""
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._create_lock:
+                histogram = self._histograms.setdefault(key, LatencyHistogram(self.bounds))
+        histogram.record(value)
+
+    def increment(self, name: str, amount: float = 1.0, **labels: str):
+        """Increment a counter"""
+        key = (name, tuple(sorted(labels.items())))
+        counter = self._counters.get(key)
+        if counter is None:
+            with self._create_lock:
+                counter = self._counters.setdefault(key, _Counter())
+        counter.add(amount)
+
+    def set_gauge(self, name: str, value: float, **labels: str):
+        """Set a gauge to its current value (summed across workers when collected)"""
+        self._gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def snapshot(self) -> Dict:
+        """Serializable snapshot of every metric in this process"""
+        return {
+            'bounds': list(self.bounds),
+            'help': dict(self._help),
+            'histograms': [
+                {'name': name, 'labels': dict(labels), **histogram.snapshot()}
+                for (name, labels), histogram in list(self._histograms.items())
+            ],
+            'counters': [
+                {'name': name, 'labels': dict(labels), 'value': counter.value()}
+                for (name, labels), counter in list(self._counters.items())
+            ],
+            'gauges': [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in list(self._gauges.items())
+            ],
+        }
+
+    def flush(self, directory: str, worker_id: Optional[str] = None):
+        """Atomically write this process's snapshot to `directory`"""
+        worker_id = worker_id or str(os.getpid())
+        try:
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"worker-{worker_id}.json")
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.debug(f"Could not flush metrics snapshot: {e}")
+
+    def collect(self, directory: Optional[str] = None, max_age_seconds: float = 300) -> Dict:
+        """
+        Merge this process's snapshot with the snapshot files of other workers
+
+        Files named after a PID are kept for as long as that process is alive,
+        however long ago it last flushed, so idle workers don't drop out of the
+        totals; a dead worker's file is removed. Other worker ids fall back to
+        the file age.
+
+        Args:
+            directory: Snapshot directory (None = this process only)
+            max_age_seconds: Ignore files of non-PID workers that stopped flushing
+
+        Returns:
+            Snapshot with per-series values summed across workers
+        """
+        snapshots = [self.snapshot()]
+        own_file = f"worker-{os.getpid()}.json"
+
+        if directory and os.path.isdir(directory):
+            now = time.time()
+            for filename in os.listdir(directory):
+                if not filename.endswith('.json') or filename == own_file:
+                    continue
+                path = os.path.join(directory, filename)
+                worker_id = filename[len('worker-'):-len('.json')] if filename.startswith('worker-') else ''
+                try:
+                    if worker_id.isdigit():
+                        if not _pid_alive(int(worker_id)):
+                            os.remove(path)
+                            continue
+                    elif now - os.path.getmtime(path) > max_age_seconds:
+                        continue
+                    with open(path) as f:
+                        data = json.load(f)
+                    if tuple(data.get('bounds', ())) == self.bounds:
+                        snapshots.append(data)
+                except (OSError, ValueError):
+                    continue
+
+        return merge_registry_snapshots(snapshots)
+
+
+def merge_registry_snapshots(snapshots: List[Dict]) -> Dict:
+    """Sum histogram buckets, counters and gauges of several registry snapshots"""
+    histograms: Dict[Tuple[str, LabelSet], List[Dict]] = {}
+    counters: Dict[Tuple[str, LabelSet], float] = {}
+    gauges: Dict[Tuple[str, LabelSet], float] = {}
+    help_texts: Dict[str, str] = {}
+
+    for snapshot in snapshots:
+        help_texts.update(snapshot.get('help', {}))
+        for item in snapshot.get('histograms', []):
+            key = (item['name'], tuple(sorted(item['labels'].items())))
+            histograms.setdefault(key, []).append(item)
+        for item in snapshot.get('counters', []):
+            key = (item['name'], tuple(sorted(item['labels'].items())))
+            counters[key] = counters.get(key, 0.0) + item['value']
+        for item in snapshot.get('gauges', []):
+            key = (item['name'], tuple(sorted(item['labels'].items())))
+            gauges[key] = gauges.get(key, 0.0) + item['value']
+
+    return {
+        'bounds': snapshots[0]['bounds'] if snapshots else list(DEFAULT_LATENCY_BUCKETS_MS),
+        'help': help_texts,
+        'histograms': [
+            {'name': name, 'labels': dict(labels), **merge_histogram_snapshots(items)}
+            for (name, labels), items in histograms.items()
+        ],
+        'counters': [
+            {'name': name, 'labels': dict(labels), 'value': value}
+            for (name, labels), value in counters.items()
+        ],
+        'gauges': [
+            {'name': name, 'labels': dict(labels), 'value': value}
+            for (name, labels), value in gauges.items()
+        ],
+    }
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str], extra: Optional[Dict[str, str]] = None) -> str:
+    merged = dict(labels)
+    if extra:
+        merged.update(extra)
+    if not merged:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape_label(value)}"' for key, value in sorted(merged.items())) + '}'
+
+
+def _format_number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render_prometheus(snapshot: Dict, namespace: str = 'bonifatus') -> str:
+    """
+    Render a registry snapshot in Prometheus text exposition format (0.0.4)
+
+    Histograms recorded in milliseconds are exported in seconds, following
+    Prometheus base-unit conventions (metric names ending in _ms become _seconds).
+
+    Args:
+        snapshot: Registry snapshot (usually merged across workers)
+        namespace: Metric name prefix
+
+    Returns:
+        Exposition text
+    """
+    lines: List[str] = []
+    help_texts = snapshot.get('help', {})
+    bounds = snapshot.get('bounds', [])
+
+    families: Dict[str, List[Dict]] = {}
+    for item in snapshot.get('histograms', []):
+        families.setdefault(item['name'], []).append(item)
+
+    for name, items in sorted(families.items()):
+        in_ms = name.endswith('_ms')
+        scale = 1000.0 if in_ms else 1.0
+        metric = f"{namespace}_{name[:-3] + '_seconds' if in_ms else name}"
+        lines.append(f"# HELP {metric} {help_texts.get(name, name)}")
+        lines.append(f"# TYPE {metric} histogram")
+        for item in sorted(items, key=lambda i: sorted(i['labels'].items())):
+            cumulative = 0
+            for idx, count in enumerate(item['counts']):
+                cumulative += count
+                le = _format_number(bounds[idx] / scale) if idx < len(bounds) else '+Inf'
+                lines.append(f"{metric}_bucket{_format_labels(item['labels'], {'le': le})} {cumulative}")
+            lines.append(f"{metric}_sum{_format_labels(item['labels'])} {_format_number(item['sum'] / scale)}")
+            lines.append(f"{metric}_count{_format_labels(item['labels'])} {cumulative}")
+
+    for kind, key in (('counter', 'counters'), ('gauge', 'gauges')):
+        value_families: Dict[str, List[Dict]] = {}
+        for item in snapshot.get(key, []):
+            value_families.setdefault(item['name'], []).append(item)
+
+        for name, items in sorted(value_families.items()):
+            metric = f"{namespace}_{name}"
+            lines.append(f"# HELP {metric} {help_texts.get(name, name)}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for item in sorted(items, key=lambda i: sorted(i['labels'].items())):
+                lines.append(f"{metric}{_format_labels(item['labels'])} {_format_number(item['value'])}")
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,340 @@
+# backend/app/utils/ocr_utils.py
+"""
+Helpers for turning one Tesseract recognition result into text, confidence
+and word layout
+
+Tesseract's TSV/data output (``image_to_data``) already contains every
+recognized word with its confidence and position, so the plain-text output
+of a second ``image_to_string`` run can be rebuilt from it.
+
+Also holds the pure per-page decisions around OCR: preprocessing plan,
+scanned-vs-native classification and text quality scoring.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+# Tesseract result levels (page, block, paragraph, line, word)
+WORD_LEVEL = 5
+
+# Column order of Tesseract's TSV output (the API's GetTSVText omits the header row)
+TSV_COLUMNS = (
+    'level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+    'left', 'top', 'width', 'height', 'conf', 'text'
+)
+
+
+class OCRWord(NamedTuple):
+    """One recognized word with its confidence (0-100) and bounding box"""
+    text: str
+    confidence: float
+    left: int
+    top: int
+    width: int
+    height: int
+    block: int
+    paragraph: int
+    line: int
+
+
+@dataclass
+class OCRResult:
+    """Text, mean word confidence (0-1) and word layout of one recognition run"""
+    text: str = ""
+    confidence: float = 0.0
+    words: List[OCRWord] = field(default_factory=list)
+    rotation: int = 0  # Degrees the image was rotated before recognition
+
+
+def _number(value, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def parse_ocr_data(data: Dict[str, Sequence]) -> OCRResult:
+    """
+    Build text, confidence and layout from Tesseract's data output
+
+    Words are joined with spaces, lines with newlines and paragraphs/blocks
+    with a blank line, matching Tesseract's own text renderer.
+
+    Args:
+        data: Column dict as returned by image_to_data(output_type=DICT)
+            or by parse_tsv()
+
+    Returns:
+        OCRResult (confidence is the mean over words with confidence > 0)
+    """
+    words: List[OCRWord] = []
+    texts = data.get('text', [])
+    levels = data.get('level', [WORD_LEVEL] * len(texts))
+
+    for i, raw_text in enumerate(texts):
+        text = (raw_text or '').strip()
+        if not text or int(_number(levels[i], WORD_LEVEL)) != WORD_LEVEL:
+            continue
+        words.append(OCRWord(
+            text=text,
+            confidence=_number(data['conf'][i], -1.0),
+            left=int(_number(data['left'][i])),
+            top=int(_number(data['top'][i])),
+            width=int(_number(data['width'][i])),
+            height=int(_number(data['height'][i])),
+            block=int(_number(data['block_num'][i])),
+            paragraph=int(_number(data['par_num'][i])),
+            line=int(_number(data['line_num'][i])),
+        ))
+
+    paragraphs: List[List[List[str]]] = []
+    last_paragraph = last_line = None
+    for word in words:
+        paragraph_key = (word.block, word.paragraph)
+        if paragraph_key != last_paragraph:
+            paragraphs.append([[]])
+            last_paragraph, last_line = paragraph_key, word.line
+        elif word.line != last_line:
+            paragraphs[-1].append([])
+            last_line = word.line
+        paragraphs[-1][-1].append(word.text)
+
+    text = '\n\n'.join(
+        '\n'.join(' '.join(line) for line in lines)
+        for lines in paragraphs
+    )
+
+    confidences = [word.confidence for word in words if word.confidence > 0]
+    confidence = sum(confidences) / len(confidences) / 100.0 if confidences else 0.0
+
+    return OCRResult(text=text, confidence=confidence, words=words)
+
+
+def parse_tsv(tsv: str, header: Optional[Sequence[str]] = None) -> Dict[str, List[str]]:
+    """
+    Split Tesseract TSV output into a column dict (same shape as image_to_data DICT)
+
+    Args:
+        tsv: TSV text
+        header: Column names if ``tsv`` has no header row (e.g. TSV_COLUMNS)
+
+    Returns:
+        Column name -> list of cell strings
+    """
+    lines = tsv.splitlines()
+    if header is None:
+        if not lines:
+            return {}
+        header, lines = lines[0].split('\t'), lines[1:]
+    columns: Dict[str, List[str]] = {name: [] for name in header}
+    for line in lines:
+        if not line:
+            continue
+        cells = line.split('\t')
+        if len(cells) < len(header):
+            cells += [''] * (len(header) - len(cells))
+        for name, cell in zip(header, cells):
+            columns[name].append(cell)
+    return columns
+
+
+def looks_rotated(words: Sequence[OCRWord], min_words: int = 5) -> bool:
+    """
+    Whether the recognized layout suggests the page is rotated by 90/270 degrees
+
+    On a sideways page Tesseract still finds some "words", but their boxes are
+    taller than wide; upright multi-letter words are almost always wider.
+    """
+    candidates = [w for w in words if len(w.text) >= 3 and w.width > 0 and w.height > 0]
+    if len(candidates) < min_words:
+        return False
+    vertical = sum(1 for w in candidates if w.height > w.width)
+    return vertical / len(candidates) > 0.5
+
+
+def needs_orientation_check(result: OCRResult, min_confidence: float, min_words: int) -> bool:
+    """
+    Whether orientation detection (OSD) is worth running for a page
+
+    OSD is an extra recognition pass; it only pays off when the first pass
+    looks wrong: low confidence, almost no words, or vertical word boxes.
+    """
+    if len(result.words) < min_words:
+        return True
+    if result.confidence < min_confidence:
+        return True
+    return looks_rotated(result.words)
+
+
+# Preprocessing chains, cheapest first
+CHAIN_NONE = 'none'            # Tesseract's own binarization only
+CHAIN_BILATERAL = 'bilateral'  # Edge-preserving smoothing + adaptive threshold
+CHAIN_NLMEANS = 'nlmeans'      # Non-local means denoising + adaptive threshold
+CHAINS = (CHAIN_NONE, CHAIN_BILATERAL, CHAIN_NLMEANS)
+
+
+class PreprocessPlan(NamedTuple):
+    """Render resolution and preprocessing chain chosen for one page"""
+    dpi: int
+    chain: str
+    reason: str
+
+
+def choose_preprocessing(
+    noise: float,
+    contrast: float,
+    clean_noise: float,
+    heavy_noise: float,
+    min_contrast: float,
+    clean_dpi: int,
+    dpi: int,
+    source_dpi: Optional[float] = None,
+    min_source_dpi: float = 200.0
+) -> PreprocessPlan:
+    """
+    Pick the cheapest preprocessing that a page's measured quality allows
+
+    Args:
+        noise: Estimated noise sigma (grey levels) on the downsampled page
+        contrast: Spread between dark and light pixels (0-1)
+        clean_noise: Below this a page counts as clean
+        heavy_noise: From this on only NL-means denoising helps
+        min_contrast: Below this the page needs local thresholding
+        clean_dpi: Render resolution for clean pages
+        dpi: Render resolution for pages that need preprocessing
+        source_dpi: Resolution of an embedded scan, if known
+        min_source_dpi: Scans below this always get at least the fast chain
+
+    Returns:
+        PreprocessPlan
+    """
+    if noise >= heavy_noise:
+        return PreprocessPlan(dpi, CHAIN_NLMEANS, f"heavy noise ({noise:.1f})")
+    if noise >= clean_noise:
+        return PreprocessPlan(dpi, CHAIN_BILATERAL, f"moderate noise ({noise:.1f})")
+    if contrast < min_contrast:
+        return PreprocessPlan(dpi, CHAIN_BILATERAL, f"low contrast ({contrast:.2f})")
+    if source_dpi is not None and source_dpi < min_source_dpi:
+        return PreprocessPlan(dpi, CHAIN_BILATERAL, f"low resolution scan ({source_dpi:.0f} DPI)")
+    return PreprocessPlan(clean_dpi, CHAIN_NONE, f"clean (noise {noise:.1f}, contrast {contrast:.2f})")
+
+
+class PageKind(NamedTuple):
+    """Structure-based verdict for one PDF page"""
+    is_scanned: bool
+    confidence: float
+    reason: str
+
+
+def classify_page_structure(font_count: int, text_block_count: int, text_length: int, image_count: int) -> PageKind:
+    """
+    Decide from a page's structure whether it is scanned or has native text
+
+    Language-agnostic: only counts fonts, non-empty text blocks, characters
+    of embedded text and images.
+    """
+    # Definitely NATIVE text page
+    if font_count > 0 and text_block_count > 3:
+        return PageKind(False, 1.0, f"{font_count} fonts, {text_block_count} text blocks")
+    # Substantial text present = likely native
+    if text_length >= 200:
+        return PageKind(False, 0.9, f"substantial text ({text_length} chars)")
+    # Definitely SCANNED (no fonts, no text, but has images)
+    if font_count == 0 and text_block_count == 0 and image_count > 0:
+        return PageKind(True, 1.0, f"no fonts, no text blocks, {image_count} images")
+    # Very little text = likely scanned
+    if text_length < 50:
+        return PageKind(True, 0.8, f"only {text_length} chars of text")
+    # Ambiguous (some text but no fonts) = decide on text amount
+    if text_length >= 100:
+        return PageKind(False, 0.7, f"moderate text ({text_length} chars)")
+    return PageKind(True, 0.6, f"little text ({text_length} chars)")
+
+
+_LETTER_PATTERN = re.compile(r'[a-zA-ZäöüßÄÖÜа-яА-Я]')
+_DIGIT_PATTERN = re.compile(r'\d')
+_SPACE_PATTERN = re.compile(r'\s')
+_PUNCTUATION_PATTERN = re.compile(r'[.,!?;:()\-"]')
+_QUALITY_WORD_PATTERN = re.compile(r'\b[a-zA-ZäöüßÄÖÜà-яА-ЯáâãçéèêëíìîïñóòôõúùûüğışţÀÁÂÃÇÉÈÊËÍÌÎÏÑÓÒÔÕÚÙÛÜĞİŞŢ]{3,}\b')
+
+# Words of a text that are spell-checked
+SPELLING_SAMPLE_SIZE = 100
+
+
+def prescreen_text_quality(text: str) -> Tuple[Optional[float], Dict[str, float], Set[str]]:
+    """
+    Character-level checks that run before spell checking
+
+    Returns:
+        Tuple of (final quality score or None, metrics, words to spell-check).
+        The score is set when the text is too short, mostly invalid characters
+        or has too few words; otherwise the words sample decides.
+    """
+    if not text or len(text.strip()) < 10:
+        return 0.0, {"reason": "text_too_short"}, set()
+
+    metrics = {}
+
+    # Basic character validation (fast check)
+    total_chars = len(text)
+    valid_chars = (
+        len(_LETTER_PATTERN.findall(text)) + len(_DIGIT_PATTERN.findall(text))
+        + len(_SPACE_PATTERN.findall(text)) + len(_PUNCTUATION_PATTERN.findall(text))
+    )
+    valid_ratio = valid_chars / total_chars if total_chars > 0 else 0
+    metrics['valid_char_ratio'] = valid_ratio
+
+    # If too many invalid characters, fail fast
+    if valid_ratio < 0.7:
+        metrics['quality_score'] = valid_ratio * 0.5
+        return metrics['quality_score'], metrics, set()
+
+    # Words for spell checking (min 3 chars)
+    words = _QUALITY_WORD_PATTERN.findall(text.lower())
+    if len(words) < 5:
+        metrics['quality_score'] = 0.5
+        metrics['reason'] = 'too_few_words'
+        return 0.5, metrics, set()
+
+    return None, metrics, set(words[:SPELLING_SAMPLE_SIZE])
+
+
+def spelling_score(error_rate: float) -> float:
+    """
+    Map a spelling error rate to a score
+
+    < 15% errors = excellent (0.95-1.0), 15-30% = good (0.7-0.95),
+    30-50% = poor (0.5-0.7), > 50% = garbage (0.0-0.5)
+    """
+    if error_rate < 0.15:
+        return 1.0 - (error_rate * 0.33)
+    if error_rate < 0.30:
+        return 0.95 - ((error_rate - 0.15) * 1.67)
+    if error_rate < 0.50:
+        return 0.7 - ((error_rate - 0.30) * 1.0)
+    return max(0.0, 0.5 - (error_rate - 0.5))
+
+
+def finish_text_quality(metrics: Dict[str, float], sample: Set[str], misspelled: Set[str]) -> float:
+    """
+    Complete a prescreened text's metrics with its spell-check result
+
+    Args:
+        metrics: Metrics from prescreen_text_quality (updated in place)
+        sample: The text's words that were spell-checked
+        misspelled: Misspelled words (may include words of other texts)
+
+    Returns:
+        Quality score, 1.0 = perfect, 0.0 = garbage
+    """
+    misspelled_count = len(sample & misspelled)
+    error_rate = misspelled_count / len(sample) if sample else 1.0
+    metrics['spelling_error_rate'] = error_rate
+    metrics['total_words_checked'] = len(sample)
+    metrics['misspelled_words'] = misspelled_count
+    metrics['spelling_score'] = spelling_score(error_rate)
+
+    # Weighted combination: spelling accuracy matters most
+    metrics['quality_score'] = metrics['valid_char_ratio'] * 0.2 + metrics['spelling_score'] * 0.8
+    return metrics['quality_score']
@@ -0,0 +1,265 @@
+# backend/app/utils/pdf_document.py
+"""
+Parse-once handle for an uploaded PDF
+
+Validation, page counting and text extraction used to open the same upload
+separately (PyMuPDF three to four times, PyPDF2 once more). A PDFDocument is
+created once per upload and passed along; the PyMuPDF document is opened on
+first use and page text, fonts, images and structural risk flags are cached.
+
+Uploads that cross a process boundary (the analysis process pool) are
+spooled to a temporary file: the receiving process re-opens the handle from
+the path and memory-maps the bytes instead of unpickling a copy.
+
+Not thread-safe: MuPDF documents must be used from one thread at a time.
+"""
+
+import logging
+import mmap
+import os
+import re
+import tempfile
+from typing import Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+_REF_PATTERN = re.compile(r'(\d+) 0 R')
+
+RISK_FLAGS = ('javascript', 'embedded_files', 'launch_action', 'suspicious_uri')
+
+
+class PDFOpenError(Exception):
+    """The PDF can't be opened or inspected (corrupted, not a PDF, encrypted)"""
+
+
+class PDFDocument:
+    """
+    Lazily populated, shared view of one PDF
+
+    Create with from_bytes() for in-memory content, spool() to hand the upload
+    to another process, or open() to attach to a spooled file.
+    """
+
+    def __init__(self, data: Optional[Union[bytes, mmap.mmap]] = None, path: Optional[str] = None, owns_path: bool = False):
+        self._data = data
+        self.path = path
+        self._owns_path = owns_path
+        self._file = None
+        self._doc = None
+        self._open_error: Optional[str] = None
+        self._page_text: Dict[int, str] = {}
+        self._page_blocks: Dict[int, list] = {}
+        self._page_fonts: Dict[int, list] = {}
+        self._page_images: Dict[int, list] = {}
+        self._page = None  # (number, fitz.Page) of the last loaded page
+        self._risk_flags: Optional[Dict[str, bool]] = None
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'PDFDocument':
+        """Handle over in-memory PDF bytes (no copy)"""
+        return cls(data=data)
+
+    @classmethod
+    def open(cls, path: str, owns_path: bool = False) -> 'PDFDocument':
+        """
+        Handle over a PDF file on disk; its bytes are memory-mapped, not read
+
+        Args:
+            path: PDF file path
+            owns_path: Delete the file when the handle is closed
+        """
+        handle = cls(path=path, owns_path=owns_path)
+        handle._file = open(path, 'rb')
+        size = os.fstat(handle._file.fileno()).st_size
+        handle._data = mmap.mmap(handle._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        return handle
+
+    @classmethod
+    def spool(cls, data: bytes) -> 'PDFDocument':
+        """Write upload bytes to a temporary file once and open a handle over it"""
+        fd, path = tempfile.mkstemp(prefix='bonifatus_upload_', suffix='.pdf')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+        except Exception:
+            os.unlink(path)
+            raise
+        return cls.open(path, owns_path=True)
+
+    def __enter__(self) -> 'PDFDocument':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def buffer(self) -> Union[bytes, mmap.mmap]:
+        """The PDF bytes (memory-mapped for spooled handles; supports len, slicing, hashing)"""
+        return self._data if self._data is not None else b''
+
+    @property
+    def size(self) -> int:
+        return len(self.buffer)
+
+    @property
+    def doc(self):
+        """
+        The PyMuPDF document, opened on first access
+
+        Raises:
+            PDFOpenError: The content is not a readable PDF
+        """
+        if self._doc is None:
+            if self._open_error is not None:
+                raise PDFOpenError(self._open_error)
+            try:
+                import fitz  # PyMuPDF
+
+                if self.path:
+                    self._doc = fitz.open(self.path, filetype="pdf")
+                else:
+                    self._doc = fitz.open(stream=self._data, filetype="pdf")
+            except Exception as e:
+                self._open_error = str(e) or type(e).__name__
+                raise PDFOpenError(self._open_error) from e
+        return self._doc
+
+    @property
+    def open_error(self) -> Optional[str]:
+        """Why the PDF can't be opened, or None if it can"""
+        try:
+            self.doc
+        except PDFOpenError as e:
+            return str(e)
+        return None
+
+    @property
+    def page_count(self) -> int:
+        """Number of pages (1 as a conservative estimate if the PDF can't be opened)"""
+        try:
+            return len(self.doc)
+        except PDFOpenError as e:
+            logger.error(f"Failed to count PDF pages: {e}")
+            return 1
+
+    def load_page(self, number: int):
+        """fitz.Page for a page number (the last loaded page is kept)"""
+        if self._page is None or self._page[0] != number:
+            self._page = (number, self.doc.load_page(number))
+        return self._page[1]
+
+    def page_text(self, number: int) -> str:
+        """Embedded text of a page"""
+        if number not in self._page_text:
+            self._page_text[number] = self.load_page(number).get_text()
+        return self._page_text[number]
+
+    def page_blocks(self, number: int) -> list:
+        """Text blocks of a page, as returned by get_text("blocks")"""
+        if number not in self._page_blocks:
+            self._page_blocks[number] = self.load_page(number).get_text("blocks")
+        return self._page_blocks[number]
+
+    def page_fonts(self, number: int) -> list:
+        """Fonts referenced by a page"""
+        if number not in self._page_fonts:
+            self._page_fonts[number] = self.doc.get_page_fonts(number)
+        return self._page_fonts[number]
+
+    def page_images(self, number: int) -> list:
+        """Images referenced by a page"""
+        if number not in self._page_images:
+            self._page_images[number] = self.doc.get_page_images(number)
+        return self._page_images[number]
+
+    def extract_image(self, xref: int) -> Dict:
+        """Embedded image bytes and metadata"""
+        return self.doc.extract_image(xref)
+
+    def _object_sources(self, value_type: str, value: str) -> List[str]:
+        """Source of a dictionary value plus the objects it references (one level)"""
+        doc = self.doc
+        sources = [value]
+        if value_type == 'xref':
+            value = doc.xref_object(int(value.split()[0]), compressed=True)
+            sources.append(value)
+        for ref in _REF_PATTERN.findall(value):
+            try:
+                sources.append(doc.xref_object(int(ref), compressed=True))
+            except Exception:
+                pass
+        return sources
+
+    def risk_flags(self) -> Dict[str, bool]:
+        """
+        Structural features used as exploit vectors
+
+        Inspects page objects and their annotations (JavaScript, command
+        URIs), the catalog's name tree (embedded files) and its open/
+        additional actions (launch actions). Object sources are compared as
+        text; no content streams are decoded.
+
+        Returns:
+            Flag name (see RISK_FLAGS) -> present
+
+        Raises:
+            PDFOpenError: The PDF can't be opened or is encrypted
+        """
+        if self._risk_flags is not None:
+            return self._risk_flags
+
+        doc = self.doc
+        if doc.needs_pass:
+            raise PDFOpenError("PDF is encrypted")
+
+        flags = dict.fromkeys(RISK_FLAGS, False)
+
+        for number in range(len(doc)):
+            try:
+                page_xref = doc.page_xref(number)
+                sources = [doc.xref_object(page_xref, compressed=True)]
+                sources += self._object_sources(*doc.xref_get_key(page_xref, 'Annots'))[1:]
+                page_source = '\n'.join(sources)
+            except Exception as e:
+                logger.debug(f"Error inspecting page {number} structure: {e}")
+                continue
+
+            if '/JS' in page_source or '/JavaScript' in page_source:
+                flags['javascript'] = True
+            if '/URI' in page_source and ('cmd.exe' in page_source or 'powershell' in page_source):
+                flags['suspicious_uri'] = True
+            if flags['javascript'] and flags['suspicious_uri']:
+                break
+
+        catalog = doc.pdf_catalog()
+        if catalog > 0:
+            flags['embedded_files'] = doc.xref_get_key(catalog, 'Names/EmbeddedFiles')[0] != 'null'
+            for key in ('OpenAction', 'AA'):
+                value_type, value = doc.xref_get_key(catalog, key)
+                if value_type != 'null' and any('/Launch' in s for s in self._object_sources(value_type, value)):
+                    flags['launch_action'] = True
+
+        self._risk_flags = flags
+        return flags
+
+    def close(self):
+        """Close the document and the mapping; delete the spool file if this handle owns it"""
+        self._page = None
+        if self._doc is not None:
+            try:
+                self._doc.close()
+            except Exception:
+                pass
+            self._doc = None
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._owns_path and self.path:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self._owns_path = False
@@ -3,9 +3,9 @@
 PDF utility functions for document processing
 """
 
-import io
 import logging
-from typing import Optional
+
+from app.utils.pdf_document import PDFDocument
 
 logger = logging.getLogger(__name__)
 
@@ -18,28 +18,14 @@ def count_pdf_pages(file_content: bytes) -> int:
         file_content: Raw PDF file bytes
 
     Returns:
-        Number of pages in the PDF
-
-    Raises:
-        Exception: If PDF cannot be opened or is invalid
+        Number of pages in the PDF (1 if it cannot be opened)
     """
-    try:
-        import fitz  # PyMuPDF
-
-        # Open PDF from bytes
-        pdf_stream = io.BytesIO(file_content)
-        doc = fitz.open(stream=pdf_stream, filetype="pdf")
-
-        page_count = len(doc)
-        doc.close()
-
-        logger.debug(f"PDF has {page_count} pages")
-        return page_count
+    # Callers that go on to validate or extract text should keep a PDFDocument instead
+    with PDFDocument.from_bytes(file_content) as document:
+        page_count = document.page_count
 
-    except Exception as e:
-        logger.error(f"Failed to count PDF pages: {e}")
-        # If we can't count pages, return 1 as conservative estimate
-        return 1
+    logger.debug("PDF has %s pages", page_count)
+    return page_count
 
 
 def estimate_pages_from_size(file_size_bytes: int, mime_type: str) -> int:
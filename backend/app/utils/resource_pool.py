@@ -0,0 +1,159 @@
+# backend/app/utils/resource_pool.py
+"""
+Bounded, keyed pool of expensive-to-create resources
+
+Resources (e.g. initialized OCR engines) are kept per key (e.g. language
+combination) and reused. The pool caps the total number of resources and
+the number per key; when it is full, the least recently used idle resource
+of another key is closed to make room.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Generic, Hashable, Iterator, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class PoolTimeout(Exception):
+    """No resource became available within the timeout"""
+
+
+class KeyedPool(Generic[T]):
+    """
+    Thread-safe LRU pool of resources grouped by key
+
+    Args:
+        factory: Creates a resource for a key (called without the pool lock held)
+        max_size: Max resources alive across all keys
+        max_per_key: Max resources alive for one key (concurrent users of that key)
+        close: Releases a resource's native memory when it is evicted or discarded
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[Hashable], T],
+        max_size: int,
+        max_per_key: int = 1,
+        close: Optional[Callable[[T], None]] = None
+    ):
+        self._factory = factory
+        self._close = close or (lambda resource: None)
+        self.max_size = max(1, max_size)
+        self.max_per_key = max(1, min(max_per_key, self.max_size))
+
+        self._cond = threading.Condition()
+        # key -> idle resources; key order is least -> most recently used
+        self._idle: "OrderedDict[Hashable, List[T]]" = OrderedDict()
+        self._alive: Dict[Hashable, int] = {}
+        self._total = 0
+        self._stats = {'hits': 0, 'created': 0, 'evicted': 0, 'discarded': 0, 'waits': 0}
+
+    def _evict_lru(self, keep: Hashable) -> bool:
+        """Close the least recently used idle resource of another key (lock held)"""
+        for key, resources in self._idle.items():
+            if key == keep or not resources:
+                continue
+            resource = resources.pop(0)
+            if not resources:
+                del self._idle[key]
+            self._release_slot(key)
+            self._stats['evicted'] += 1
+            self._close(resource)
+            return True
+        return False
+
+    def _release_slot(self, key: Hashable):
+        self._total -= 1
+        self._alive[key] -= 1
+        if not self._alive[key]:
+            del self._alive[key]
+
+    def _checkout(self, key: Hashable, timeout: Optional[float]):
+        """Take an idle resource or reserve a slot for a new one (returns (resource, created))"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                idle = self._idle.get(key)
+                if idle:
+                    resource = idle.pop()
+                    if not idle:
+                        del self._idle[key]
+                    self._stats['hits'] += 1
+                    return resource, False
+
+                if self._alive.get(key, 0) < self.max_per_key:
+                    if self._total < self.max_size or self._evict_lru(keep=key):
+                        self._total += 1
+                        self._alive[key] = self._alive.get(key, 0) + 1
+                        return None, True
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise PoolTimeout(f"No pooled resource for {key!r} within {timeout}s")
+                self._stats['waits'] += 1
+                self._cond.wait(remaining)
+
+    def _checkin(self, key: Hashable, resource: T):
+        with self._cond:
+            self._idle.setdefault(key, []).append(resource)
+            self._idle.move_to_end(key)
+            self._cond.notify_all()
+
+    def _discard(self, key: Hashable, resource: Optional[T]):
+        with self._cond:
+            self._release_slot(key)
+            self._stats['discarded'] += 1
+            self._cond.notify_all()
+        if resource is not None:
+            self._close(resource)
+
+    @contextmanager
+    def acquire(self, key: Hashable, timeout: Optional[float] = None) -> Iterator[T]:
+        """
+        Borrow a resource for a key, creating it if needed
+
+        A resource whose user raised is closed rather than returned, since its
+        state is unknown.
+
+        Raises:
+            PoolTimeout: All slots stayed busy for ``timeout`` seconds
+        """
+        resource, create = self._checkout(key, timeout)
+        if create:
+            try:
+                resource = self._factory(key)
+            except BaseException:
+                self._discard(key, None)
+                raise
+            with self._cond:
+                self._stats['created'] += 1
+
+        try:
+            yield resource
+        except BaseException:
+            self._discard(key, resource)
+            raise
+        self._checkin(key, resource)
+
+    def close_all(self):
+        """Close all idle resources (call on shutdown, once nothing is borrowed)"""
+        with self._cond:
+            idle = [(key, r) for key, resources in self._idle.items() for r in resources]
+            self._idle.clear()
+            for key, _ in idle:
+                self._release_slot(key)
+        for _, resource in idle:
+            self._close(resource)
+
+    def get_stats(self) -> Dict[str, object]:
+        """Pool counters and resources alive per key"""
+        with self._cond:
+            return {
+                **self._stats,
+                'alive': self._total,
+                'idle': sum(len(r) for r in self._idle.values()),
+                'keys': dict(self._alive),
+            }
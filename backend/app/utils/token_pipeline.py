@@ -0,0 +1,168 @@
+# backend/app/utils/token_pipeline.py
+"""
+Single-pass tokenization for keyword and phrase extraction.
+
+The text is cleaned and lowercased once, then scanned with one compiled
+regex. Each token is checked against the stop word, preserve and exclude
+sets as it is found and counted at once, so filtered unigrams and n-grams
+come out of the same pass and no token list is built. Counts are stored in
+an array indexed by interned term ids; that keeps the vocabulary of large
+documents compact.
+"""
+
+import heapq
+import re
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import AbstractSet, Dict, Hashable, Iterator, List, Optional, Set, Tuple
+
+# Same character handling as KeywordExtractionService.cleanse_text / tokenize
+CONTROL_CHARS = re.compile(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f-\x9f]')
+TOKEN_PATTERN = re.compile(r'\b[a-zа-яäöüßàáâãçéèêëíìîïñóòôõúùûüğışţ]{3,}\b', re.IGNORECASE)
+REPEATED_CHARS = re.compile(r'(.)\1{2,}')
+
+EMPTY: AbstractSet[str] = frozenset()
+
+
+class TermCounts:
+    """
+    Term frequencies kept in an array indexed by interned term ids
+
+    A drop-in for the parts of Counter the extraction uses: counting an
+    occurrence is one dict lookup plus one array increment, and counts
+    take four bytes each instead of a Python int per term.
+    """
+
+    __slots__ = ('_ids', '_terms', '_counts', '_distinct', 'total')
+
+    def __init__(self):
+        self._ids: Dict[Hashable, int] = {}
+        self._terms: List[Hashable] = []
+        self._counts = array('L')
+        self._distinct = 0
+        self.total = 0
+
+    def add(self, term: Hashable):
+        """Count one occurrence of term"""
+        term_id = self._ids.get(term)
+        if term_id is None:
+            self._ids[term] = len(self._terms)
+            self._terms.append(term)
+            self._counts.append(1)
+            self._distinct += 1
+        else:
+            if not self._counts[term_id]:
+                self._distinct += 1
+            self._counts[term_id] += 1
+        self.total += 1
+
+    def discard(self, term: Hashable):
+        """Drop all occurrences of term"""
+        term_id = self._ids.get(term)
+        if term_id is not None and self._counts[term_id]:
+            self.total -= self._counts[term_id]
+            self._counts[term_id] = 0
+            self._distinct -= 1
+
+    def __getitem__(self, term: Hashable) -> int:
+        term_id = self._ids.get(term)
+        return self._counts[term_id] if term_id is not None else 0
+
+    def __contains__(self, term: Hashable) -> bool:
+        return self[term] > 0
+
+    def __len__(self) -> int:
+        return self._distinct
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return (term for term, count in zip(self._terms, self._counts) if count)
+
+    def items(self) -> Iterator[Tuple[Hashable, int]]:
+        """(term, count) pairs in first-seen order"""
+        return ((term, count) for term, count in zip(self._terms, self._counts) if count)
+
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[Hashable, int]]:
+        """Most frequent terms, ties in first-seen order (like Counter.most_common)"""
+        if n is None:
+            return sorted(self.items(), key=itemgetter(1), reverse=True)
+        return heapq.nlargest(n, self.items(), key=itemgetter(1))
+
+
+@dataclass
+class TokenScan:
+    """Result of one pass over a text"""
+    unigrams: TermCounts
+    ngrams: Optional[TermCounts] = None
+    tokens_seen: int = 0
+    stopword_hits: int = 0
+    excluded_hits: int = 0
+    preserved: Set[str] = field(default_factory=set)
+
+
+def scan_tokens(
+    text: str,
+    stop_words: AbstractSet[str] = EMPTY,
+    preserve: AbstractSet[str] = EMPTY,
+    exclude: AbstractSet[str] = EMPTY,
+    ngram_size: int = 0,
+    ngram_max_length: int = 30
+) -> TokenScan:
+    """
+    Tokenize a text and count filtered unigrams and n-grams in one pass
+
+    Unigrams: stop words are dropped unless they are in preserve (category
+    keywords); then tokens in exclude (entity values) are dropped.
+
+    N-grams: built from consecutive tokens that are no stop words, at most
+    ngram_max_length long and free of OCR noise like 'aaa' (as in
+    KeywordExtractionService.filter_tokens); other tokens are skipped, not
+    treated as breaks.
+
+    Args:
+        text: Raw text
+        stop_words: Lowercase stop words
+        preserve: Lowercase terms kept even if they are stop words
+        exclude: Lowercase terms never counted as unigrams
+        ngram_size: Words per n-gram; 0 counts no n-grams
+        ngram_max_length: Longest token used in n-grams
+
+    Returns:
+        TokenScan with unigram counts and, if requested, n-gram counts
+        (n-grams are space-joined strings)
+    """
+    unigrams = TermCounts()
+    ngrams = TermCounts() if ngram_size > 0 else None
+    window = deque(maxlen=ngram_size) if ngrams is not None else None
+    scan = TokenScan(unigrams=unigrams, ngrams=ngrams)
+
+    tokens_seen = stopword_hits = excluded_hits = 0
+    for match in TOKEN_PATTERN.finditer(CONTROL_CHARS.sub('', text).lower()):
+        token = match.group()
+        tokens_seen += 1
+        is_stop_word = token in stop_words
+
+        if token in preserve:
+            scan.preserved.add(token)
+            keep = True
+        else:
+            keep = not is_stop_word
+            stopword_hits += is_stop_word
+
+        if keep:
+            if token in exclude:
+                excluded_hits += 1
+            else:
+                unigrams.add(token)
+
+        if window is not None and not is_stop_word and len(token) <= ngram_max_length \
+                and not REPEATED_CHARS.search(token):
+            window.append(token)
+            if len(window) == ngram_size:
+                ngrams.add(' '.join(window))
+
+    scan.tokens_seen = tokens_seen
+    scan.stopword_hits = stopword_hits
+    scan.excluded_hits = excluded_hits
+    return scan
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark bulk campaign delivery against the local mock Brevo provider.
+
+Renders and "sends" a synthetic campaign through EmailDeliveryService using
+MockBrevoTransport, so no email leaves the machine and no database is needed.
+
+Usage:
+    python scripts/benchmark_campaign_delivery.py --recipients 50000 --latency-ms 80
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.services.email_delivery_service import (
+    EmailDeliveryService, MockBrevoTransport, OutboundEmail
+)
+
+
+async def run_benchmark(recipients: int, latency_ms: float, failure_rate: float,
+                        batch_size: int, concurrency: int, rate: float):
+    """Send a synthetic campaign through the mock transport and report throughput"""
+    transport = MockBrevoTransport(latency_ms=latency_ms, failure_rate=failure_rate)
+    service = EmailDeliveryService(transport=transport)
+    service.batch_size = batch_size
+    service.max_concurrency = concurrency
+    service.rate_per_second = rate
+
+    body = "<p>Hello {name}, your {tier} plan has new features.</p>" * 20
+    messages = [
+        OutboundEmail(
+            to_email=f"user{i}@example.com",
+            to_name=f"User {i}",
+            subject=f"News for User {i}",
+            html_content=body.format(name=f"User {i}", tier="Free"),
+            reference=i
+        )
+        for i in range(recipients)
+    ]
+
+    started = time.perf_counter()
+    results = await service.send_bulk(messages, from_email="info@bonidoc.com", from_name="BoniDoc")
+    elapsed = time.perf_counter() - started
+    await service.aclose()
+
+    succeeded = sum(1 for r in results if r.success)
+    print(f"Recipients:        {recipients}")
+    print(f"Batch size:        {batch_size} versions/request")
+    print(f"Concurrency:       {concurrency} requests")
+    print(f"Rate limit:        {rate} requests/s")
+    print(f"Mock latency:      {latency_ms} ms")
+    print("-" * 40)
+    print(f"API requests:      {transport.requests}")
+    print(f"Delivered:         {succeeded}")
+    print(f"Failed:            {len(results) - succeeded}")
+    print(f"Elapsed:           {elapsed:.2f} s")
+    print(f"Throughput:        {recipients / elapsed:,.0f} messages/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--recipients', type=int, default=50000)
+    parser.add_argument('--latency-ms', type=float, default=80.0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=10.0, help='Requests per second')
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(
+        args.recipients, args.latency_ms, args.failure_rate,
+        args.batch_size, args.concurrency, args.rate
+    ))
+
+
+if __name__ == '__main__':
+    main()
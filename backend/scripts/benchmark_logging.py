@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-document logging overhead of the analysis hot path.
+
+Replays the log calls one document analysis makes (keyword extraction,
+date extraction, classification over every category) in three setups:
+
+  before   INFO f-strings through a synchronous file handler (old behaviour)
+  after    %-style DEBUG traces, root at INFO, queue handler (new default)
+  debug    same as after but with DEBUG enabled for the analysis modules,
+           so traces are sampled and written by the listener thread
+
+Records go to a temporary file, so the numbers include real I/O.
+
+Usage:
+    python scripts/benchmark_logging.py --documents 500 --categories 30
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.utils.log_utils import SamplingFilter, start_queue_logging
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+logger = logging.getLogger('app.services.classification_service')
+
+
+def analyze_before(keywords, categories, dates):
+    """Log calls of one document as the hot path made them before"""
+    logger.info(f"[KEYWORD EXTRACTION] Tokenized {len(keywords) * 5} total tokens from text")
+    logger.info(f"[KEYWORD EXTRACTION] Filtered out {len(keywords)} stop words: {keywords[:20]}")
+    for parsed, context in dates:
+        logger.info(f"[DATE DEBUG] Found date: {parsed} | Type: invoice_date | Context: '...{context}...'")
+    logger.info(f"[CLASSIFICATION DEBUG] Document keywords ({len(keywords)}): {keywords[:10]}{'...' if len(keywords) > 10 else ''}")
+    for name, category_keywords in categories:
+        logger.info(f"[CLASSIFICATION DEBUG] Processing category {name}, is_multi_lingual=True, requested_language=de")
+        logger.info(f"[CLASSIFICATION DEBUG] Category {name} keywords ({len(category_keywords)}): {list(category_keywords.keys())[:10]}{'...' if len(category_keywords) > 10 else ''}")
+        logger.info(f"[CLASSIFICATION DEBUG] Category {name}: score={0.123:.3f}, matched={3}/{len(keywords)}, matched_kw={keywords[:5]}")
+    logger.info(f"[CLASSIFICATION DEBUG] Selected {1} categories: {[categories[0][0]]}")
+
+
+def analyze_after(keywords, categories, dates):
+    """Log calls of one document as the hot path makes them now"""
+    logger.debug("[KEYWORD EXTRACTION] Tokenized %s total tokens from text", len(keywords) * 5)
+    logger.debug("[KEYWORD EXTRACTION] Filtered out %s stop words: %s", len(keywords), keywords[:20])
+    for parsed, context in dates:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[DATE DEBUG] Found date: %s | Type: invoice_date | Context: '...%s...'", parsed, context)
+    logger.debug("[CLASSIFICATION DEBUG] Document keywords (%s): %s%s", len(keywords), keywords[:10], '...' if len(keywords) > 10 else '')
+    for name, category_keywords in categories:
+        logger.debug("[CLASSIFICATION DEBUG] Processing category %s, is_multi_lingual=%s, requested_language=%s", name, True, 'de')
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[CLASSIFICATION DEBUG] Category %s keywords (%s): %s%s", name, len(category_keywords), list(category_keywords.keys())[:10], '...' if len(category_keywords) > 10 else '')
+        logger.debug("[CLASSIFICATION DEBUG] Category %s: score=%.3f, matched=%s/%s, matched_kw=%s", name, 0.123, 3, len(keywords), keywords[:5])
+    logger.debug("[CLASSIFICATION DEBUG] Selected %s categories: %s", 1, [categories[0][0]])
+
+
+def run(label, analyze, documents, workload, setup):
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    with tempfile.NamedTemporaryFile('w', suffix='.log', delete=False) as f:
+        path = f.name
+    file_handler = logging.FileHandler(path)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root.addHandler(file_handler)
+
+    listener = setup(root, file_handler)
+    started = time.perf_counter()
+    for _ in range(documents):
+        analyze(*workload)
+    elapsed = time.perf_counter() - started
+    if listener:
+        listener.stop()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    file_handler.close()
+
+    size = os.path.getsize(path)
+    os.unlink(path)
+    print(f"{label:<8} {elapsed / documents * 1e6:>10.1f} us/doc {size / documents / 1024:>10.1f} KB/doc")
+
+
+def setup_before(root, file_handler):
+    root.setLevel(logging.INFO)
+    logger.setLevel(logging.NOTSET)
+    return None
+
+
+def setup_after(root, file_handler, debug=False):
+    root.setLevel(logging.INFO)
+    logger.setLevel(logging.DEBUG if debug else logging.NOTSET)
+    queue_handler, listener = start_queue_logging([file_handler])
+    queue_handler.addFilter(SamplingFilter())
+    return listener
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--documents', type=int, default=500)
+    parser.add_argument('--categories', type=int, default=30)
+    parser.add_argument('--keywords', type=int, default=200, help='Keywords per document and per category')
+    parser.add_argument('--dates', type=int, default=10, help='Date matches per document')
+    args = parser.parse_args()
+
+    keywords = [f"keyword{i}" for i in range(args.keywords)]
+    categories = [
+        (f"CAT{c}", {f"cat{c}_kw{i}": 1.0 for i in range(args.keywords)})
+        for c in range(args.categories)
+    ]
+    dates = [(f"2025-01-{d % 28 + 1:02d}", "Rechnungsdatum: 12.01.2025 Betrag " * 2) for d in range(args.dates)]
+    workload = (keywords, categories, dates)
+
+    print(f"{args.documents} documents, {args.categories} categories, {args.keywords} keywords, {args.dates} dates")
+    print(f"{'setup':<8} {'overhead':>16} {'log volume':>17}")
+    run('before', analyze_before, args.documents, workload, setup_before)
+    run('after', analyze_after, args.documents, workload, setup_after)
+    run('debug', analyze_after, args.documents, workload, lambda r, h: setup_after(r, h, debug=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Benchmark OCR preprocessing: fixed 300 DPI + NL-means vs. adaptive per-page plans.
+
+Runs every page of a corpus through two setups:
+
+  legacy    render at 300 DPI, NL-means denoise + adaptive threshold (old behaviour)
+  adaptive  measure noise/contrast on a small probe, then render at the planned
+            DPI and apply the planned chain (new default)
+
+and reports milliseconds per page and character accuracy against the ground
+truth (difflib ratio). Without --corpus a synthetic corpus is generated: text
+pages rendered clean, with gaussian noise, JPEG-compressed and low contrast.
+With --corpus, every PDF/PNG/JPEG/TIFF in the directory is used whose
+ground truth sits next to it as <name>.txt (one file per document).
+
+Use it to tune OCR_NOISE_CLEAN_THRESHOLD, OCR_NOISE_HEAVY_THRESHOLD and
+OCR_MIN_CONTRAST for your scans.
+
+Usage:
+    python scripts/benchmark_ocr_preprocessing.py --pages 4 --lang eng
+    python scripts/benchmark_ocr_preprocessing.py --corpus ~/scans --lang deu
+"""
+import argparse
+import difflib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import cv2
+import fitz  # PyMuPDF
+import numpy as np
+
+from app.core.config import settings
+from app.services.ocr_service import ocr_service
+from app.utils.image_preprocessing import apply_chain, pixmap_to_array
+from app.utils.ocr_utils import CHAIN_NLMEANS
+
+SAMPLE_TEXT = (
+    "Rechnung Nr. 2024-0815 vom 12.03.2024. Sehr geehrte Damen und Herren, "
+    "für die Lieferung der bestellten Waren berechnen wir Ihnen den Betrag von "
+    "1.234,56 EUR zuzüglich Mehrwertsteuer. Bitte überweisen Sie den Betrag "
+    "innerhalb von 14 Tagen auf das unten angegebene Konto. Invoice total due "
+    "within fourteen days of receipt; late payments accrue interest."
+)
+
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg', '.tif', '.tiff')
+
+
+def _text_page(text: str) -> fitz.Document:
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_textbox(fitz.Rect(60, 60, 535, 780), text, fontsize=11)
+    return doc
+
+
+def _degrade(gray: np.ndarray, kind: str, rng: np.random.Generator) -> np.ndarray:
+    """Simulate a scan defect on a rendered page"""
+    if kind == 'noise':
+        noisy = gray.astype(np.float32) + rng.normal(0, 25, gray.shape)
+        return np.clip(noisy, 0, 255).astype(np.uint8)
+    if kind == 'jpeg':
+        _, encoded = cv2.imencode('.jpg', gray, [cv2.IMWRITE_JPEG_QUALITY, 15])
+        return cv2.imdecode(encoded, cv2.IMREAD_GRAYSCALE)
+    if kind == 'faint':
+        return (110 + gray.astype(np.float32) * 0.45).astype(np.uint8)
+    return gray
+
+
+def _scanned_pdf(gray: np.ndarray, scan_dpi: int) -> fitz.Document:
+    """Wrap a greyscale scan into a one-page PDF, as a scanner would"""
+    _, encoded = cv2.imencode('.png', gray)
+    height, width = gray.shape
+    doc = fitz.open()
+    page = doc.new_page(width=width * 72 / scan_dpi, height=height * 72 / scan_dpi)
+    page.insert_image(page.rect, stream=encoded.tobytes())
+    return doc
+
+
+def synthetic_corpus(pages: int, seed: int):
+    """Yield (name, fitz page, ground truth) for clean and degraded scans"""
+    rng = np.random.default_rng(seed)
+    for index in range(pages):
+        text = f"Seite {index + 1}. " + SAMPLE_TEXT
+        source = _text_page(text)
+        scan_dpi = 300 if index % 2 == 0 else 150
+        pix = source[0].get_pixmap(matrix=fitz.Matrix(scan_dpi / 72, scan_dpi / 72), colorspace=fitz.csGRAY)
+        gray = pixmap_to_array(pix)
+        for kind in ('clean', 'noise', 'jpeg', 'faint'):
+            doc = _scanned_pdf(_degrade(gray, kind, rng), scan_dpi)
+            yield f"p{index + 1}-{kind}-{scan_dpi}dpi", doc[0], text
+
+
+def directory_corpus(directory: str):
+    """Yield (name, fitz page, ground truth) for documents with a .txt next to them"""
+    for name in sorted(os.listdir(directory)):
+        base, suffix = os.path.splitext(name)
+        truth_path = os.path.join(directory, base + '.txt')
+        if suffix.lower() not in ('.pdf',) + IMAGE_SUFFIXES or not os.path.exists(truth_path):
+            continue
+        with open(truth_path, encoding='utf-8') as f:
+            truth = f.read()
+        doc = fitz.open(os.path.join(directory, name))
+        if suffix.lower() != '.pdf':
+            doc = fitz.open('pdf', doc.convert_to_pdf())
+        # Ground truth is per document, so only single-page documents are scored
+        for number in range(len(doc)):
+            yield f"{name}#{number + 1}", doc[number], truth if len(doc) == 1 else None
+
+
+def _render(page: fitz.Page, dpi: int) -> np.ndarray:
+    zoom = dpi / 72
+    return pixmap_to_array(page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY))
+
+
+def run_legacy(page: fitz.Page, lang: str) -> str:
+    return ocr_service._recognize(apply_chain(_render(page, 300), CHAIN_NLMEANS), lang).text
+
+
+def run_adaptive(page: fitz.Page, lang: str):
+    rect = page.rect
+    zoom = settings.ocr.ocr_probe_max_side / max(rect.width, rect.height)
+    probe = pixmap_to_array(page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY))
+    plan = ocr_service.plan_preprocessing(probe)
+    return ocr_service._recognize(apply_chain(_render(page, plan.dpi), plan.chain), lang).text, plan
+
+
+def accuracy(text: str, truth: str) -> float:
+    normalize = lambda s: ' '.join(s.split())
+    return difflib.SequenceMatcher(None, normalize(text), normalize(truth)).ratio()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', help='Directory of PDFs/images with <name>.txt ground truth')
+    parser.add_argument('--pages', type=int, default=2, help='Synthetic source pages (x4 degradations)')
+    parser.add_argument('--lang', default='deu+eng', help='Tesseract language string')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    corpus = directory_corpus(args.corpus) if args.corpus else synthetic_corpus(args.pages, args.seed)
+
+    totals = {'legacy': [0.0, 0.0], 'adaptive': [0.0, 0.0]}
+    scored = pages = 0
+    print(f"{'page':<28} {'plan':<24} {'legacy ms':>10} {'acc':>6} {'adaptive ms':>12} {'acc':>6}")
+    for name, page, truth in corpus:
+        start = time.perf_counter()
+        legacy_text = run_legacy(page, args.lang)
+        legacy_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        adaptive_text, plan = run_adaptive(page, args.lang)
+        adaptive_ms = (time.perf_counter() - start) * 1000
+
+        pages += 1
+        totals['legacy'][0] += legacy_ms
+        totals['adaptive'][0] += adaptive_ms
+        if truth is not None:
+            scored += 1
+            legacy_acc, adaptive_acc = accuracy(legacy_text, truth), accuracy(adaptive_text, truth)
+            totals['legacy'][1] += legacy_acc
+            totals['adaptive'][1] += adaptive_acc
+            acc = (f"{legacy_acc:6.3f}", f"{adaptive_acc:6.3f}")
+        else:
+            acc = ('-', '-')
+        print(f"{name:<28} {plan.chain + '@' + str(plan.dpi) + ' ' + plan.reason:<24.24} "
+              f"{legacy_ms:10.0f} {acc[0]:>6} {adaptive_ms:12.0f} {acc[1]:>6}")
+
+    if not pages:
+        print("No pages found")
+        return
+
+    print()
+    for setup, (ms, acc) in totals.items():
+        mean_acc = f"{acc / scored:.3f}" if scored else '-'
+        print(f"{setup:<10} {ms / pages:8.0f} ms/page   accuracy {mean_acc}")
+
+
+if __name__ == '__main__':
+    main()
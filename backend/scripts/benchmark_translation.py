@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch translation against the local mock translation provider.
+
+Translates a synthetic workload with repeated texts (like category names and
+keywords) through TranslationService using MockTranslationTransport, so no
+provider is contacted and no database is needed (the persistent cache is off;
+the in-process cache and request coalescing are measured).
+
+Usage:
+    python scripts/benchmark_translation.py --texts 2000 --unique 300 --latency-ms 80
+    python scripts/benchmark_translation.py --provider deepl
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.core.config import settings
+from app.services.translation_service import MockTranslationTransport, TranslationService
+
+
+async def run_benchmark(texts: int, unique: int, latency_ms: float, callers: int,
+                        concurrency: int, provider: str):
+    """Translate the workload from several concurrent callers and report request counts"""
+    settings.translation.translation_force_provider = provider
+    if provider == "deepl" and not settings.translation.translation_deepl_api_key:
+        settings.translation.translation_deepl_api_key = "mock-key"
+
+    transport = MockTranslationTransport(latency_ms=latency_ms)
+    service = TranslationService(transport=transport, persistent_cache=False)
+    service.max_concurrency = concurrency
+
+    vocabulary = [f"Category label {i}" for i in range(unique)]
+    workload = [random.choice(vocabulary) for _ in range(texts)]
+    per_caller = [workload[i::callers] for i in range(callers)]
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        service.translate_batch(chunk, "en", "de") for chunk in per_caller
+    ))
+    elapsed = time.perf_counter() - started
+    await service.aclose()
+
+    translated = sum(1 for result in results for value in result.values() if value)
+    print(f"Provider:          {provider}")
+    print(f"Texts:             {texts} ({unique} unique)")
+    print(f"Callers:           {callers}")
+    print(f"Concurrency:       {concurrency} requests")
+    print(f"Mock latency:      {latency_ms} ms")
+    print("-" * 40)
+    print(f"Provider requests: {transport.requests}")
+    print(f"Texts sent:        {transport.texts}")
+    print(f"Translated:        {translated}")
+    print(f"Elapsed:           {elapsed:.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--texts', type=int, default=2000)
+    parser.add_argument('--unique', type=int, default=300)
+    parser.add_argument('--latency-ms', type=float, default=80.0)
+    parser.add_argument('--callers', type=int, default=10, help='Concurrent translate_batch calls')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--provider', choices=['libretranslate', 'deepl'], default='libretranslate')
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(
+        args.texts, args.unique, args.latency_ms, args.callers,
+        args.concurrency, args.provider
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Replay recorded Stripe events against a local webhook endpoint.
+
+Reads events from JSON files (one event per file, e.g. saved from the Stripe
+dashboard or `stripe events retrieve`) or JSONL files (one event per line),
+signs each payload like Stripe does (`t=<ts>,v1=HMAC-SHA256(secret, "<ts>.<payload>")`)
+and POSTs it concurrently. Use --duplicates to resend every event, which must
+not be processed twice, and compare acknowledgement latency with
+STRIPE_WEBHOOK_ASYNC on and off.
+
+Usage:
+    python scripts/replay_stripe_events.py events/*.json --secret whsec_test
+    python scripts/replay_stripe_events.py recorded.jsonl --duplicates 1 --concurrency 20
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+def load_events(paths):
+    """Read events from .json and .jsonl files, ordered by their Stripe creation time"""
+    events = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            if path.endswith('.jsonl'):
+                events.extend(json.loads(line) for line in f if line.strip())
+            else:
+                data = json.load(f)
+                events.extend(data if isinstance(data, list) else [data])
+    return sorted(events, key=lambda event: event.get('created', 0))
+
+
+def sign(payload: str, secret: str) -> str:
+    """Build a Stripe-Signature header for the payload"""
+    timestamp = int(time.time())
+    signature = hmac.new(secret.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+async def replay(url: str, secret: str, events: list, duplicates: int, concurrency: int):
+    """Send all events (plus duplicates) and report acknowledgement latency"""
+    payloads = [json.dumps(event) for event in events] * (duplicates + 1)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = {}
+
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        async def send(payload: str):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(url, content=payload, headers={
+                    'Content-Type': 'application/json',
+                    'Stripe-Signature': sign(payload, secret)
+                })
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(send(payload) for payload in payloads))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"Events:       {len(events)} (+{len(events) * duplicates} duplicates)")
+    print(f"Concurrency:  {concurrency}")
+    print(f"Statuses:     {statuses}")
+    print("-" * 40)
+    print(f"Ack p50:      {statistics.median(latencies):.1f} ms")
+    print(f"Ack p95:      {latencies[int(len(latencies) * 0.95) - 1]:.1f} ms")
+    print(f"Ack max:      {latencies[-1]:.1f} ms")
+    print(f"Elapsed:      {elapsed:.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='+', help='Recorded event .json or .jsonl files')
+    parser.add_argument('--url', default='http://localhost:8080/api/v1/webhooks/stripe')
+    parser.add_argument('--secret', default=None, help='Webhook signing secret (defaults to the configured one)')
+    parser.add_argument('--duplicates', type=int, default=0, help='Times every event is resent')
+    parser.add_argument('--concurrency', type=int, default=10)
+    args = parser.parse_args()
+
+    secret = args.secret
+    if not secret:
+        from app.core.config import settings
+        secret = settings.stripe.stripe_webhook_secret
+
+    events = load_events(args.files)
+    if not events:
+        print("No events found")
+        return
+    asyncio.run(replay(args.url, secret, events, args.duplicates, args.concurrency))
+
+
+if __name__ == '__main__':
+    main()
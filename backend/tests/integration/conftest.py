@@ -0,0 +1,37 @@
+"""
+Fixtures for integration tests
+
+Integration tests need a PostgreSQL database given by TEST_DATABASE_URL and
+are skipped without one. Each test runs in a private schema inside one
+transaction that is rolled back afterwards, so the database is left untouched.
+"""
+import os
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, text
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    """Engine for TEST_DATABASE_URL"""
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = create_engine(url)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_connection(db_engine):
+    """Connection with a private schema first on the search path, rolled back after the test"""
+    with db_engine.connect() as connection:
+        transaction = connection.begin()
+        schema = f"test_{uuid.uuid4().hex[:12]}"
+        connection.execute(text(f"CREATE SCHEMA {schema}"))
+        connection.execute(text(f"SET LOCAL search_path TO {schema}, public"))
+        try:
+            yield connection
+        finally:
+            transaction.rollback()
@@ -0,0 +1,205 @@
+"""
+Smoke test for the admin statistics triggers of migration 063
+
+Runs the migration against minimal users, documents and user_monthly_usage
+tables, then checks that the maintained counters match a full recount after
+backfill and after bulk inserts, soft deletes, moves, hard deletes, page
+usage updates and user changes.
+"""
+import importlib.util
+from pathlib import Path
+
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.services.admin_stats_service import AdminStatsService
+
+pytestmark = pytest.mark.integration
+
+MIGRATION = Path(__file__).parents[2] / "alembic" / "versions" / "063_add_stats_rollups.py"
+
+BASE_TABLES = """
+    CREATE TABLE users (
+        id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+        tier_id integer NOT NULL,
+        is_active boolean NOT NULL DEFAULT true,
+        created_at timestamptz NOT NULL DEFAULT now()
+    );
+    CREATE TABLE documents (
+        id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+        user_id uuid NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        file_size integer NOT NULL,
+        is_deleted boolean NOT NULL DEFAULT false,
+        created_at timestamptz NOT NULL DEFAULT now()
+    );
+    CREATE TABLE user_monthly_usage (
+        id serial PRIMARY KEY,
+        user_id uuid NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        month_period varchar(7) NOT NULL,
+        pages_processed integer NOT NULL DEFAULT 0
+    );
+"""
+
+
+def run_migration(connection):
+    spec = importlib.util.spec_from_file_location("migration_063", MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with Operations.context(MigrationContext.configure(connection)):
+        migration.upgrade()
+
+
+def add_user(connection, tier_id, is_active=True):
+    return connection.execute(
+        text("INSERT INTO users (tier_id, is_active) VALUES (:tier, :active) RETURNING id"),
+        {"tier": tier_id, "active": is_active}
+    ).scalar_one()
+
+
+def add_documents(connection, user_id, sizes, is_deleted=False):
+    connection.execute(
+        text("""
+            INSERT INTO documents (user_id, file_size, is_deleted)
+            SELECT :user_id, size, :is_deleted FROM unnest(CAST(:sizes AS integer[])) AS size
+        """),
+        {"user_id": user_id, "sizes": sizes, "is_deleted": is_deleted}
+    )
+
+
+def counters(connection):
+    return dict(connection.execute(
+        text("SELECT metric, sum(value)::bigint FROM stats_counters GROUP BY metric HAVING sum(value) <> 0")
+    ).all())
+
+
+def recount(connection):
+    """The counters as computed from scratch over the base tables"""
+    expected = dict(connection.execute(text("""
+        SELECT 'documents', count(*) FROM documents WHERE NOT is_deleted
+        UNION ALL SELECT 'document_bytes', sum(file_size) FROM documents WHERE NOT is_deleted
+        UNION ALL SELECT 'document_pages', sum(pages_processed) FROM user_monthly_usage
+        UNION ALL SELECT 'users', count(*) FROM users
+        UNION ALL SELECT 'users_active', count(*) FROM users WHERE is_active
+        UNION ALL SELECT 'users_tier:' || tier_id, count(*) FROM users GROUP BY tier_id
+    """)).all())
+    return {metric: value for metric, value in expected.items() if value}
+
+
+def user_totals(connection):
+    """Maintained per-user totals next to a recount, for users with any activity"""
+    maintained = {
+        row[0]: tuple(row[1:]) for row in connection.execute(text(
+            "SELECT user_id, document_count, total_bytes, total_pages FROM user_document_stats"
+        ))
+        if any(row[1:])
+    }
+    recounted = {
+        row[0]: tuple(row[1:]) for row in connection.execute(text("""
+            SELECT u.id,
+                   (SELECT count(*) FROM documents d WHERE d.user_id = u.id AND NOT d.is_deleted),
+                   (SELECT coalesce(sum(file_size), 0) FROM documents d WHERE d.user_id = u.id AND NOT d.is_deleted),
+                   (SELECT coalesce(sum(pages_processed), 0) FROM user_monthly_usage m WHERE m.user_id = u.id)
+            FROM users u
+        """))
+        if any(row[1:])
+    }
+    return maintained, recounted
+
+
+def assert_consistent(connection):
+    assert counters(connection) == recount(connection)
+    maintained, recounted = user_totals(connection)
+    assert maintained == recounted
+
+
+@pytest.fixture
+def stats_db(db_connection):
+    """Base tables with some data, migrated to 063"""
+    db_connection.execute(text(BASE_TABLES))
+    alice = add_user(db_connection, tier_id=1)
+    bob = add_user(db_connection, tier_id=2)
+    add_user(db_connection, tier_id=1, is_active=False)
+    add_documents(db_connection, alice, [100, 200])
+    add_documents(db_connection, alice, [50], is_deleted=True)
+    add_documents(db_connection, bob, [10])
+    db_connection.execute(
+        text("INSERT INTO user_monthly_usage (user_id, month_period, pages_processed) VALUES (:user_id, '2025-01', 5)"),
+        {"user_id": alice}
+    )
+    run_migration(db_connection)
+    return db_connection, alice, bob
+
+
+class TestStatsTriggers:
+    """Counters and per-user totals stay equal to a full recount"""
+
+    def test_backfill(self, stats_db):
+        """Test the migration backfills counters, user totals and daily rollups"""
+        connection, alice, bob = stats_db
+
+        assert counters(connection) == {
+            'documents': 3, 'document_bytes': 310, 'document_pages': 5,
+            'users': 3, 'users_active': 2, 'users_tier:1': 2, 'users_tier:2': 1
+        }
+        assert_consistent(connection)
+        rollups = dict(connection.execute(text(
+            "SELECT metric, sum(value)::bigint FROM stats_daily_rollups GROUP BY metric"
+        )).all())
+        assert rollups == {'documents_created': 4, 'bytes_uploaded': 360, 'signups': 3}
+
+    def test_document_writes(self, stats_db):
+        """Test bulk inserts, soft deletes, moves and hard deletes"""
+        connection, alice, bob = stats_db
+
+        add_documents(connection, bob, [1, 2, 3])
+        assert_consistent(connection)
+
+        connection.execute(text("UPDATE documents SET is_deleted = true WHERE user_id = :u AND file_size = 100"), {"u": alice})
+        assert_consistent(connection)
+
+        connection.execute(text("UPDATE documents SET user_id = :to WHERE user_id = :frm AND file_size < 3"), {"to": alice, "frm": bob})
+        assert_consistent(connection)
+
+        connection.execute(text("DELETE FROM documents WHERE is_deleted"))
+        connection.execute(text("DELETE FROM documents WHERE file_size = 10"))
+        assert_consistent(connection)
+        assert counters(connection)['documents'] == 4
+
+    def test_usage_and_user_writes(self, stats_db):
+        """Test page usage, tier and status changes, and user deletion"""
+        connection, alice, bob = stats_db
+
+        connection.execute(text("UPDATE user_monthly_usage SET pages_processed = 8"))
+        connection.execute(
+            text("INSERT INTO user_monthly_usage (user_id, month_period, pages_processed) VALUES (:u, '2025-01', 4)"),
+            {"u": bob}
+        )
+        assert_consistent(connection)
+
+        connection.execute(text("UPDATE users SET tier_id = 2 WHERE NOT is_active"))
+        connection.execute(text("UPDATE users SET is_active = false WHERE id = :u"), {"u": alice})
+        assert_consistent(connection)
+
+        connection.execute(text("DELETE FROM users WHERE id = :u"), {"u": bob})
+        assert_consistent(connection)
+        assert counters(connection)['users'] == 2
+
+    def test_admin_stats_service_reads(self, stats_db):
+        """Test the service reads the maintained counters and refreshes rollups"""
+        connection, alice, bob = stats_db
+        session = Session(bind=connection)
+        service = AdminStatsService()
+
+        add_documents(connection, bob, [5])
+        service.refresh_rollups(session)
+
+        assert service.get_counters(session)['documents'] == 4
+        assert service.users_by_tier(service.get_counters(session)) == {1: 2, 2: 1}
+        assert service.count_users(session, is_active=False) == 1
+        today = service.get_daily_rollups(session, days=1)[0]
+        assert today['documents_created'] == 5
+        assert today['bytes_uploaded'] == 365
+        session.close()
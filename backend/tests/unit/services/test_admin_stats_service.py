@@ -0,0 +1,81 @@
+"""
+Unit tests for AdminStatsService counter reads
+
+The database session is a fake returning canned counter and rollup rows.
+"""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+
+from app.services.admin_stats_service import AdminStatsService, DAILY_METRICS
+
+
+def session_returning(rows):
+    session = Mock()
+    session.execute.return_value.all.return_value = rows
+    return session
+
+
+COUNTER_ROWS = [
+    ('users', 12),
+    ('users_active', 9),
+    ('users_tier:1', 10),
+    ('users_tier:2', 2),
+    ('users_tier:3', 0),
+    ('documents', 340),
+    ('document_bytes', 1048576),
+]
+
+
+class TestCounters:
+    """Test suite for the counter-backed totals"""
+
+    def test_get_counters_sums_slots(self):
+        """Test counters are returned as ints keyed by metric"""
+        counters = AdminStatsService().get_counters(session_returning([('documents', 7), ('users', 3)]))
+
+        assert counters == {'documents': 7, 'users': 3}
+
+    def test_users_by_tier_skips_empty_tiers(self):
+        """Test tier counters map to tier IDs and empty tiers are left out"""
+        service = AdminStatsService()
+
+        assert service.users_by_tier(dict(COUNTER_ROWS)) == {1: 10, 2: 2}
+
+    def test_count_users_per_filter(self):
+        """Test each supported user list filter is answered from the counters"""
+        service = AdminStatsService()
+        session = session_returning(COUNTER_ROWS)
+
+        assert service.count_users(session) == 12
+        assert service.count_users(session, tier_id=2) == 2
+        assert service.count_users(session, tier_id=4) == 0
+        assert service.count_users(session, is_active=True) == 9
+        assert service.count_users(session, is_active=False) == 3
+
+    def test_count_users_without_counter(self):
+        """Test filter combinations without a counter fall back to the caller (None)"""
+        session = session_returning(COUNTER_ROWS)
+
+        assert AdminStatsService().count_users(session, tier_id=1, is_active=True) is None
+        session.execute.assert_not_called()
+
+
+class TestDailyRollups:
+    """Test suite for AdminStatsService.get_daily_rollups"""
+
+    def test_missing_days_and_metrics_are_zero(self):
+        """Test the series covers every day oldest first and fills gaps with zeros"""
+        today = datetime.now(timezone.utc).date()
+        session = session_returning([
+            (today, 'documents_created', 4),
+            (today - timedelta(days=2), 'signups', 1),
+            (today - timedelta(days=2), 'unknown_metric', 99),
+            (today - timedelta(days=10), 'documents_created', 50),
+        ])
+
+        series = AdminStatsService().get_daily_rollups(session, days=3)
+
+        assert [entry['day'] for entry in series] == [(today - timedelta(days=i)).isoformat() for i in (2, 1, 0)]
+        assert series[0] == {'day': (today - timedelta(days=2)).isoformat(), 'documents_created': 0, 'bytes_uploaded': 0, 'signups': 1}
+        assert series[1] == {'day': (today - timedelta(days=1)).isoformat(), **{metric: 0 for metric in DAILY_METRICS}}
+        assert series[2]['documents_created'] == 4
@@ -0,0 +1,110 @@
+"""
+Unit tests for AnalysisExecutor slot handling
+
+Only the queueing logic is tested; no worker processes are started.
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.services.analysis_executor import AnalysisCancelledError, AnalysisExecutor
+
+
+def make_executor(workers=1, per_user=1, queue_timeout=30):
+    config = SimpleNamespace(
+        analysis_executor_enabled=True,
+        analysis_workers=workers,
+        analysis_queue_size=10,
+        analysis_queue_timeout_seconds=queue_timeout,
+        analysis_max_concurrent_per_user=per_user
+    )
+    with patch('app.services.analysis_executor.settings', SimpleNamespace(analysis=config)):
+        executor = AnalysisExecutor()
+    executor._slots = asyncio.Semaphore(workers)
+    return executor
+
+
+@pytest.fixture(autouse=True)
+def no_metrics():
+    with patch('app.services.analysis_executor.performance_monitor', Mock()):
+        yield
+
+
+class TestWaitForSlot:
+    """Test suite for AnalysisExecutor._wait_for_slot"""
+
+    def test_slots_are_held_on_return(self):
+        """Test a granted wait holds one global and one per-user slot"""
+        async def scenario():
+            executor = make_executor()
+            user_slot = await executor._wait_for_slot('user-1', None)
+
+            assert executor._slots.locked()
+            assert user_slot.locked()
+            assert executor._user_refs == {'user-1': 1}
+            assert executor._waiting == 0
+
+        asyncio.run(scenario())
+
+    def test_cancelled_waiter_releases_everything(self):
+        """Test cancelling the waiting coroutine gives back its slots and user entry"""
+        async def scenario():
+            executor = make_executor()
+            # Another analysis holds the only worker
+            await executor._slots.acquire()
+
+            waiter = asyncio.create_task(executor._wait_for_slot('user-1', None))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+
+            executor._slots.release()
+            await asyncio.sleep(0.01)
+
+            assert executor._user_refs == {}
+            assert executor._user_slots == {}
+            assert executor._waiting == 0
+            # The freed worker slot was not taken by the abandoned acquisition
+            await asyncio.wait_for(executor._slots.acquire(), timeout=0.1)
+
+        asyncio.run(scenario())
+
+    def test_disconnect_while_waiting(self):
+        """Test a client disconnect while queued raises AnalysisCancelledError and frees the user entry"""
+        async def scenario():
+            executor = make_executor()
+            await executor._slots.acquire()
+            disconnected = asyncio.get_running_loop().create_future()
+            watcher = asyncio.ensure_future(disconnected)
+
+            waiter = asyncio.create_task(executor._wait_for_slot('user-1', watcher))
+            await asyncio.sleep(0.01)
+            disconnected.set_result(None)
+
+            with pytest.raises(AnalysisCancelledError):
+                await waiter
+            assert executor._user_refs == {}
+            assert executor._user_slots == {}
+
+        asyncio.run(scenario())
+
+    def test_per_user_limit(self):
+        """Test a user's second analysis waits for the first even with free workers"""
+        async def scenario():
+            executor = make_executor(workers=2, per_user=1)
+            user_slot = await executor._wait_for_slot('user-1', None)
+
+            second = asyncio.create_task(executor._wait_for_slot('user-1', None))
+            other_user = await asyncio.wait_for(executor._wait_for_slot('user-2', None), timeout=0.1)
+            await asyncio.sleep(0.01)
+            assert not second.done()
+
+            executor._release('user-2', other_user)
+            executor._release('user-1', user_slot)
+            assert await asyncio.wait_for(second, timeout=0.1) is user_slot
+            assert executor._user_refs == {'user-1': 1}
+
+        asyncio.run(scenario())
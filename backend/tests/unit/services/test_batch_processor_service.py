@@ -0,0 +1,180 @@
+"""
+Unit tests for batch shard splitting and result aggregation
+
+Database sessions are fakes recording the progress UPDATEs; analysis is mocked.
+"""
+import asyncio
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.batch_processor_service import BatchProcessorService, BatchProgress
+
+
+class FakeSession:
+    """Session recording progress UPDATEs; the first `failures` commits raise"""
+
+    def __init__(self, failures=0, batch=None):
+        self.failures = failures
+        self.batch = batch
+        self.written = []
+        self._pending = []
+
+    def execute(self, statement):
+        self._pending.append(statement.compile(dialect=postgresql.dialect()).params)
+
+    def commit(self):
+        if self.failures:
+            self.failures -= 1
+            self._pending = []
+            raise RuntimeError('database unavailable')
+        self.written.extend(self._pending)
+        self._pending = []
+
+    def rollback(self):
+        self._pending = []
+
+    def query(self, model):
+        query = Mock()
+        query.filter.return_value.first.return_value = self.batch
+        return query
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def config():
+    settings = SimpleNamespace(analysis=SimpleNamespace(
+        batch_shard_size=3,
+        batch_progress_flush_files=2,
+        batch_progress_flush_seconds=3600
+    ))
+    with patch('app.services.batch_processor_service.settings', settings):
+        yield settings
+
+
+def result(name, success=True):
+    return {'success': success, 'original_filename': name}
+
+
+class TestMakeShards:
+    """Test suite for BatchProcessorService.make_shards"""
+
+    def test_splits_in_upload_order(self):
+        """Test files are split into shards of the configured size, keeping order"""
+        files = [{'path': f'/tmp/{i}.pdf'} for i in range(7)]
+
+        shards = BatchProcessorService().make_shards(files)
+
+        assert [len(shard) for shard in shards] == [3, 3, 1]
+        assert [f for shard in shards for f in shard] == files
+
+    def test_explicit_size_and_empty_input(self):
+        """Test an explicit shard size wins and no files give no shards"""
+        service = BatchProcessorService()
+
+        assert [len(shard) for shard in service.make_shards([{}] * 4, shard_size=2)] == [2, 2]
+        assert service.make_shards([]) == []
+
+
+class TestBatchProgress:
+    """Test suite for BatchProgress aggregation"""
+
+    def test_flush_writes_one_increment(self):
+        """Test buffered results are written as a single atomic increment"""
+        progress = BatchProgress(str(uuid.uuid4()))
+        session = FakeSession()
+        for entry in (result('a.pdf'), result('b.pdf', success=False), result('c.pdf')):
+            progress.add(entry)
+
+        assert progress.flush(session) is True
+
+        [params] = session.written
+        assert params['processed_files_1'] == 3
+        assert params['successful_files_1'] == 2
+        assert params['failed_files_1'] == 1
+        assert params['current_file_name'] == 'c.pdf'
+        assert [r['original_filename'] for r in params['param_2']] == ['a.pdf', 'b.pdf', 'c.pdf']
+
+    def test_flush_if_due_throttles_by_file_count(self):
+        """Test results are written every batch_progress_flush_files files"""
+        progress = BatchProgress(str(uuid.uuid4()))
+        session = FakeSession()
+
+        for name in ('a', 'b', 'c'):
+            progress.add(result(name))
+            progress.flush_if_due(session)
+
+        assert [params['processed_files_1'] for params in session.written] == [2]
+
+    def test_failed_flush_keeps_results(self):
+        """Test a failed write keeps the results for the next flush"""
+        progress = BatchProgress(str(uuid.uuid4()))
+        session = FakeSession(failures=1)
+        progress.add(result('a'))
+
+        assert progress.flush(session) is False
+        progress.add(result('b', success=False))
+        assert progress.flush(session) is True
+
+        [params] = session.written
+        assert params['processed_files_1'] == 2
+        assert params['failed_files_1'] == 1
+
+
+class TestShardResults:
+    """Test suite for persisting shard results"""
+
+    @staticmethod
+    def run_shard(files, session):
+        analysis = Mock(analyze_document=AsyncMock(side_effect=RuntimeError('OCR failed')))
+        with patch('app.services.batch_processor_service.db_manager', Mock(session_local=lambda: session)), \
+                patch('app.services.batch_processor_service.document_analysis_service', analysis):
+            return asyncio.run(BatchProcessorService().process_shard(str(uuid.uuid4()), files, 'user-1'))
+
+    def test_results_survive_failed_progress_writes(self, tmp_path):
+        """Test results a shard cannot write are returned and written by finalize_batch"""
+        files = []
+        for name in ('a.pdf', 'b.pdf', 'c.pdf'):
+            (tmp_path / name).write_bytes(b'%PDF')
+            files.append({'path': str(tmp_path / name), 'original_filename': name, 'mime_type': 'application/pdf'})
+
+        summary = self.run_shard(files, FakeSession(failures=10))
+
+        assert summary['failed'] == 3
+        assert [r['original_filename'] for r in summary['unsaved_results']] == ['a.pdf', 'b.pdf', 'c.pdf']
+
+        batch = SimpleNamespace(successful_files=0, total_files=3)
+        finalizer_session = FakeSession(batch=batch)
+        with patch('app.services.batch_processor_service.db_manager', Mock(session_local=lambda: finalizer_session)):
+            BatchProcessorService().finalize_batch(str(uuid.uuid4()), [summary, {'successful': 0, 'failed': 0, 'unsaved_results': []}])
+
+        [params] = finalizer_session.written
+        assert params['processed_files_1'] == 3
+        assert params['failed_files_1'] == 3
+        assert batch.status == 'completed'
+
+    def test_written_results_are_not_returned(self, tmp_path):
+        """Test a shard whose writes succeed returns no unsaved results"""
+        (tmp_path / 'a.pdf').write_bytes(b'%PDF')
+        session = FakeSession()
+
+        summary = self.run_shard([{'path': str(tmp_path / 'a.pdf'), 'original_filename': 'a.pdf', 'mime_type': 'application/pdf'}], session)
+
+        assert summary['unsaved_results'] == []
+        assert [params['processed_files_1'] for params in session.written] == [1]
+
+    def test_finalize_fails_when_results_cannot_be_saved(self):
+        """Test the batch is not marked completed while results are still unsaved"""
+        batch = SimpleNamespace(successful_files=0, total_files=1)
+        session = FakeSession(failures=1, batch=batch)
+
+        with patch('app.services.batch_processor_service.db_manager', Mock(session_local=lambda: session)):
+            with pytest.raises(RuntimeError):
+                BatchProcessorService().finalize_batch(str(uuid.uuid4()), [{'unsaved_results': [result('a')]}])
+
+        assert not hasattr(batch, 'status')
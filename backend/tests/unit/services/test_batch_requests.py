@@ -0,0 +1,93 @@
+"""
+Unit tests for batched provider request helpers
+"""
+from app.services.storage.batch_requests import (
+    chunked, graph_batch_body, graph_batch_outcomes, run_batches, send_with_retries
+)
+
+
+class TestChunked:
+    """Test suite for chunked"""
+
+    def test_splits_into_provider_sized_batches(self):
+        """Test items are split in order with a short last batch"""
+        assert chunked(list(range(5)), 2) == [[0, 1], [2, 3], [4]]
+        assert chunked([], 20) == []
+
+
+class TestSendWithRetries:
+    """Test suite for send_with_retries"""
+
+    def test_resends_only_throttled_items(self):
+        """Test throttled items are resent while finished items are not"""
+        calls = []
+
+        def send_once(keys):
+            calls.append(list(keys))
+            if len(calls) == 1:
+                return {'a': (200, None), 'b': (429, 'Too many requests'), 'c': (404, 'Not found')}
+            return {key: (204, None) for key in keys}
+
+        results = send_with_retries(['a', 'b', 'c'], send_once, max_retries=3, sleep=lambda _: None)
+
+        assert calls == [['a', 'b', 'c'], ['b']]
+        assert results == {'a': None, 'b': None, 'c': 'Not found'}
+
+    def test_gives_up_after_max_retries(self):
+        """Test items still failing after the last retry report an error"""
+        sleeps = []
+
+        def send_once(keys):
+            raise ConnectionError('connection reset')
+
+        results = send_with_retries(['a'], send_once, max_retries=2, sleep=sleeps.append)
+
+        assert len(sleeps) == 2
+        assert results == {'a': 'connection reset'}
+
+    def test_unanswered_items_are_retried(self):
+        """Test items missing from a batch response are resent"""
+        responses = iter([{'a': (200, None)}, {'b': (200, None)}])
+
+        results = send_with_retries(['a', 'b'], lambda keys: next(responses), max_retries=1, sleep=lambda _: None)
+
+        assert results == {'a': None, 'b': None}
+
+
+class TestRunBatches:
+    """Test suite for run_batches"""
+
+    def test_merges_results_of_all_batches(self):
+        """Test every key is sent once (duplicates removed) and results are merged"""
+        sent = []
+
+        def send_batch(batch):
+            sent.append(batch)
+            return {key: None if key % 2 else 'failed' for key in batch}
+
+        results = run_batches([1, 2, 3, 4, 5, 5], 2, send_batch, workers=3)
+
+        assert sorted(key for batch in sent for key in batch) == [1, 2, 3, 4, 5]
+        assert all(len(batch) <= 2 for batch in sent)
+        assert results == {1: None, 2: 'failed', 3: None, 4: 'failed', 5: None}
+
+
+class TestGraphBatch:
+    """Test suite for Graph $batch payloads"""
+
+    def test_body_and_outcomes_round_trip(self):
+        """Test request IDs map responses back to their files"""
+        body = graph_batch_body([
+            {'method': 'DELETE', 'url': '/me/drive/items/f1'},
+            {'method': 'PATCH', 'url': '/me/drive/items/f2', 'body': {'parentReference': {'id': 'dir'}}},
+        ])
+
+        assert body['requests'][0] == {'id': '0', 'method': 'DELETE', 'url': '/me/drive/items/f1'}
+        assert body['requests'][1]['headers'] == {'Content-Type': 'application/json'}
+
+        outcomes = graph_batch_outcomes({'responses': [
+            {'id': '1', 'status': 409, 'body': {'error': {'message': 'Name already exists'}}},
+            {'id': '0', 'status': 204},
+        ]}, ['f1', 'f2'])
+
+        assert outcomes == {'f1': (204, None), 'f2': (409, 'Name already exists')}
@@ -0,0 +1,33 @@
+"""
+Unit tests for the category list cache in CategoryService
+"""
+from unittest.mock import patch
+
+from app.services.category_service import CategoryService
+
+
+class TestCategoryListCache:
+    """Test suite for the per-user category list cache"""
+
+    def test_expired_entries_are_evicted_on_write(self):
+        """Test caching a list drops expired entries of other users"""
+        service = CategoryService()
+        variant = ('en', True, True)
+
+        with patch('app.services.category_service.time.monotonic', return_value=100.0):
+            service._cache_list('user-1', variant, object())
+        with patch('app.services.category_service.time.monotonic', return_value=200.0):
+            service._cache_list('user-2', variant, object())
+
+        assert list(service._list_cache) == ['user-2']
+
+    def test_invalidate_drops_only_that_user(self):
+        """Test invalidation removes every cached variant of one user"""
+        service = CategoryService()
+        service._cache_list('user-1', ('en', True, True), object())
+        service._cache_list('user-1', ('de', True, False), object())
+        service._cache_list('user-2', ('en', True, True), object())
+
+        service.invalidate_user_cache('user-1')
+
+        assert list(service._list_cache) == ['user-2']
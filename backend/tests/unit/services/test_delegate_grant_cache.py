@@ -0,0 +1,41 @@
+"""
+Unit tests for the DelegateService grant cache
+"""
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from app.services.delegate_service import DelegateService
+
+
+class TestGrantCache:
+    """Test suite for DelegateService grant caching"""
+
+    def test_cache_is_bounded_lru(self):
+        """Test the least recently used pair is evicted beyond the size bound"""
+        service = DelegateService()
+        service.GRANT_CACHE_MAX_SIZE = 2
+        now = datetime.now(timezone.utc)
+        first, second, third = [(uuid.uuid4(), uuid.uuid4()) for _ in range(3)]
+
+        service._cache_grant(first, 0.0, None)
+        service._cache_grant(second, 0.0, None)
+        with patch('app.services.delegate_service.time.monotonic', return_value=1.0):
+            assert service._cached_grant(first, now) is None
+            service._cache_grant(third, 1.0, None)
+
+        assert list(service._grant_cache) == [first, third]
+
+    def test_expired_entries_are_dropped(self):
+        """Test entries older than the TTL are misses and leave the cache"""
+        service = DelegateService()
+        key = (uuid.uuid4(), uuid.uuid4())
+        grant = (uuid.uuid4(), 'viewer', None)
+        service._cache_grant(key, 0.0, grant)
+
+        with patch('app.services.delegate_service.time.monotonic', return_value=10.0):
+            assert service._cached_grant(key, datetime.now(timezone.utc)) == grant
+        with patch('app.services.delegate_service.time.monotonic', return_value=service.GRANT_CACHE_TTL_SECONDS + 1.0):
+            assert service._cached_grant(key, datetime.now(timezone.utc)) is False
+
+        assert key not in service._grant_cache
@@ -0,0 +1,31 @@
+"""
+Unit tests for document list keyset cursors
+"""
+import uuid
+from datetime import datetime, timezone
+
+from app.services.document_service import _decode_cursor, _encode_cursor
+
+
+class TestDocumentCursor:
+    """Test suite for document list keyset cursors"""
+
+    def test_round_trip(self):
+        """Test a cursor decodes to the sort value and id it was built from"""
+        document_id = uuid.uuid4()
+        created_at = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+
+        cursor = _encode_cursor(created_at, document_id, 'created_at', 'desc')
+
+        assert _decode_cursor(cursor, 'created_at', 'desc') == (created_at, document_id)
+
+    def test_cursor_of_another_sort_is_ignored(self):
+        """Test a cursor issued for a different sort field or order falls back to offset paging"""
+        cursor = _encode_cursor('Invoice', uuid.uuid4(), 'title', 'asc')
+
+        assert _decode_cursor(cursor, 'title', 'desc') is None
+        assert _decode_cursor(cursor, 'file_name', 'asc') is None
+
+    def test_invalid_cursor_is_ignored(self):
+        """Test garbage cursors fall back to offset paging"""
+        assert _decode_cursor('not-a-cursor', 'created_at', 'desc') is None
@@ -0,0 +1,154 @@
+"""
+Unit tests for EmailDeliveryService bulk delivery and rate limiting
+
+The Brevo API is replaced by an httpx.MockTransport.
+"""
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.services.email_delivery_service import EmailDeliveryService, OutboundEmail, TokenBucket
+
+
+@pytest.fixture
+def config():
+    settings = SimpleNamespace(email=SimpleNamespace(
+        brevo_api_key='test-key',
+        email_delivery_max_concurrency=4,
+        email_delivery_rate_per_second=1000,
+        email_delivery_batch_size=2,
+        email_delivery_http2=False,
+        email_delivery_mock=False
+    ))
+    with patch('app.services.email_delivery_service.settings', settings):
+        yield settings
+
+
+class FakeBrevo:
+    """MockTransport handler recording message-version requests"""
+
+    def __init__(self, fail_recipient=None):
+        self.fail_recipient = fail_recipient
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        recipients = [version['to'][0]['email'] for version in payload['messageVersions']]
+        self.requests.append(recipients)
+        if self.fail_recipient in recipients:
+            return httpx.Response(400, json={'code': 'invalid_parameter', 'message': 'bad recipient'})
+        return httpx.Response(201, json={'messageIds': [f'<id-{email}>' for email in recipients]})
+
+
+def messages(count):
+    return [
+        OutboundEmail(to_email=f'user{i}@example.com', to_name=None, subject=f'Hi {i}', html_content='<p>Hi</p>', reference=i)
+        for i in range(count)
+    ]
+
+
+def send(service, outbound):
+    return asyncio.run(service.send_bulk(outbound, from_email='info@example.com', from_name='Bonifatus'))
+
+
+class TestSendBulk:
+    """Test suite for EmailDeliveryService.send_bulk"""
+
+    def test_groups_messages_into_version_batches(self, config):
+        """Test messages are sent batch_size versions per request"""
+        brevo = FakeBrevo()
+        service = EmailDeliveryService(transport=httpx.MockTransport(brevo))
+
+        results = send(service, messages(5))
+
+        assert sorted(len(recipients) for recipients in brevo.requests) == [1, 2, 2]
+        assert service.get_stats() == {'requests': 3, 'messages': 5}
+        assert [result.reference for result in results] == [0, 1, 2, 3, 4]
+
+    def test_maps_message_ids_to_messages(self, config):
+        """Test each result carries its own recipient and Brevo message ID"""
+        service = EmailDeliveryService(transport=httpx.MockTransport(FakeBrevo()))
+
+        results = send(service, messages(3))
+
+        assert all(result.success for result in results)
+        assert [result.message_id for result in results] == [f'<id-user{i}@example.com>' for i in range(3)]
+        assert [result.to_email for result in results] == [f'user{i}@example.com' for i in range(3)]
+
+    def test_rejected_request_fails_only_its_messages(self, config):
+        """Test a rejected request marks its batch as failed and leaves other batches alone"""
+        service = EmailDeliveryService(transport=httpx.MockTransport(FakeBrevo(fail_recipient='user2@example.com')))
+
+        results = send(service, messages(4))
+
+        assert [result.success for result in results] == [True, True, False, False]
+        assert 'Status 400' in results[2].error
+        assert results[3].message_id is None
+
+    def test_transport_error_is_reported_per_message(self, config):
+        """Test a network error becomes a failed result instead of an exception"""
+        def unreachable(request):
+            raise httpx.ConnectError('connection refused', request=request)
+
+        service = EmailDeliveryService(transport=httpx.MockTransport(unreachable))
+
+        results = send(service, messages(2))
+
+        assert [result.success for result in results] == [False, False]
+        assert 'connection refused' in results[0].error
+
+
+class TestRateLimiting:
+    """Test suite for TokenBucket and the per-request rate limit"""
+
+    def test_token_bucket_limits_sustained_rate(self):
+        """Test acquisitions beyond the burst wait for new tokens"""
+        async def scenario():
+            bucket = TokenBucket(rate=20, capacity=1)
+            started = time.monotonic()
+            for _ in range(4):
+                await bucket.acquire()
+            return time.monotonic() - started
+
+        # One token up front, three more at 20/s
+        assert asyncio.run(scenario()) >= 0.14
+
+    def test_requests_pass_through_the_limiter(self, config):
+        """Test every provider request takes a token"""
+        service = EmailDeliveryService(transport=httpx.MockTransport(FakeBrevo()))
+        acquired = []
+
+        async def deliver():
+            state = service._get_state()
+            original_acquire = state.limiter.acquire
+
+            async def counting_acquire():
+                acquired.append(True)
+                await original_acquire()
+
+            state.limiter.acquire = counting_acquire
+            return await service.send_bulk(messages(5), from_email='info@example.com', from_name='Bonifatus')
+
+        asyncio.run(deliver())
+
+        assert len(acquired) == service.get_stats()['requests'] == 3
+
+    def test_client_of_previous_loop_is_closed(self, config):
+        """Test a new event loop (e.g. the next Celery task) closes the previous loop's client"""
+        service = EmailDeliveryService(transport=httpx.MockTransport(FakeBrevo()))
+
+        async def deliver():
+            await service.send_bulk(messages(1), from_email='info@example.com', from_name='Bonifatus')
+            await asyncio.sleep(0)
+            return service._state.client
+
+        first_client = asyncio.run(deliver())
+        second_client = asyncio.run(deliver())
+
+        assert first_client is not second_client
+        assert first_client.is_closed
@@ -0,0 +1,243 @@
+"""
+Unit tests for the email processing pipeline
+
+Covers attachment spooling, the attachment concurrency limits and the
+isolation of failing emails in the pipeline workers. IMAP, analysis and
+upload are replaced by fakes.
+"""
+import asyncio
+import os
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from app.services.analysis_executor import AnalysisQueueFullError
+from app.services.email_processing_service import AttachmentConcurrencyLimiter, EmailProcessingService
+from app.utils.imap_utils import AttachmentPart
+
+
+@pytest.fixture
+def service(tmp_path):
+    with patch('app.services.email_processing_service.EmailService', Mock()):
+        service = EmailProcessingService(db=Mock())
+    service.temp_storage_path = str(tmp_path)
+    return service
+
+
+class FakeImap:
+    """IMAP connection answering UID FETCH with canned body parts"""
+
+    def __init__(self, response):
+        self.response = response
+        self.commands = []
+
+    def uid(self, command, uid, query):
+        self.commands.append((command, uid, query))
+        return 'OK', self.response
+
+
+class TestSpoolAttachmentParts:
+    """Test suite for EmailProcessingService.spool_attachment_parts"""
+
+    def test_decodes_parts_to_temp_files(self, service, tmp_path):
+        """Test only the requested parts are fetched, decoded and written to disk"""
+        imap = FakeImap([
+            (b'1 (UID 7 BODY[2] {8}', b'aGVsbG8='),
+            (b' BODY[3] {5}', b'plain'),
+            b')'
+        ])
+        parts = [
+            AttachmentPart(section='2', filename='invoice.pdf', content_type='application/pdf', encoding='base64', encoded_size=8),
+            AttachmentPart(section='3', filename='note.txt', content_type='text/plain', encoding='7bit', encoded_size=5)
+        ]
+
+        spooled = service.spool_attachment_parts(imap, 7, parts)
+
+        assert imap.commands == [('FETCH', '7', '(UID BODY.PEEK[2] BODY.PEEK[3])')]
+        assert [(item['filename'], item['size']) for item in spooled] == [('invoice.pdf', 5), ('note.txt', 5)]
+        with open(spooled[0]['path'], 'rb') as f:
+            assert f.read() == b'hello'
+        assert all(os.path.dirname(item['path']) == str(tmp_path) for item in spooled)
+
+    def test_failed_write_removes_spooled_files(self, service, tmp_path):
+        """Test a failure part-way through leaves no temp files behind"""
+        imap = FakeImap([(b'1 (UID 7 BODY[2] {5}', b'first'), (b' BODY[3] {6}', b'second'), b')'])
+        parts = [
+            AttachmentPart(section='2', filename='a.txt', content_type='text/plain', encoding='7bit', encoded_size=5),
+            AttachmentPart(section='3', filename='b.txt', content_type='text/plain', encoding='7bit', encoded_size=6)
+        ]
+        save = service.save_attachment_to_temp
+        service.save_attachment_to_temp = lambda attachment: save(attachment) if attachment['filename'] == 'a.txt' else None
+
+        with pytest.raises(OSError):
+            service.spool_attachment_parts(imap, 7, parts)
+
+        assert os.listdir(tmp_path) == []
+
+
+class TestAttachmentConcurrencyLimiter:
+    """Test suite for AttachmentConcurrencyLimiter"""
+
+    @staticmethod
+    async def run_jobs(limiter, user_ids):
+        """Run one short job per user ID and return the peak concurrency overall and per user"""
+        running = {}
+        peaks = {'total': 0}
+
+        async def job(user_id):
+            async with limiter.slot(user_id):
+                running[user_id] = running.get(user_id, 0) + 1
+                peaks['total'] = max(peaks['total'], sum(running.values()))
+                peaks[user_id] = max(peaks.get(user_id, 0), running[user_id])
+                await asyncio.sleep(0.01)
+                running[user_id] -= 1
+
+        await asyncio.gather(*[job(user_id) for user_id in user_ids])
+        return peaks
+
+    def test_per_user_share(self):
+        """Test one user's burst never exceeds the per-user share"""
+        limiter = AttachmentConcurrencyLimiter(max_total=4, max_per_user=2)
+
+        peaks = asyncio.run(self.run_jobs(limiter, ['a'] * 6 + ['b']))
+
+        assert peaks['a'] == 2
+        assert peaks['total'] == 3
+
+    def test_global_cap(self):
+        """Test concurrency across users never exceeds the global cap"""
+        limiter = AttachmentConcurrencyLimiter(max_total=2, max_per_user=2)
+
+        peaks = asyncio.run(self.run_jobs(limiter, ['a', 'a', 'b', 'b', 'c', 'c']))
+
+        assert peaks['total'] == 2
+
+    def test_user_semaphores_are_evicted(self):
+        """Test per-user state is dropped once a user has no holders or waiters"""
+        limiter = AttachmentConcurrencyLimiter(max_total=2, max_per_user=1)
+
+        asyncio.run(self.run_jobs(limiter, ['a', 'a', 'b']))
+
+        assert limiter._per_user == {}
+        assert limiter._user_refs == {}
+
+    def test_cancelled_waiter_is_evicted(self):
+        """Test a waiter cancelled before getting a slot does not leak its user entry"""
+        async def scenario():
+            limiter = AttachmentConcurrencyLimiter(max_total=1, max_per_user=1)
+            release = asyncio.Event()
+
+            async def holder():
+                async with limiter.slot('a'):
+                    await release.wait()
+
+            async def waiter():
+                async with limiter.slot('b'):
+                    pass
+
+            holding = asyncio.create_task(holder())
+            await asyncio.sleep(0)
+            waiting = asyncio.create_task(waiter())
+            await asyncio.sleep(0)
+            assert limiter._user_refs == {'a': 1, 'b': 1}
+
+            waiting.cancel()
+            await asyncio.gather(waiting, return_exceptions=True)
+            assert limiter._user_refs == {'a': 1}
+
+            release.set()
+            await holding
+            return limiter
+
+        limiter = asyncio.run(scenario())
+        assert limiter._per_user == {}
+
+
+class TestPipelineWorker:
+    """Test suite for EmailProcessingService._pipeline_worker"""
+
+    def test_failing_email_does_not_stop_the_pipeline(self, service, tmp_path):
+        """Test a failing job is marked for retry while later jobs complete, and all temp files are removed"""
+        async def complete(job):
+            if job['uid'] == 2:
+                raise RuntimeError('analysis crashed')
+            return 'processed'
+
+        service._complete_email_job = complete
+        jobs = []
+        for uid in (1, 2, 3):
+            path = tmp_path / f'{uid}.pdf'
+            path.write_bytes(b'%PDF')
+            jobs.append({'uid': uid, 'attachments': [{'path': str(path)}]})
+
+        async def scenario():
+            queue = asyncio.Queue()
+            outcomes = {}
+            for job in jobs:
+                queue.put_nowait(job)
+            workers = [asyncio.create_task(service._pipeline_worker(queue, outcomes)) for _ in range(2)]
+            await queue.join()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            return outcomes
+
+        outcomes = asyncio.run(scenario())
+
+        assert outcomes == {1: 'processed', 2: 'retry', 3: 'processed'}
+        assert os.listdir(tmp_path) == []
+
+
+class TestProcessSingleAttachment:
+    """Test suite for EmailProcessingService._process_single_attachment"""
+
+    @staticmethod
+    def process(service, tmp_path, analyze, duplicate_id=None):
+        attachment = tmp_path / 'invoice.pdf'
+        attachment.write_bytes(b'%PDF-1.4')
+        service._find_duplicate = Mock(return_value=duplicate_id)
+        service._read_attachment = Mock(return_value=(b'%PDF-1.4', 'application/pdf'))
+        upload = AsyncMock(return_value={'success': True, 'document_id': 'doc-1'})
+
+        with patch('app.services.email_processing_service.db_manager', Mock()), \
+                patch('app.services.email_processing_service.analysis_executor', Mock(analyze=analyze)), \
+                patch('app.services.email_processing_service.document_upload_service', Mock(confirm_upload=upload)):
+            outcome = asyncio.run(service._process_single_attachment(
+                idx=0,
+                temp_file=str(attachment),
+                filename='invoice.pdf',
+                file_hash='abc',
+                user_context={'user_id': 'user-1', 'user_email': 'a@example.com', 'preferred_language': 'en'},
+                fallback_category_ids=['other'],
+                sender_email='a@example.com',
+                email_id=b'7',
+                total=1
+            ))
+        return outcome, upload
+
+    def test_analysis_runs_in_the_analysis_pool(self, service, tmp_path):
+        """Test attachments are analyzed through the analysis executor"""
+        analyze = AsyncMock(return_value={'suggested_category_id': 'cat-1', 'keywords': [{'word': 'invoice'}]})
+
+        outcome, upload = self.process(service, tmp_path, analyze)
+
+        assert outcome == ('doc-1', None)
+        assert analyze.await_args.kwargs['user_id'] == 'user-1'
+        assert analyze.await_args.kwargs['mime_type'] == 'application/pdf'
+        assert upload.await_args.kwargs['category_ids'] == ['cat-1']
+
+    def test_duplicate_skips_analysis(self, service, tmp_path):
+        """Test a known file hash is reported without analyzing it"""
+        analyze = AsyncMock()
+
+        outcome, _ = self.process(service, tmp_path, analyze, duplicate_id='doc-0')
+
+        assert outcome == (None, 'invoice.pdf: Duplicate - already uploaded')
+        analyze.assert_not_awaited()
+
+    def test_saturated_pool_leaves_email_for_retry(self, service, tmp_path):
+        """Test a full analysis queue propagates instead of becoming a per-file error"""
+        analyze = AsyncMock(side_effect=AnalysisQueueFullError('busy'))
+
+        with pytest.raises(AnalysisQueueFullError):
+            self.process(service, tmp_path, analyze)
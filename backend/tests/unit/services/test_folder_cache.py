@@ -0,0 +1,89 @@
+"""
+Unit tests for the cloud folder ID cache and chunked upload helpers
+"""
+import io
+
+from app.services.storage.chunked_upload import (
+    ONEDRIVE_CHUNK_GRANULARITY, align_chunk_size, content_range, hash_stream, next_expected_offset, stream_size
+)
+from app.services.storage.folder_cache import FolderCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestFolderCache:
+    """Test suite for FolderCache"""
+
+    def test_caches_per_account_and_parent(self):
+        """Test folder IDs are scoped by account, provider and parent folder"""
+        cache = FolderCache(max_size=10, ttl_seconds=60)
+        cache.put('user-1', 'google_drive', 'Invoices', 'folder-1', parent_id='root-1')
+
+        assert cache.get('user-1', 'google_drive', 'Invoices', parent_id='root-1') == 'folder-1'
+        assert cache.get('user-2', 'google_drive', 'Invoices', parent_id='root-1') is None
+        assert cache.get('user-1', 'onedrive', 'Invoices', parent_id='root-1') is None
+        assert cache.get(None, 'google_drive', 'Invoices', parent_id='root-1') is None
+
+    def test_entries_expire(self):
+        """Test entries are looked up again after the TTL"""
+        clock = FakeClock()
+        cache = FolderCache(max_size=10, ttl_seconds=60, clock=clock)
+        cache.put('user-1', 'onedrive', 'Bonifatus_DMS', 'root-1')
+
+        clock.now = 59
+        assert cache.get('user-1', 'onedrive', 'Bonifatus_DMS') == 'root-1'
+        clock.now = 61
+        assert cache.get('user-1', 'onedrive', 'Bonifatus_DMS') is None
+
+    def test_invalidate_account_and_missing_folder(self):
+        """Test account-wide invalidation and dropping a deleted folder with its children"""
+        cache = FolderCache(max_size=10, ttl_seconds=60)
+        cache.put('user-1', 'google_drive', 'Bonifatus_DMS', 'root-1')
+        cache.put('user-1', 'google_drive', 'Invoices', 'folder-1', parent_id='root-1')
+        cache.put('user-2', 'google_drive', 'Invoices', 'folder-2', parent_id='root-2')
+
+        assert cache.invalidate_folder_id('user-1', 'root-1') == 2
+        assert cache.get('user-2', 'google_drive', 'Invoices', parent_id='root-2') == 'folder-2'
+        assert cache.invalidate('user-2') == 1
+        assert cache.get_stats()['entries'] == 0
+
+    def test_evicts_least_recently_used(self):
+        """Test the oldest entry is evicted when the cache is full"""
+        cache = FolderCache(max_size=2, ttl_seconds=60)
+        cache.put('user-1', 'onedrive', 'A', 'a')
+        cache.put('user-1', 'onedrive', 'B', 'b')
+        cache.get('user-1', 'onedrive', 'A')
+        cache.put('user-1', 'onedrive', 'C', 'c')
+
+        assert cache.get('user-1', 'onedrive', 'B') is None
+        assert cache.get('user-1', 'onedrive', 'A') == 'a'
+
+
+class TestChunkedUploadHelpers:
+    """Test suite for chunked upload helpers"""
+
+    def test_chunk_size_alignment(self):
+        """Test chunk sizes are rounded down to the provider granularity"""
+        assert align_chunk_size(8 * 1024 * 1024, ONEDRIVE_CHUNK_GRANULARITY) == 25 * ONEDRIVE_CHUNK_GRANULARITY
+        assert align_chunk_size(1000, ONEDRIVE_CHUNK_GRANULARITY) == ONEDRIVE_CHUNK_GRANULARITY
+
+    def test_resume_offset_from_expected_ranges(self):
+        """Test the resume offset is the first missing byte"""
+        assert next_expected_offset(['26214400-']) == 26214400
+        assert next_expected_offset(['300-399', '100-199']) == 100
+        assert next_expected_offset([]) is None
+        assert content_range(0, 10, 100) == 'bytes 0-9/100'
+
+    def test_stream_size_and_hash_rewind(self):
+        """Test size and hash leave the stream at its start"""
+        stream = io.BytesIO(b'abc')
+        stream.read()
+        assert stream_size(stream) == 3
+        assert hash_stream(stream).startswith('ba7816bf')
+        assert stream.read() == b'abc'
@@ -0,0 +1,92 @@
+"""
+Unit tests for the shared per-language lexicon service
+"""
+from app.services.lexicon_service import Lexicon, LexiconService, freeze_terms
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class StubLexiconService(LexiconService):
+    """LexiconService with the database replaced by a version counter and load log"""
+
+    def __init__(self, check_seconds=30, clock=None):
+        super().__init__(check_seconds=check_seconds, clock=clock or FakeClock())
+        self.db_version = 0
+        self.loads = []
+        self.fail_languages = set()
+
+    def _read_version(self, db):
+        return self.db_version
+
+    def _load(self, db, language, version):
+        self.loads.append((language, version))
+        complete = language not in self.fail_languages
+        stop_words = freeze_terms(['Der', 'die'] if complete else [])
+        return Lexicon(language, version, stop_words=stop_words), complete
+
+
+class TestFreezeTerms:
+    """Test suite for freeze_terms"""
+
+    def test_normalizes_and_drops_empty_values(self):
+        """Test terms are lowercased and stripped, empty values dropped"""
+        terms = freeze_terms([' Tel ', 'FAX', 'tel', '', None, '   '])
+
+        assert terms == frozenset({'tel', 'fax'})
+        assert isinstance(terms, frozenset)
+
+
+class TestLexiconService:
+    """Test suite for LexiconService"""
+
+    def test_loads_each_language_once(self):
+        """Test lexicons are shared between calls and services"""
+        service = StubLexiconService()
+
+        first = service.stop_words(None, 'de')
+        second = service.get(None, 'de').stop_words
+        service.field_labels(None, 'en')
+
+        assert first is second
+        assert first == frozenset({'der', 'die'})
+        assert service.loads == [('de', 0), ('en', 0)]
+
+    def test_reloads_after_version_change(self):
+        """Test a changed version counter drops lexicons after the check interval"""
+        clock = FakeClock()
+        service = StubLexiconService(check_seconds=30, clock=clock)
+        service.get(None, 'de')
+
+        service.db_version = 1
+        clock.now = 10
+        assert service.get(None, 'de').version == 0
+
+        clock.now = 31
+        assert service.get(None, 'de').version == 1
+        assert service.loads == [('de', 0), ('de', 1)]
+
+    def test_failed_loads_are_not_cached(self):
+        """Test an incomplete load is retried on the next call"""
+        service = StubLexiconService()
+        service.fail_languages.add('fr')
+
+        assert service.stop_words(None, 'fr') == frozenset()
+        service.fail_languages.clear()
+        assert service.stop_words(None, 'fr') == frozenset({'der', 'die'})
+        assert len(service.loads) == 2
+
+    def test_preload_and_invalidate(self):
+        """Test preloading languages and dropping them locally"""
+        service = StubLexiconService()
+
+        assert service.preload(None, ['en', 'de']) == ['de', 'en']
+        service.invalidate('de')
+        assert list(service.get_stats()['languages']) == ['en']
+        service.invalidate()
+        assert service.get_stats()['languages'] == {}
@@ -0,0 +1,166 @@
+"""
+Unit tests for set-based keyword weight learning
+
+Keyword weights are loaded from a dict instead of the database and the
+staged upsert rows are captured, so the weight arithmetic can be checked
+without PostgreSQL.
+"""
+import uuid
+from unittest.mock import Mock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.ml_learning_service import MLLearningService
+
+INVOICES = uuid.UUID('00000000-0000-0000-0000-000000000001')
+CONTRACTS = uuid.UUID('00000000-0000-0000-0000-000000000002')
+RECEIPTS = uuid.UUID('00000000-0000-0000-0000-000000000003')
+LETTERS = uuid.UUID('00000000-0000-0000-0000-000000000004')
+
+
+@pytest.fixture
+def service():
+    service = MLLearningService()
+    failing_session = Mock()
+    failing_session.execute.side_effect = RuntimeError('no database')
+    # Database unavailable -> documented defaults (primary 1.0, bonus 0.2, boost 0.5, ...)
+    service._config_cache = dict(service._load_config(failing_session))
+    return service
+
+
+def learn(service, weights, keywords, primary=INVOICES, predicted=None, confidence=None):
+    """Run learn_from_classification and return the staged {(category, keyword): update}"""
+    staged = {}
+    session = Mock()
+
+    def persist(updates, language, session):
+        staged.update(updates)
+
+    with patch.object(service, '_involves_other_category', return_value=False), \
+            patch.object(service, '_load_keyword_weights', return_value=weights), \
+            patch.object(service, '_persist_keyword_updates', side_effect=persist), \
+            patch.object(service, '_log_learning_event'), \
+            patch('app.services.ml_learning_service.lexicon_service') as lexicons:
+        lexicons.stop_words.return_value = frozenset({'the'})
+        learned = service.learn_from_classification(
+            document_id=uuid.uuid4(),
+            document_keywords=keywords,
+            primary_category_id=primary,
+            secondary_category_ids=[],
+            language='en',
+            user_id=uuid.uuid4(),
+            ai_predicted_category=predicted,
+            ai_confidence=confidence,
+            session=session
+        )
+    return learned, staged, session
+
+
+class TestWeightMath:
+    """Test suite for the in-memory weight updates"""
+
+    def test_correct_prediction_reinforces(self, service):
+        """Test new keywords start at the adjustment and existing ones are incremented"""
+        weights = {'invoice': {INVOICES: 2.0}}
+
+        learned, staged, session = learn(service, weights, ['invoice', 'amount', 'due', 'the', '42'], predicted=INVOICES, confidence=0.9)
+
+        assert learned is True
+        # primary 1.0 + correct bonus 0.2
+        assert staged[(INVOICES, 'invoice')] == {'weight': pytest.approx(3.2), 'matched': True}
+        assert staged[(INVOICES, 'amount')] == {'weight': pytest.approx(1.2), 'matched': True}
+        assert (INVOICES, 'the') not in staged and (INVOICES, '42') not in staged
+        session.commit.assert_called_once()
+
+    def test_low_confidence_correct_prediction_learns_more(self, service):
+        """Test the low confidence multiplier applies to correct predictions"""
+        learned, staged, _ = learn(service, {}, ['invoice', 'amount', 'due'], predicted=INVOICES, confidence=0.4)
+
+        assert staged[(INVOICES, 'invoice')]['weight'] == pytest.approx(1.2 * 1.5)
+
+    def test_weights_are_clamped(self, service):
+        """Test learned weights never exceed ml_max_weight"""
+        learned, staged, _ = learn(service, {'invoice': {INVOICES: 9.5}}, ['invoice', 'amount', 'due'])
+
+        assert staged[(INVOICES, 'invoice')]['weight'] == 10.0
+
+    def test_wrong_prediction_penalizes_and_boosts(self, service):
+        """Test a confident wrong prediction lowers the wrong category and boosts the right one"""
+        weights = {
+            'invoice': {CONTRACTS: 1.0},
+            'amount': {CONTRACTS: 0.2},
+        }
+
+        learned, staged, _ = learn(service, weights, ['invoice', 'amount', 'due'], predicted=CONTRACTS, confidence=0.9)
+
+        # Penalty 0.3, clamped at ml_min_weight 0.1
+        assert staged[(CONTRACTS, 'invoice')] == {'weight': pytest.approx(0.7), 'matched': False}
+        assert staged[(CONTRACTS, 'amount')] == {'weight': pytest.approx(0.1), 'matched': False}
+        # (primary 1.0 + wrong boost 0.5) * high confidence multiplier 1.3
+        assert staged[(INVOICES, 'due')]['weight'] == pytest.approx(1.95)
+
+    def test_differential_preservation(self, service):
+        """Test the primary weight is lifted to keep ml_min_weight_differential over other categories"""
+        service._config_cache['ml_learning_rate'] = 0.1
+        weights = {'invoice': {INVOICES: 1.9, RECEIPTS: 2.0}}
+
+        learned, staged, _ = learn(service, weights, ['invoice', 'amount', 'due'])
+
+        # 1.9 + 0.1 = 2.0 would tie with RECEIPTS; lifted to 2.0 + 0.3
+        assert staged[(INVOICES, 'invoice')] == {'weight': pytest.approx(2.3), 'matched': True}
+        assert (RECEIPTS, 'invoice') not in staged
+
+    def test_generic_and_foreign_keywords_are_not_learned(self, service):
+        """Test keywords in 3+ other categories or much stronger elsewhere are skipped"""
+        weights = {
+            'date': {CONTRACTS: 1.0, RECEIPTS: 1.0, LETTERS: 1.0},
+            'signature': {CONTRACTS: 5.0},
+        }
+
+        learned, staged, _ = learn(service, weights, ['date', 'signature', 'invoice', 'amount'])
+
+        assert set(staged) == {(INVOICES, 'invoice'), (INVOICES, 'amount')}
+
+    def test_too_few_keywords(self, service):
+        """Test nothing is learned below ml_min_keywords_required quality keywords"""
+        learned, staged, session = learn(service, {}, ['invoice', 'the', 'ab'])
+
+        assert learned is False
+        assert staged == {}
+        session.commit.assert_not_called()
+
+
+class TestPersistKeywordUpdates:
+    """Test suite for the single upsert"""
+
+    def test_one_sorted_upsert_with_server_side_match_count(self, service):
+        """Test updates become one INSERT ... ON CONFLICT in lock order with match_count incremented in SQL"""
+        session = Mock()
+        updates = {
+            (RECEIPTS, 'total'): {'weight': 1.0, 'matched': True},
+            (INVOICES, 'vat'): {'weight': 0.5, 'matched': False},
+            (INVOICES, 'amount'): {'weight': 2.0, 'matched': True},
+        }
+
+        service._persist_keyword_updates(updates, 'en', session)
+
+        [statement] = [call.args[0] for call in session.execute.call_args_list]
+        compiled = statement.compile(dialect=postgresql.dialect())
+        sql = str(compiled)
+        assert 'ON CONFLICT (category_id, keyword, language_code) DO UPDATE' in sql
+        assert 'match_count = (category_keywords.match_count + excluded.match_count)' in sql
+
+        rows = [
+            (compiled.params[f'category_id_m{i}'], compiled.params[f'keyword_m{i}'], compiled.params[f'match_count_m{i}'])
+            for i in range(3)
+        ]
+        assert rows == [(INVOICES, 'amount', 1), (INVOICES, 'vat', 0), (RECEIPTS, 'total', 1)]
+
+    def test_nothing_to_write(self, service):
+        """Test no statement is issued without updates"""
+        session = Mock()
+
+        service._persist_keyword_updates({}, 'en', session)
+
+        session.execute.assert_not_called()
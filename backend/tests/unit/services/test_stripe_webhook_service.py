@@ -0,0 +1,203 @@
+"""
+Unit tests for background Stripe webhook processing
+
+The database is replaced by an in-memory event table; the tests cover the
+per-customer ordering, claim/record and retry logic of StripeWebhookService.
+"""
+import asyncio
+from copy import copy
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from unittest.mock import patch
+
+import pytest
+
+from app.services.stripe_webhook_service import (
+    EventStatusWriteError, StripeWebhookService, due_events
+)
+
+
+@dataclass
+class FakeEvent:
+    id: str
+    customer_key: str = 'cus_1'
+    event_type: str = 'invoice.payment_succeeded'
+    status: str = 'pending'
+    attempts: int = 0
+    next_attempt_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    processed_at: Optional[datetime] = None
+
+
+class InMemoryWebhookService(StripeWebhookService):
+    """StripeWebhookService on an in-memory event table (insertion order = Stripe order)"""
+
+    def __init__(self, events, handler, max_attempts=3, retry_seconds=60, batch_size=20):
+        self.async_enabled = True
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.events = {event.id: event for event in events}
+        self.handler = handler
+        self.fail_record = False
+
+    def _load_due_events(self, customer_key):
+        rows = [
+            event for event in self.events.values()
+            if event.customer_key == customer_key and event.status in ('pending', 'failed', 'processing')
+        ][:self.batch_size]
+        return [copy(event) for event in due_events(rows, datetime.now(timezone.utc))]
+
+    def _get_handler(self):
+        return self.handler
+
+    @staticmethod
+    def _build_event(row):
+        return row.id
+
+    def _claim(self, row):
+        stored = self.events[row.id]
+        if stored.status != row.status or stored.attempts != row.attempts:
+            return False
+        stored.status = 'processing'
+        stored.attempts += 1
+        return True
+
+    def _record(self, session, event_id, values):
+        if self.fail_record:
+            raise EventStatusWriteError(f"Could not record status of event {event_id}")
+        for key, value in values.items():
+            setattr(self.events[event_id], key, value)
+
+
+class RecordingHandler:
+    """Event handler that records calls and fails for selected event IDs"""
+
+    def __init__(self, failing=()):
+        self.calls = []
+        self.failing = set(failing)
+
+    async def __call__(self, event_id, session):
+        self.calls.append(event_id)
+        if event_id in self.failing:
+            raise RuntimeError(f"handler failed for {event_id}")
+        return []
+
+
+def drain(service, customer_key='cus_1'):
+    with patch('app.services.stripe_webhook_service.db_manager'):
+        return asyncio.run(service._drain(customer_key))
+
+
+class TestStripeWebhookProcessing:
+    """Test suite for StripeWebhookService event processing"""
+
+    def test_processes_customer_events_in_order(self):
+        """Test events of one customer run in stored order and only that customer's"""
+        handler = RecordingHandler()
+        events = [FakeEvent('evt_1'), FakeEvent('evt_other', customer_key='cus_2'), FakeEvent('evt_2'), FakeEvent('evt_3')]
+        service = InMemoryWebhookService(events, handler, batch_size=2)
+
+        summary = drain(service)
+
+        assert handler.calls == ['evt_1', 'evt_2', 'evt_3']
+        assert summary == {'processed': 3, 'failed': 0, 'skipped': 0}
+        assert all(service.events[e].status == 'processed' for e in ('evt_1', 'evt_2', 'evt_3'))
+        assert service.events['evt_other'].status == 'pending'
+
+    def test_stops_at_first_failure_with_backoff(self):
+        """Test a failed event blocks later events and is scheduled with exponential backoff"""
+        handler = RecordingHandler(failing={'evt_2'})
+        service = InMemoryWebhookService(
+            [FakeEvent('evt_1'), FakeEvent('evt_2', status='failed', attempts=2), FakeEvent('evt_3')],
+            handler, max_attempts=5, retry_seconds=60
+        )
+
+        before = datetime.now(timezone.utc)
+        summary = drain(service)
+
+        failed = service.events['evt_2']
+        assert handler.calls == ['evt_1', 'evt_2']
+        assert summary['failed'] == 1
+        assert failed.status == 'failed'
+        assert failed.attempts == 3
+        assert 'handler failed' in failed.last_error
+        # Third attempt failed: 60s * 2^2
+        assert before + timedelta(seconds=240) <= failed.next_attempt_at <= datetime.now(timezone.utc) + timedelta(seconds=240)
+        assert service.events['evt_3'].status == 'pending'
+
+        # Not due yet: a second run does nothing
+        assert drain(service) == {'processed': 0, 'failed': 0, 'skipped': 0}
+        assert handler.calls == ['evt_1', 'evt_2']
+
+    def test_gives_up_after_max_attempts(self):
+        """Test an event becomes 'dead' on its last attempt and no longer blocks the customer"""
+        handler = RecordingHandler(failing={'evt_1'})
+        service = InMemoryWebhookService(
+            [FakeEvent('evt_1', status='failed', attempts=2), FakeEvent('evt_2')],
+            handler, max_attempts=3
+        )
+
+        summary = drain(service)
+
+        assert service.events['evt_1'].status == 'dead'
+        assert service.events['evt_1'].next_attempt_at is None
+        assert service.events['evt_2'].status == 'processed'
+        assert summary == {'processed': 1, 'failed': 0, 'skipped': 0}
+
+    def test_successful_handler_is_not_run_again(self):
+        """Test a failed status write stops processing and the claimed event is not re-run"""
+        handler = RecordingHandler()
+        service = InMemoryWebhookService([FakeEvent('evt_1'), FakeEvent('evt_2')], handler)
+        service.fail_record = True
+
+        with pytest.raises(EventStatusWriteError):
+            drain(service)
+        assert handler.calls == ['evt_1']
+        assert service.events['evt_1'].status == 'processing'
+
+        # The claimed event blocks the customer until its lease expires
+        service.fail_record = False
+        assert drain(service) == {'processed': 0, 'failed': 0, 'skipped': 0}
+        assert handler.calls == ['evt_1']
+
+    def test_waits_for_spawned_tasks_only(self):
+        """Test the worker awaits the handler's own background tasks, not unrelated ones"""
+        done = []
+
+        async def send_email():
+            await asyncio.sleep(0)
+            done.append('email')
+
+        async def handler(event_id, session):
+            return [asyncio.create_task(send_email())]
+
+        async def run():
+            unrelated = asyncio.create_task(asyncio.sleep(3600))
+            try:
+                await asyncio.wait_for(StripeWebhookService._run_handler(handler, 'evt_1', None), timeout=1)
+            finally:
+                unrelated.cancel()
+
+        asyncio.run(run())
+        assert done == ['email']
+
+
+class TestDueEvents:
+    """Test suite for due_events"""
+
+    def test_stops_at_processing_and_waiting_events(self):
+        """Test leading events are due up to a claimed or not yet due event"""
+        now = datetime.now(timezone.utc)
+        due_later = FakeEvent('evt_3', status='failed', next_attempt_at=now + timedelta(minutes=1))
+        due_now = FakeEvent('evt_2', status='failed', next_attempt_at=now - timedelta(minutes=1))
+
+        assert [e.id for e in due_events([FakeEvent('evt_1'), due_now, due_later, FakeEvent('evt_4')], now)] == ['evt_1', 'evt_2']
+        assert due_events([FakeEvent('evt_1', status='processing'), FakeEvent('evt_2')], now) == []
+
+    def test_retry_delay_doubles(self):
+        """Test backoff doubles per failed attempt"""
+        service = InMemoryWebhookService([], RecordingHandler(), retry_seconds=30)
+
+        assert [service.retry_delay(n).total_seconds() for n in (1, 2, 3)] == [30, 60, 120]
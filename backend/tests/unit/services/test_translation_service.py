@@ -0,0 +1,179 @@
+"""
+Unit tests for TranslationService batching, caching and provider fallback
+
+Provider APIs are replaced by an httpx.MockTransport.
+"""
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from app.services.translation_service import TranslationService, _text_hash
+
+DEEPL_URL = "https://deepl.test/v2/translate"
+LIBRE_URL = "http://libre.test"
+
+
+def translation_settings(**overrides):
+    config = dict(
+        translation_provider="libretranslate",
+        translation_libretranslate_url=LIBRE_URL,
+        translation_deepl_api_key="deepl-key",
+        translation_deepl_url=DEEPL_URL,
+        translation_force_provider=None,
+        translation_timeout=5,
+        translation_cache_enabled=False,
+        translation_memory_cache_size=100,
+        translation_max_concurrency=4,
+        translation_deepl_batch_size=50,
+        translation_mock=False
+    )
+    config.update(overrides)
+    return SimpleNamespace(translation=SimpleNamespace(**config))
+
+
+class FakeProviders:
+    """MockTransport handler answering LibreTranslate and DeepL requests"""
+
+    def __init__(self, deepl_status=200, latency=0.0):
+        self.deepl_status = deepl_status
+        self.latency = latency
+        self.requests = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.latency)
+        if request.url.host == 'deepl.test':
+            form = parse_qs(request.content.decode())
+            self.requests.append(('deepl', form['text']))
+            if self.deepl_status != 200:
+                return httpx.Response(self.deepl_status, json={'message': 'unavailable'})
+            target = form['target_lang'][0].lower()
+            return httpx.Response(200, json={'translations': [{'text': f"deepl:{target}:{t}"} for t in form['text']]})
+
+        payload = json.loads(request.content)
+        self.requests.append(('libretranslate', [payload['q']]))
+        return httpx.Response(200, json={'translatedText': f"libre:{payload['target']}:{payload['q']}"})
+
+
+@pytest.fixture
+def config():
+    settings = translation_settings()
+    with patch('app.services.translation_service.settings', settings):
+        yield settings
+
+
+def make_service(providers):
+    return TranslationService(transport=httpx.MockTransport(providers), persistent_cache=False)
+
+
+class TestTranslationService:
+    """Test suite for TranslationService"""
+
+    def test_identical_texts_in_flight_are_coalesced(self, config):
+        """Test concurrent requests for the same text share one provider call"""
+        providers = FakeProviders(latency=0.05)
+        service = make_service(providers)
+
+        async def scenario():
+            return await asyncio.gather(
+                service.translate_batch(['Rechnung', 'Vertrag'], 'de', 'en'),
+                service.translate_batch(['Rechnung'], 'de', 'en')
+            )
+
+        first, second = asyncio.run(scenario())
+
+        assert first == {'Rechnung': 'libre:en:Rechnung', 'Vertrag': 'libre:en:Vertrag'}
+        assert second == {'Rechnung': 'libre:en:Rechnung'}
+        assert sorted(text for _, texts in providers.requests for text in texts) == ['Rechnung', 'Vertrag']
+
+    def test_memory_cache_is_keyed_by_language_pair(self, config):
+        """Test cached texts are not requested again, other target languages are"""
+        providers = FakeProviders()
+        service = make_service(providers)
+
+        async def scenario():
+            await service.translate_batch(['Rechnung'], 'de', 'en')
+            cached = await service.translate_batch(['Rechnung'], 'de', 'en')
+            other_target = await service.translate_batch(['Rechnung'], 'de', 'fr')
+            return cached, other_target
+
+        cached, other_target = asyncio.run(scenario())
+
+        assert cached == {'Rechnung': 'libre:en:Rechnung'}
+        assert other_target == {'Rechnung': 'libre:fr:Rechnung'}
+        assert len(providers.requests) == 2
+        assert ('libretranslate', 'de', 'en', _text_hash('Rechnung')) in service._memory_cache
+
+    def test_deepl_batches_texts(self, config):
+        """Test paid users get one DeepL request per batch of texts"""
+        providers = FakeProviders()
+        service = make_service(providers)
+
+        results = asyncio.run(service.translate_batch(['Rechnung', 'Vertrag', 'Rechnung'], 'de', 'en', user_tier='paid'))
+
+        assert results == {'Rechnung': 'deepl:en:Rechnung', 'Vertrag': 'deepl:en:Vertrag'}
+        assert providers.requests == [('deepl', ['Rechnung', 'Vertrag'])]
+
+    def test_fallback_results_are_cached_under_fallback_provider(self, config):
+        """Test LibreTranslate fallbacks are not served as DeepL results later"""
+        providers = FakeProviders(deepl_status=503)
+        service = make_service(providers)
+
+        async def scenario():
+            first = await service.translate_batch(['Rechnung'], 'de', 'en', user_tier='paid')
+            providers.deepl_status = 200
+            second = await service.translate_batch(['Rechnung'], 'de', 'en', user_tier='paid')
+            return first, second
+
+        first, second = asyncio.run(scenario())
+
+        assert first == {'Rechnung': 'libre:en:Rechnung'}
+        assert second == {'Rechnung': 'deepl:en:Rechnung'}
+        text_hash = _text_hash('Rechnung')
+        assert service._memory_cache[('libretranslate', 'de', 'en', text_hash)] == 'libre:en:Rechnung'
+        assert service._memory_cache[('deepl', 'de', 'en', text_hash)] == 'deepl:en:Rechnung'
+
+    def test_persistent_cache_runs_off_the_event_loop(self, config):
+        """Test translation_cache lookups and writes run in worker threads"""
+        service = TranslationService(transport=httpx.MockTransport(FakeProviders()), persistent_cache=True)
+        threads = []
+
+        def load_cached(keys):
+            threads.append(threading.current_thread())
+            return {}
+
+        def store_cached(entries):
+            threads.append(threading.current_thread())
+
+        with patch.object(service, '_load_cached', side_effect=load_cached), \
+                patch.object(service, '_store_cached', side_effect=store_cached):
+            asyncio.run(service.translate_batch(['Rechnung'], 'de', 'en'))
+
+        assert len(threads) == 2
+        assert all(thread is not threading.main_thread() for thread in threads)
+
+    def test_client_of_previous_loop_is_closed(self, config):
+        """Test a new event loop (e.g. the next Celery task) closes the previous loop's client"""
+        service = make_service(FakeProviders())
+
+        async def translate():
+            await service.translate_batch(['Rechnung'], 'de', 'en')
+            return service._state.client
+
+        first_client = asyncio.run(translate())
+        service._memory_cache.clear()
+
+        async def next_task():
+            client = await translate()
+            await asyncio.sleep(0)
+            return client
+
+        second_client = asyncio.run(next_task())
+
+        assert first_client is not second_client
+        assert first_client.is_closed
@@ -0,0 +1,3 @@
+"""
+Utility module unit tests
+"""
@@ -0,0 +1,88 @@
+"""
+Unit tests for IMAP protocol helpers
+"""
+from app.utils.imap_utils import (
+    AttachmentPart, parse_fetch_response, find_attachment_parts, decode_part_payload
+)
+
+
+MIXED_BODYSTRUCTURE = (
+    b' BODYSTRUCTURE (("text" "plain" ("charset" "utf-8") NIL NIL "7bit" 12 1 NIL NIL NIL NIL)'
+    b'("application" "pdf" ("name" "invoice.pdf") NIL NIL "base64" 4000 NIL ("attachment" ("filename" "invoice.pdf")) NIL NIL)'
+    b'(("image" "png" NIL NIL NIL "base64" 800 NIL ("inline" ("filename*" "utf-8\'\'b%C3%A4r.png")) NIL NIL) "related" ("boundary" "zz") NIL NIL)'
+    b' "mixed" ("boundary" "yy") NIL NIL NIL))'
+)
+
+
+class TestParseFetchResponse:
+    """Test suite for parse_fetch_response"""
+
+    def test_parses_literals_and_bodystructure(self):
+        """Test header literal and BODYSTRUCTURE are keyed by UID"""
+        data = [
+            (b'1 (UID 17 BODY[HEADER.FIELDS (FROM TO)] {40}', b'From: a@b.c\r\nTo: x@doc.bonidoc.com\r\n\r\n'),
+            MIXED_BODYSTRUCTURE,
+        ]
+        messages = parse_fetch_response(data)
+
+        assert list(messages.keys()) == [17]
+        assert messages[17]['BODY[HEADER.FIELDS (FROM TO)]'].startswith(b'From: a@b.c')
+        assert isinstance(messages[17]['BODYSTRUCTURE'], list)
+
+    def test_parses_multiple_messages(self):
+        """Test batched responses for several UIDs"""
+        data = [
+            (b'1 (UID 5 BODY[2] {8}', b'aGVsbG8='), b')',
+            (b'2 (UID 9 BODY[2] {4}', b'abcd'), b')',
+        ]
+        messages = parse_fetch_response(data)
+
+        assert messages[5]['BODY[2]'] == b'aGVsbG8='
+        assert messages[9]['BODY[2]'] == b'abcd'
+
+    def test_peek_suffix_is_normalized(self):
+        """Test BODY.PEEK keys map to BODY keys"""
+        messages = parse_fetch_response([b'1 (UID 3 BODY.PEEK[1] "x")'])
+        assert messages[3]['BODY[1]'] == b'x'
+
+
+class TestFindAttachmentParts:
+    """Test suite for find_attachment_parts"""
+
+    def test_nested_multipart_sections(self):
+        """Test section numbering and RFC 2231 filenames in nested multiparts"""
+        structure = parse_fetch_response([b'1 (UID 1' + MIXED_BODYSTRUCTURE])[1]['BODYSTRUCTURE']
+        parts = find_attachment_parts(structure)
+
+        assert [part.section for part in parts] == ['2', '3.1']
+        assert parts[0].filename == 'invoice.pdf'
+        assert parts[0].content_type == 'application/pdf'
+        assert parts[1].filename == 'bär.png'
+
+    def test_single_part_message(self):
+        """Test a message whose whole body is the attachment"""
+        structure = [b'application', b'pdf', None, None, None, b'base64', b'100', None,
+                     [b'attachment', [b'filename', b'a.pdf']], None]
+        parts = find_attachment_parts(structure)
+
+        assert parts == [AttachmentPart('1', 'a.pdf', 'application/pdf', 'base64', 100)]
+
+    def test_parts_without_disposition_are_ignored(self):
+        """Test body text is not treated as an attachment"""
+        structure = [b'text', b'plain', [b'charset', b'utf-8'], None, None, b'7bit', b'12', b'1']
+        assert find_attachment_parts(structure) == []
+
+    def test_estimated_size_for_base64(self):
+        """Test decoded size estimate accounts for base64 overhead"""
+        assert AttachmentPart('1', 'a', 'x/y', 'base64', 4000).estimated_size == 3000
+        assert AttachmentPart('1', 'a', 'x/y', '7bit', 4000).estimated_size == 4000
+
+
+class TestDecodePartPayload:
+    """Test suite for decode_part_payload"""
+
+    def test_decodes_transfer_encodings(self):
+        """Test base64, quoted-printable and raw payloads"""
+        assert decode_part_payload(b'aGVs\r\nbG8=', 'base64') == b'hello'
+        assert decode_part_payload(b'caf=C3=A9', 'quoted-printable') == 'café'.encode()
+        assert decode_part_payload(b'raw', '7bit') == b'raw'
@@ -0,0 +1,71 @@
+"""
+Unit tests for language detection sampling helpers
+"""
+from app.utils.language_sampling import (
+    language_shares, pick_evenly, sample_windows, split_segments, text_fingerprint
+)
+
+
+class TestSampleWindows:
+    """Test suite for sample_windows"""
+
+    def test_short_text_is_returned_whole(self):
+        """Test texts within the budget are only whitespace-normalized"""
+        assert sample_windows("Guten\n Tag,\tHerr   Müller", 100) == "Guten Tag, Herr Müller"
+
+    def test_long_text_is_bounded_and_covers_head_middle_tail(self):
+        """Test long texts are reduced to windows from start, middle and end"""
+        text = ' '.join(['kopf'] * 500 + ['mitte'] * 500 + ['ende'] * 500)
+
+        sample = sample_windows(text, 300)
+
+        assert len(sample) <= 302
+        assert sample.startswith('kopf')
+        assert 'mitte' in sample
+        assert sample.endswith('ende')
+
+    def test_windows_are_cut_at_word_boundaries(self):
+        """Test no partial words are produced at window edges"""
+        text = ' '.join(['abcdefg'] * 1000)
+
+        assert set(sample_windows(text, 200).split()) == {'abcdefg'}
+
+
+class TestSplitSegments:
+    """Test suite for split_segments and pick_evenly"""
+
+    def test_pick_evenly_keeps_first_and_last(self):
+        """Test picks are spread over the whole sequence"""
+        assert pick_evenly(range(100), 3) == [0, 49, 99]
+        assert pick_evenly([1, 2], 5) == [1, 2]
+
+    def test_segment_count_is_capped(self):
+        """Test long documents are checked on at most max_segments segments"""
+        text = 'wort ' * 20000
+
+        segments = split_segments(text, 1000, 12)
+
+        assert len(segments) == 12
+        assert all(len(segment) <= 1000 for segment in segments)
+
+    def test_empty_text_has_no_segments(self):
+        assert split_segments(' \n ', 1000, 12) == []
+
+
+class TestLanguageShares:
+    """Test suite for language_shares"""
+
+    def test_shares_by_characters(self):
+        """Test shares are weighted by text length and pages without result ignored"""
+        shares = language_shares([('de', 3000), ('en', 1000), (None, 500), ('de', 0)])
+
+        assert shares == [('de', 0.75), ('en', 0.25)]
+
+    def test_no_detections(self):
+        assert language_shares([(None, 100)]) == []
+
+
+def test_fingerprint_is_stable():
+    """Test equal texts share a cache key and different texts don't"""
+    assert text_fingerprint('Rechnung') == text_fingerprint('Rechnung')
+    assert text_fingerprint('Rechnung') != text_fingerprint('Invoice')
@@ -0,0 +1,108 @@
+"""
+Unit tests for logging primitives
+"""
+import logging
+import queue
+
+from app.utils.log_utils import (
+    DeferredQueueHandler, SamplingFilter, parse_level_overrides, start_queue_logging
+)
+
+
+def _record(msg, level=logging.DEBUG, args=None, name='app.test'):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+class TestParseLevelOverrides:
+    """Test suite for parse_level_overrides"""
+
+    def test_parses_pairs(self):
+        """Test names and level names are parsed, whitespace and case ignored"""
+        overrides = parse_level_overrides(" app.services=debug , app.tasks=WARNING")
+        assert overrides == {'app.services': logging.DEBUG, 'app.tasks': logging.WARNING}
+
+    def test_skips_invalid_entries(self):
+        """Test unknown levels and incomplete entries are ignored"""
+        assert parse_level_overrides("app=LOUD,=INFO,app.x,") == {}
+        assert parse_level_overrides("") == {}
+
+
+class TestSamplingFilter:
+    """Test suite for SamplingFilter"""
+
+    def test_burst_then_sampling(self):
+        """Test the first records pass, later ones are sampled"""
+        sampling = SamplingFilter(burst=3, interval=60, sample_every=5, clock=lambda: 0.0)
+        passed = [sampling.filter(_record("score=%s")) for _ in range(13)]
+        assert passed[:3] == [True, True, True]
+        assert passed[3:] == [False, False, False, False, True, False, False, False, False, True]
+
+    def test_templates_are_independent(self):
+        """Test each message template has its own budget"""
+        sampling = SamplingFilter(burst=1, interval=60, sample_every=0, clock=lambda: 0.0)
+        assert sampling.filter(_record("a=%s"))
+        assert not sampling.filter(_record("a=%s"))
+        assert sampling.filter(_record("b=%s"))
+
+    def test_new_interval_reports_suppressed(self):
+        """Test the budget resets after the interval and the drop count is reported"""
+        now = [0.0]
+        sampling = SamplingFilter(burst=1, interval=10, sample_every=0, clock=lambda: now[0])
+        sampling.filter(_record("a=%s"))
+        sampling.filter(_record("a=%s"))
+        sampling.filter(_record("a=%s"))
+
+        now[0] = 11.0
+        record = _record("a=%s", args=(1,))
+        assert sampling.filter(record)
+        assert record.getMessage() == "a=1 [2 similar suppressed]"
+
+    def test_higher_levels_always_pass(self):
+        """Test records above max_level are never sampled"""
+        sampling = SamplingFilter(burst=0, interval=60, sample_every=0, clock=lambda: 0.0)
+        assert not sampling.filter(_record("x"))
+        assert sampling.filter(_record("x", level=logging.INFO))
+
+
+class TestDeferredQueueHandler:
+    """Test suite for DeferredQueueHandler"""
+
+    def test_merges_args_without_formatting(self):
+        """Test the message is merged but not line-formatted"""
+        handler = DeferredQueueHandler(queue.Queue())
+        handler.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+        handler.handle(_record("value=%s", level=logging.INFO, args=([1, 2],)))
+
+        record = handler.queue.get_nowait()
+        assert record.msg == "value=[1, 2]"
+        assert record.args is None
+
+    def test_drops_when_full(self):
+        """Test a full queue drops records instead of blocking"""
+        handler = DeferredQueueHandler(queue.Queue(maxsize=1))
+        handler.handle(_record("one", level=logging.INFO))
+        handler.handle(_record("two", level=logging.INFO))
+        assert handler.dropped == 1
+
+    def test_listener_delivers_records(self):
+        """Test records reach the original handler through the listener thread"""
+        received = []
+
+        class ListHandler(logging.Handler):
+            def emit(self, record):
+                received.append(self.format(record))
+
+        logger = logging.getLogger('test_log_utils.listener')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        target = ListHandler()
+        logger.addHandler(target)
+
+        queue_handler, listener = start_queue_logging([target], logger=logger)
+        try:
+            logger.info("hello %s", "world")
+        finally:
+            listener.stop()
+            logger.removeHandler(queue_handler)
+
+        assert received == ["hello world"]
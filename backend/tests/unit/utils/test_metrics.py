@@ -0,0 +1,131 @@
+"""
+Unit tests for histogram metrics primitives
+"""
+import os
+import threading
+import time
+
+from app.utils.metrics import (
+    LatencyHistogram, MetricsRegistry, histogram_percentile, render_prometheus
+)
+
+
+class TestLatencyHistogram:
+    """Test suite for LatencyHistogram"""
+
+    def test_records_into_buckets(self):
+        """Test values land in the first bucket whose bound is >= value"""
+        histogram = LatencyHistogram(bounds=(10, 100))
+        for value in (5, 10, 50, 1000):
+            histogram.record(value)
+
+        snapshot = histogram.snapshot()
+        assert snapshot['counts'] == [2, 1, 1]
+        assert snapshot['sum'] == 1065
+
+    def test_sums_thread_shards(self):
+        """Test observations from several threads are all counted"""
+        histogram = LatencyHistogram(bounds=(10,))
+
+        def worker():
+            for _ in range(1000):
+                histogram.record(1)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert histogram.snapshot()['counts'] == [4000, 0]
+
+    def test_percentile_interpolates(self):
+        """Test percentile estimates stay within the containing bucket"""
+        bounds = (10, 20, 30)
+        snapshot = {'counts': [90, 9, 1, 0], 'sum': 0}
+
+        assert histogram_percentile(snapshot, 0.5, bounds) <= 10
+        assert 10 <= histogram_percentile(snapshot, 0.95, bounds) <= 20
+        assert histogram_percentile({'counts': [], 'sum': 0}, 0.99, bounds) == 0.0
+
+
+class TestMetricsRegistry:
+    """Test suite for MetricsRegistry"""
+
+    def test_collect_merges_worker_snapshots(self, tmp_path):
+        """Test snapshot files of other workers are summed into the result"""
+        other = MetricsRegistry(bounds=(10, 100))
+        other.observe('latency_ms', 5, route='/a')
+        other.increment('requests_total', route='/a')
+        other.flush(str(tmp_path), worker_id='other')
+
+        local = MetricsRegistry(bounds=(10, 100))
+        local.observe('latency_ms', 50, route='/a')
+        local.increment('requests_total', route='/a')
+
+        merged = local.collect(str(tmp_path))
+
+        assert merged['histograms'][0]['counts'] == [1, 1, 0]
+        assert merged['counters'][0]['value'] == 2
+
+    def test_render_prometheus(self):
+        """Test exposition output uses cumulative buckets in seconds"""
+        registry = MetricsRegistry(bounds=(10, 100))
+        registry.describe('latency_ms', 'Request latency')
+        registry.observe('latency_ms', 5, route='/a')
+        registry.observe('latency_ms', 50, route='/a')
+
+        text = render_prometheus(registry.snapshot())
+
+        assert '# TYPE bonifatus_latency_seconds histogram' in text
+        assert 'bonifatus_latency_seconds_bucket{le="0.01",route="/a"} 1' in text
+        assert 'bonifatus_latency_seconds_bucket{le="+Inf",route="/a"} 2' in text
+        assert 'bonifatus_latency_seconds_count{route="/a"} 2' in text
+
+    def test_gauges_are_summed_across_workers(self, tmp_path):
+        """Test gauges from worker snapshots add up and render as gauge type"""
+        other = MetricsRegistry()
+        other.set_gauge('queue_depth', 3)
+        other.flush(str(tmp_path), worker_id='other')
+
+        local = MetricsRegistry()
+        local.set_gauge('queue_depth', 2)
+
+        merged = local.collect(str(tmp_path))
+
+        assert merged['gauges'] == [{'name': 'queue_depth', 'labels': {}, 'value': 5}]
+        assert '# TYPE bonifatus_queue_depth gauge' in render_prometheus(merged)
+
+    def test_collect_keeps_live_workers_and_drops_dead_ones(self, tmp_path):
+        """Test an idle live worker's old file is kept and a dead worker's file is removed"""
+        live = MetricsRegistry()
+        live.increment('requests_total', 3)
+        live.flush(str(tmp_path), worker_id=str(os.getppid()))
+        live_path = tmp_path / f"worker-{os.getppid()}.json"
+        os.utime(live_path, (time.time() - 3600, time.time() - 3600))
+
+        dead = MetricsRegistry()
+        dead.increment('requests_total', 5)
+        dead.flush(str(tmp_path), worker_id='99999999')
+
+        merged = MetricsRegistry().collect(str(tmp_path), max_age_seconds=60)
+
+        assert merged['counters'][0]['value'] == 3
+        assert live_path.exists()
+        assert not (tmp_path / 'worker-99999999.json').exists()
+
+    def test_increments_from_threads_are_all_counted(self):
+        """Test concurrent counter increments are not lost"""
+        registry = MetricsRegistry()
+
+        def worker():
+            for _ in range(10000):
+                registry.increment('requests_total')
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert registry.snapshot()['counters'][0]['value'] == 80000
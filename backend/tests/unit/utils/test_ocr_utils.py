@@ -0,0 +1,168 @@
+"""
+Unit tests for OCR result helpers
+"""
+from app.utils.ocr_utils import (
+    CHAIN_BILATERAL, CHAIN_NLMEANS, CHAIN_NONE, TSV_COLUMNS, OCRResult, OCRWord,
+    choose_preprocessing, classify_page_structure, finish_text_quality, looks_rotated,
+    needs_orientation_check, parse_ocr_data, parse_tsv, prescreen_text_quality
+)
+
+
+def _data(rows):
+    """Build an image_to_data style column dict from (level, block, par, line, conf, text, w, h) rows"""
+    columns = {name: [] for name in (
+        'level', 'block_num', 'par_num', 'line_num', 'conf', 'text', 'left', 'top', 'width', 'height'
+    )}
+    for level, block, par, line, conf, text, width, height in rows:
+        columns['level'].append(level)
+        columns['block_num'].append(block)
+        columns['par_num'].append(par)
+        columns['line_num'].append(line)
+        columns['conf'].append(conf)
+        columns['text'].append(text)
+        columns['left'].append(0)
+        columns['top'].append(0)
+        columns['width'].append(width)
+        columns['height'].append(height)
+    return columns
+
+
+def _word(text, width=40, height=12, confidence=90.0):
+    return OCRWord(text, confidence, 0, 0, width, height, 1, 1, 1)
+
+
+class TestParseOcrData:
+    """Test suite for parse_ocr_data"""
+
+    def test_rebuilds_text_layout(self):
+        """Test words, lines and paragraphs are joined like Tesseract's text output"""
+        data = _data([
+            (4, 1, 1, 1, '-1', '', 100, 12),
+            (5, 1, 1, 1, '90', 'Invoice', 40, 12),
+            (5, 1, 1, 1, '80', 'No.', 20, 12),
+            (5, 1, 1, 2, '70', '42', 15, 12),
+            (5, 2, 1, 1, '60', 'Total', 30, 12),
+            (5, 2, 1, 1, '-1', ' ', 5, 12),
+        ])
+        result = parse_ocr_data(data)
+
+        assert result.text == "Invoice No.\n42\n\nTotal"
+        assert len(result.words) == 4
+        assert abs(result.confidence - 0.75) < 1e-9
+
+    def test_ignores_non_positive_confidence(self):
+        """Test words with confidence <= 0 are kept in text but not averaged"""
+        data = _data([
+            (5, 1, 1, 1, '0', 'x', 5, 12),
+            (5, 1, 1, 1, '96.5', 'Betrag', 40, 12),
+        ])
+        result = parse_ocr_data(data)
+        assert result.text == "x Betrag"
+        assert abs(result.confidence - 0.965) < 1e-9
+
+    def test_empty_result(self):
+        """Test an empty page yields empty text and zero confidence"""
+        result = parse_ocr_data(_data([]))
+        assert result.text == ""
+        assert result.confidence == 0.0
+
+    def test_tsv_roundtrip(self):
+        """Test TSV output parses to the same columns as the dict output"""
+        tsv = (
+            "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext\n"
+            "5\t1\t1\t1\t1\t1\t10\t10\t40\t12\t91\tHello\n"
+            "5\t1\t1\t1\t1\t2\t60\t10\t40\t12\t89\tWorld\n"
+        )
+        result = parse_ocr_data(parse_tsv(tsv))
+        assert result.text == "Hello World"
+        assert abs(result.confidence - 0.9) < 1e-9
+
+        # Engine API output comes without the header row
+        rows = tsv.split('\n', 1)[1]
+        assert parse_ocr_data(parse_tsv(rows, header=TSV_COLUMNS)).text == "Hello World"
+
+
+class TestOrientationCheck:
+    """Test suite for needs_orientation_check"""
+
+    def test_confident_upright_page_skips_osd(self):
+        """Test a confident page with enough wide words needs no OSD"""
+        result = OCRResult(text="", confidence=0.9, words=[_word("word") for _ in range(10)])
+        assert not needs_orientation_check(result, min_confidence=0.6, min_words=8)
+
+    def test_low_confidence_or_few_words_runs_osd(self):
+        """Test low confidence or sparse text triggers OSD"""
+        words = [_word("word") for _ in range(10)]
+        assert needs_orientation_check(OCRResult("", 0.4, words), 0.6, 8)
+        assert needs_orientation_check(OCRResult("", 0.9, words[:3]), 0.6, 8)
+
+    def test_vertical_words_suggest_rotation(self):
+        """Test mostly tall word boxes are treated as a rotated page"""
+        tall = [_word("word", width=12, height=40) for _ in range(10)]
+        assert looks_rotated(tall)
+        assert needs_orientation_check(OCRResult("", 0.9, tall), 0.6, 8)
+
+
+class TestChoosePreprocessing:
+    """Test suite for choose_preprocessing"""
+
+    THRESHOLDS = dict(clean_noise=1.5, heavy_noise=4.0, min_contrast=0.45, clean_dpi=200, dpi=300)
+
+    def test_clean_page_skips_preprocessing_at_lower_dpi(self):
+        """Test a clean, contrasty page is rendered at the clean DPI without preprocessing"""
+        plan = choose_preprocessing(0.6, 0.9, **self.THRESHOLDS)
+        assert (plan.dpi, plan.chain) == (200, CHAIN_NONE)
+
+    def test_noise_levels_pick_chain(self):
+        """Test moderate noise gets the fast chain and heavy noise NL-means"""
+        assert choose_preprocessing(2.0, 0.9, **self.THRESHOLDS).chain == CHAIN_BILATERAL
+        plan = choose_preprocessing(6.0, 0.9, **self.THRESHOLDS)
+        assert (plan.dpi, plan.chain) == (300, CHAIN_NLMEANS)
+
+    def test_low_contrast_or_low_resolution_scan(self):
+        """Test faint pages and low-resolution scans get at least the fast chain"""
+        assert choose_preprocessing(0.5, 0.3, **self.THRESHOLDS).chain == CHAIN_BILATERAL
+        assert choose_preprocessing(0.5, 0.9, source_dpi=150, **self.THRESHOLDS).chain == CHAIN_BILATERAL
+        assert choose_preprocessing(0.5, 0.9, source_dpi=300, **self.THRESHOLDS).chain == CHAIN_NONE
+
+
+class TestClassifyPageStructure:
+    """Test suite for classify_page_structure"""
+
+    def test_native_and_scanned_pages(self):
+        """Test pages with fonts and text blocks are native, image-only pages scanned"""
+        assert not classify_page_structure(2, 12, 1500, 1).is_scanned
+        assert classify_page_structure(0, 0, 0, 1).is_scanned
+
+    def test_text_amount_decides_ambiguous_pages(self):
+        """Test pages without fonts are judged by the amount of embedded text"""
+        assert not classify_page_structure(0, 2, 250, 1).is_scanned
+        assert not classify_page_structure(0, 2, 120, 0).is_scanned
+        assert classify_page_structure(0, 2, 70, 0).is_scanned
+        assert classify_page_structure(1, 1, 20, 0).is_scanned
+
+
+class TestTextQuality:
+    """Test suite for prescreen_text_quality and finish_text_quality"""
+
+    TEXT = "Please transfer the invoice amount within fourteen days to the account below."
+
+    def test_prescreen_decides_short_or_garbled_text(self):
+        """Test short text, invalid characters and few words are scored without spell checking"""
+        assert prescreen_text_quality("abc")[0] == 0.0
+        score, _, sample = prescreen_text_quality("\u25a1\u25a1\u25a1\u25a1\u25a1\u25a1\u25a1\u25a1 ab")
+        assert score < 0.35 and not sample
+        score, metrics, _ = prescreen_text_quality("12.03.2024 1.234,56 EUR total")
+        assert score == 0.5 and metrics['reason'] == 'too_few_words'
+
+    def test_spelling_sample_scores_text(self):
+        """Test the spell-check result of a shared run is applied per text"""
+        score, metrics, sample = prescreen_text_quality(self.TEXT)
+        assert score is None
+        assert 'invoice' in sample
+
+        clean = finish_text_quality(dict(metrics), sample, {'someotherpageword'})
+        assert clean > 0.95
+
+        garbled = finish_text_quality(dict(metrics), sample, set(list(sample)[:len(sample) // 2 + 1]))
+        assert garbled < 0.75
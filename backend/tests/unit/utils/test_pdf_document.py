@@ -0,0 +1,38 @@
+"""
+Unit tests for the parse-once PDF handle (spooling and memory mapping)
+"""
+import hashlib
+import os
+
+from app.utils.pdf_document import PDFDocument
+
+PDF_BYTES = b"%PDF-1.4\n% not a real document\n%%EOF\n"
+
+
+class TestPDFDocumentSpool:
+    """Test suite for PDFDocument.spool and PDFDocument.open"""
+
+    def test_spool_maps_bytes_and_removes_file(self):
+        """Test spooled content is readable through the mapping and deleted on close"""
+        with PDFDocument.spool(PDF_BYTES) as document:
+            path = document.path
+            assert os.path.exists(path)
+            assert document.size == len(PDF_BYTES)
+            assert document.buffer[:8] == b"%PDF-1.4"
+            assert hashlib.sha256(document.buffer).hexdigest() == hashlib.sha256(PDF_BYTES).hexdigest()
+        assert not os.path.exists(path)
+
+    def test_open_does_not_delete_foreign_file(self, tmp_path):
+        """Test a handle opened on an existing file leaves it in place"""
+        path = tmp_path / "upload.pdf"
+        path.write_bytes(PDF_BYTES)
+        with PDFDocument.open(str(path)) as document:
+            assert bytes(document.buffer) == PDF_BYTES
+        assert path.exists()
+
+    def test_empty_file(self, tmp_path):
+        """Test an empty file gives an empty buffer instead of failing to map"""
+        path = tmp_path / "empty.pdf"
+        path.write_bytes(b"")
+        with PDFDocument.open(str(path)) as document:
+            assert document.size == 0
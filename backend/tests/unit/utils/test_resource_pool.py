@@ -0,0 +1,96 @@
+"""
+Unit tests for the keyed LRU resource pool
+"""
+import threading
+
+import pytest
+
+from app.utils.resource_pool import KeyedPool, PoolTimeout
+
+
+class FakeEngine:
+    def __init__(self, key):
+        self.key = key
+        self.closed = False
+
+
+def _pool(max_size=2, max_per_key=1):
+    created = []
+
+    def factory(key):
+        engine = FakeEngine(key)
+        created.append(engine)
+        return engine
+
+    pool = KeyedPool(factory, max_size=max_size, max_per_key=max_per_key, close=lambda e: setattr(e, 'closed', True))
+    return pool, created
+
+
+class TestKeyedPool:
+    """Test suite for KeyedPool"""
+
+    def test_reuses_resource_per_key(self):
+        """Test a returned resource is handed out again for the same key"""
+        pool, created = _pool()
+        with pool.acquire('eng') as first:
+            pass
+        with pool.acquire('eng') as second:
+            pass
+        assert first is second
+        assert len(created) == 1
+        assert pool.get_stats()['hits'] == 1
+
+    def test_evicts_least_recently_used_key(self):
+        """Test a full pool closes the idle resource of the least recently used key"""
+        pool, created = _pool(max_size=2)
+        with pool.acquire('eng'):
+            pass
+        with pool.acquire('deu'):
+            pass
+        with pool.acquire('eng'):
+            pass
+        with pool.acquire('eng+deu+rus'):
+            pass
+
+        deu = next(e for e in created if e.key == 'deu')
+        assert deu.closed
+        assert pool.get_stats()['keys'] == {'eng': 1, 'eng+deu+rus': 1}
+
+    def test_busy_key_times_out(self):
+        """Test a key at its per-key limit waits and then raises PoolTimeout"""
+        pool, _ = _pool(max_size=2, max_per_key=1)
+        with pool.acquire('eng'):
+            with pytest.raises(PoolTimeout):
+                with pool.acquire('eng', timeout=0.01):
+                    pass
+
+    def test_waiter_gets_returned_resource(self):
+        """Test a waiting caller receives the resource once it is returned"""
+        pool, created = _pool(max_size=1)
+        got = []
+        held, release = threading.Event(), threading.Event()
+
+        def holder():
+            with pool.acquire('eng'):
+                held.set()
+                release.wait(1)
+
+        thread = threading.Thread(target=holder)
+        thread.start()
+        held.wait(1)
+
+        threading.Timer(0.05, release.set).start()
+        with pool.acquire('eng', timeout=1) as engine:
+            got.append(engine)
+        thread.join()
+        assert got == created
+
+    def test_failed_use_discards_resource(self):
+        """Test a resource whose user raised is closed and not reused"""
+        pool, created = _pool()
+        with pytest.raises(ValueError):
+            with pool.acquire('eng'):
+                raise ValueError("engine crashed")
+        assert created[0].closed
+        with pool.acquire('eng') as engine:
+            assert engine is not created[0]
@@ -0,0 +1,83 @@
+"""
+Unit tests for the single-pass token pipeline
+"""
+import re
+from collections import Counter
+
+from app.utils.token_pipeline import TermCounts, scan_tokens
+
+TEXT = (
+    "Rechnung Nr. 4711 für die Lieferung der Waren. Die Rechnung ist innerhalb von 14 Tagen zu zahlen. "
+    "Acme GmbH bedankt sich für die Lieferung!!! Zahlung per Überweisung an Acme GmbH. Aaaah Rechnung."
+)
+STOP_WORDS = frozenset({'für', 'die', 'der', 'ist', 'von', 'sich', 'per', 'rechnung'})
+
+
+def reference_unigrams(text, stop_words, preserve, exclude):
+    """Token filtering as done before the pipeline: tokenize, then one pass per filter"""
+    tokens = re.findall(r'\b[a-zа-яäöüßàáâãçéèêëíìîïñóòôõúùûüğışţ]{3,}\b', text.lower(), re.IGNORECASE)
+    tokens = [t for t in tokens if t in preserve or t not in stop_words]
+    return Counter(t for t in tokens if t not in exclude)
+
+
+class TestTermCounts:
+    """Test suite for TermCounts"""
+
+    def test_counts_like_counter(self):
+        """Test counts, totals and most_common ordering match Counter"""
+        words = 'b a c a b a d'.split()
+        counts = TermCounts()
+        for word in words:
+            counts.add(word)
+
+        assert counts.most_common(2) == Counter(words).most_common(2)
+        assert counts.most_common() == Counter(words).most_common()
+        assert counts['a'] == 3 and counts['zzz'] == 0
+        assert counts.total == 7 and len(counts) == 4
+
+    def test_discard(self):
+        """Test discarded terms disappear from counts, totals and iteration"""
+        counts = TermCounts()
+        for word in 'a a b'.split():
+            counts.add(word)
+
+        counts.discard('a')
+        counts.discard('missing')
+
+        assert 'a' not in counts
+        assert list(counts) == ['b']
+        assert counts.total == 1 and len(counts) == 1
+
+
+class TestScanTokens:
+    """Test suite for scan_tokens"""
+
+    def test_matches_multi_pass_filtering(self):
+        """Test the fused pass yields the same unigram counts as separate filter passes"""
+        preserve = frozenset({'rechnung'})
+        exclude = frozenset({'acme', 'gmbh'})
+
+        scan = scan_tokens(TEXT, STOP_WORDS, preserve, exclude)
+
+        assert dict(scan.unigrams.items()) == dict(reference_unigrams(TEXT, STOP_WORDS, preserve, exclude))
+        assert scan.unigrams['rechnung'] == 3
+        assert scan.preserved == {'rechnung'}
+        assert scan.excluded_hits == 4
+
+    def test_ngrams_skip_stop_words_and_noise(self):
+        """Test n-grams are built from filtered tokens (stop words and OCR noise removed)"""
+        scan = scan_tokens(TEXT, STOP_WORDS, ngram_size=2)
+
+        assert scan.ngrams['acme gmbh'] == 2
+        assert scan.ngrams['lieferung waren'] == 1
+        assert not any('aaaah' in phrase for phrase in scan.ngrams)
+        assert not any('die' in phrase.split() for phrase in scan.ngrams)
+
+    def test_no_ngrams_unless_requested(self):
+        assert scan_tokens(TEXT).ngrams is None
+
+    def test_control_characters_are_removed(self):
+        """Test control characters don't split words, as in cleanse_text"""
+        scan = scan_tokens("Lie\x00ferung")
+
+        assert list(scan.unigrams) == ['lieferung']